@@ -6,6 +6,27 @@
 extern "C" {
 #endif
 
+/* An entry of the LOAD_GLOBAL cache of a code object: the object a global
+   name was found to refer to, which stays valid as long as the globals and
+   the builtins keep the versions they had then (see dictobject.h). */
+typedef struct {
+    PY_DICT_VERSION_T gc_globals_version;
+    PY_DICT_VERSION_T gc_builtins_version;
+    PyObject *gc_value;		/* borrowed from one of the dicts */
+} PyGlobalCacheEntry;
+
+/* An entry of the attribute cache of a code object, for one LOAD_ATTR or
+   LOAD_METHOD instruction: where the attribute was found on an instance
+   of ac_type, which stays valid while the type keeps its version tag. */
+typedef struct {
+    PyTypeObject *ac_type;	/* borrowed; 0 ac_kind if the entry is unused */
+    unsigned int ac_version;	/* tp_version_tag of ac_type */
+    int ac_kind;		/* where the attribute is, see ceval.c */
+    Py_ssize_t ac_index;	/* index hint in the instance dict, or offset
+				   of the slot */
+    PyObject *ac_descr;		/* the function found on the type, borrowed */
+} PyAttrCacheEntry;
+
 /* Bytecode object */
 typedef struct {
     PyObject_HEAD
@@ -26,6 +47,12 @@ typedef struct {
     int co_firstlineno;		/* first source line number */
     PyObject *co_lnotab;	/* string (encoding addr<->lineno mapping) */
     void *co_zombieframe;     /* for optimization only (see frameobject.c) */
+    PyGlobalCacheEntry *co_globalcache; /* LOAD_GLOBAL cache, indexed like
+                                           co_names; NULL until needed */
+    PyAttrCacheEntry *co_attrcache; /* LOAD_ATTR and LOAD_METHOD caches;
+                                       NULL until needed */
+    unsigned char *co_attrcache_map; /* 1 + index in co_attrcache of the
+                                        instruction at each offset, or 0 */
 } PyCodeObject;
 
 /* Masks for co_flags above */
@@ -66,6 +66,14 @@ values == the number of Active items).
 To avoid slowing down lookups on a near-full table, we resize the table when
 it's two-thirds full.
 */
+/* The type of dict versions; 64 bits where possible, so that the version
+   counter never wraps around. */
+#ifdef HAVE_LONG_LONG
+#define PY_DICT_VERSION_T unsigned PY_LONG_LONG
+#else
+#define PY_DICT_VERSION_T size_t
+#endif
+
 typedef struct _dictobject PyDictObject;
 struct _dictobject {
 	PyObject_HEAD
@@ -85,6 +93,24 @@ struct _dictobject {
 	 */
 	PyDictEntry *ma_table;
 	PyDictEntry *(*ma_lookup)(PyDictObject *mp, PyObject *key, long hash);
+
+	/* ma_version changes whenever an item is added, replaced or removed.
+	 * The versions of all dicts are drawn from a single counter, so that
+	 * a version identifies both a dict and its contents: an unchanged
+	 * version means that the values previously found are still there.
+	 */
+	PY_DICT_VERSION_T ma_version;
+
+	/* ma_values is NULL for an ordinary ("combined") table.  For a split
+	 * table, ma_table points to a key table shared with the __dict__ of
+	 * other instances of the same class, whose me_value fields are
+	 * unused, and the values are held in ma_values, indexed like
+	 * ma_table.  Split tables are allocated without ma_smalltable; they
+	 * have ma_nosmalltable set, which stays set if such a dict is turned
+	 * into a combined table.
+	 */
+	PyObject **ma_values;
+	int ma_nosmalltable;
 	PyDictEntry ma_smalltable[PyDict_MINSIZE];
 };
 
@@ -124,9 +150,15 @@ PyAPI_FUNC(Py_ssize_t) PyDict_Size(PyObject *mp);
 PyAPI_FUNC(PyObject *) PyDict_Copy(PyObject *mp);
 PyAPI_FUNC(int) PyDict_Contains(PyObject *mp, PyObject *key);
 PyAPI_FUNC(int) _PyDict_Contains(PyObject *mp, PyObject *key, long hash);
+PyAPI_FUNC(PyObject *) _PyDict_GetItemHint(PyObject *mp, PyObject *key,
+					   Py_ssize_t *hint);
 PyAPI_FUNC(PyObject *) _PyDict_NewPresized(Py_ssize_t minused);
 PyAPI_FUNC(void) _PyDict_MaybeUntrack(PyObject *mp);
 
+/* Instance dicts of heap types, with a key table shared through the type */
+PyAPI_FUNC(PyObject *) _PyObjectDict_New(PyTypeObject *tp);
+PyAPI_FUNC(void) _PyDict_DecRefSharedKeys(struct _dictsharedkeys *keys);
+
 /* PyDict_Update(mp, other) is equivalent to PyDict_Merge(mp, other, 1). */
 PyAPI_FUNC(int) PyDict_Update(PyObject *mp, PyObject *other);
 
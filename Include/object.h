@@ -388,6 +388,8 @@ typedef struct _heaptypeobject {
 					  see add_operators() in typeobject.c . */
 	PyBufferProcs as_buffer;
 	PyObject *ht_name, *ht_slots;
+	/* key table shared by the __dict__ of instances, see dictobject.c */
+	struct _dictsharedkeys *ht_cached_keys;
 	/* here are optional user slots, followed by the members. */
 } PyHeapTypeObject;
 
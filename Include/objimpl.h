@@ -101,6 +101,30 @@ PyAPI_FUNC(void) PyObject_Free(void *);
 
 /* Macros */
 #ifdef WITH_PYMALLOC
+/* Usage of the small object allocator, see sys.getallocatorstats(). */
+#define _PYMALLOC_MAX_CLASSES		64
+#define _PYMALLOC_MAX_ARENA_POOLS	64
+typedef struct {
+	size_t arena_size;
+	size_t pool_size;
+	size_t narenas;			/* arenas currently allocated */
+	size_t narenas_total;		/* arenas ever allocated */
+	size_t narenas_highwater;	/* most arenas allocated at once */
+	size_t npools_used;
+	size_t npools_free;		/* includes pools never used yet */
+	size_t allocated_bytes;		/* in blocks handed out */
+	size_t available_bytes;		/* in free blocks of used pools */
+	unsigned int nclasses;
+	size_t class_size[_PYMALLOC_MAX_CLASSES];
+	size_t class_pools[_PYMALLOC_MAX_CLASSES];
+	size_t class_blocks[_PYMALLOC_MAX_CLASSES];
+	size_t class_freeblocks[_PYMALLOC_MAX_CLASSES];
+	/* arena_usage[n] is the number of arenas with n pools in use */
+	unsigned int arena_pools;
+	size_t arena_usage[_PYMALLOC_MAX_ARENA_POOLS + 1];
+} _PyMallocStats;
+PyAPI_FUNC(void) _PyObject_GetMallocStats(_PyMallocStats *stats);
+
 #ifdef PYMALLOC_DEBUG	/* WITH_PYMALLOC && PYMALLOC_DEBUG */
 PyAPI_FUNC(void *) _PyObject_DebugMalloc(size_t nbytes);
 PyAPI_FUNC(void *) _PyObject_DebugRealloc(void *p, size_t nbytes);
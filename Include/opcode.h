@@ -137,6 +137,9 @@ extern "C" {
 #define SET_ADD         146
 #define MAP_ADD         147
 
+#define LOAD_METHOD     160	/* Index in name list */
+#define CALL_METHOD     161	/* #args + (#kwargs<<8) */
+
 
 /* EXCEPT_HANDLER is a special, implicit block type which is created when
    entering an except handler. It is not an opcode but we define it here
@@ -940,6 +940,49 @@ class BufferedReader(_BufferedIOMixin):
         self._read_pos = 0
         return out[:n] if out else nodata_val
 
+    def readinto(self, b):
+        """Read up to len(b) bytes into b.
+
+        Like read(), but whole blocks are read with raw.readinto()
+        straight into b instead of going through the buffer.
+        """
+        with self._read_lock:
+            return self._readinto_unlocked(b)
+
+    def _readinto_unlocked(self, b):
+        view = memoryview(b)
+        if view.itemsize != 1:
+            return BufferedIOBase.readinto(self, b)
+        n = len(view)
+        buf = self._read_buf
+        pos = self._read_pos
+        avail = len(buf) - pos
+        if n <= avail:
+            # Fast path: the data to read is fully buffered.
+            view[:n] = buf[pos:pos+n]
+            self._read_pos += n
+            return n
+        view[:avail] = buf[pos:]
+        written = avail
+        self._reset_read_buf()
+        while n - written >= self.buffer_size:
+            r = self.raw.readinto(view[written:])
+            if not r:
+                return None if r is None and not written else written
+            written += r
+        while written < n:
+            chunk = self.raw.read(self.buffer_size)
+            if not chunk:
+                return None if chunk is None and not written else written
+            r = min(len(chunk), n - written)
+            view[written:written+r] = chunk[:r]
+            written += r
+            if r < len(chunk):
+                # Save the extra data in the buffer.
+                self._read_buf = chunk
+                self._read_pos = r
+        return written
+
     def peek(self, n=0):
         """Returns buffered bytes without advancing the position.
 
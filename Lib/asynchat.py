@@ -204,10 +204,12 @@ class async_chat (asyncore.dispatcher):
         else:
             self.producer_fifo.append(data)
         self.initiate_send()
+        self.interest_changed()
 
     def push_with_producer (self, producer):
         self.producer_fifo.append(producer)
         self.initiate_send()
+        self.interest_changed()
 
     def readable (self):
         "predicate for inclusion in the readable for select()"
@@ -224,6 +226,7 @@ class async_chat (asyncore.dispatcher):
     def close_when_done (self):
         "automatically close this channel once the outgoing queue is empty"
         self.producer_fifo.append(None)
+        self.interest_changed()
 
     def initiate_send(self):
         while self.producer_fifo and self.connected:
@@ -236,6 +239,11 @@ class async_chat (asyncore.dispatcher):
                     self.handle_close()
                     return
                 ## print("first is not None")
+            elif self._can_sendmsg():
+                buffers = self._gather_buffers()
+                if len(buffers) > 1:
+                    self._initiate_sendmsg(buffers)
+                    return
 
             # handle classic producer behavior
             obs = self.ac_out_buffer_size
@@ -267,11 +275,44 @@ class async_chat (asyncore.dispatcher):
             # we tried to send some actual data
             return
 
+    # at most this many queued buffers are handed to one sendmsg() call
+    ac_max_gather = 64
+
+    def _can_sendmsg(self):
+        # a subclass overriding send() expects to see every write
+        return (hasattr(self.socket, 'sendmsg') and
+                type(self).send is asyncore.dispatcher.send)
+
+    def _gather_buffers(self):
+        buffers = []
+        for data in self.producer_fifo:
+            if (not isinstance(data, (bytes, bytearray)) or not data or
+                len(buffers) == self.ac_max_gather):
+                break
+            buffers.append(data)
+        return buffers
+
+    def _initiate_sendmsg(self, buffers):
+        # send consecutive queued buffers with a single system call
+        try:
+            num_sent = self.sendmsg(buffers)
+        except socket.error:
+            self.handle_error()
+            return
+        for data in buffers:
+            if num_sent < len(data):
+                if num_sent:
+                    self.producer_fifo[0] = data[num_sent:]
+                break
+            num_sent -= len(data)
+            del self.producer_fifo[0]
+
     def discard_buffers (self):
         # Emergencies only!
         self.ac_in_buffer = b''
         del self.incoming[:]
         self.producer_fifo.clear()
+        self.interest_changed()
 
 class simple_producer:
 
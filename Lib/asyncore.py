@@ -52,7 +52,8 @@ import sys
 import time
 import os
 from errno import EALREADY, EINPROGRESS, EWOULDBLOCK, ECONNRESET, \
-     ENOTCONN, ESHUTDOWN, EINTR, EISCONN, EBADF, ECONNABORTED, errorcode
+     ENOTCONN, ESHUTDOWN, EINTR, EISCONN, EBADF, ECONNABORTED, ENOENT, \
+     EEXIST, EPERM, errorcode
 
 try:
     socket_map
@@ -192,23 +193,171 @@ def poll2(timeout=0.0, map=None):
 
 poll3 = poll2                           # Alias for backward compatibility
 
+# The epoll pollers used by running loops, by id() of their map
+_pollers = {}
+
+def _interest_changed(map, fd):
+    poller = _pollers.get(id(map))
+    if poller is not None:
+        poller.changed.add(fd)
+
+class epoll_poller:
+    # Keeps the fds of a map registered with an epoll object between
+    # calls, so that the sockets aren't registered again at each pass.
+    # readable() and writable() are asked again for the channels which
+    # were added or handled an event; for a channel which isn't watched
+    # for both events, the missing predicate is asked at every pass, since
+    # it may have become true because of another channel.  A ready channel
+    # is asked again before its events are handled, in case a predicate
+    # has become false since.  The event flags have the same values as
+    # poll's.
+
+    _IN = getattr(select, 'EPOLLIN', 0) | getattr(select, 'EPOLLPRI', 0)
+    _OUT = getattr(select, 'EPOLLOUT', 0)
+
+    def __init__(self, map):
+        self.map = map
+        self.epoll = select.epoll()
+        self.registered = {}    # fd -> (dispatcher, event mask)
+        self.always_ready = {}  # fds which epoll can't watch (files)
+        self.partial = set()    # fds not watched for both events
+        self.changed = set(map)
+
+    def _set_interest(self, fd, obj, flags):
+        registered = self.registered
+        if obj is None or flags & self._IN and flags & self._OUT:
+            self.partial.discard(fd)
+        else:
+            self.partial.add(fd)
+        if not flags:
+            # Like poll2(), don't report errors for channels which
+            # are neither readable nor writable
+            if registered.pop(fd, None) is not None:
+                self.always_ready.pop(fd, None)
+                try:
+                    self.epoll.unregister(fd)
+                except (IOError, ValueError):
+                    # the fd was closed, which unregistered it
+                    pass
+            return
+        flags |= select.EPOLLERR | select.EPOLLHUP
+        old = registered.get(fd)
+        if old is not None and old[0] is obj and old[1] == flags:
+            return
+        registered[fd] = (obj, flags)
+        if fd in self.always_ready:
+            self.always_ready[fd] = flags
+            return
+        try:
+            try:
+                self.epoll.modify(fd, flags)
+            except IOError as err:
+                if err.args[0] != ENOENT:
+                    raise
+                self.epoll.register(fd, flags)
+        except IOError as err:
+            if err.args[0] != EPERM:
+                raise
+            # regular files are always ready
+            self.always_ready[fd] = flags
+
+    def update(self):
+        map = self.map
+        registered = self.registered
+        changed = self.changed
+        for fd in changed:
+            obj = map.get(fd)
+            flags = 0
+            if obj is not None:
+                if obj.readable():
+                    flags |= self._IN
+                if obj.writable():
+                    flags |= self._OUT
+            self._set_interest(fd, obj, flags)
+        for fd in list(self.partial):
+            if fd in changed:
+                continue
+            obj = map.get(fd)
+            if obj is None:
+                self._set_interest(fd, obj, 0)
+                continue
+            old = registered.get(fd)
+            if old is None:
+                flags = new = 0
+            elif old[0] is obj:
+                flags = new = old[1]
+            else:
+                # the fd was reused by another channel
+                flags, new = None, 0
+            if not new & self._IN and obj.readable():
+                new |= self._IN
+            if not new & self._OUT and obj.writable():
+                new |= self._OUT
+            if new != flags:
+                self._set_interest(fd, obj, new)
+        changed.clear()
+
+    def __call__(self, timeout=0.0, map=None):
+        self.update()
+        if timeout is None:
+            timeout = -1
+        try:
+            r = self.epoll.poll(timeout)
+        except IOError as err:
+            if err.args[0] != EINTR:
+                raise
+            r = []
+        if self.always_ready:
+            r.extend(self.always_ready.items())
+        map = self.map
+        registered = self.registered
+        changed = self.changed
+        for fd, flags in r:
+            obj = map.get(fd)
+            if obj is None:
+                continue
+            changed.add(fd)
+            mask = registered.get(fd, (obj, flags))[1]
+            if flags & mask & self._IN and not obj.readable():
+                mask &= ~self._IN
+            if flags & mask & self._OUT and not obj.writable():
+                mask &= ~self._OUT
+            if mask & (self._IN | self._OUT):
+                readwrite(obj, flags & mask)
+
+    def close(self):
+        self.epoll.close()
+
 def loop(timeout=30.0, use_poll=False, map=None, count=None):
     if map is None:
         map = socket_map
 
-    if use_poll and hasattr(select, 'poll'):
+    poller = None
+    if use_poll == 'epoll' and hasattr(select, 'epoll'):
+        poll_fun = poller = epoll_poller(map)
+        old_poller = _pollers.get(id(map))
+        _pollers[id(map)] = poller
+    elif use_poll and hasattr(select, 'poll'):
         poll_fun = poll2
     else:
         poll_fun = poll
 
-    if count is None:
-        while map:
-            poll_fun(timeout, map)
+    try:
+        if count is None:
+            while map:
+                poll_fun(timeout, map)
 
-    else:
-        while map and count > 0:
-            poll_fun(timeout, map)
-            count = count - 1
+        else:
+            while map and count > 0:
+                poll_fun(timeout, map)
+                count = count - 1
+    finally:
+        if poller is not None:
+            if old_poller is None:
+                del _pollers[id(map)]
+            else:
+                _pollers[id(map)] = old_poller
+            poller.close()
 
 class dispatcher:
 
@@ -269,6 +418,7 @@ class dispatcher:
         if map is None:
             map = self._map
         map[self._fileno] = self
+        _interest_changed(map, self._fileno)
 
     def del_channel(self, map=None):
         fd = self._fileno
@@ -277,8 +427,15 @@ class dispatcher:
         if fd in map:
             #self.log_info('closing channel %d:%s' % (fd, self))
             del map[fd]
+            _interest_changed(map, fd)
         self._fileno = None
 
+    def interest_changed(self):
+        # Tell a loop using epoll to check readable() and writable() again;
+        # needed when they change other than by handling an event.
+        if self._fileno is not None:
+            _interest_changed(self._map, self._fileno)
+
     def create_socket(self, family, type):
         self.family_and_type = family, type
         sock = socket.socket(family, type)
@@ -364,6 +521,19 @@ class dispatcher:
             else:
                 raise
 
+    def sendmsg(self, buffers):
+        try:
+            result = self.socket.sendmsg(buffers)
+            return result
+        except socket.error as why:
+            if why.args[0] == EWOULDBLOCK:
+                return 0
+            elif why.args[0] in (ECONNRESET, ENOTCONN, ESHUTDOWN, ECONNABORTED):
+                self.handle_close()
+                return 0
+            else:
+                raise
+
     def recv(self, buffer_size):
         try:
             data = self.socket.recv(buffer_size)
@@ -519,6 +689,7 @@ class dispatcher_with_send(dispatcher):
             self.log_info('sending %s' % repr(data))
         self.out_buffer = self.out_buffer + data
         self.initiate_send()
+        self.interest_changed()
 
 # ---------------------------------------------------------------------------
 # used for debugging.
@@ -134,6 +134,33 @@ def _slotnames(cls):
 
     return names
 
+# Bytes-like objects whose data a pickler with a buffer_callback may send
+# out-of-band.  The registry maps a type to a function taking the object
+# and returning a (reconstructor, args) pair; when unpickling, the object
+# is rebuilt as reconstructor(*args, buffer), where buffer is the
+# out-of-band buffer handed to the unpickler.
+
+_buffer_registry = {}                   # type -> reduction function
+
+def _bytes_from_buffer(buffer):
+    if type(buffer) is bytes:
+        return buffer
+    return bytes(buffer)
+
+def _bytearray_from_buffer(buffer):
+    if type(buffer) is bytearray:
+        return buffer
+    return bytearray(buffer)
+
+def _array_from_buffer(typecode, buffer):
+    from array import array
+    obj = array(typecode)
+    obj.fromstring(buffer)
+    return obj
+
+_buffer_registry[bytes] = lambda obj: (_bytes_from_buffer, ())
+_buffer_registry[bytearray] = lambda obj: (_bytearray_from_buffer, ())
+
 # A registry of extension codes.  This is an ad-hoc compression
 # mechanism.  Whenever a global reference to <module>, <name> is about
 # to be pickled, the (<module>, <name>) tuple is looked up here to see
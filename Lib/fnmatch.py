@@ -14,8 +14,10 @@ import re
 
 __all__ = ["filter", "fnmatch","fnmatchcase","translate"]
 
-_cache = {}  # Maps text patterns to compiled regexen.
-_cacheb = {}  # Ditto for bytes patterns.
+_MAXCACHE = 100
+
+_cache = re._LRUCache(_MAXCACHE)  # Maps text patterns to compiled regexen.
+_cacheb = re._LRUCache(_MAXCACHE)  # Ditto for bytes patterns.
 
 def fnmatch(name, pat):
     """Test whether FILENAME matches PATTERN.
@@ -39,6 +41,8 @@ def fnmatch(name, pat):
     return fnmatchcase(name, pat)
 
 def _compile_pattern(pat):
+    # str and bytes patterns are kept apart, since comparing them raises
+    # a BytesWarning under -b
     cache = _cacheb if isinstance(pat, bytes) else _cache
     regex = cache.get(pat)
     if regex is None:
@@ -48,9 +52,15 @@ def _compile_pattern(pat):
             res = bytes(res_str, 'ISO-8859-1')
         else:
             res = translate(pat)
-        cache[pat] = regex = re.compile(res)
+        regex = re.compile(res)
+        cache.set(pat, regex)
     return regex.match
 
+def _purge():
+    """Clear the pattern cache"""
+    _cache.clear()
+    _cacheb.clear()
+
 def filter(names, pat):
     """Return the subset of the list NAMES that match PAT"""
     import os,posixpath
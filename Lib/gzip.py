@@ -1,13 +1,21 @@
 """Functions that read and write gzipped files.
 
-The user of the file doesn't have to worry about the compression,
-but random access is not allowed."""
+The user of the file doesn't have to worry about the compression.
+Random access is slow, unless the file was written in blocks and an
+index of the blocks is available."""
 
 # based on Andrew Kuchling's minigzip.py distributed with the zlib module
 
-import struct, sys, time
+import struct, sys, time, os
+import bisect
+import collections
+import queue
 import zlib
 import builtins
+try:
+    import threading
+except ImportError:
+    threading = None
 
 __all__ = ["GzipFile","open"]
 
@@ -15,6 +23,14 @@ FTEXT, FHCRC, FEXTRA, FNAME, FCOMMENT = 1, 2, 4, 8, 16
 
 READ, WRITE = 1, 2
 
+# The largest block allowed in the BGZF format, where the size of each
+# compressed member (less one) must fit in 16 bits
+BGZF_MAX_BLOCKSIZE = 0xff00
+
+# The empty member which ends a BGZF file
+_BGZF_EOF = (b'\037\213\010\004\000\000\000\000\000\377\006\000BC\002\000'
+             b'\033\000\003\000\000\000\000\000\000\000\000\000')
+
 def U32(i):
     """Return i as an unsigned integer, assuming it fits in 32 bits.
     If it's >= 2GB when viewed as a 32-bit unsigned int, return a long.
@@ -44,6 +60,88 @@ def open(filename, mode="rb", compresslevel=9):
     """
     return GzipFile(filename, mode, compresslevel)
 
+def _cpu_count():
+    try:
+        return max(os.sysconf('SC_NPROCESSORS_ONLN'), 1)
+    except (AttributeError, ValueError, OSError):
+        return 1
+
+def _compress_member(data, compresslevel, mtime, bgzf):
+    """Return data compressed as a complete gzip member."""
+    compress = zlib.compressobj(compresslevel, zlib.DEFLATED, -zlib.MAX_WBITS,
+                                zlib.DEF_MEM_LEVEL, 0)
+    body = compress.compress(data) + compress.flush()
+    trailer = struct.pack("<LL", zlib.crc32(data) & 0xffffffff,
+                          len(data) & 0xffffffff)
+    if bgzf:
+        # the BC subfield holds the size of the whole member, less one
+        size = 18 + len(body) + 8
+        header = struct.pack("<4sLBBHBBHH", b'\037\213\010\004', mtime, 0,
+                             255, 6, ord('B'), ord('C'), 2, size - 1)
+    else:
+        header = struct.pack("<4sLBB", b'\037\213\010\000', mtime, 0, 255)
+    return header + body + trailer
+
+class _BlockCompressor:
+    """Compress blocks on a number of threads, returning the results in
+    the order the blocks were submitted."""
+
+    def __init__(self, compress, threads):
+        self._compress = compress
+        self._pending = collections.deque()
+        self._jobs = queue.Queue()
+        self._threads = []
+        self.maxpending = 2 * threads
+        if threads > 1 and threading is not None:
+            for i in range(threads):
+                t = threading.Thread(target=self._work)
+                t.daemon = True
+                t.start()
+                self._threads.append(t)
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            try:
+                job.append(self._compress(job[0]))
+            except Exception as e:
+                job.append(e)
+            job[1].set()
+
+    def submit(self, data):
+        if not self._threads:
+            self._pending.append([data, None, self._compress(data)])
+            return
+        job = [data, threading.Event()]
+        self._pending.append(job)
+        self._jobs.put(job)
+
+    def results(self, wait=False):
+        """Yield the compressed blocks that are ready, in order.  If wait
+        is true, wait for all of them; otherwise only wait while there
+        are too many blocks in progress."""
+        pending = self._pending
+        while pending:
+            job = pending[0]
+            if job[1] is not None:
+                if not (wait or len(pending) > self.maxpending or
+                        job[1].is_set()):
+                    break
+                job[1].wait()
+            pending.popleft()
+            if isinstance(job[2], Exception):
+                raise job[2]
+            yield job[0], job[2]
+
+    def close(self):
+        for t in self._threads:
+            self._jobs.put(None)
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
 class GzipFile:
     """The GzipFile class simulates most of the methods of a file object with
     the exception of the readinto() and truncate() methods.
@@ -54,7 +152,8 @@ class GzipFile:
     max_read_chunk = 10 * 1024 * 1024   # 10Mb
 
     def __init__(self, filename=None, mode=None,
-                 compresslevel=9, fileobj=None, mtime=None):
+                 compresslevel=9, fileobj=None, mtime=None,
+                 blocksize=None, threads=None, bgzf=False):
         """Constructor for the GzipFile class.
 
         At least one of fileobj and filename must be given a
@@ -90,8 +189,24 @@ class GzipFile:
         return value of time.time() and of the st_mtime member of the
         object returned by os.stat().
 
+        If blocksize is given when writing, the data is cut into blocks of
+        blocksize bytes, each written as a separate gzip member, and the
+        blocks are compressed on threads threads (by default, one per
+        CPU).  If bgzf is true, the members are written in the BGZF format
+        used by bgzip, which limits blocksize to BGZF_MAX_BLOCKSIZE.  The
+        position of the blocks is kept in the index, which can be saved
+        with save_index(), and allows seek() to jump to any block when
+        reading.
+
         """
 
+        if blocksize is not None:
+            if bgzf and not 0 < blocksize <= BGZF_MAX_BLOCKSIZE:
+                raise ValueError("BGZF blocksize must be between 1 and %d"
+                                 % BGZF_MAX_BLOCKSIZE)
+            elif blocksize <= 0:
+                raise ValueError("blocksize must be positive")
+
         # guarantee the file is opened in binary mode on platforms
         # that care about that sort of thing
         if mode and 'b' not in mode:
@@ -105,6 +220,9 @@ class GzipFile:
             if hasattr(fileobj, 'mode'): mode = fileobj.mode
             else: mode = 'rb'
 
+        self.blocksize = blocksize
+        self.index = None
+
         if mode[0:1] == 'r':
             self.mode = READ
             # Set flag indicating start of a new member
@@ -131,7 +249,21 @@ class GzipFile:
         self.mtime = mtime
 
         if self.mode == WRITE:
-            self._write_gzip_header()
+            if blocksize is None:
+                self._write_gzip_header()
+            else:
+                if threads is None:
+                    threads = _cpu_count()
+                if mtime is None:
+                    mtime = time.time()
+                mtime = int(mtime)
+                self.bgzf = bgzf
+                self._blocks = _BlockCompressor(
+                    lambda data: _compress_member(data, compresslevel,
+                                                  mtime, bgzf),
+                    threads)
+                self._compressed_size = 0
+                self.index = []
 
     @property
     def filename(self):
@@ -181,6 +313,7 @@ class GzipFile:
         self.size = 0
 
     def _read_gzip_header(self):
+        # Return the size of the member given by a BGZF header, or None.
         magic = self.fileobj.read(2)
         if magic != b'\037\213':
             raise IOError('Not a gzipped file')
@@ -193,11 +326,17 @@ class GzipFile:
         # os = self.fileobj.read(1)
         self.fileobj.read(2)
 
+        membersize = None
         if flag & FEXTRA:
-            # Read & discard the extra field, if present
+            # Read the extra field, if present, looking for a BGZF block size
             xlen = ord(self.fileobj.read(1))
             xlen = xlen + 256*ord(self.fileobj.read(1))
-            self.fileobj.read(xlen)
+            extra = self.fileobj.read(xlen)
+            while len(extra) >= 4:
+                slen = extra[2] + 256*extra[3]
+                if extra[:2] == b'BC' and slen == 2 and len(extra) >= 6:
+                    membersize = extra[4] + 256*extra[5] + 1
+                extra = extra[4 + slen:]
         if flag & FNAME:
             # Read and discard a null-terminated string containing the filename
             while True:
@@ -212,7 +351,7 @@ class GzipFile:
                     break
         if flag & FHCRC:
             self.fileobj.read(2)     # Read & discard the 16-bit header CRC
-
+        return membersize
 
     def write(self,data):
         if self.mode != WRITE:
@@ -221,12 +360,33 @@ class GzipFile:
 
         if self.fileobj is None:
             raise ValueError("write() on closed GzipFile object")
-        if len(data) > 0:
+        if self.blocksize is not None:
+            self._write_blocks(data)
+        elif len(data) > 0:
             self.size = self.size + len(data)
             self.crc = zlib.crc32(data, self.crc) & 0xffffffff
             self.fileobj.write( self.compress.compress(data) )
             self.offset += len(data)
 
+    def _write_blocks(self, data, flush=False):
+        if len(data) > 0:
+            self.writebuf.append(bytes(data))
+            self.bufsize += len(data)
+            self.offset += len(data)
+        if self.bufsize >= self.blocksize or (flush and self.bufsize):
+            buf = b"".join(self.writebuf)
+            blocksize = self.blocksize
+            end = len(buf) if flush else len(buf) - len(buf) % blocksize
+            for start in range(0, end, blocksize):
+                self._blocks.submit(buf[start:min(start + blocksize, end)])
+            self.writebuf = [buf[end:]]
+            self.bufsize = len(buf) - end
+        for data, member in self._blocks.results(flush):
+            self.index.append((self._compressed_size, self.size))
+            self.fileobj.write(member)
+            self._compressed_size += len(member)
+            self.size += len(data)
+
     def read(self, size=-1):
         if self.mode != READ:
             import errno
@@ -338,7 +498,15 @@ class GzipFile:
     def close(self):
         if self.fileobj is None:
             return
-        if self.mode == WRITE:
+        if self.mode == WRITE and self.blocksize is not None:
+            try:
+                self._write_blocks(b"", True)
+            finally:
+                self._blocks.close()
+            if self.bgzf:
+                self.fileobj.write(_BGZF_EOF)
+            self.fileobj = None
+        elif self.mode == WRITE:
             self.fileobj.write(self.compress.flush())
             write32u(self.fileobj, self.crc)
             # self.size may exceed 2GB, or even 4GB
@@ -360,7 +528,10 @@ class GzipFile:
         self.close()
 
     def flush(self,zlib_mode=zlib.Z_SYNC_FLUSH):
-        if self.mode == WRITE:
+        if self.mode == WRITE and self.blocksize is not None:
+            # Write the data buffered so far as a (short) block
+            self._write_blocks(b"", True)
+        elif self.mode == WRITE:
             # Ensure the compressor's buffer is flushed
             self.fileobj.write(self.compress.flush(zlib_mode))
         self.fileobj.flush()
@@ -405,7 +576,18 @@ class GzipFile:
                 self.write(chunk)
             self.write(bytes(count % 1024))
         elif self.mode == READ:
-            if offset < self.offset:
+            if self.index:
+                # jump to the start of the member holding offset, unless
+                # it is the current one
+                i = bisect.bisect_right(self._index_offsets, offset) - 1
+                start = self._index_offsets[i]
+                if offset < self.offset or start > self.offset:
+                    self.fileobj.seek(self.index[i][0])
+                    self._new_member = True
+                    self.extrabuf = b""
+                    self.extrasize = 0
+                    self.offset = start
+            elif offset < self.offset:
                 # for negative seek, rewind and do positive seek
                 self.rewind()
             count = offset - self.offset
@@ -413,6 +595,82 @@ class GzipFile:
                 self.read(1024)
             self.read(count % 1024)
 
+    def build_index(self):
+        """Scan the file for the position of each gzip member, so that
+        seek() can start decompressing from the nearest one.
+
+        BGZF members are skipped over; others are decompressed once.
+        Returns the index, a list of (compressed offset, uncompressed
+        offset) pairs.
+        """
+        if self.mode != READ:
+            raise IOError("Can't build an index in write mode")
+        fileobj = self.fileobj
+        fileobj.seek(0, 2)
+        end = fileobj.tell()
+        index = []
+        pos = size = 0
+        while pos < end:
+            start = pos
+            fileobj.seek(pos)
+            membersize = self._read_gzip_header()
+            if membersize is not None:
+                fileobj.seek(pos + membersize - 4)
+                isize = read32(fileobj)
+                pos += membersize
+            else:
+                decompress = zlib.decompressobj(-zlib.MAX_WBITS)
+                isize = 0
+                while not decompress.unused_data:
+                    buf = fileobj.read(1024 * 1024)
+                    if not buf:
+                        raise IOError("Truncated gzip member")
+                    isize += len(decompress.decompress(buf))
+                isize += len(decompress.flush())
+                pos = fileobj.tell() - len(decompress.unused_data) + 8
+            if isize:
+                index.append((start, size))
+            size += isize
+        self.set_index(index)
+        return self.index
+
+    def set_index(self, index):
+        """Use index, a list of (compressed offset, uncompressed offset)
+        pairs giving the start of gzip members, to seek."""
+        if self.mode != READ:
+            raise IOError("Can't set an index in write mode")
+        index = [tuple(entry) for entry in index]
+        if not index or index[0] != (0, 0):
+            index.insert(0, (0, 0))
+        self.index = index
+        self._index_offsets = [u for c, u in index]
+        offset = self.offset
+        self.rewind()
+        self.seek(offset)
+
+    def save_index(self, filename):
+        """Save the index to a file in the .gzi format used by bgzip."""
+        index = self.index
+        if index is None:
+            raise ValueError("no index has been built")
+        with builtins.open(filename, "wb") as f:
+            entries = [entry for entry in index if entry != (0, 0)]
+            f.write(struct.pack("<Q", len(entries)))
+            for c, u in entries:
+                f.write(struct.pack("<QQ", c, u))
+
+    def load_index(self, filename):
+        """Load an index saved by save_index() or by bgzip."""
+        if self.mode != READ:
+            raise IOError("Can't load an index in write mode")
+        with builtins.open(filename, "rb") as f:
+            count = struct.unpack("<Q", f.read(8))[0]
+            data = f.read(16 * count)
+        if len(data) != 16 * count:
+            raise IOError("Truncated gzip index")
+        self.set_index([struct.unpack_from("<QQ", data, 16 * i)
+                         for i in range(count)])
+
     def readline(self, size=-1):
         if size < 0:
             size = sys.maxsize
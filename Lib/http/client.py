@@ -70,11 +70,17 @@ import email.parser
 import email.message
 import io
 import os
+import select
 import socket
+import time
 from urllib.parse import urlsplit
 import warnings
+try:
+    import threading
+except ImportError:
+    import dummy_threading as threading
 
-__all__ = ["HTTPResponse", "HTTPConnection",
+__all__ = ["HTTPResponse", "HTTPConnection", "HTTPConnectionPool",
            "HTTPException", "NotConnected", "UnknownProtocol",
            "UnknownTransferEncoding", "UnimplementedFileMode",
            "IncompleteRead", "InvalidURL", "ImproperConnectionState",
@@ -203,6 +209,10 @@ responses = {
 # maximal amount of data to read at one time in _safe_read
 MAXAMOUNT = 1048576
 
+# maximal amount of unread body that is read and discarded to keep a pooled
+# connection open when a response is closed early
+_MAXDRAIN = 65536
+
 class HTTPMessage(email.message.Message):
     # XXX The only usage of this method is in
     # http.server.CGIHTTPRequestHandler.  Maybe move the code there so
@@ -298,6 +308,10 @@ class HTTPResponse(io.RawIOBase):
         self.length = _UNKNOWN          # number of bytes left in response
         self.will_close = _UNKNOWN      # conn will close at end of response
 
+        # called with a flag telling whether the connection can be reused
+        # once the response is closed; see HTTPConnectionPool
+        self._release = None
+
     def _read_status(self):
         # Initialize with Simple-Response defaults.
         line = str(self.fp.readline(), "iso-8859-1")
@@ -453,9 +467,32 @@ class HTTPResponse(io.RawIOBase):
         return True
 
     def close(self):
+        if self.fp:
+            reusable = False
+            if self._release is not None and not self.will_close:
+                reusable = self._drain()
+            self._close_conn(reusable)
+
+    def _close_conn(self, reusable=True):
+        # Called with the default when the whole body has been read.
         if self.fp:
             self.fp.close()
             self.fp = None
+        release, self._release = self._release, None
+        if release is not None:
+            release(reusable and not self.will_close)
+
+    def _drain(self):
+        # Read and discard a short remaining body, so the connection can be
+        # used for the next request.  Return true if that was possible.
+        if self.chunked or self.length is None or self.length > _MAXDRAIN:
+            return False
+        try:
+            self._safe_read(self.length)
+        except (socket.error, IncompleteRead):
+            return False
+        self.length = 0
+        return True
 
     # These implementations are for the benefit of io.BufferedReader.
 
@@ -497,7 +534,7 @@ class HTTPResponse(io.RawIOBase):
             else:
                 s = self._safe_read(self.length)
                 self.length = 0
-            self.close()        # we read everything
+            self._close_conn()        # we read everything
             return s
 
         if self.length is not None:
@@ -512,7 +549,7 @@ class HTTPResponse(io.RawIOBase):
         if self.length is not None:
             self.length -= len(s)
             if not self.length:
-                self.close()
+                self._close_conn()
         return s
 
     def _read_chunked(self, amt):
@@ -565,7 +602,7 @@ class HTTPResponse(io.RawIOBase):
                 break
 
         # we read everything; close the "file"
-        self.close()
+        self._close_conn()
 
         return b''.join(value)
 
@@ -622,6 +659,22 @@ class HTTPResponse(io.RawIOBase):
     def getcode(self):
         return self.status
 
+def _split_hostport(host, port, default_port):
+    if port is None:
+        i = host.rfind(':')
+        j = host.rfind(']')         # ipv6 addresses have [...]
+        if i > j:
+            try:
+                port = int(host[i+1:])
+            except ValueError:
+                raise InvalidURL("nonnumeric port: '%s'" % host[i+1:])
+            host = host[:i]
+        else:
+            port = default_port
+        if host and host[0] == '[' and host[-1] == ']':
+            host = host[1:-1]
+    return host, port
+
 class HTTPConnection:
 
     _http_vsn = 11
@@ -653,21 +706,7 @@ class HTTPConnection:
         self._tunnel_port = port
 
     def _set_hostport(self, host, port):
-        if port is None:
-            i = host.rfind(':')
-            j = host.rfind(']')         # ipv6 addresses have [...]
-            if i > j:
-                try:
-                    port = int(host[i+1:])
-                except ValueError:
-                    raise InvalidURL("nonnumeric port: '%s'" % host[i+1:])
-                host = host[:i]
-            else:
-                port = self.default_port
-            if host and host[0] == '[' and host[-1] == ']':
-                host = host[1:-1]
-        self.host = host
-        self.port = port
+        self.host, self.port = _split_hostport(host, port, self.default_port)
 
     def set_debuglevel(self, level):
         self.debuglevel = level
@@ -740,6 +779,25 @@ class HTTPConnection:
         else:
             self.sock.sendall(str)
 
+    def _send_buffers(self, buffers):
+        """Send a list of bytes objects to the server, as a single write.
+
+        Sockets which support sendmsg() get the buffers in one system call
+        without joining them first.
+        """
+        if self.sock is None:
+            if self.auto_open:
+                self.connect()
+            else:
+                raise NotConnected()
+        if self.debuglevel > 0:
+            print("send:", repr(b"".join(buffers)))
+        sendall_buffers = getattr(self.sock, "_sendall_buffers", None)
+        if sendall_buffers is not None:
+            sendall_buffers(buffers)
+        else:
+            self.sock.sendall(b"".join(buffers))
+
     def _output(self, s):
         """Add a line of output to the current request buffer.
 
@@ -760,9 +818,10 @@ class HTTPConnection:
         # it will avoid performance problems caused by the interaction
         # between delayed ack and the Nagle algorithim.
         if isinstance(message_body, bytes):
-            msg += message_body
+            self._send_buffers([msg, message_body])
             message_body = None
-        self.send(msg)
+        else:
+            self.send(msg)
         if message_body is not None:
             # message_body was not a string (i.e. it is a file), and
             # we must run the risk of Nagle.
@@ -1046,6 +1105,154 @@ else:
 
     __all__.append("HTTPSConnection")
 
+
+class HTTPConnectionPool:
+    """Keep persistent connections open for reuse, per host.
+
+    request() sends a request over an idle connection to the same host
+    if there is one, or over a new connection otherwise.  When the
+    response has been read to the end, or closed, its connection goes
+    back to the pool.  At most maxsize idle connections are kept per
+    host, and connections left idle for more than idle_timeout seconds
+    are closed.
+    """
+
+    def __init__(self, maxsize=4, idle_timeout=60.0):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._idle = {}     # key -> list of (connection, time released)
+        self._lock = threading.Lock()
+        # statistics
+        self.requests = 0   # requests sent
+        self.reused = 0     # requests sent over a pooled connection
+        self.discarded = 0  # pooled connections found closed or stale
+
+    @property
+    def reuse_ratio(self):
+        """The fraction of requests sent over a pooled connection."""
+        if not self.requests:
+            return 0.0
+        return self.reused / self.requests
+
+    def get_connection(self, host, port=None,
+                       connection_class=HTTPConnection,
+                       timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
+                       tunnel_host=None):
+        """Return an idle pooled connection to host, or a new one.
+
+        The second item of the returned tuple is true if the connection
+        was taken from the pool.
+        """
+        key = (connection_class,) + _split_hostport(
+            host, port, connection_class.default_port) + (tunnel_host,)
+        now = time.time()
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                pooled, released = idle.pop()
+                if (now - released < self.idle_timeout and
+                    self._is_alive(pooled)):
+                    # the socket keeps the timeout of its previous user
+                    pooled.timeout = timeout
+                    if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+                        timeout = socket.getdefaulttimeout()
+                    pooled.sock.settimeout(timeout)
+                    return pooled, True
+                self.discarded += 1
+                pooled.close()
+        conn = connection_class(host, port, timeout=timeout)
+        if tunnel_host:
+            conn._set_tunnel(tunnel_host)
+        # connecting through a tunnel changes conn.host and conn.port
+        conn._pool_key = key
+        return conn, False
+
+    def _is_alive(self, conn):
+        # An idle connection should have nothing to read; if it has, the
+        # server has closed it (or sent something we can't make sense of).
+        if conn.sock is None:
+            return False
+        try:
+            return not select.select([conn.sock], [], [], 0)[0]
+        except (select.error, ValueError):
+            return False
+
+    def put_connection(self, conn):
+        """Return an idle connection to the pool, or close it if the
+        pool is full for its host."""
+        if conn.sock is None:
+            return
+        key = getattr(conn, '_pool_key', None)
+        if key is None:
+            key = conn._pool_key = (type(conn), conn.host, conn.port, None)
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.maxsize:
+                idle.append((conn, time.time()))
+                return
+        conn.close()
+
+    def request(self, method, url, body=None, headers={}, host=None,
+                connection_class=None,
+                timeout=socket._GLOBAL_DEFAULT_TIMEOUT, tunnel_host=None):
+        """Send a request and return the HTTPResponse.
+
+        url is an absolute http or https URL, unless host is given, in
+        which case url is sent as it is (for example, a path, or an
+        absolute URL for a proxy).  A request that fails on a pooled
+        connection the server has since closed is retried once on a new
+        connection, unless body is a file.
+        """
+        if host is None:
+            scheme, host, path, query, fragment = urlsplit(url)
+            if connection_class is None:
+                if scheme == 'http':
+                    connection_class = HTTPConnection
+                elif scheme == 'https' and 'HTTPSConnection' in __all__:
+                    connection_class = HTTPSConnection
+                else:
+                    raise UnknownProtocol(scheme)
+            url = path or '/'
+            if query:
+                url += '?' + query
+        if connection_class is None:
+            connection_class = HTTPConnection
+        while True:
+            conn, reused = self.get_connection(host, None, connection_class,
+                                               timeout, tunnel_host)
+            try:
+                conn.request(method, url, body, headers)
+                response = conn.getresponse()
+            except (socket.error, BadStatusLine):
+                conn.close()
+                if reused and not hasattr(body, 'read'):
+                    continue
+                raise
+            except:
+                conn.close()
+                raise
+            break
+        with self._lock:
+            self.requests += 1
+            if reused:
+                self.reused += 1
+
+        def release(reusable):
+            if reusable:
+                self.put_connection(conn)
+            else:
+                conn.close()
+        response._release = release
+        return response
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn, released in connections:
+                conn.close()
+
 class HTTPException(Exception):
     # Subclasses that define an __init__ must call Exception.__init__
     # or define self.args.  Otherwise, str() will fail.
@@ -82,11 +82,12 @@ XXX To do:
 
 __version__ = "0.6"
 
-__all__ = ["HTTPServer", "BaseHTTPRequestHandler"]
+__all__ = ["HTTPServer", "ThreadingHTTPServer", "BaseHTTPRequestHandler"]
 
 import cgi
 import email.message
 import email.parser
+import email.utils
 import http.client
 import io
 import mimetypes
@@ -130,6 +131,14 @@ class HTTPServer(socketserver.TCPServer):
         self.server_port = port
 
 
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+
+    """HTTP server handling each connection in a new thread, so that
+    idle persistent connections don't hold up other clients."""
+
+    daemon_threads = True
+
+
 class BaseHTTPRequestHandler(socketserver.StreamRequestHandler):
 
     """HTTP request handler base class.
@@ -332,7 +341,12 @@ class BaseHTTPRequestHandler(socketserver.StreamRequestHandler):
         commands such as GET and POST.
 
         """
-        self.raw_requestline = self.rfile.readline()
+        try:
+            self.raw_requestline = self.rfile.readline()
+        except socket.timeout:
+            # An idle persistent connection; see StreamRequestHandler.timeout
+            self.close_connection = 1
+            return
         if not self.raw_requestline:
             self.close_connection = 1
             return
@@ -344,6 +358,8 @@ class BaseHTTPRequestHandler(socketserver.StreamRequestHandler):
             return
         method = getattr(self, mname)
         method()
+        # Send any response still buffered before reading the next request
+        self.wfile.flush()
 
     def handle(self):
         """Handle multiple requests if necessary."""
@@ -377,12 +393,14 @@ class BaseHTTPRequestHandler(socketserver.StreamRequestHandler):
         # using _quote_html to prevent Cross Site Scripting attacks (see bug #1100201)
         content = (self.error_message_format %
                    {'code': code, 'message': _quote_html(message), 'explain': explain})
+        body = content.encode('UTF-8', 'replace')
         self.send_response(code, message)
         self.send_header("Content-Type", self.error_content_type)
         self.send_header('Connection', 'close')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
         if self.command != 'HEAD' and code >= 200 and code not in (204, 304):
-            self.wfile.write(content.encode('UTF-8', 'replace'))
+            self.wfile.write(body)
 
     def send_response(self, code, message=None):
         """Send the response header and log the response code.
@@ -390,6 +408,9 @@ class BaseHTTPRequestHandler(socketserver.StreamRequestHandler):
         Also send two standard headers with the server software
         version and the current date.
 
+        The status line and headers are buffered until end_headers()
+        or flush_headers() is called.
+
         """
         self.log_request(code)
         if message is None:
@@ -397,28 +418,83 @@ class BaseHTTPRequestHandler(socketserver.StreamRequestHandler):
                 message = self.responses[code][0]
             else:
                 message = ''
+        self._headers_buffer = []
+        self._response_code = code
+        self._framing = None
         if self.request_version != 'HTTP/0.9':
-            self.wfile.write(("%s %d %s\r\n" %
-                              (self.protocol_version, code, message)).encode('ASCII', 'strict'))
-            # print (self.protocol_version, code, message)
+            self._headers_buffer.append(("%s %d %s\r\n" %
+                    (self.protocol_version, code, message)).encode('ASCII', 'strict'))
         self.send_header('Server', self.version_string())
         self.send_header('Date', self.date_time_string())
 
     def send_header(self, keyword, value):
         """Send a MIME header."""
         if self.request_version != 'HTTP/0.9':
-            self.wfile.write(("%s: %s\r\n" % (keyword, value)).encode('ASCII', 'strict'))
+            if not hasattr(self, '_headers_buffer'):
+                self._headers_buffer = []
+            self._headers_buffer.append(
+                ("%s: %s\r\n" % (keyword, value)).encode('ASCII', 'strict'))
 
-        if keyword.lower() == 'connection':
+        keyword = keyword.lower()
+        if keyword == 'connection':
             if value.lower() == 'close':
                 self.close_connection = 1
             elif value.lower() == 'keep-alive':
                 self.close_connection = 0
+        elif keyword == 'content-length':
+            self._framing = 'length'
+        elif keyword == 'transfer-encoding' and value.lower() == 'chunked':
+            self._framing = 'chunked'
 
     def end_headers(self):
-        """Send the blank line ending the MIME headers."""
+        """Send the blank line ending the MIME headers.
+
+        If the connection would be kept open but the length of the body
+        can't be determined from the headers, a "Connection: close"
+        header is added first, so that the end of the body is marked by
+        closing the connection.
+
+        """
+        if (not self.close_connection and
+            getattr(self, '_framing', None) is None and
+            self.command != 'HEAD' and
+            getattr(self, '_response_code', 200) >= 200 and
+            getattr(self, '_response_code', 200) not in (204, 304)):
+            self.send_header('Connection', 'close')
         if self.request_version != 'HTTP/0.9':
+            if not hasattr(self, '_headers_buffer'):
+                self._headers_buffer = []
+            self._headers_buffer.append(b"\r\n")
+        self.flush_headers()
+
+    def flush_headers(self):
+        """Write the buffered status line and headers."""
+        if getattr(self, '_headers_buffer', None):
+            self.wfile.write(b"".join(self._headers_buffer))
+            self._headers_buffer = []
+
+    def write_chunk(self, data):
+        """Write data as one chunk of a chunked response body.
+
+        The response must have been sent with a "Transfer-Encoding:
+        chunked" header, which is only allowed if request_version is
+        HTTP/1.1 or later; otherwise the data is written unframed and
+        the connection is closed after the response.
+
+        """
+        if not data:
+            return
+        if getattr(self, '_framing', None) == 'chunked':
+            self.wfile.write(("%x\r\n" % len(data)).encode('ASCII'))
+            self.wfile.write(data)
             self.wfile.write(b"\r\n")
+        else:
+            self.wfile.write(data)
+
+    def end_chunks(self):
+        """End a chunked response body."""
+        if getattr(self, '_framing', None) == 'chunked':
+            self.wfile.write(b"0\r\n\r\n")
 
     def log_request(self, code='-', size='-'):
         """Log an accepted request.
@@ -596,6 +672,13 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
     The GET and HEAD requests are identical except that the HEAD
     request omits the actual contents of the file.
 
+    Every response carries a Content-Length header, so connections can
+    be kept open between requests by setting protocol_version to
+    "HTTP/1.1"; use ThreadingHTTPServer then, so that an idle client
+    doesn't keep the others waiting.
+    Conditional requests using If-None-Match or If-Modified-Since are
+    answered with 304 (Not Modified) when the file hasn't changed.
+
     """
 
     server_version = "SimpleHTTP/" + __version__
@@ -631,6 +714,7 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
                 # redirect browser - doing basically what apache does
                 self.send_response(301)
                 self.send_header("Location", self.path + "/")
+                self.send_header("Content-Length", "0")
                 self.end_headers()
                 return None
             for index in "index.html", "index.htm":
@@ -641,6 +725,19 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
             else:
                 return self.list_directory(path)
         ctype = self.guess_type(path)
+        try:
+            fs = os.stat(path)
+        except OSError:
+            self.send_error(404, "File not found")
+            return None
+        etag = self.make_etag(fs)
+        if self.not_modified(etag, fs.st_mtime):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified",
+                             self.date_time_string(fs.st_mtime))
+            self.end_headers()
+            return None
         try:
             f = open(path, 'rb')
         except IOError:
@@ -651,9 +748,36 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
         fs = os.fstat(f.fileno())
         self.send_header("Content-Length", str(fs[6]))
         self.send_header("Last-Modified", self.date_time_string(fs.st_mtime))
+        self.send_header("ETag", self.make_etag(fs))
         self.end_headers()
         return f
 
+    def make_etag(self, fs):
+        """Return the entity tag for a file, given its stat result."""
+        return '"%x-%x"' % (int(fs.st_mtime), fs.st_size)
+
+    def not_modified(self, etag, mtime):
+        """Return true if the request's validators match the file.
+
+        If-None-Match takes precedence over If-Modified-Since, as
+        required by RFC 2616.
+
+        """
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since is not None:
+            date = email.utils.parsedate_tz(if_modified_since)
+            if date is not None:
+                try:
+                    since = email.utils.mktime_tz(date)
+                except (OverflowError, ValueError):
+                    return False
+                return int(mtime) <= since
+        return False
+
     def list_directory(self, path):
         """Helper to produce a directory listing (absent index.html).
 
@@ -733,7 +857,16 @@ class SimpleHTTPRequestHandler(BaseHTTPRequestHandler):
         -- note however that this the default server uses this
         to copy binary data as well.
 
+        When copying a file to the client connection, the socket's
+        sendfile() method is used, so that the data of a regular file
+        never passes through user space.
+
         """
+        if (outputfile is self.wfile and
+            isinstance(self.connection, socket.socket)):
+            outputfile.flush()
+            self.connection.sendfile(source)
+            return
         shutil.copyfileobj(source, outputfile)
 
     def guess_type(self, path):
@@ -1026,6 +1159,7 @@ class CGIHTTPRequestHandler(SimpleHTTPRequestHandler):
         os.environ.update(env)
 
         self.send_response(200, "Script output follows")
+        self.flush_headers()
 
         decoded_query = query.replace('+', ' ')
 
@@ -1129,4 +1263,5 @@ def test(HandlerClass = BaseHTTPRequestHandler,
         sys.exit(0)
 
 if __name__ == '__main__':
-    test(HandlerClass=SimpleHTTPRequestHandler)
+    test(HandlerClass=SimpleHTTPRequestHandler,
+         ServerClass=ThreadingHTTPServer, protocol="HTTP/1.1")
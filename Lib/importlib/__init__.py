@@ -18,7 +18,7 @@ References on import:
           http://www.python.org/dev/peps/pep-0328
 
 """
-__all__ = ['__import__', 'import_module']
+__all__ = ['__import__', 'import_module', 'invalidate_caches']
 
 from . import _bootstrap
 
@@ -122,3 +122,19 @@ def import_module(name, package=None):
                 break
             level += 1
     return _bootstrap._gcd_import(name[level:], package, level)
+
+
+def invalidate_caches():
+    """Invalidate the caches of the finders on sys.meta_path and in
+    sys.path_importer_cache.
+
+    Finders cache the listings of the directories they search.  A listing is
+    refreshed when the directory's modification time changes, but a module
+    created within the file system's timestamp granularity can be missed;
+    call this function after creating modules at runtime.
+
+    """
+    for finder in sys.meta_path:
+        if hasattr(finder, 'invalidate_caches'):
+            finder.invalidate_caches()
+    _bootstrap.PathFinder.invalidate_caches()
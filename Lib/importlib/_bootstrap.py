@@ -56,6 +56,16 @@ def _path_isdir(path):
     return _path_is_mode_type(path, 0o040000)
 
 
+# Platforms whose file systems are usually case-insensitive, requiring
+# directory listings to be compared in lower case.
+_CASE_INSENSITIVE_PLATFORMS = 'win', 'cygwin', 'darwin', 'os2'
+
+
+def _relax_case():
+    """True if file names should be compared without regard to case."""
+    return sys.platform.startswith(_CASE_INSENSITIVE_PLATFORMS)
+
+
 def _path_without_ext(path, ext_type):
     """Replacement for os.path.splitext()[0]."""
     for suffix in _suffix_list(ext_type):
@@ -649,6 +659,14 @@ class PathFinder:
         else:
             return None
 
+    @classmethod
+    def invalidate_caches(cls):
+        """Call the invalidate_caches() method of every finder stored in
+        sys.path_importer_cache that defines one."""
+        for finder in list(sys.path_importer_cache.values()):
+            if hasattr(finder, 'invalidate_caches'):
+                finder.invalidate_caches()
+
 
 class _ChainedFinder:
 
@@ -665,6 +683,12 @@ class _ChainedFinder:
         else:
             return None
 
+    def invalidate_caches(self):
+        """Invalidate the caches of the chained finders."""
+        for finder in self._finders:
+            if hasattr(finder, 'invalidate_caches'):
+                finder.invalidate_caches()
+
 
 class _FileFinder:
 
@@ -696,30 +720,68 @@ class _FileFinder:
         if not _path_isdir(absolute_path):
             raise ImportError("only directories are supported")
         self._path_entry = absolute_path
+        self._path_mtime = -1
+        self._path_cache = frozenset()
+        self._relaxed_case = _relax_case()
+
+    def invalidate_caches(self):
+        """Force the directory listing to be re-read on the next search."""
+        self._path_mtime = -1
+
+    def _contents(self):
+        """Return the names in the directory, re-reading the listing only if
+        the directory's modification time changed since it was last read."""
+        try:
+            mtime = _os.stat(self._path_entry).st_mtime
+        except OSError:
+            mtime = -1
+        if mtime != self._path_mtime or mtime == -1:
+            try:
+                contents = _os.listdir(self._path_entry)
+            except OSError:
+                contents = []
+            if self._relaxed_case:
+                contents = [name.lower() for name in contents]
+            self._path_cache = frozenset(contents)
+            self._path_mtime = mtime
+        return self._path_cache
 
     def find_module(self, fullname, path=None):
         tail_module = fullname.rpartition('.')[2]
+        # Names are looked up in the cached directory listing so that no
+        # stat() call is made for files which do not exist.  The listing
+        # holds names with their real case, so _case_ok() only needs to be
+        # consulted when the comparison had to ignore case.
+        contents = self._contents()
+        relaxed_case = self._relaxed_case
+        cache_module = tail_module.lower() if relaxed_case else tail_module
         package_directory = None
-        if self._possible_package:
+        if self._possible_package and cache_module in contents:
+            package_directory = _path_join(self._path_entry, tail_module)
             for ext in self._suffixes:
-                package_directory = _path_join(self._path_entry, tail_module)
                 init_filename = '__init__' + ext
                 package_init = _path_join(package_directory, init_filename)
                 if (_path_isfile(package_init) and
-                        _case_ok(self._path_entry, tail_module) and
-                        _case_ok(package_directory, init_filename)):
+                        (not relaxed_case or
+                            (_case_ok(self._path_entry, tail_module) and
+                             _case_ok(package_directory, init_filename)))):
                     return self._loader(fullname, package_init, True)
         for ext in self._suffixes:
             file_name = tail_module + ext
+            cache_name = file_name.lower() if relaxed_case else file_name
+            if cache_name not in contents:
+                continue
             file_path = _path_join(self._path_entry, file_name)
             if (_path_isfile(file_path) and
-                    _case_ok(self._path_entry, file_name)):
+                    (not relaxed_case or
+                        _case_ok(self._path_entry, file_name))):
                 return self._loader(fullname, file_path, False)
         else:
             # Raise a warning if it matches a directory w/o an __init__ file.
             if (package_directory is not None and
                     _path_isdir(package_directory) and
-                    _case_ok(self._path_entry, tail_module)):
+                    (not relaxed_case or
+                        _case_ok(self._path_entry, tail_module))):
                 _warnings.warn("Not importing directory %s: missing __init__"
                                 % package_directory, ImportWarning)
             return None
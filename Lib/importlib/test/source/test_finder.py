@@ -120,6 +120,43 @@ class FinderTests(abc.FinderTests):
             self.assertRaises(ImportWarning, self.run_test, 'pkg',
             {'pkg.__init__'}, unlink={'pkg.__init__'})
 
+    def test_directory_listing_cached(self):
+        # The directory listing is only re-read when the directory's mtime
+        # changes or the cache is explicitly invalidated.
+        with source_util.create_modules('blah') as mapping:
+            root = mapping['.root']
+            # Use a whole number of seconds so utime() restores it exactly.
+            mtime = int(os.stat(root).st_mtime)
+            os.utime(root, (mtime, mtime))
+            finder = _bootstrap._PyPycFileFinder(root)
+            self.assertTrue(finder.find_module('blah'))
+            self.assertTrue(finder.find_module('_temp_uncached') is None)
+            new_path = os.path.join(root, '_temp_uncached.py')
+            with open(new_path, 'w') as file:
+                file.write('attr = 1')
+            try:
+                os.utime(root, (mtime, mtime))
+                self.assertTrue(finder.find_module('_temp_uncached') is None)
+                finder.invalidate_caches()
+                self.assertTrue(finder.find_module('_temp_uncached'))
+            finally:
+                os.unlink(new_path)
+
+    def test_directory_listing_mtime(self):
+        with source_util.create_modules('blah') as mapping:
+            root = mapping['.root']
+            finder = _bootstrap._PyPycFileFinder(root)
+            self.assertTrue(finder.find_module('_temp_uncached') is None)
+            stat_info = os.stat(root)
+            new_path = os.path.join(root, '_temp_uncached.py')
+            with open(new_path, 'w') as file:
+                file.write('attr = 1')
+            try:
+                os.utime(root, (stat_info.st_atime, stat_info.st_mtime + 10))
+                self.assertTrue(finder.find_module('_temp_uncached'))
+            finally:
+                os.unlink(new_path)
+
 
 def test_main():
     from test.support import run_unittest
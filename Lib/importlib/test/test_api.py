@@ -66,9 +66,40 @@ class ImportModuleTests(unittest.TestCase):
         self.assertRaises(TypeError, importlib.import_module, '.support')
 
 
+class InvalidateCacheTests(unittest.TestCase):
+
+    """Test importlib.invalidate_caches."""
+
+    def test_method_called(self):
+        # If defined the method should be called.
+        class InvalidatingNullFinder:
+            def __init__(self, *ignored):
+                self.called = False
+            def find_module(self, *args):
+                return None
+            def invalidate_caches(self):
+                self.called = True
+
+        meta_ins = InvalidatingNullFinder()
+        path_ins = InvalidatingNullFinder()
+        with util.import_state(meta_path=[meta_ins],
+                               path_importer_cache={'finder_to_invalidate':
+                                                        path_ins,
+                                                    'no_method': object(),
+                                                    'none': None}):
+            importlib.invalidate_caches()
+        self.assertTrue(meta_ins.called)
+        self.assertTrue(path_ins.called)
+
+    def test_method_lacking(self):
+        # There should be no issues if the method is not defined.
+        with util.import_state(meta_path=[object()]):
+            importlib.invalidate_caches()
+
+
 def test_main():
     from test.support import run_unittest
-    run_unittest(ImportModuleTests)
+    run_unittest(ImportModuleTests, InvalidateCacheTests)
 
 
 if __name__ == '__main__':
@@ -99,14 +99,14 @@ Using json.tool from the shell to validate and pretty-print::
 """
 __version__ = '2.0.9'
 __all__ = [
-    'dump', 'dumps', 'load', 'loads',
-    'JSONDecoder', 'JSONEncoder',
+    'dump', 'dumps', 'load', 'loads', 'iterload',
+    'JSONDecoder', 'JSONStreamDecoder', 'JSONEncoder',
 ]
 
 __author__ = 'Bob Ippolito <bob@redivi.com>'
 
-from .decoder import JSONDecoder
-from .encoder import JSONEncoder
+from .decoder import JSONDecoder, JSONStreamDecoder
+from .encoder import JSONEncoder, BUFFER_SIZE
 
 _default_encoder = JSONEncoder(
     skipkeys=False,
@@ -120,9 +120,11 @@ _default_encoder = JSONEncoder(
 
 def dump(obj, fp, skipkeys=False, ensure_ascii=True, check_circular=True,
         allow_nan=True, cls=None, indent=None, separators=None,
-        default=None, **kw):
+        default=None, buffer_size=BUFFER_SIZE, **kw):
     """Serialize ``obj`` as a JSON formatted stream to ``fp`` (a
-    ``.write()``-supporting file-like object).
+    ``.write()``-supporting file-like object).  The output is written in
+    blocks of about ``buffer_size`` characters; if ``fp`` is a binary file
+    they are encoded as UTF-8.
 
     If ``skipkeys`` is true then ``dict`` keys that are not basic types
     (``str``, ``unicode``, ``int``, ``float``, ``bool``, ``None``) will be
@@ -165,18 +167,15 @@ def dump(obj, fp, skipkeys=False, ensure_ascii=True, check_circular=True,
         check_circular and allow_nan and
         cls is None and indent is None and separators is None and
         default is None and not kw):
-        iterable = _default_encoder.iterencode(obj)
+        encoder = _default_encoder
     else:
         if cls is None:
             cls = JSONEncoder
-        iterable = cls(skipkeys=skipkeys, ensure_ascii=ensure_ascii,
+        encoder = cls(skipkeys=skipkeys, ensure_ascii=ensure_ascii,
             check_circular=check_circular, allow_nan=allow_nan, indent=indent,
             separators=separators,
-            default=default, **kw).iterencode(obj)
-    # could accelerate with writelines in some versions of Python, at
-    # a debuggability cost
-    for chunk in iterable:
-        fp.write(chunk)
+            default=default, **kw)
+    encoder.dump(obj, fp, buffer_size)
 
 
 def dumps(obj, skipkeys=False, ensure_ascii=True, check_circular=True,
@@ -256,6 +255,47 @@ def load(fp, cls=None, object_hook=None, parse_float=None,
         parse_constant=parse_constant, object_pairs_hook=object_pairs_hook, **kw)
 
 
+def iterload(fp, items=False, cls=None, object_hook=None, parse_float=None,
+        parse_int=None, parse_constant=None, object_pairs_hook=None,
+        chunk_size=8192, **kw):
+    """Deserialize ``fp`` (a ``.read()``-supporting file-like object
+    containing a sequence of JSON documents) incrementally, yielding each
+    document as soon as it has been read.
+
+    If ``items`` is true, ``fp`` must contain a single JSON array, and each
+    of its elements is yielded instead.  At most ``chunk_size`` characters
+    or bytes are read at a time, so the whole text is never held in memory.
+
+    The other arguments have the same meaning as in ``load``.
+
+    """
+    if cls is None:
+        cls = JSONDecoder
+    if object_hook is not None:
+        kw['object_hook'] = object_hook
+    if object_pairs_hook is not None:
+        kw['object_pairs_hook'] = object_pairs_hook
+    if parse_float is not None:
+        kw['parse_float'] = parse_float
+    if parse_int is not None:
+        kw['parse_int'] = parse_int
+    if parse_constant is not None:
+        kw['parse_constant'] = parse_constant
+    if not kw and cls is JSONDecoder:
+        decoder = _default_decoder
+    else:
+        decoder = cls(**kw)
+    return decoder.iterdecode(_until_empty(fp, chunk_size), items)
+
+
+def _until_empty(fp, chunk_size):
+    while True:
+        chunk = fp.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
 def loads(s, encoding=None, cls=None, object_hook=None, parse_float=None,
         parse_int=None, parse_constant=None, object_pairs_hook=None, **kw):
     """Deserialize ``s`` (a ``str`` instance containing a JSON
@@ -1,6 +1,7 @@
 """Implementation of JSONDecoder
 """
 import binascii
+import codecs
 import re
 import sys
 import struct
@@ -11,7 +12,7 @@ try:
 except ImportError:
     c_scanstring = None
 
-__all__ = ['JSONDecoder']
+__all__ = ['JSONDecoder', 'JSONStreamDecoder']
 
 FLAGS = re.VERBOSE | re.MULTILINE | re.DOTALL
 
@@ -342,3 +343,275 @@ class JSONDecoder(object):
         except StopIteration:
             raise ValueError("No JSON object could be decoded")
         return obj, end
+
+    def iterdecode(self, chunks, items=False, encoding='utf-8'):
+        """Decode an iterable of ``str`` or ``bytes`` chunks, yielding each
+        top-level JSON value (or, if ``items`` is true, each element of a
+        top-level array) as soon as it is complete.
+
+        See ``JSONStreamDecoder`` for details.
+
+        """
+        stream = JSONStreamDecoder(self, items, encoding)
+        for chunk in chunks:
+            for obj in stream.feed(chunk):
+                yield obj
+        for obj in stream.close():
+            yield obj
+
+
+# Characters which may start or end a nested structure or string.
+STRUCTURE = re.compile(r'[^"\[\]{}]*', re.DOTALL)
+# The rest of a string up to its closing quote, or a trailing backslash.
+STRINGBODY = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+# Numbers and the literals true, false, null, NaN and (-)Infinity.
+SCALAR = re.compile(r'[-+.\w]*')
+
+# Parser states of a JSONStreamDecoder
+_VALUE, _ARRAY_START, _FIRST_ITEM, _NEXT_ITEM, _ITEM, _DONE = range(6)
+
+# The positions at the end of a message built by errmsg()
+ERRPOS = re.compile(r'(.*): line \d+ column \d+ (?:- line \d+ column \d+ )?'
+                    r'\(char (\d+)(?: - (\d+))?\)$', re.DOTALL)
+
+
+def _advance(base, s, pos):
+    # base is (offset, lines, last_nl) for s[0]: its offset in the whole
+    # text, the number of newlines before it and the offset of the last
+    # of them (or -1).  Return the same for s[pos].
+    offset, lines, last_nl = base
+    n = s.count('\n', 0, pos)
+    if n:
+        last_nl = offset + s.rindex('\n', 0, pos)
+    return offset + pos, lines + n, last_nl
+
+
+def _stream_errmsg(msg, base, s, pos, end=None):
+    # Like errmsg(), for positions in s whose first character is at base
+    def linecol(pos):
+        offset, lines, last_nl = _advance(base, s, pos)
+        if lines == 0:
+            return 1, offset, offset
+        return lines + 1, offset - last_nl, offset
+    lineno, colno, pos = linecol(pos)
+    if end is None:
+        fmt = '{0}: line {1} column {2} (char {3})'
+        return fmt.format(msg, lineno, colno, pos)
+    endlineno, endcolno, end = linecol(end)
+    fmt = '{0}: line {1} column {2} - line {3} column {4} (char {5} - {6})'
+    return fmt.format(msg, lineno, colno, endlineno, endcolno, pos, end)
+
+
+class JSONStreamDecoder(object):
+    """Incremental JSON decoder
+
+    Chunks of a JSON text are passed to ``feed()``, which returns the list of
+    values completed by that chunk.  By default the text is a sequence of
+    JSON documents separated by optional whitespace, such as newline-delimited
+    JSON, and every document is returned.  If ``items`` is true the text must
+    be a single JSON array, and each of its elements is returned instead.
+
+    ``bytes`` chunks are decoded with ``encoding``; a multibyte character may
+    be split across chunks.  Every value is decoded by the scanner of the
+    ``JSONDecoder`` given as ``decoder``, so only the value currently being
+    received is buffered.  The chunks of a value are joined once it is
+    complete, and error messages give positions in the whole text.
+
+    """
+
+    def __init__(self, decoder=None, items=False, encoding='utf-8'):
+        if decoder is None:
+            decoder = JSONDecoder()
+        self.scan_once = decoder.scan_once
+        self.items = items
+        self.encoding = encoding
+        self._decoder = None
+        # The text which hasn't been scanned yet, preceded by the start of
+        # the value being received, if that started in the same chunk
+        self._buf = ''
+        # Where _buf starts in the whole text; see _advance()
+        self._base = (0, 0, -1)
+        # The text of the value being received from earlier chunks, and
+        # where it starts in the whole text
+        self._parts = []
+        self._value_base = None
+        # Start of the value being received in _buf, or None between values
+        self._start = None
+        # How far the current value has been checked for completeness
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._state = _ARRAY_START if items else _VALUE
+
+    def feed(self, data):
+        """Add a chunk of the JSON text and return a list of the values
+        which it completes."""
+        if isinstance(data, bytes):
+            if self._decoder is None:
+                self._decoder = codecs.getincrementaldecoder(self.encoding)()
+            data = self._decoder.decode(data)
+        if self._buf:
+            # only the few characters which couldn't be checked yet
+            self._buf += data
+        else:
+            self._buf = data
+        return self._parse(False)
+
+    def close(self):
+        """Signal the end of the JSON text and return a list of any values
+        still to be completed.  Raise ``ValueError`` if the text ends inside
+        a value or array."""
+        if self._decoder is not None:
+            self._buf += self._decoder.decode(b'', True)
+        values = self._parse(True)
+        s = self._buf
+        if self._start is not None:
+            # Let the scanner report what is wrong with the value
+            self._decode(s, len(s))
+            raise ValueError(self._errmsg("Expecting object", s, 0))
+        if self._state not in (_VALUE, _DONE):
+            raise ValueError(self._errmsg("Unterminated array", s, len(s)))
+        return values
+
+    def _errmsg(self, msg, s, pos, end=None):
+        return _stream_errmsg(msg, self._base, s, pos, end)
+
+    def _parse(self, final, _w=WHITESPACE.match):
+        s = self._buf
+        values = []
+        pos = self._pos
+        state = self._state
+        while True:
+            if self._start is None:
+                pos = _w(s, pos).end()
+                if pos == len(s):
+                    break
+                nextchar = s[pos]
+                if state == _ARRAY_START:
+                    if nextchar != '[':
+                        raise ValueError(self._errmsg("Expecting array",
+                                                      s, pos))
+                    pos += 1
+                    state = _FIRST_ITEM
+                    continue
+                elif state == _NEXT_ITEM or (state == _FIRST_ITEM and
+                                             nextchar == ']'):
+                    if nextchar == ']':
+                        state = _DONE
+                    elif nextchar == ',':
+                        state = _ITEM
+                    else:
+                        raise ValueError(self._errmsg("Expecting , delimiter",
+                                                      s, pos))
+                    pos += 1
+                    continue
+                elif state == _DONE:
+                    raise ValueError(self._errmsg("Extra data",
+                                                  s, pos, len(s)))
+                self._start = pos
+                self._depth = 0
+                self._in_string = False
+            end = self._find_end(s, pos, final)
+            if end is None:
+                pos = self._pos
+                break
+            values.append(self._decode(s, end))
+            pos = end
+            self._start = None
+            if state != _VALUE:
+                state = _NEXT_ITEM
+        self._state = state
+        # Keep only the text which hasn't been checked; the checked part
+        # of an incomplete value is set aside until the value is complete
+        cut = pos
+        if self._start is not None:
+            if pos > self._start:
+                if not self._parts:
+                    self._value_base = _advance(self._base, s, self._start)
+                self._parts.append(s[self._start:pos])
+            self._start = 0
+        if cut:
+            self._base = _advance(self._base, s, cut)
+            self._buf = s[cut:]
+            pos -= cut
+        self._pos = pos
+        return values
+
+    def _decode(self, s, end):
+        # Decode the value which ends at s[end], and starts at
+        # s[self._start] or in self._parts
+        if self._parts:
+            self._parts.append(s[self._start:end])
+            doc = ''.join(self._parts)
+            self._parts = []
+            base = self._value_base
+            idx = 0
+            end = len(doc)
+        else:
+            doc = s
+            base = self._base
+            idx = self._start
+        try:
+            value, pos = self.scan_once(doc, idx)
+        except StopIteration:
+            raise ValueError(_stream_errmsg("Expecting object",
+                                            base, doc, idx))
+        except ValueError as err:
+            # make the positions relative to the whole text
+            m = ERRPOS.match(str(err))
+            if m is None:
+                raise
+            msg, pos, errend = m.groups()
+            if errend is not None:
+                errend = int(errend)
+            raise ValueError(_stream_errmsg(msg, base, doc, int(pos), errend))
+        if pos != end:
+            raise ValueError(_stream_errmsg("Extra data", base, doc, pos, end))
+        return value
+
+    def _find_end(self, s, pos, final,
+            _structure=STRUCTURE.match, _string=STRINGBODY.match,
+            _scalar=SCALAR.match):
+        # Return the index just past the end of the value starting at
+        # self._start if it is complete, checking from pos onwards.
+        # Otherwise, remember how far it was checked and return None.
+        n = len(s)
+        depth = self._depth
+        in_string = self._in_string
+        if depth == 0 and not in_string:
+            nextchar = s[pos]
+            if nextchar not in '"[{':
+                end = _scalar(s, pos).end()
+                if end == n and not final:
+                    self._pos = pos
+                    return None
+                return end
+        while pos < n:
+            if in_string:
+                pos = _string(s, pos).end()
+                if pos == n or s[pos] != '"':
+                    # the text ends inside the string, possibly after a
+                    # backslash which is checked again with the next chunk
+                    break
+                pos += 1
+                in_string = False
+                if depth == 0:
+                    return pos
+            else:
+                pos = _structure(s, pos).end()
+                if pos == n:
+                    break
+                nextchar = s[pos]
+                pos += 1
+                if nextchar == '"':
+                    in_string = True
+                elif nextchar in '[{':
+                    depth += 1
+                else:
+                    depth -= 1
+                    if depth == 0:
+                        return pos
+        self._pos = pos
+        self._depth = depth
+        self._in_string = in_string
+        return None
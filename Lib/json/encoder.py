@@ -1,5 +1,6 @@
 """Implementation of JSONEncoder
 """
+import io
 import re
 
 try:
@@ -30,6 +31,8 @@ for i in range(0x20):
 # Assume this produces an infinity on all machines (probably not guaranteed)
 INFINITY = float('1e66666')
 FLOAT_REPR = repr
+# Size of the blocks written by JSONEncoder.dump()
+BUFFER_SIZE = 64 * 1024
 
 def encode_basestring(s):
     """Return a JSON representation of a Python string
@@ -232,12 +235,8 @@ class JSONEncoder(object):
             return text
 
 
-        if (_one_shot and c_make_encoder is not None
-                and not self.indent):
-            _iterencode = c_make_encoder(
-                markers, self.default, _encoder, self.indent,
-                self.key_separator, self.item_separator, self.sort_keys,
-                self.skipkeys, self.allow_nan)
+        if _one_shot and c_make_encoder is not None:
+            _iterencode = self._make_c_encoder()
         else:
             _iterencode = _make_iterencode(
                 markers, self.default, _encoder, self.indent, floatstr,
@@ -245,6 +244,54 @@ class JSONEncoder(object):
                 self.skipkeys, _one_shot)
         return _iterencode(o, 0)
 
+    def dump(self, o, fp, buffer_size=BUFFER_SIZE, encoding='utf-8'):
+        """Encode the given object and write it to ``fp``, a text or
+        binary file-like object, in blocks of about ``buffer_size``
+        characters.  Text written to a binary file is encoded with
+        ``encoding``.
+
+        Only the current block is held in memory, so this is suitable for
+        very large objects::
+
+            with open('big.json', 'wb') as f:
+                JSONEncoder().dump(bigobject, f)
+
+        """
+        if isinstance(fp, (io.RawIOBase, io.BufferedIOBase)):
+            def write(chunk, _write=fp.write):
+                _write(chunk.encode(encoding))
+        else:
+            write = fp.write
+        if (c_make_encoder is not None and
+                type(self).iterencode is JSONEncoder.iterencode):
+            self._make_c_encoder()(o, 0, write, buffer_size)
+            return
+        chunks = []
+        size = 0
+        for chunk in self.iterencode(o):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= buffer_size:
+                write(''.join(chunks))
+                del chunks[:]
+                size = 0
+        if chunks:
+            write(''.join(chunks))
+
+    def _make_c_encoder(self):
+        if self.check_circular:
+            markers = {}
+        else:
+            markers = None
+        if self.ensure_ascii:
+            _encoder = encode_basestring_ascii
+        else:
+            _encoder = encode_basestring
+        return c_make_encoder(
+            markers, self.default, _encoder, self.indent,
+            self.key_separator, self.item_separator, self.sort_keys,
+            self.skipkeys, self.allow_nan)
+
 def _make_iterencode(markers, _default, _encoder, _indent, _floatstr,
         _key_separator, _item_separator, _sort_keys, _skipkeys, _one_shot,
         ## HACK: hand-optimized bytecode; turn globals into locals
@@ -1,5 +1,5 @@
 from unittest import TestCase
-from io import StringIO
+from io import StringIO, BytesIO
 
 import json
 
@@ -19,3 +19,70 @@ class TestDump(TestCase):
         self.assertEquals(json.dumps(
                 {2: 3.0, 4.0: 5, False: 1, 6: True}, sort_keys=True),
                 '{"false": 1, "2": 3.0, "4.0": 5, "6": true}')
+
+
+class RecordingFile(StringIO):
+    def __init__(self):
+        StringIO.__init__(self)
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return StringIO.write(self, s)
+
+
+class TestStreamingDump(TestCase):
+    data = {"items": [{"id": i, "name": "item %d" % i, "score": i / 4,
+                       "tags": ["a", "b\u20ac"], "ok": i % 2 == 0,
+                       "none": None}
+                      for i in range(500)],
+            "total": 500}
+
+    def test_matches_dumps(self):
+        for kw in [{}, {"indent": 2}, {"indent": 0}, {"sort_keys": True},
+                   {"separators": (",", ":")}, {"ensure_ascii": False},
+                   {"indent": 3, "separators": (",", ": ")}]:
+            sio = StringIO()
+            json.dump(self.data, sio, **kw)
+            self.assertEqual(sio.getvalue(), json.dumps(self.data, **kw))
+
+    def test_indent_nested(self):
+        data = [[], {}, [[1, {"a": [2]}]], {"b": {"c": []}}]
+        for indent in (0, 1, 4):
+            sio = StringIO()
+            json.JSONEncoder(indent=indent).dump(data, sio)
+            pure = json.JSONEncoder(indent=indent).iterencode(data)
+            self.assertEqual(sio.getvalue(), ''.join(pure))
+
+    def test_blocks(self):
+        f = RecordingFile()
+        json.dump(self.data, f, buffer_size=1024)
+        expected = json.dumps(self.data)
+        self.assertEqual(f.getvalue(), expected)
+        self.assertTrue(1 < f.writes <= len(expected) // 1024 + 1)
+        f = RecordingFile()
+        json.dump(self.data, f)
+        self.assertEqual(f.writes, 1)
+
+    def test_binary_file(self):
+        bio = BytesIO()
+        json.dump(self.data, bio, ensure_ascii=False, buffer_size=100)
+        self.assertEqual(bio.getvalue().decode('utf-8'),
+                         json.dumps(self.data, ensure_ascii=False))
+
+    def test_default(self):
+        sio = StringIO()
+        json.dump({"s": {1, 2}}, sio, default=sorted, buffer_size=1)
+        self.assertEqual(sio.getvalue(), '{"s": [1, 2]}')
+        self.assertRaises(TypeError, json.dump, {"s": {1}}, StringIO())
+        self.assertRaises(TypeError, json.dump, {(1, 2): 3}, StringIO())
+
+    def test_overridden_iterencode(self):
+        class Encoder(json.JSONEncoder):
+            def iterencode(self, o):
+                yield 'prefix'
+                for chunk in json.JSONEncoder.iterencode(self, o):
+                    yield chunk
+        sio = StringIO()
+        json.dump([1], sio, cls=Encoder)
+        self.assertEqual(sio.getvalue(), 'prefix[1]')
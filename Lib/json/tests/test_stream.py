@@ -0,0 +1,155 @@
+from unittest import TestCase
+from io import StringIO, BytesIO
+
+import json
+from json.decoder import JSONStreamDecoder
+
+DOCS = [
+    {"a": [1, 2.5, "x]}"], "b": {"c": None}},
+    "string with \"quotes\" and \\ backslashes [{",
+    [],
+    {},
+    -12,
+    3.25e10,
+    True,
+    False,
+    None,
+    ["\u20ac", {"nested": [[[]]]}],
+]
+
+
+class TestStreamDecoder(TestCase):
+    def feed_all(self, chunks, items=False):
+        stream = JSONStreamDecoder(items=items)
+        values = []
+        for chunk in chunks:
+            values.extend(stream.feed(chunk))
+        values.extend(stream.close())
+        return values
+
+    def split(self, text, size):
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def test_documents(self):
+        text = '\n'.join(json.dumps(doc) for doc in DOCS) + '\n'
+        for size in (1, 2, 3, 7, len(text)):
+            self.assertEqual(self.feed_all(self.split(text, size)), DOCS)
+
+    def test_concatenated(self):
+        text = '{"a":1}[2]"3"4 5'
+        for size in (1, 4, len(text)):
+            self.assertEqual(self.feed_all(self.split(text, size)),
+                             [{"a": 1}, [2], "3", 4, 5])
+
+    def test_items(self):
+        text = ' [ ' + ' , '.join(json.dumps(doc) for doc in DOCS) + ' ] '
+        for size in (1, 5, len(text)):
+            self.assertEqual(self.feed_all(self.split(text, size), True),
+                             DOCS)
+        self.assertEqual(self.feed_all(['[]'], True), [])
+        self.assertEqual(self.feed_all(['[', ']'], True), [])
+
+    def test_values_returned_early(self):
+        stream = JSONStreamDecoder()
+        self.assertEqual(stream.feed('{"a": '), [])
+        self.assertEqual(stream.feed('1}{"b"'), [{"a": 1}])
+        self.assertEqual(stream.feed(': 2} 12'), [{"b": 2}])
+        # a number may continue in the next chunk
+        self.assertEqual(stream.feed('3'), [])
+        self.assertEqual(stream.close(), [123])
+
+        stream = JSONStreamDecoder(items=True)
+        self.assertEqual(stream.feed('[1, "two", '), [1, "two"])
+        self.assertEqual(stream.feed('[3]'), [[3]])
+        self.assertEqual(stream.feed(']'), [])
+        self.assertEqual(stream.close(), [])
+
+    def test_bytes(self):
+        text = json.dumps(DOCS, ensure_ascii=False).encode('utf-8')
+        chunks = [text[i:i + 1] for i in range(len(text))]
+        self.assertEqual(self.feed_all(chunks, True), DOCS)
+        data = '"\u20ac"'.encode('utf-16-le')
+        stream = JSONStreamDecoder(encoding='utf-16-le')
+        self.assertEqual(stream.feed(data[:3]), [])
+        self.assertEqual(stream.feed(data[3:]), ['\u20ac'])
+
+    def test_buffer_is_trimmed(self):
+        stream = JSONStreamDecoder()
+        for i in range(100):
+            stream.feed('{"key": %d}\n' % i)
+        self.assertEqual(stream._buf, '')
+        stream.feed('[1, 2')
+        self.assertEqual(''.join(stream._parts) + stream._buf, '[1, 2')
+        # the chunks of a value are only joined once it is complete
+        for i in range(100):
+            stream.feed(', %d' % i)
+        self.assertEqual(len(stream._parts), 101)
+        self.assertEqual(stream.feed(']'), [[1, 2] + list(range(100))])
+        self.assertEqual(stream._parts, [])
+
+    def test_error_positions(self):
+        def error(chunks, items=False):
+            stream = JSONStreamDecoder(items=items)
+            try:
+                for chunk in chunks:
+                    stream.feed(chunk)
+                stream.close()
+            except ValueError as err:
+                return str(err)
+            self.fail('%r did not raise ValueError' % chunks)
+        text = '{"a": 1}\n{"b": 2}\n{"c" 3}\n'
+        msg = 'Expecting : delimiter: line 3 column 6 (char 23)'
+        for size in (1, 3, len(text)):
+            self.assertEqual(error(self.split(text, size)), msg)
+        self.assertEqual(error(['[1, 2', ' 3]'], True),
+                         'Expecting , delimiter: line 1 column 6 (char 6)')
+        self.assertEqual(error(['[1,\n', '2]', ' x'], True),
+                         'Extra data: line 2 column 4 - line 2 column 5 '
+                         '(char 7 - 8)')
+
+    def test_custom_decoder(self):
+        decoder = json.JSONDecoder(object_pairs_hook=lambda pairs: pairs)
+        stream = JSONStreamDecoder(decoder)
+        self.assertEqual(stream.feed('{"a": 1, "b": 2}'),
+                         [[("a", 1), ("b", 2)]])
+
+    def test_errors(self):
+        for text, items in [('{"a": 1', False),
+                            ('"abc', False),
+                            ('[1, 2]]', False),
+                            ('{"a" 1}', False),
+                            ('nul', False),
+                            ('1.2.3', False),
+                            ('{} x', False),
+                            ('{"a": 1}', True),
+                            ('[1, 2', True),
+                            ('[1 2]', True),
+                            ('[1, ]', True),
+                            ('[1], [2]', True)]:
+            stream = JSONStreamDecoder(items=items)
+            try:
+                for char in text:
+                    stream.feed(char)
+                stream.close()
+            except ValueError:
+                pass
+            else:
+                self.fail('%r did not raise ValueError' % text)
+
+    def test_iterdecode(self):
+        decoder = json.JSONDecoder()
+        chunks = iter(['[1', ', {"a"', ': 2}]'])
+        it = decoder.iterdecode(chunks, items=True)
+        self.assertEqual(next(it), 1)
+        self.assertEqual(next(it), {"a": 2})
+        self.assertRaises(StopIteration, next, it)
+
+    def test_iterload(self):
+        text = '\n'.join(json.dumps(doc) for doc in DOCS)
+        self.assertEqual(list(json.iterload(StringIO(text), chunk_size=3)),
+                         DOCS)
+        data = json.dumps(DOCS).encode('utf-8')
+        self.assertEqual(list(json.iterload(BytesIO(data), items=True)), DOCS)
+        self.assertEqual(list(json.iterload(StringIO('[{"a": 1}]'), True,
+                                            object_pairs_hook=list)),
+                         [[("a", 1)]])
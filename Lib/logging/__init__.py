@@ -911,10 +911,25 @@ class Manager:
         Initialize the manager with the root node of the logger hierarchy.
         """
         self.root = rootnode
-        self.disable = 0
+        self._disable = 0
         self.emittedNoHandlerWarning = 0
         self.loggerDict = {}
 
+    def _getDisable(self):
+        return self._disable
+
+    def _setDisable(self, level):
+        _acquireLock()
+        try:
+            self._disable = level
+            self._clearCache()
+        finally:
+            _releaseLock()
+
+    disable = property(_getDisable, _setDisable,
+                       doc="Logging calls at this level or below are "
+                           "discarded (see logging.disable()).")
+
     def getLogger(self, name):
         """
         Get a logger with the specified name (channel name), creating it
@@ -969,7 +984,8 @@ class Manager:
             i = name.rfind(".", 0, i - 1)
         if not rv:
             rv = self.root
-        alogger.parent = rv
+        alogger._parent = rv
+        alogger._enabledLevel = 0
 
     def _fixupChildren(self, ph, alogger):
         """
@@ -981,8 +997,24 @@ class Manager:
         for c in ph.loggerMap.keys():
             #The if means ... if not c.parent.name.startswith(nm)
             if c.parent.name[:namelen] != name:
-                alogger.parent = c.parent
-                c.parent = alogger
+                alogger._parent = c.parent
+                c._parent = alogger
+        # The new logger may now set the level of its descendants
+        self._clearCache()
+
+    def _clearCache(self):
+        """
+        Make every logger in the hierarchy work out its effective level
+        again, after a change which may affect it.
+        """
+        _acquireLock()
+        try:
+            for logger in self.loggerDict.values():
+                if isinstance(logger, Logger):
+                    logger._enabledLevel = 0
+            self.root._enabledLevel = 0
+        finally:
+            _releaseLock()
 
 #---------------------------------------------------------------------------
 #   Logger classes and functions
@@ -1009,17 +1041,43 @@ class Logger(Filterer):
         """
         Filterer.__init__(self)
         self.name = name
-        self.level = level
-        self.parent = None
+        self._level = level
+        self._parent = None
         self.propagate = 1
         self.handlers = []
         self.disabled = 0
+        # The lowest level for which logging is enabled, taking the parent
+        # loggers and logging.disable() into account; 0 if not known.
+        self._enabledLevel = 0
+
+    def _getLevel(self):
+        return self._level
 
     def setLevel(self, level):
         """
         Set the logging level of this logger.
         """
-        self.level = level
+        _acquireLock()
+        try:
+            self._level = level
+            self.manager._clearCache()
+        finally:
+            _releaseLock()
+
+    level = property(_getLevel, setLevel)
+
+    def _getParent(self):
+        return self._parent
+
+    def _setParent(self, parent):
+        _acquireLock()
+        try:
+            self._parent = parent
+            self.manager._clearCache()
+        finally:
+            _releaseLock()
+
+    parent = property(_getParent, _setParent)
 
     def debug(self, msg, *args, **kwargs):
         """
@@ -1030,7 +1088,7 @@ class Logger(Filterer):
 
         logger.debug("Houston, we have a %s", "thorny problem", exc_info=1)
         """
-        if self.isEnabledFor(DEBUG):
+        if self._enabledLevel <= DEBUG and self.isEnabledFor(DEBUG):
             self._log(DEBUG, msg, args, **kwargs)
 
     def info(self, msg, *args, **kwargs):
@@ -1042,7 +1100,7 @@ class Logger(Filterer):
 
         logger.info("Houston, we have a %s", "interesting problem", exc_info=1)
         """
-        if self.isEnabledFor(INFO):
+        if self._enabledLevel <= INFO and self.isEnabledFor(INFO):
             self._log(INFO, msg, args, **kwargs)
 
     def warning(self, msg, *args, **kwargs):
@@ -1054,7 +1112,7 @@ class Logger(Filterer):
 
         logger.warning("Houston, we have a %s", "bit of a problem", exc_info=1)
         """
-        if self.isEnabledFor(WARNING):
+        if self._enabledLevel <= WARNING and self.isEnabledFor(WARNING):
             self._log(WARNING, msg, args, **kwargs)
 
     warn = warning
@@ -1068,7 +1126,7 @@ class Logger(Filterer):
 
         logger.error("Houston, we have a %s", "major problem", exc_info=1)
         """
-        if self.isEnabledFor(ERROR):
+        if self._enabledLevel <= ERROR and self.isEnabledFor(ERROR):
             self._log(ERROR, msg, args, **kwargs)
 
     def exception(self, msg, *args):
@@ -1086,7 +1144,7 @@ class Logger(Filterer):
 
         logger.critical("Houston, we have a %s", "major disaster", exc_info=1)
         """
-        if self.isEnabledFor(CRITICAL):
+        if self._enabledLevel <= CRITICAL and self.isEnabledFor(CRITICAL):
             self._log(CRITICAL, msg, args, **kwargs)
 
     fatal = critical
@@ -1105,7 +1163,7 @@ class Logger(Filterer):
                 raise TypeError("level must be an integer")
             else:
                 return
-        if self.isEnabledFor(level):
+        if self._enabledLevel <= level and self.isEnabledFor(level):
             self._log(level, msg, args, **kwargs)
 
     def findCaller(self):
@@ -1230,10 +1288,23 @@ class Logger(Filterer):
     def isEnabledFor(self, level):
         """
         Is this logger enabled for level 'level'?
+
+        The answer is worked out from the levels of this logger and its
+        parents, and from logging.disable(), and cached until one of them
+        changes.
         """
-        if self.manager.disable >= level:
-            return 0
-        return level >= self.getEffectiveLevel()
+        enabledLevel = self._enabledLevel
+        if not enabledLevel:
+            # Under the lock, so that a change made meanwhile can't be
+            # missed by the value stored
+            _acquireLock()
+            try:
+                enabledLevel = max(self.getEffectiveLevel(),
+                                   self.manager.disable + 1)
+                self._enabledLevel = enabledLevel
+            finally:
+                _releaseLock()
+        return level >= enabledLevel
 
 class RootLogger(Logger):
     """
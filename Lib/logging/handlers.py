@@ -24,7 +24,7 @@ Copyright (C) 2001-2009 Vinay Sajip. All Rights Reserved.
 To use, simply 'import logging.handlers' and log away!
 """
 
-import logging, socket, os, pickle, struct, time, re
+import logging, socket, os, pickle, struct, time, re, copy, queue
 from stat import ST_DEV, ST_INO
 
 try:
@@ -32,6 +32,11 @@ try:
 except ImportError:
     codecs = None
 
+try:
+    import threading
+except ImportError:
+    threading = None
+
 #
 # Some constants...
 #
@@ -1137,3 +1142,162 @@ class MemoryHandler(BufferingHandler):
         self.flush()
         self.target = None
         BufferingHandler.close(self)
+
+
+class QueueHandler(logging.Handler):
+    """
+    A handler class which puts records on a queue, such as a queue.Queue
+    or a multiprocessing.Queue, for a QueueListener to process on another
+    thread or in another process. The logging thread only waits for the
+    queue, never for the handlers doing the output.
+    """
+    def __init__(self, queue, block=False, timeout=None):
+        """
+        Initialize the handler with the queue to put records on.
+
+        If the queue is bounded and full, a record is dropped, unless block
+        is true; then put() waits for up to timeout seconds (or for as long
+        as needed, if timeout is None) before dropping it.
+        """
+        logging.Handler.__init__(self)
+        self.queue = queue
+        self.block = block
+        self.timeout = timeout
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        """
+        Return a copy of the record that can be pickled.
+
+        The message is merged with its arguments, and any exception
+        information is replaced by its text, so that the record doesn't
+        hold references to arbitrary objects. Override this to put
+        something else on the queue.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                formatter = self.formatter or logging._defaultFormatter
+                record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        """
+        Put a record on the queue, blocking as configured. Raises
+        queue.Full if the record has to be dropped.
+        """
+        self.queue.put(record, self.block, self.timeout)
+
+    def emit(self, record):
+        """
+        Emit a record.
+
+        Prepare the record and put it on the queue, counting it as dropped
+        if the queue is full.
+        """
+        try:
+            self.enqueue(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+        except (KeyboardInterrupt, SystemExit):
+            raise
+        except:
+            self.handleError(record)
+        else:
+            self.enqueued += 1
+
+class QueueListener:
+    """
+    Take records off a queue filled by QueueHandlers, on a thread of its
+    own, and pass them to a number of handlers.
+    """
+    _sentinel = None
+
+    def __init__(self, queue, *handlers, batchSize=100):
+        """
+        Initialize the listener with the queue to take records from and
+        the handlers to pass them to.
+
+        After waiting for a record, the listener takes up to batchSize-1
+        more records already waiting on the queue before handling them.
+        """
+        self.queue = queue
+        self.handlers = handlers
+        self.batchSize = batchSize
+        self.handled = 0
+        self.batches = 0
+        self._thread = None
+
+    def dequeue(self, block):
+        """
+        Take a record off the queue. Raises queue.Empty if block is false
+        and the queue is empty.
+        """
+        return self.queue.get(block)
+
+    def prepare(self, record):
+        """
+        Prepare a record for handling. This implementation returns the
+        record unchanged.
+        """
+        return record
+
+    def handle(self, record):
+        """
+        Pass a record to each handler whose level it reaches, as a logger
+        would.
+        """
+        record = self.prepare(record)
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def start(self):
+        """
+        Start the thread which takes records off the queue.
+        """
+        if threading is None:
+            raise RuntimeError("QueueListener requires threading")
+        self._thread = t = threading.Thread(target=self._monitor,
+                                            name="QueueListener")
+        t.daemon = True
+        t.start()
+
+    def _monitor(self):
+        done = False
+        while not done:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batchSize:
+                try:
+                    batch.append(self.dequeue(False))
+                except queue.Empty:
+                    break
+            for record in batch:
+                # Records taken after the sentinel are still handled
+                if record is self._sentinel:
+                    done = True
+                    continue
+                self.handle(record)
+                self.handled += 1
+            self.batches += 1
+
+    def enqueueSentinel(self):
+        """
+        Put the sentinel on the queue which tells the thread to stop. If
+        the queue is full, this blocks until there is room for it.
+        """
+        self.queue.put(self._sentinel, True)
+
+    def stop(self):
+        """
+        Stop the listener, once the records already on the queue have
+        been handled.
+        """
+        if self._thread is not None:
+            self.enqueueSentinel()
+            self._thread.join()
+            self._thread = None
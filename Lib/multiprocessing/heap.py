@@ -11,14 +11,15 @@ import mmap
 import tempfile
 import os
 import sys
+import struct
 import threading
 import itertools
 
 import _multiprocessing
-from multiprocessing.util import Finalize, info
+from multiprocessing.util import Finalize, info, get_temp_dir
 from multiprocessing.forking import assert_spawning
 
-__all__ = ['BufferWrapper']
+__all__ = ['BufferWrapper', 'SharedBufferWrapper']
 
 #
 # Inheirtable class which wraps an mmap, and from which blocks can be allocated
@@ -57,6 +58,95 @@ else:
             self.size = size
             self.name = None
 
+#
+# Arena which can be attached by any process at any time, not just by
+# children which inherit it
+#
+
+# maps names to the named arenas created or attached by this process; an
+# attached arena is dropped once none of its blocks is in use here
+_named_arenas = {}
+_named_arenas_lock = threading.RLock()
+
+def _attach_arena(size, name):
+    # return this process's mapping of a named arena, mapping it if needed
+    _named_arenas_lock.acquire()
+    try:
+        try:
+            return _named_arenas[name]
+        except KeyError:
+            arena = NamedArena.__new__(NamedArena)
+            arena.__setstate__((size, name))
+            arena._blocks = 0
+            _named_arenas[name] = arena
+            return arena
+    finally:
+        _named_arenas_lock.release()
+
+_arena_dir = None
+
+def get_arena_dir():
+    # get name of the directory holding the files of named arenas, which
+    # will be automatically cleaned up -- it is in /dev/shm where possible
+    # so that the memory is never written back to disk
+    global _arena_dir
+    if _arena_dir is None:
+        if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+            import shutil
+            _arena_dir = tempfile.mkdtemp(prefix='pymp-', dir='/dev/shm')
+            info('created arena directory %s', _arena_dir)
+            Finalize(None, shutil.rmtree, args=[_arena_dir], exitpriority=-100)
+        else:
+            _arena_dir = get_temp_dir()
+    return _arena_dir
+
+if sys.platform == 'win32':
+
+    class NamedArena(Arena):
+
+        # number of blocks in use by this process if it attached the arena
+        _blocks = None
+
+        def __init__(self, size):
+            Arena.__init__(self, size)
+            _named_arenas[self.name] = self
+
+        def __reduce__(self):
+            return _attach_arena, self._state
+
+else:
+
+    class NamedArena(object):
+
+        _counter = itertools.count()
+
+        # number of blocks in use by this process if it attached the arena
+        _blocks = None
+
+        def __init__(self, size):
+            self.size = size
+            self.name = os.path.join(get_arena_dir(), 'pym-%d-%d' %
+                                     (os.getpid(), next(NamedArena._counter)))
+            fd = os.open(self.name, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+            try:
+                os.ftruncate(fd, size)
+                self.buffer = mmap.mmap(fd, size)
+            finally:
+                os.close(fd)
+            self._state = (self.size, self.name)
+            _named_arenas[self.name] = self
+
+        def __setstate__(self, state):
+            self.size, self.name = self._state = state
+            fd = os.open(self.name, os.O_RDWR)
+            try:
+                self.buffer = mmap.mmap(fd, self.size)
+            finally:
+                os.close(fd)
+
+        def __reduce__(self):
+            return _attach_arena, self._state
+
 #
 # Class allowing allocation of chunks of memory from arenas
 #
@@ -65,16 +155,20 @@ class Heap(object):
 
     _alignment = 8
 
-    def __init__(self, size=mmap.PAGESIZE):
+    def __init__(self, size=mmap.PAGESIZE, arena_type=Arena):
         self._lastpid = os.getpid()
         self._lock = threading.Lock()
         self._size = size
+        self._arena_type = arena_type
         self._lengths = []
         self._len_to_seq = {}
         self._start_to_block = {}
         self._stop_to_block = {}
         self._allocated_blocks = set()
         self._arenas = []
+        # maps blocks lent to other processes to whether they are still
+        # in use by this process
+        self._lent_blocks = {}
 
     @staticmethod
     def _roundup(n, alignment):
@@ -89,7 +183,7 @@ class Heap(object):
             length = self._roundup(max(self._size, size), mmap.PAGESIZE)
             self._size *= 2
             info('allocating a new mmap of length %d', length)
-            arena = Arena(length)
+            arena = self._arena_type(length)
             self._arenas.append(arena)
             return (arena, 0, length)
         else:
@@ -159,13 +253,69 @@ class Heap(object):
         finally:
             self._lock.release()
 
+    def lend(self, block):
+        # mark a block as used by another process; its first byte is set
+        # to non-zero by `release_lent_block()` once that process is done,
+        # and `acquire_lent_block()` stores the pid of that process after it
+        self._lock.acquire()
+        try:
+            assert block in self._allocated_blocks
+            (arena, start, stop) = block
+            arena.buffer[start:start + self._alignment] = \
+                bytes(self._alignment)
+            self._lent_blocks[block] = True
+        finally:
+            self._lock.release()
+
+    def reap(self, pids):
+        # free the lent blocks used by processes `pids`, which have exited
+        if os.getpid() != self._lastpid:
+            return
+        self._lock.acquire()
+        try:
+            for block in self._lent_blocks:
+                (arena, start, stop) = block
+                pid, = struct.unpack('i', arena.buffer[start + 4:start + 8])
+                if pid in pids:
+                    arena.buffer[start] = 1
+            self._reap_lent_blocks()
+        finally:
+            self._lock.release()
+
+    def release(self, block):
+        # free a block once neither this process nor a process to which
+        # it was lent is using it
+        assert os.getpid() == self._lastpid
+        self._lock.acquire()
+        try:
+            if block in self._lent_blocks:
+                self._lent_blocks[block] = False
+                self._reap_lent_blocks()
+            else:
+                self._allocated_blocks.remove(block)
+                self._free(block)
+        finally:
+            self._lock.release()
+
+    def _reap_lent_blocks(self):
+        # free lent blocks which both sides have finished with
+        for block, in_use in list(self._lent_blocks.items()):
+            (arena, start, stop) = block
+            if not in_use and arena.buffer[start]:
+                del self._lent_blocks[block]
+                self._allocated_blocks.remove(block)
+                self._free(block)
+
     def malloc(self, size):
         # return a block of right size (possibly rounded up)
         assert 0 <= size < sys.maxsize
         if os.getpid() != self._lastpid:
-            self.__init__()                     # reinitialize after fork
+            # reinitialize after fork
+            self.__init__(arena_type=self._arena_type)
         self._lock.acquire()
         try:
+            if self._lent_blocks:
+                self._reap_lent_blocks()
             size = self._roundup(max(size,1), self._alignment)
             (arena, start, stop) = self._malloc(size)
             new_stop = start + size
@@ -199,3 +349,66 @@ class BufferWrapper(object):
 
     def get_size(self):
         return self._state[1]
+
+#
+# Chunk of an mmap which can be sent to another process at any time
+#
+
+class SharedBufferWrapper(BufferWrapper):
+
+    _heap = Heap(arena_type=NamedArena)
+
+    # the block starts with a flag set by the process it is lent to
+    _header = Heap._alignment
+
+    def __init__(self, size):
+        assert 0 <= size < sys.maxsize
+        block = SharedBufferWrapper._heap.malloc(size + self._header)
+        self._state = (block, size)
+        Finalize(self, SharedBufferWrapper._heap.release, args=(block,))
+
+    def get_address(self):
+        return BufferWrapper.get_address(self) + self._header
+
+    def write(self, obj):
+        # copy the contents of a buffer object of the right size
+        (arena, start, stop), size = self._state
+        start += self._header
+        arena.buffer[start:start + size] = obj
+
+    def lend(self):
+        # prepare the chunk to be used by one other process, returning
+        # the arena and offset at which the chunk can be found; that
+        # process must call `release_lent_block()` once it is done
+        block, size = self._state
+        SharedBufferWrapper._heap.lend(block)
+        (arena, start, stop) = block
+        return arena, start + self._header
+
+def acquire_lent_block(arena, offset):
+    # called by the process a chunk was lent to before using it
+    start = offset - SharedBufferWrapper._header
+    arena.buffer[start + 4:start + 8] = struct.pack('i', os.getpid())
+    _named_arenas_lock.acquire()
+    try:
+        if arena._blocks is not None:
+            arena._blocks += 1
+    finally:
+        _named_arenas_lock.release()
+
+def release_lent_block(arena, offset):
+    # called by the process a chunk was lent to once it has finished with it
+    arena.buffer[offset - SharedBufferWrapper._header] = 1
+    _named_arenas_lock.acquire()
+    try:
+        if arena._blocks is not None:
+            arena._blocks -= 1
+            if not arena._blocks and _named_arenas.get(arena.name) is arena:
+                del _named_arenas[arena.name]
+    finally:
+        _named_arenas_lock.release()
+
+def reap_lent_blocks(pids):
+    # free the chunks lent to processes `pids` which exited without
+    # releasing them
+    SharedBufferWrapper._heap.reap(pids)
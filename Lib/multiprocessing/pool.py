@@ -38,11 +38,85 @@ job_counter = itertools.count()
 def mapstar(args):
     return list(map(*args))
 
+def timed_mapstar(args):
+    t = time.time()
+    result = list(map(*args))
+    return time.time() - t, result
+
+#
+# Passing large buffers through shared memory
+#
+
+_plain_types = frozenset([int, float, str, tuple, list, dict, type(None)])
+
+def share_buffers(seq, threshold):
+    '''
+    Return a tuple of the items of `seq` with buffer objects of at least
+    `threshold` bytes replaced by copies in shared memory
+    '''
+    from .sharedctypes import SharedBuffer
+    result = []
+    for obj in seq:
+        if type(obj) not in _plain_types:
+            try:
+                view = memoryview(obj)
+            except TypeError:
+                pass
+            else:
+                size = view.itemsize
+                for n in view.shape or ():
+                    size *= n
+                if size >= threshold:
+                    obj = SharedBuffer(view)
+        result.append(obj)
+    return tuple(result)
+
+def _share_task(task, threshold):
+    # share the arguments of a task, looking inside chunks made by `map()`
+    if task is None:
+        return task
+    job, i, func, args, kwds = task
+    if func is mapstar or func is timed_mapstar:
+        (f, chunk), = args
+        args = ((f, share_buffers(chunk, threshold)),)
+    else:
+        args = share_buffers(args, threshold)
+        if kwds:
+            keys = list(kwds)
+            kwds = dict(zip(keys, share_buffers(
+                [kwds[key] for key in keys], threshold)))
+    return job, i, func, args, kwds
+
+def _share_result(func, result, threshold):
+    success, value = result
+    if not success:
+        return result
+    if func is mapstar:
+        value = list(share_buffers(value, threshold))
+    elif func is timed_mapstar:
+        elapsed, value = value
+        value = elapsed, list(share_buffers(value, threshold))
+    else:
+        value, = share_buffers((value,), threshold)
+    return success, value
+
+def _reap_lent_blocks(pool):
+    # free the shared memory lent to workers which exited without
+    # releasing it, such as workers killed by `terminate()`
+    from .heap import reap_lent_blocks
+    reap_lent_blocks([p.pid for p in pool])
+
+def _sharing_put(put, threshold):
+    def sharing_put(task):
+        put(_share_task(task, threshold))
+    return sharing_put
+
 #
 # Code run by worker processes
 #
 
-def worker(inqueue, outqueue, initializer=None, initargs=()):
+def worker(inqueue, outqueue, initializer=None, initargs=(),
+           buffer_threshold=None):
     put = outqueue.put
     get = inqueue.get
     if hasattr(inqueue, '_writer'):
@@ -68,7 +142,132 @@ def worker(inqueue, outqueue, initializer=None, initargs=()):
             result = (True, func(*args, **kwds))
         except Exception as e:
             result = (False, e)
+        if buffer_threshold is not None:
+            result = _share_result(func, result, buffer_threshold)
+            # let the sender reuse shared arguments as soon as it can
+            task = args = kwds = None
         put((job, i, result))
+        task = args = kwds = result = None
+
+#
+# Helpers for jobs which bound the number of tasks in flight
+#
+
+class TaskWindow(object):
+    '''
+    Bounds the number of dispatched tasks of a job whose results have not
+    been consumed yet.
+    '''
+
+    def __init__(self, size):
+        self._lock = threading.Lock()
+        self._size = size
+        self._pending = 0
+        self._closed = False
+        self._cancelled = False
+        self._wakeup = None
+
+    def try_acquire(self, wakeup):
+        # never blocks: if the window is full then `wakeup(self)` is
+        # called once there is room again
+        self._lock.acquire()
+        try:
+            if self._pending < self._size or self._closed:
+                self._pending += 1
+                return True
+            self._wakeup = wakeup
+            return False
+        finally:
+            self._lock.release()
+
+    def release(self):
+        self._lock.acquire()
+        try:
+            self._pending -= 1
+            wakeup, self._wakeup = self._wakeup, None
+        finally:
+            self._lock.release()
+        if wakeup is not None:
+            wakeup(self)
+
+    def close(self, cancel=False):
+        # stop bounding the job, e.g. because its results are discarded;
+        # if `cancel` is true then no more of its tasks are dispatched
+        self._lock.acquire()
+        try:
+            self._closed = True
+            self._cancelled = self._cancelled or cancel
+            wakeup, self._wakeup = self._wakeup, None
+        finally:
+            self._lock.release()
+        if wakeup is not None:
+            wakeup(self)
+
+    def cancelled(self):
+        return self._cancelled
+
+class _WindowedIterator(object):
+    '''
+    Wraps the iterator of a job with a window, so that the rest of the job
+    is cancelled once the iterator is discarded -- otherwise the job would
+    wait for its results to be consumed forever.
+    '''
+
+    def __init__(self, result):
+        self._result = result
+
+    def __iter__(self):
+        return self
+
+    def next(self, timeout=None):
+        return self._result.next(timeout)
+
+    __next__ = next
+
+    def __del__(self):
+        self._result._window.close(cancel=True)
+
+def _make_window(max_pending):
+    if max_pending is None:
+        return None
+    if max_pending < 1:
+        raise ValueError('max_pending must be at least 1')
+    return TaskWindow(max_pending)
+
+class ChunkSizer(object):
+    '''
+    Chooses chunk sizes so that each chunk keeps a worker busy for about
+    `target` seconds, based on the measured time taken per task.
+    '''
+
+    def __init__(self, target=0.05, maxsize=1024):
+        self.size = 1
+        self._target = target
+        self._maxsize = maxsize
+        self._per_task = None
+
+    def record(self, ntasks, elapsed):
+        per_task = elapsed / ntasks
+        if self._per_task is None:
+            self._per_task = per_task
+        else:
+            # exponentially weighted moving average
+            self._per_task = 0.75 * self._per_task + 0.25 * per_task
+        if self._per_task > 0:
+            size = int(self._target / self._per_task)
+        else:
+            size = self._maxsize
+        # grow by at most a factor of two per measurement
+        self.size = max(1, min(size, self.size * 2, self._maxsize))
+
+def _record_timing(sizer, obj):
+    # strip the timing added by `timed_mapstar()` and pass it to `sizer`
+    success, value = obj
+    if success:
+        elapsed, value = value
+        if value:
+            sizer.record(len(value), elapsed)
+    return success, value
 
 #
 # Class representing a process pool
@@ -80,8 +279,15 @@ class Pool(object):
     '''
     Process = Process
 
-    def __init__(self, processes=None, initializer=None, initargs=()):
+    def __init__(self, processes=None, initializer=None, initargs=(),
+                 buffer_threshold=None):
         self._setup_queues()
+        self._buffer_threshold = buffer_threshold
+        if buffer_threshold is not None:
+            # workers inherit the directory holding shared arenas
+            from .heap import get_arena_dir
+            get_arena_dir()
+            self._quick_put = _sharing_put(self._quick_put, buffer_threshold)
         self._taskqueue = queue.Queue()
         self._cache = {}
         self._state = RUN
@@ -99,7 +305,8 @@ class Pool(object):
         for i in range(processes):
             w = self.Process(
                 target=worker,
-                args=(self._inqueue, self._outqueue, initializer, initargs)
+                args=(self._inqueue, self._outqueue, initializer, initargs,
+                      buffer_threshold)
                 )
             self._pool.append(w)
             w.name = w.name.replace('Process', 'PoolWorker')
@@ -125,7 +332,8 @@ class Pool(object):
         self._terminate = Finalize(
             self, self._terminate_pool,
             args=(self._taskqueue, self._inqueue, self._outqueue, self._pool,
-                  self._task_handler, self._result_handler, self._cache),
+                  self._task_handler, self._result_handler, self._cache,
+                  buffer_threshold),
             exitpriority=15
             )
 
@@ -143,48 +351,63 @@ class Pool(object):
         assert self._state == RUN
         return self.apply_async(func, args, kwds).get()
 
-    def map(self, func, iterable, chunksize=None):
+    def map(self, func, iterable, chunksize=None, max_pending=None):
         '''
         Apply `func` to each element in `iterable`, collecting the results
         in a list that is returned.
         '''
         assert self._state == RUN
-        return self.map_async(func, iterable, chunksize).get()
+        return self.map_async(func, iterable, chunksize,
+                              max_pending=max_pending).get()
 
-    def imap(self, func, iterable, chunksize=1):
+    def imap(self, func, iterable, chunksize=1, max_pending=None):
         '''
         Equivalent of `map()` -- can be MUCH slower than `Pool.map()`.
+
+        If `max_pending` is given then at most that many tasks (or chunks)
+        are dispatched whose results have not yet been consumed, and
+        `iterable` is only read as results are consumed.  If `chunksize`
+        is None then the size of chunks adapts to the measured time taken
+        by each task.
         '''
-        assert self._state == RUN
-        if chunksize == 1:
-            result = IMapIterator(self._cache)
-            self._taskqueue.put((((result._job, i, func, (x,), {})
-                         for i, x in enumerate(iterable)), result._set_length))
-            return result
-        else:
-            assert chunksize > 1
-            task_batches = Pool._get_tasks(func, iterable, chunksize)
-            result = IMapIterator(self._cache)
-            self._taskqueue.put((((result._job, i, mapstar, (x,), {})
-                     for i, x in enumerate(task_batches)), result._set_length))
-            return (item for chunk in result for item in chunk)
+        return self._imap(IMapIterator, func, iterable, chunksize,
+                          max_pending)
 
-    def imap_unordered(self, func, iterable, chunksize=1):
+    def imap_unordered(self, func, iterable, chunksize=1, max_pending=None):
         '''
         Like `imap()` method but ordering of results is arbitrary.
         '''
+        return self._imap(IMapUnorderedIterator, func, iterable, chunksize,
+                          max_pending)
+
+    def _imap(self, Iterator, func, iterable, chunksize, max_pending):
         assert self._state == RUN
+        window = _make_window(max_pending)
         if chunksize == 1:
-            result = IMapUnorderedIterator(self._cache)
-            self._taskqueue.put((((result._job, i, func, (x,), {})
-                         for i, x in enumerate(iterable)), result._set_length))
+            result = Iterator(self._cache, window)
+            tasks = ((result._job, i, func, (x,), {})
+                     for i, x in enumerate(iterable))
+            self._taskqueue.put((tasks, result._set_length, window))
+            if window is not None:
+                return _WindowedIterator(result)
             return result
         else:
-            assert chunksize > 1
-            task_batches = Pool._get_tasks(func, iterable, chunksize)
-            result = IMapUnorderedIterator(self._cache)
-            self._taskqueue.put((((result._job, i, mapstar, (x,), {})
-                     for i, x in enumerate(task_batches)), result._set_length))
+            if chunksize is None:
+                sizer = ChunkSizer()
+                task_batches = Pool._get_sized_tasks(func, iterable, sizer)
+                result = Iterator(self._cache, window, sizer)
+                tasks = ((result._job, i, timed_mapstar, (x,), {})
+                         for i, x in enumerate(task_batches))
+            else:
+                assert chunksize > 1
+                task_batches = Pool._get_tasks(func, iterable, chunksize)
+                result = Iterator(self._cache, window)
+                tasks = ((result._job, i, mapstar, (x,), {})
+                         for i, x in enumerate(task_batches))
+            self._taskqueue.put((tasks, result._set_length, window))
+            if window is not None:
+                return (item for chunk in _WindowedIterator(result)
+                        for item in chunk)
             return (item for chunk in result for item in chunk)
 
     def apply_async(self, func, args=(), kwds={}, callback=None):
@@ -193,14 +416,39 @@ class Pool(object):
         '''
         assert self._state == RUN
         result = ApplyResult(self._cache, callback)
-        self._taskqueue.put(([(result._job, None, func, args, kwds)], None))
+        self._taskqueue.put(([(result._job, None, func, args, kwds)], None,
+                             None))
         return result
 
-    def map_async(self, func, iterable, chunksize=None, callback=None):
+    def map_async(self, func, iterable, chunksize=None, callback=None,
+                  max_pending=None):
         '''
         Asynchronous version of `map()` method.
+
+        If `max_pending` is given then at most that many chunks are in
+        flight at once.  An `iterable` without a length is then read
+        lazily instead of being converted to a list, and if `chunksize`
+        is None the size of chunks adapts to the measured time taken by
+        each task.
         '''
         assert self._state == RUN
+        window = _make_window(max_pending)
+        if window is not None and not hasattr(iterable, '__len__'):
+            if chunksize is None:
+                sizer = ChunkSizer()
+                task_batches = Pool._get_sized_tasks(func, iterable, sizer)
+                star = timed_mapstar
+            else:
+                assert chunksize > 0
+                sizer = None
+                task_batches = Pool._get_tasks(func, iterable, chunksize)
+                star = mapstar
+            result = LazyMapResult(self._cache, callback, window, sizer)
+            tasks = ((result._job, i, star, (x,), {})
+                     for i, x in enumerate(task_batches))
+            self._taskqueue.put((tasks, result._set_length, window))
+            return result
+
         if not hasattr(iterable, '__len__'):
             iterable = list(iterable)
 
@@ -212,35 +460,82 @@ class Pool(object):
             chunksize = 0
 
         task_batches = Pool._get_tasks(func, iterable, chunksize)
-        result = MapResult(self._cache, chunksize, len(iterable), callback)
-        self._taskqueue.put((((result._job, i, mapstar, (x,), {})
-                              for i, x in enumerate(task_batches)), None))
+        result = MapResult(self._cache, chunksize, len(iterable), callback,
+                           window)
+        tasks = ((result._job, i, mapstar, (x,), {})
+                 for i, x in enumerate(task_batches))
+        self._taskqueue.put((tasks, None, window))
         return result
 
     @staticmethod
     def _handle_tasks(taskqueue, put, outqueue, pool):
         thread = threading.current_thread()
 
-        for taskseq, set_length in iter(taskqueue.get, None):
-            i = -1
-            for i, task in enumerate(taskseq):
+        # Jobs are dispatched in order.  A job whose window is full is
+        # parked, without blocking the jobs queued after it, until its
+        # window puts itself on `taskqueue` to say that it has room again.
+        # Once the pool is closed the windows are closed too, since the
+        # results of a parked job may never be consumed.
+        jobs = collections.deque()
+        parked = {}
+        closing = False
+
+        while 1:
+            if not jobs:
+                if closing and not parked:
+                    break
+                item = taskqueue.get()
+                if thread._state:
+                    debug('task handler found thread._state != RUN')
+                    break
+                if item is None:
+                    debug('task handler got sentinel')
+                    closing = True
+                    for window in list(parked):
+                        window.close()
+                elif isinstance(item, TaskWindow):
+                    if item in parked:
+                        jobs.append(parked.pop(item))
+                else:
+                    taskseq, set_length, window = item
+                    jobs.append([iter(taskseq), set_length, window, 0])
+                continue
+
+            job = jobs[0]
+            taskseq, set_length, window = job[:3]
+            while 1:
                 if thread._state:
                     debug('task handler found thread._state != RUN')
                     break
+                if window is not None and \
+                   not window.try_acquire(taskqueue.put):
+                    if closing:
+                        window.close()
+                        continue
+                    parked[window] = jobs.popleft()
+                    break
+                try:
+                    if window is not None and window.cancelled():
+                        debug('task handler dropping rest of cancelled job')
+                        raise StopIteration
+                    task = next(taskseq)
+                except StopIteration:
+                    jobs.popleft()
+                    if set_length:
+                        debug('doing set_length()')
+                        set_length(job[3])
+                    break
                 try:
                     put(task)
                 except IOError:
                     debug('could not put task on queue')
+                    jobs.clear()
+                    parked.clear()
+                    closing = True
                     break
-            else:
-                if set_length:
-                    debug('doing set_length()')
-                    set_length(i+1)
-                continue
-            break
-        else:
-            debug('task handler got sentinel')
-
+                job[3] += 1
+            if thread._state:
+                break
 
         try:
             # tell result handler to finish when cache is empty
@@ -281,6 +576,8 @@ class Pool(object):
                 cache[job]._set(i, obj)
             except KeyError:
                 pass
+            # don't keep shared results alive once they are dropped
+            task = obj = None
 
         while cache and thread._state != TERMINATE:
             try:
@@ -297,6 +594,7 @@ class Pool(object):
                 cache[job]._set(i, obj)
             except KeyError:
                 pass
+            task = obj = None
 
         if hasattr(outqueue, '_reader'):
             debug('ensuring that outqueue is not full')
@@ -323,6 +621,17 @@ class Pool(object):
                 return
             yield (func, x)
 
+    @staticmethod
+    def _get_sized_tasks(func, it, sizer):
+        # like `_get_tasks()` but the size of each chunk is decided by
+        # `sizer` at the moment the chunk is created
+        it = iter(it)
+        while 1:
+            x = tuple(itertools.islice(it, sizer.size))
+            if not x:
+                return
+            yield (func, x)
+
     def __reduce__(self):
         raise NotImplementedError(
               'pool objects cannot be passed between processes or pickled'
@@ -346,6 +655,8 @@ class Pool(object):
         self._result_handler.join()
         for p in self._pool:
             p.join()
+        if self._buffer_threshold is not None:
+            _reap_lent_blocks(self._pool)
 
     @staticmethod
     def _help_stuff_finish(inqueue, task_handler, size):
@@ -358,7 +669,8 @@ class Pool(object):
 
     @classmethod
     def _terminate_pool(cls, taskqueue, inqueue, outqueue, pool,
-                        task_handler, result_handler, cache):
+                        task_handler, result_handler, cache,
+                        buffer_threshold=None):
         # this is guaranteed to only be called once
         debug('finalizing pool')
 
@@ -388,6 +700,8 @@ class Pool(object):
             debug('joining pool workers')
             for p in pool:
                 p.join()
+            if buffer_threshold is not None:
+                _reap_lent_blocks(pool)
 
 #
 # Class whose instances are returned by `Pool.apply_async()`
@@ -445,11 +759,12 @@ class ApplyResult(object):
 
 class MapResult(ApplyResult):
 
-    def __init__(self, cache, chunksize, length, callback):
+    def __init__(self, cache, chunksize, length, callback, window=None):
         ApplyResult.__init__(self, cache, callback)
         self._success = True
         self._value = [None] * length
         self._chunksize = chunksize
+        self._window = window
         if chunksize <= 0:
             self._number_left = 0
             self._ready = True
@@ -458,6 +773,12 @@ class MapResult(ApplyResult):
 
     def _set(self, i, success_result):
         success, result = success_result
+        if self._window is not None:
+            if success:
+                self._window.release()
+            else:
+                # results of the remaining tasks will be discarded
+                self._window.close()
         if success:
             self._value[i*self._chunksize:(i+1)*self._chunksize] = result
             self._number_left -= 1
@@ -483,13 +804,77 @@ class MapResult(ApplyResult):
             finally:
                 self._cond.release()
 
+#
+# Class whose instances are returned by `Pool.map_async()` when the
+# iterable is read lazily, so its length is not known in advance
+#
+
+class LazyMapResult(ApplyResult):
+
+    def __init__(self, cache, callback, window, sizer=None):
+        ApplyResult.__init__(self, cache, callback)
+        self._success = True
+        self._chunks = {}
+        self._length = None
+        self._window = window
+        self._sizer = sizer
+
+    def _set(self, i, obj):
+        if self._sizer is not None:
+            obj = _record_timing(self._sizer, obj)
+        success, result = obj
+        if success:
+            self._window.release()
+            self._cond.acquire()
+            try:
+                self._chunks[i] = result
+                done = len(self._chunks) == self._length
+            finally:
+                self._cond.release()
+        else:
+            # results of the remaining tasks will be discarded
+            self._window.close()
+            self._success = False
+            self._value = result
+            done = True
+        if done:
+            self._finish()
+
+    def _set_length(self, length):
+        self._cond.acquire()
+        try:
+            if not self._success:
+                return
+            self._length = length
+            done = len(self._chunks) == length
+        finally:
+            self._cond.release()
+        if done:
+            self._finish()
+
+    def _finish(self):
+        if self._success:
+            chunks = self._chunks
+            self._value = [item for j in range(len(chunks))
+                           for item in chunks[j]]
+            self._chunks = None
+            if self._callback:
+                self._callback(self._value)
+        del self._cache[self._job]
+        self._cond.acquire()
+        try:
+            self._ready = True
+            self._cond.notify()
+        finally:
+            self._cond.release()
+
 #
 # Class whose instances are returned by `Pool.imap()`
 #
 
 class IMapIterator(object):
 
-    def __init__(self, cache):
+    def __init__(self, cache, window=None, sizer=None):
         self._cond = threading.Condition(threading.Lock())
         self._job = next(job_counter)
         self._cache = cache
@@ -497,6 +882,8 @@ class IMapIterator(object):
         self._index = 0
         self._length = None
         self._unsorted = {}
+        self._window = window
+        self._sizer = sizer
         cache[self._job] = self
 
     def __iter__(self):
@@ -520,6 +907,8 @@ class IMapIterator(object):
         finally:
             self._cond.release()
 
+        if self._window is not None:
+            self._window.release()
         success, value = item
         if success:
             return value
@@ -528,6 +917,8 @@ class IMapIterator(object):
     __next__ = next                    # XXX
 
     def _set(self, i, obj):
+        if self._sizer is not None:
+            obj = _record_timing(self._sizer, obj)
         self._cond.acquire()
         try:
             if self._index == i:
@@ -563,6 +954,8 @@ class IMapIterator(object):
 class IMapUnorderedIterator(IMapIterator):
 
     def _set(self, i, obj):
+        if self._sizer is not None:
+            obj = _record_timing(self._sizer, obj)
         self._cond.acquire()
         try:
             self._items.append(obj)
@@ -11,9 +11,11 @@ import ctypes
 import weakref
 
 from multiprocessing import heap, RLock
+from multiprocessing.util import Finalize
 from multiprocessing.forking import assert_spawning, ForkingPickler
 
-__all__ = ['RawValue', 'RawArray', 'Value', 'Array', 'copy', 'synchronized']
+__all__ = ['RawValue', 'RawArray', 'Value', 'Array', 'copy', 'synchronized',
+           'SharedBuffer']
 
 #
 #
@@ -115,6 +117,49 @@ def synchronized(obj, lock=None):
             scls = class_cache[cls] = type(classname, (SynchronizedBase,), d)
         return scls(obj, lock)
 
+#
+# Copy of a buffer object which can be passed to other processes at any time
+#
+
+class SharedBuffer(object):
+    '''
+    Copy of a buffer object (such as `bytes` or `array.array`) in shared
+    memory.  It may be pickled at any time, once, and is unpickled as a
+    memoryview of the same memory with the same item type.
+    '''
+
+    def __init__(self, obj):
+        view = memoryview(obj)
+        size = view.itemsize
+        for n in view.shape or ():
+            size *= n
+        if view.ndim == 1 and view.format in typecode_to_type:
+            self._typecode = view.format
+            self._length = len(view)
+        else:
+            self._typecode = 'B'
+            self._length = size
+        self._wrapper = heap.SharedBufferWrapper(size)
+        self._wrapper.write(view)
+
+    def __len__(self):
+        return self._length
+
+    def __reduce__(self):
+        arena, offset = self._wrapper.lend()
+        return rebuild_shared_buffer, (arena, offset, self._typecode,
+                                       self._length)
+
+def rebuild_shared_buffer(arena, offset, typecode, length):
+    type_ = typecode_to_type[typecode] * length
+    obj = type_.from_buffer(arena.buffer, offset)
+    heap.acquire_lent_block(arena, offset)
+    # the memoryview keeps obj alive; when both are gone, or this process
+    # exits, the process which lent the memory may reuse it
+    Finalize(obj, heap.release_lent_block, args=(arena, offset),
+             exitpriority=0)
+    return memoryview(obj)
+
 #
 # Functions for pickling/unpickling
 #
@@ -173,5 +173,8 @@ def_op('LIST_APPEND', 145)
 def_op('SET_ADD', 146)
 def_op('MAP_ADD', 147)
 
+name_op('LOAD_METHOD', 160)
+def_op('CALL_METHOD', 161)
+
 
 del def_op, name_op, jrel_op, jabs_op
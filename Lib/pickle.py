@@ -26,7 +26,7 @@ Misc variables:
 __version__ = "$Revision$"       # Code version
 
 from types import FunctionType, BuiltinFunctionType
-from copyreg import dispatch_table
+from copyreg import dispatch_table, _buffer_registry
 from copyreg import _extension_registry, _inverted_registry, _extension_cache
 import marshal
 import sys
@@ -170,13 +170,18 @@ _tuplesize2code = [EMPTY_TUPLE, TUPLE1, TUPLE2, TUPLE3]
 BINBYTES       = b'B'   # push bytes; counted binary string argument
 SHORT_BINBYTES = b'C'   #  "     "   ;    "      "       "      " < 256 bytes
 
+# Out-of-band data (protocol 3, only written when a buffer_callback is given)
+
+NEXT_BUFFER    = b'\x97'  # push next out-of-band buffer
+
 __all__.extend([x for x in dir() if re.match("[A-Z][A-Z0-9_]+$",x)])
 
 # Pickling machinery
 
 class _Pickler:
 
-    def __init__(self, file, protocol=None, *, fix_imports=True):
+    def __init__(self, file, protocol=None, *, fix_imports=True,
+                 buffer_callback=None):
         """This takes a binary file for writing a pickle data stream.
 
         The optional protocol argument tells the pickler to use the
@@ -192,11 +197,20 @@ class _Pickler:
         The file argument must have a write() method that accepts a single
         bytes argument. It can thus be a file object opened for binary
         writing, a io.BytesIO instance, or any other custom object that
-        meets this interface.
+        meets this interface.  If file is None, only dumps() can be used.
 
         If fix_imports is True and protocol is less than 3, pickle will try to
         map the new Python 3.x names to the old module names used in Python
         2.x, so that the pickle data stream is readable with Python 2.x.
+
+        If buffer_callback is not None, the data of bytes, bytearray and
+        array.array objects, and of memoryview objects, may be sent
+        out-of-band instead of being copied into the pickle data stream.
+        buffer_callback is called with a memoryview of the data; if it
+        returns a false value, only a reference to the next out-of-band
+        buffer is written, and the caller is responsible for handing the
+        buffers, in order, to the unpickler.  buffer_callback requires a
+        protocol of 3 or higher.
         """
         if protocol is None:
             protocol = DEFAULT_PROTOCOL
@@ -204,15 +218,24 @@ class _Pickler:
             protocol = HIGHEST_PROTOCOL
         elif not 0 <= protocol <= HIGHEST_PROTOCOL:
             raise ValueError("pickle protocol must be <= %d" % HIGHEST_PROTOCOL)
-        try:
-            self.write = file.write
-        except AttributeError:
-            raise TypeError("file must have a 'write' attribute")
+        if buffer_callback is not None and protocol < 3:
+            raise ValueError("buffer_callback needs protocol >= 3")
+        if file is None:
+            self.write = None
+        else:
+            try:
+                self.write = file.write
+            except AttributeError:
+                raise TypeError("file must have a 'write' attribute")
         self.memo = {}
         self.proto = int(protocol)
         self.bin = protocol >= 1
         self.fast = 0
+        self._fast_nesting = 0
+        self._fast_memo = None
+        self._output = None
         self.fix_imports = fix_imports and protocol < 3
+        self._buffer_callback = buffer_callback
 
     def clear_memo(self):
         """Clears the pickler's "memo".
@@ -232,11 +255,63 @@ class _Pickler:
         if not hasattr(self, "write"):
             raise PicklingError("Pickler.__init__() was not called by "
                                 "%s.__init__()" % (self.__class__.__name__,))
+        if self.write is None:
+            raise ValueError("Pickler has no file, use dumps() instead")
+        self._dump(obj)
+
+    def dumps(self, obj):
+        """Return the pickled representation of obj as a bytes object.
+
+        The memo is cleared first, so that the result can be loaded on its
+        own.  The output buffer is kept and reused by the next call.
+        """
+        if not hasattr(self, "write"):
+            raise PicklingError("Pickler.__init__() was not called by "
+                                "%s.__init__()" % (self.__class__.__name__,))
+        if self.memo:
+            self.memo.clear()
+        output = self._output
+        if output is None:
+            output = self._output = io.BytesIO()
+        write = self.write
+        self.write = output.write
+        try:
+            self._dump(obj)
+            return output.getvalue()
+        finally:
+            self.write = write
+            output.seek(0)
+            output.truncate()
+
+    def _dump(self, obj):
+        self._fast_nesting = 0
+        self._fast_memo = None
         if self.proto >= 2:
             self.write(PROTO + bytes([self.proto]))
         self.save(obj)
         self.write(STOP)
 
+    # In fast mode nothing is memoized, so a recursive object would be
+    # pickled forever.  Past _FAST_NESTING_LIMIT nested containers, the ids
+    # of the containers being saved are kept to catch that.
+    _FAST_NESTING_LIMIT = 50
+
+    def _fast_enter(self, obj):
+        self._fast_nesting += 1
+        if self._fast_nesting >= self._FAST_NESTING_LIMIT:
+            if self._fast_memo is None:
+                self._fast_memo = set()
+            if id(obj) in self._fast_memo:
+                raise ValueError("fast mode: can't pickle cyclic objects "
+                                 "including object type %s at %#x" %
+                                 (type(obj).__name__, id(obj)))
+            self._fast_memo.add(id(obj))
+
+    def _fast_leave(self, obj):
+        if self._fast_nesting >= self._FAST_NESTING_LIMIT:
+            self._fast_memo.discard(id(obj))
+        self._fast_nesting -= 1
+
     def memoize(self, obj):
         """Store an object in the memo."""
 
@@ -292,8 +367,18 @@ class _Pickler:
             self.write(self.get(x[0]))
             return
 
-        # Check the type dispatch table
         t = type(obj)
+
+        # Offer the data of bytes-like objects to the buffer callback
+        if self._buffer_callback is not None:
+            if t is memoryview:
+                self.save_memoryview(obj)
+                return
+            reduce = _buffer_registry.get(t)
+            if reduce is not None and self.save_buffer(obj, reduce):
+                return
+
+        # Check the type dispatch table
         f = self.dispatch.get(t)
         if f:
             f(self, obj) # Call unbound method with explicit self
@@ -347,6 +432,20 @@ class _Pickler:
         # This exists so a subclass can override it
         return None
 
+    def save_buffer(self, obj, reduce):
+        # Send the data of obj out-of-band if the buffer callback agrees;
+        # return False if obj is to be pickled in-band as usual.
+        if self._buffer_callback(memoryview(obj)):
+            return False
+        func, args = reduce(obj)
+        self.save(func)
+        self.write(MARK)
+        for arg in args:
+            self.save(arg)
+        self.write(NEXT_BUFFER + TUPLE + REDUCE)
+        self.memoize(obj)
+        return True
+
     def save_pers(self, pid):
         # Save a persistent id reference
         if self.bin:
@@ -497,6 +596,19 @@ class _Pickler:
         self.memoize(obj)
     dispatch[bytes] = save_bytes
 
+    def save_memoryview(self, obj):
+        # Only used with a buffer callback; memoryview objects can't be
+        # pickled otherwise
+        if not self._buffer_callback(obj):
+            self.write(NEXT_BUFFER)
+            self.memoize(obj)
+            return
+        # In-band: a copy of the data, read-only views as bytes
+        if obj.readonly:
+            self.save_bytes(obj.tobytes())
+        else:
+            self.save_reduce(bytearray, (obj.tobytes(),), obj=obj)
+
     def save_str(self, obj, pack=struct.pack):
         if self.bin:
             encoded = obj.encode('utf-8')
@@ -572,7 +684,12 @@ class _Pickler:
             write(MARK + LIST)
 
         self.memoize(obj)
-        self._batch_appends(obj)
+        if self.fast:
+            self._fast_enter(obj)
+            self._batch_appends(obj)
+            self._fast_leave(obj)
+        else:
+            self._batch_appends(obj)
 
     dispatch[list] = save_list
 
@@ -620,7 +737,12 @@ class _Pickler:
             write(MARK + DICT)
 
         self.memoize(obj)
-        self._batch_setitems(obj.items())
+        if self.fast:
+            self._fast_enter(obj)
+            self._batch_setitems(obj.items())
+            self._fast_leave(obj)
+        else:
+            self._batch_setitems(obj.items())
 
     dispatch[dict] = save_dict
     if PyStringMap is not None:
@@ -777,7 +899,7 @@ def whichmodule(func, funcname):
 class _Unpickler:
 
     def __init__(self, file, *, fix_imports=True,
-                 encoding="ASCII", errors="strict"):
+                 encoding="ASCII", errors="strict", buffers=None):
         """This takes a binary file for reading a pickle data stream.
 
         The protocol version of the pickle is detected automatically, so no
@@ -788,7 +910,7 @@ class _Unpickler:
         requires no arguments.  Both methods should return bytes.
         Thus file-like object can be a binary file object opened for
         reading, a BytesIO object, or any other custom object that
-        meets this interface.
+        meets this interface.  If file is None, only loads() can be used.
 
         Optional keyword arguments are *fix_imports*, *encoding* and *errors*,
         which are used to control compatiblity support for pickle stream
@@ -797,14 +919,25 @@ class _Unpickler:
         *encoding* and *errors* tell pickle how to decode 8-bit string
         instances pickled by Python 2.x; these default to 'ASCII' and
         'strict', respectively.
+
+        If buffers is not None, it is an iterable of the out-of-band
+        buffers written by a pickler with a buffer_callback, in the order
+        they were handed to that callback.  The buffers, which can be any
+        objects supporting the buffer protocol, are used without copying
+        them.
         """
-        self.readline = file.readline
-        self.read = file.read
+        if file is None:
+            self.readline = self.read = None
+        else:
+            self.readline = file.readline
+            self.read = file.read
         self.memo = {}
         self.encoding = encoding
         self.errors = errors
         self.proto = 0
         self.fix_imports = fix_imports
+        self._buffers = iter(buffers) if buffers is not None else None
+        self.stack = []
 
     def load(self):
         """Read a pickled object representation from the open file.
@@ -816,8 +949,35 @@ class _Unpickler:
         if not hasattr(self, "read"):
             raise UnpicklingError("Unpickler.__init__() was not called by "
                                   "%s.__init__()" % (self.__class__.__name__,))
+        if self.read is None:
+            raise ValueError("Unpickler has no file, use loads() instead")
+        return self._load()
+
+    def loads(self, data):
+        """Read a pickled object representation from a bytes object.
+
+        The memo is cleared first.  Bytes past the pickled object's
+        representation are ignored.
+        """
+        if not hasattr(self, "read"):
+            raise UnpicklingError("Unpickler.__init__() was not called by "
+                                  "%s.__init__()" % (self.__class__.__name__,))
+        if isinstance(data, str):
+            raise TypeError("Can't load pickle from unicode string")
+        if self.memo:
+            self.memo.clear()
+        file = io.BytesIO(data)
+        read, readline = self.read, self.readline
+        self.read, self.readline = file.read, file.readline
+        try:
+            return self._load()
+        finally:
+            self.read, self.readline = read, readline
+
+    def _load(self):
         self.mark = object() # any new unique object
-        self.stack = []
+        # the stack is reused from one load to the next
+        del self.stack[:]
         self.append = self.stack.append
         read = self.read
         dispatch = self.dispatch
@@ -960,6 +1120,17 @@ class _Unpickler:
         self.append(self.read(len))
     dispatch[BINBYTES[0]] = load_binbytes
 
+    def load_next_buffer(self):
+        if self._buffers is None:
+            raise UnpicklingError("pickle stream refers to out-of-band data "
+                                  "but no buffers argument was given")
+        try:
+            buf = next(self._buffers)
+        except StopIteration:
+            raise UnpicklingError("not enough out-of-band buffers")
+        self.append(buf)
+    dispatch[NEXT_BUFFER[0]] = load_next_buffer
+
     def load_unicode(self):
         self.append(str(self.readline()[:-1], 'raw-unicode-escape'))
     dispatch[UNICODE[0]] = load_unicode
@@ -1342,6 +1513,16 @@ def decode_long(data):
         n -= 1 << (nbytes * 8)
     return n
 
+# Let the data of arrays be sent out-of-band too
+try:
+    from array import array as _array
+except ImportError:
+    pass
+else:
+    from copyreg import _array_from_buffer
+    _buffer_registry[_array] = lambda obj: (_array_from_buffer,
+                                            (obj.typecode,))
+
 # Use the faster _pickle if possible
 try:
     from _pickle import *
@@ -1350,26 +1531,25 @@ except ImportError:
 
 # Shorthands
 
-def dump(obj, file, protocol=None, *, fix_imports=True):
-    Pickler(file, protocol, fix_imports=fix_imports).dump(obj)
+def dump(obj, file, protocol=None, *, fix_imports=True, buffer_callback=None):
+    Pickler(file, protocol, fix_imports=fix_imports,
+            buffer_callback=buffer_callback).dump(obj)
 
-def dumps(obj, protocol=None, *, fix_imports=True):
-    f = io.BytesIO()
-    Pickler(f, protocol, fix_imports=fix_imports).dump(obj)
-    res = f.getvalue()
+def dumps(obj, protocol=None, *, fix_imports=True, buffer_callback=None):
+    res = Pickler(None, protocol, fix_imports=fix_imports,
+                  buffer_callback=buffer_callback).dumps(obj)
     assert isinstance(res, bytes_types)
     return res
 
-def load(file, *, fix_imports=True, encoding="ASCII", errors="strict"):
-    return Unpickler(file, fix_imports=fix_imports,
-                     encoding=encoding, errors=errors).load()
+def load(file, *, fix_imports=True, encoding="ASCII", errors="strict",
+         buffers=None):
+    return Unpickler(file, fix_imports=fix_imports, encoding=encoding,
+                     errors=errors, buffers=buffers).load()
 
-def loads(s, *, fix_imports=True, encoding="ASCII", errors="strict"):
-    if isinstance(s, str):
-        raise TypeError("Can't load pickle from unicode string")
-    file = io.BytesIO(s)
-    return Unpickler(file, fix_imports=fix_imports,
-                     encoding=encoding, errors=errors).load()
+def loads(s, *, fix_imports=True, encoding="ASCII", errors="strict",
+          buffers=None):
+    return Unpickler(None, fix_imports=fix_imports, encoding=encoding,
+                     errors=errors, buffers=buffers).loads(s)
 
 # Doctest
 def _test():
@@ -1065,6 +1065,23 @@ opcodes = [
       which are taken literally as the string content.
       """),
 
+    # Out-of-band data (protocol 3, only written when a buffer_callback is
+    # given to the pickler)
+
+    I(name='NEXT_BUFFER',
+      code='\x97',
+      arg=None,
+      stack_before=[],
+      stack_after=[anyobject],
+      proto=3,
+      doc="""Push an out-of-band buffer.
+
+      The buffer is not in the pickle stream:  it is the next object
+      produced by the iterable given as the buffers argument of the
+      Unpickler constructor.  It is pushed unchanged, without copying its
+      data.
+      """),
+
     # Ways to spell None.
 
     I(name='NONE',
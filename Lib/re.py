@@ -91,6 +91,8 @@ This module exports the following functions:
     finditer Return an iterator yielding a match object for each match.
     compile  Compile a pattern into a RegexObject.
     purge    Clear the regular expression cache.
+    pin      Compile a pattern and keep it in the cache permanently.
+    unpin    Allow a pinned pattern to be evicted from the cache again.
     escape   Backslash all non-alphanumerics in a string.
 
 Some of the functions in this module takes flags as optional parameters:
@@ -119,9 +121,15 @@ import sys
 import sre_compile
 import sre_parse
 
+try:
+    from _thread import allocate_lock as _thread_allocate_lock
+except ImportError:
+    from _dummy_thread import allocate_lock as _thread_allocate_lock
+
 # public symbols
 __all__ = [ "match", "search", "sub", "subn", "split", "findall",
-    "compile", "purge", "template", "escape", "A", "I", "L", "M", "S", "X",
+    "compile", "purge", "pin", "unpin", "set_cache_size", "cache_info",
+    "template", "escape", "A", "I", "L", "M", "S", "X",
     "U", "ASCII", "IGNORECASE", "LOCALE", "MULTILINE", "DOTALL", "VERBOSE",
     "UNICODE", "error" ]
 
@@ -205,10 +213,34 @@ def compile(pattern, flags=0):
     return _compile(pattern, flags)
 
 def purge():
-    "Clear the regular expression cache"
+    "Clear the regular expression cache (pinned patterns are kept)"
     _cache.clear()
     _cache_repl.clear()
 
+def pin(pattern, flags=0):
+    """Compile a pattern and pin it in the cache, returning the pattern
+    object.  Pinned patterns are never evicted and do not count against
+    the cache size."""
+    p = _compile(pattern, flags)
+    if sre_compile.isstring(pattern):
+        _cache.pin((type(pattern), pattern, flags), p)
+    return p
+
+def unpin(pattern, flags=0):
+    "Make a pattern pinned with pin() subject to normal eviction again"
+    _cache.unpin((type(pattern), pattern, flags))
+
+def set_cache_size(maxsize):
+    """Set the maximum number of unpinned compiled patterns to cache.
+    Least recently used patterns are evicted if the cache shrinks."""
+    _cache.resize(maxsize)
+    _cache_repl.resize(maxsize)
+
+def cache_info():
+    """Return a tuple (hits, misses, evictions, maxsize, currsize)
+    describing the compiled pattern cache."""
+    return _cache.info()
+
 def template(pattern, flags=0):
     "Compile a template pattern, returning a pattern object"
     return _compile(pattern, flags|T)
@@ -249,13 +281,108 @@ def escape(pattern):
 # --------------------------------------------------------------------
 # internals
 
-_cache = {}
-_cache_repl = {}
-
-_pattern_type = type(sre_compile.compile("", 0))
+class _LRUCache:
+    # internal: bounded mapping with least-recently-used eviction.
+    # Entries are links [PREV, NEXT, KEY, VALUE] in a circular list
+    # whose root.NEXT is the oldest entry.  Pinned entries live only
+    # in _pinned and are never evicted.
+
+    def __init__(self, maxsize):
+        self._lock = _thread_allocate_lock()
+        self._pinned = {}
+        self._map = {}
+        self._root = root = []
+        root[:] = [root, root, None, None]
+        self.maxsize = maxsize
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        value = self._pinned.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        with self._lock:
+            link = self._map.get(key)
+            if link is None:
+                self.misses += 1
+                return None
+            # move the link to the most recently used end
+            link_prev, link_next, _, value = link
+            link_prev[1] = link_next
+            link_next[0] = link_prev
+            root = self._root
+            last = root[0]
+            last[1] = root[0] = link
+            link[0] = last
+            link[1] = root
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._pinned:
+                self._pinned[key] = value
+                return
+            link = self._map.get(key)
+            if link is not None:
+                link[3] = value
+                return
+            root = self._root
+            last = root[0]
+            last[1] = root[0] = self._map[key] = [last, root, key, value]
+            self._evict(self.maxsize)
+
+    def _evict(self, maxsize):
+        # internal: drop the oldest entries until at most maxsize remain
+        root = self._root
+        while len(self._map) > maxsize:
+            oldest = root[1]
+            root[1] = oldest[1]
+            oldest[1][0] = root
+            del self._map[oldest[2]]
+            self.evictions += 1
+
+    def pin(self, key, value):
+        with self._lock:
+            link = self._map.pop(key, None)
+            if link is not None:
+                link[0][1] = link[1]
+                link[1][0] = link[0]
+            self._pinned[key] = value
+
+    def unpin(self, key):
+        with self._lock:
+            value = self._pinned.pop(key, None)
+        if value is not None:
+            self.set(key, value)
+
+    def resize(self, maxsize):
+        if maxsize < 0:
+            raise ValueError("cache size must be non-negative")
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict(maxsize)
+
+    def clear(self):
+        with self._lock:
+            self._map.clear()
+            root = self._root
+            root[:] = [root, root, None, None]
+
+    def info(self):
+        return (self.hits, self.misses, self.evictions, self.maxsize,
+                len(self._map) + len(self._pinned))
+
+    def __len__(self):
+        return len(self._map) + len(self._pinned)
 
 _MAXCACHE = 100
 
+_cache = _LRUCache(_MAXCACHE)
+_cache_repl = _LRUCache(_MAXCACHE)
+
+_pattern_type = type(sre_compile.compile("", 0))
+
 def _compile(*key):
     # internal: compile pattern
     cachekey = (type(key[0]),) + key
@@ -271,9 +398,7 @@ def _compile(*key):
     if not sre_compile.isstring(pattern):
         raise TypeError("first argument must be string or compiled pattern")
     p = sre_compile.compile(pattern, flags)
-    if len(_cache) >= _MAXCACHE:
-        _cache.clear()
-    _cache[cachekey] = p
+    _cache.set(cachekey, p)
     return p
 
 def _compile_repl(*key):
@@ -283,9 +408,7 @@ def _compile_repl(*key):
         return p
     repl, pattern = key
     p = sre_parse.parse_template(repl, pattern)
-    if len(_cache_repl) >= _MAXCACHE:
-        _cache_repl.clear()
-    _cache_repl[key] = p
+    _cache_repl.set(key, p)
     return p
 
 def _expand(pattern, match, template):
@@ -7,6 +7,8 @@ XXX The functions here don't copy the resource fork or other metadata on Mac.
 import os
 import sys
 import stat
+import io
+import errno
 from os.path import abspath
 import fnmatch
 
@@ -25,14 +27,58 @@ try:
 except NameError:
     WindowsError = None
 
+_binary_io = (io.BufferedIOBase, io.RawIOBase)
+
 def copyfileobj(fsrc, fdst, length=16*1024):
     """copy data from file-like object fsrc to file-like object fdst"""
+    if (length > 0 and isinstance(fsrc, _binary_io) and
+        isinstance(fdst, _binary_io)):
+        _copyfileobj_readinto(fsrc, fdst, length)
+        return
     while 1:
         buf = fsrc.read(length)
         if not buf:
             break
         fdst.write(buf)
 
+def _copyfileobj_readinto(fsrc, fdst, length):
+    # Read into a single buffer, rather than making a bytes object per block
+    buf = bytearray(length)
+    view = memoryview(buf)
+    readinto = fsrc.readinto
+    write = fdst.write
+    while 1:
+        n = readinto(buf)
+        if not n:
+            break
+        if n < length:
+            write(view[:n])
+        else:
+            write(buf)
+
+def _copyfile_sendfile(fsrc, fdst):
+    """Copy the file object fsrc to fdst with os.sendfile().
+
+    Return false if nothing was copied because sendfile() doesn't
+    support these files.
+
+    """
+    infd = fsrc.fileno()
+    outfd = fdst.fileno()
+    # as few calls as possible, but sendfile() won't send 2 GB at once
+    blocksize = min(max(os.fstat(infd).st_size, 2**20), 2**30)
+    offset = 0
+    while 1:
+        try:
+            n = os.sendfile(outfd, infd, offset, blocksize)
+        except OSError as e:
+            if e.errno in (errno.EINVAL, errno.ENOSYS) and not offset:
+                return False
+            raise
+        if n == 0:
+            return True
+        offset += n
+
 def _samefile(src, dst):
     # Macintosh, Unix.
     if hasattr(os.path,'samefile'):
@@ -65,7 +111,9 @@ def copyfile(src, dst):
     try:
         fsrc = open(src, 'rb')
         fdst = open(dst, 'wb')
-        copyfileobj(fsrc, fdst)
+        # Let the kernel copy the data where it can
+        if not (hasattr(os, 'sendfile') and _copyfile_sendfile(fsrc, fdst)):
+            copyfileobj(fsrc, fdst)
     finally:
         if fdst:
             fdst.close()
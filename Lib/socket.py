@@ -163,6 +163,100 @@ class socket(_socket.socket):
         text.mode = mode
         return text
 
+    def sendfile(self, file, offset=None, count=None):
+        """sendfile(file[, offset[, count]]) -> number of bytes sent
+
+        Send the data of file, a binary file object, until EOF is reached
+        or count bytes are sent.  Sending starts at offset, or at the
+        current position of file if offset is None, and file is left
+        positioned after the last byte sent.  Regular files are sent with
+        os.sendfile() where available, so that the data doesn't go through
+        user space; other files are read with readinto() into a reused
+        buffer and sent with sendall().
+        """
+        if count is not None and count < 0:
+            raise ValueError("count must be a positive integer")
+        sent = None
+        if hasattr(os, 'sendfile') and self.type == SOCK_STREAM:
+            try:
+                infd = file.fileno()
+                if offset is None:
+                    offset = file.tell()
+            except (AttributeError, io.UnsupportedOperation, IOError):
+                pass
+            else:
+                sent = self._sendfile_use_sendfile(infd, offset, count)
+                if sent is not None:
+                    file.seek(offset + sent)
+        if sent is None:
+            if offset is not None:
+                file.seek(offset)
+            sent = self._sendfile_use_send(file, count)
+        return sent
+
+    def _sendfile_use_sendfile(self, infd, offset, count):
+        # Return None if sendfile() doesn't support these descriptors.
+        import errno, select
+        outfd = self.fileno()
+        timeout = self.gettimeout()
+        blocksize = 2**30 if count is None else count
+        sent = 0
+        while blocksize > 0:
+            try:
+                n = os.sendfile(outfd, infd, offset + sent, blocksize)
+            except OSError as e:
+                if e.errno in (errno.EINVAL, errno.ENOSYS) and not sent:
+                    return None
+                if e.errno != errno.EAGAIN:
+                    raise
+                # The socket has a timeout, which makes it non-blocking
+                # at the OS level; wait until it is writable again.
+                if not select.select([], [outfd], [], timeout)[1]:
+                    raise _socket.timeout('timed out')
+                continue
+            if n == 0:
+                break
+            sent += n
+            if count is not None:
+                blocksize -= n
+        return sent
+
+    def _sendfile_use_send(self, file, count):
+        buf = bytearray(65536 if count is None else min(count, 65536))
+        view = memoryview(buf)
+        sent = 0
+        while count is None or sent < count:
+            if count is not None and count - sent < len(buf):
+                n = file.readinto(view[:count - sent])
+            else:
+                n = file.readinto(buf)
+            if not n:
+                break
+            self.sendall(view[:n])
+            sent += n
+        return sent
+
+    def _sendall_buffers(self, buffers):
+        # Send all the data of a list of buffers, with as few system calls
+        # as sendmsg() allows and without joining them first.
+        if not hasattr(_socket.socket, 'sendmsg'):
+            for data in buffers:
+                self.sendall(data)
+            return
+        views = []
+        for data in buffers:
+            view = memoryview(data)
+            if view.itemsize != 1:
+                view = memoryview(bytes(view))
+            if len(view):
+                views.append(view)
+        while views:
+            n = self.sendmsg(views)
+            while views and n >= len(views[0]):
+                n -= len(views.pop(0))
+            if n:
+                views[0] = views[0][n:]
+
     def _decref_socketios(self):
         if self._io_refs > 0:
             self._io_refs -= 1
@@ -218,6 +312,11 @@ class SocketIO(io.RawIOBase):
         self._checkWritable()
         return self._sock.send(b)
 
+    def writelines(self, lines):
+        self._checkClosed()
+        self._checkWritable()
+        self._sock._sendall_buffers(list(lines))
+
     def readable(self):
         return self._reading and not self.closed
 
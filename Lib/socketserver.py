@@ -133,6 +133,10 @@ import socket
 import select
 import sys
 import os
+import errno
+import signal
+import time
+import queue
 try:
     import threading
 except ImportError:
@@ -141,7 +145,10 @@ except ImportError:
 __all__ = ["TCPServer","UDPServer","ForkingUDPServer","ForkingTCPServer",
            "ThreadingUDPServer","ThreadingTCPServer","BaseRequestHandler",
            "StreamRequestHandler","DatagramRequestHandler",
-           "ThreadingMixIn", "ForkingMixIn"]
+           "ThreadingMixIn", "ForkingMixIn",
+           "ThreadPoolUDPServer", "ThreadPoolTCPServer",
+           "PreForkUDPServer", "PreForkTCPServer",
+           "ThreadPoolMixIn", "PreForkMixIn"]
 if hasattr(socket, "AF_UNIX"):
     __all__.extend(["UnixStreamServer","UnixDatagramServer",
                     "ThreadingUnixStreamServer",
@@ -570,12 +577,220 @@ class ThreadingMixIn:
         t.start()
 
 
+class ThreadPoolMixIn(ThreadingMixIn):
+    """Mix-in class to handle requests in a fixed pool of threads.
+
+    Accepted requests wait in a queue of at most max_pending_requests
+    entries; while it is full the server stops accepting, and further
+    connections wait in the listen backlog (request_queue_size).
+    """
+
+    pool_size = 10
+    max_pending_requests = 50
+    _requests = None
+
+    def process_request(self, request, client_address):
+        """Queue the request for a worker thread.
+
+        Blocks while max_pending_requests requests are waiting.
+        """
+        if self._requests is None:
+            self._requests = queue.Queue(self.max_pending_requests)
+            self._pool_lock = threading.Lock()
+            self._workers = []
+            self._worker_count = 0
+            self.resize_pool(self.pool_size)
+        self._requests.put((request, client_address))
+
+    def resize_pool(self, size):
+        """Change the number of worker threads to size.
+
+        Surplus threads exit after the requests already queued have
+        been started, without interrupting any request.
+        """
+        self.pool_size = size
+        if self._requests is None:
+            # The pool is started by the first request
+            return
+        with self._pool_lock:
+            self._workers = [t for t in self._workers if t.is_alive()]
+            while self._worker_count < size:
+                t = threading.Thread(target=self.process_request_worker)
+                if self.daemon_threads:
+                    t.daemon = True
+                t.start()
+                self._workers.append(t)
+                self._worker_count += 1
+            while self._worker_count > size:
+                self._requests.put(None)
+                self._worker_count -= 1
+
+    def process_request_worker(self):
+        """Handle queued requests until told to exit."""
+        while True:
+            item = self._requests.get()
+            if item is None:
+                break
+            self.process_request_thread(*item)
+
+    def server_close(self):
+        """Stop the worker threads once the queued requests are handled.
+
+        May be extended, do not override.
+        """
+        if self._requests is not None:
+            self.resize_pool(0)
+            current = threading.current_thread()
+            for t in self._workers:
+                if t is not current:
+                    t.join()
+        super().server_close()
+
+
+class PreForkMixIn:
+    """Mix-in class to handle requests in a fixed pool of processes.
+
+    serve_forever() forks pool_size worker processes which accept and
+    handle requests on the listening socket, each one at a time, and
+    replaces any which exit.  Connections wait in the listen backlog
+    (request_queue_size) until a worker accepts them.
+    """
+
+    pool_size = 4
+    active_children = None
+    _stopping = False
+
+    def serve_forever(self, poll_interval=0.5):
+        """Run the worker processes until shutdown.
+
+        Every poll_interval seconds, exited workers are replaced and the
+        pool is resized if pool_size has changed.
+        """
+        self.__shutdown_request = False
+        self.__is_shut_down = threading.Event()
+        if self.active_children is None:
+            self.active_children = []
+        self._retired_children = []
+        try:
+            while not self.__shutdown_request:
+                self.collect_children()
+                while len(self.active_children) < self.pool_size:
+                    self.start_worker(poll_interval)
+                while len(self.active_children) > self.pool_size:
+                    # Let the worker finish its current request
+                    pid = self.active_children.pop()
+                    self._signal_child(pid)
+                    self._retired_children.append(pid)
+                time.sleep(poll_interval)
+        finally:
+            children = self.active_children + self._retired_children
+            for pid in self.active_children:
+                self._signal_child(pid)
+            for pid in children:
+                try:
+                    os.waitpid(pid, 0)
+                except os.error:
+                    pass
+            self.active_children = []
+            self._retired_children = []
+            self.__is_shut_down.set()
+
+    def shutdown(self):
+        """Stop the serve_forever loop and wait for the workers to exit.
+
+        Each worker finishes the request it is handling first.
+        """
+        self.__shutdown_request = True
+        self.__is_shut_down.wait()
+
+    def resize_pool(self, size):
+        """Change the number of worker processes to size.
+
+        Takes effect at the next poll of serve_forever().
+        """
+        self.pool_size = size
+
+    def collect_children(self):
+        """Internal routine to wait for children that have exited."""
+        for children in (self.active_children, self._retired_children):
+            for pid in children[:]:
+                try:
+                    done, status = os.waitpid(pid, os.WNOHANG)
+                except os.error:
+                    # Already reaped by someone else
+                    done = pid
+                if done:
+                    children.remove(pid)
+
+    def _signal_child(self, pid):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except os.error:
+            pass
+
+    def start_worker(self, poll_interval):
+        """Fork a worker process."""
+        pid = os.fork()
+        if pid:
+            self.active_children.append(pid)
+            return
+        # Child process.
+        # This must never return, hence os._exit()!
+        try:
+            self.serve_requests(poll_interval)
+            os._exit(0)
+        except:
+            try:
+                import traceback
+                traceback.print_exc()
+                # os._exit() doesn't flush
+                sys.stderr.flush()
+            finally:
+                os._exit(1)
+
+    def _handle_sigterm(self, signum, frame):
+        self._stopping = True
+
+    def serve_requests(self, poll_interval):
+        """Handle requests in a worker process until it is sent SIGTERM."""
+        signal.signal(signal.SIGTERM, self._handle_sigterm)
+        # Restart system calls interrupted by SIGTERM, so that a request
+        # being handled is finished
+        signal.siginterrupt(signal.SIGTERM, False)
+        # Workers race to accept each request; the losers must not block
+        self.socket.setblocking(False)
+        while not self._stopping:
+            try:
+                r, w, e = select.select([self], [], [], poll_interval)
+            except select.error as e:
+                if e.args[0] != errno.EINTR:
+                    raise
+                continue
+            if r:
+                self._handle_request_noblock()
+
+    def process_request(self, request, client_address):
+        """Handle the request in this worker process."""
+        if isinstance(request, socket.socket):
+            # On some platforms accepted sockets inherit the listening
+            # socket's non-blocking mode
+            request.setblocking(True)
+        self.finish_request(request, client_address)
+        self.close_request(request)
+
+
 class ForkingUDPServer(ForkingMixIn, UDPServer): pass
 class ForkingTCPServer(ForkingMixIn, TCPServer): pass
 
 class ThreadingUDPServer(ThreadingMixIn, UDPServer): pass
 class ThreadingTCPServer(ThreadingMixIn, TCPServer): pass
 
+class ThreadPoolUDPServer(ThreadPoolMixIn, UDPServer): pass
+class ThreadPoolTCPServer(ThreadPoolMixIn, TCPServer): pass
+
+class PreForkUDPServer(PreForkMixIn, UDPServer): pass
+class PreForkTCPServer(PreForkMixIn, TCPServer): pass
+
 if hasattr(socket, 'AF_UNIX'):
 
     class UnixStreamServer(TCPServer):
@@ -646,8 +861,13 @@ class StreamRequestHandler(BaseRequestHandler):
     rbufsize = -1
     wbufsize = 0
 
+    # A timeout to apply to the request socket, if not None.
+    timeout = None
+
     def setup(self):
         self.connection = self.request
+        if self.timeout is not None:
+            self.connection.settimeout(self.timeout)
         self.rfile = self.connection.makefile('rb', self.rbufsize)
         self.wfile = self.connection.makefile('wb', self.wbufsize)
 
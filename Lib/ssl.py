@@ -235,6 +235,21 @@ class SSLSocket(socket):
         else:
             return socket.sendall(self, data, flags)
 
+    def sendmsg(self, buffers, ancdata=(), flags=0, address=None):
+        self._checkClosed()
+        if self._sslobj:
+            if ancdata or address is not None:
+                raise ValueError(
+                    "ancillary data and address not allowed in calls to "
+                    "sendmsg() on %s" % self.__class__)
+            # the buffers have to be encrypted together
+            data = bytearray()
+            for b in buffers:
+                data += b
+            return self.send(bytes(data), flags)
+        else:
+            return socket.sendmsg(self, buffers, ancdata, flags, address)
+
     def recv(self, buflen=1024, flags=0):
         self._checkClosed()
         if self._sslobj:
@@ -292,6 +307,17 @@ class SSLSocket(socket):
         else:
             return socket.recvfrom_into(self, buffer, nbytes, flags)
 
+    def sendfile(self, file, offset=None, count=None):
+        """Send a file, like socket.sendfile(), but encrypted: the data
+        always goes through user space."""
+        if not self._sslobj:
+            return socket.sendfile(self, file, offset, count)
+        if count is not None and count < 0:
+            raise ValueError("count must be a positive integer")
+        if offset is not None:
+            file.seek(offset)
+        return self._sendfile_use_send(file, count)
+
     def pending(self):
         self._checkClosed()
         if self._sslobj:
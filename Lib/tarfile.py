@@ -49,6 +49,8 @@ import time
 import struct
 import copy
 import re
+import io
+import collections
 
 if sys.platform == 'mac':
     # This module needs work for MacOS9, especially in the area of pathname
@@ -62,6 +64,11 @@ try:
 except ImportError:
     grp = pwd = None
 
+try:
+    import threading
+except ImportError:
+    threading = None
+
 # from tarfile import *
 __all__ = ["TarFile", "TarInfo", "is_tarfile", "TarError"]
 
@@ -75,6 +82,7 @@ BLOCKSIZE = 512                 # length of processing blocks
 RECORDSIZE = BLOCKSIZE * 20     # length of records
 GNU_MAGIC = b"ustar  \0"        # magic gnu tar string
 POSIX_MAGIC = b"ustar\x0000"    # magic posix tar string
+INDEX_MAGIC = b"TARIDX\x00\x01"  # magic string of index files
 
 LENGTH_NAME = 100               # maximum length of a filename
 LENGTH_LINK = 100               # maximum length of a linkname
@@ -1549,6 +1557,7 @@ class TarFile(object):
         self.closed = False
         self.members = []       # list of members as TarInfo objects
         self._loaded = False    # flag if all members have been read
+        self._index = None      # offset of members by name, see loadindex()
         self.offset = self.fileobj.tell()
                                 # current position in the archive file
         self.inodes = {}        # dictionary caching the inodes of
@@ -1669,9 +1678,12 @@ class TarFile(object):
         return cls(name, mode, fileobj, **kwargs)
 
     @classmethod
-    def gzopen(cls, name, mode="r", fileobj=None, compresslevel=9, **kwargs):
+    def gzopen(cls, name, mode="r", fileobj=None, compresslevel=9,
+               blocksize=None, **kwargs):
         """Open gzip compressed tar archive name for reading or writing.
-           Appending is not allowed.
+           Appending is not allowed. If `blocksize' is given, the archive
+           is written in independent gzip members of blocksize bytes, which
+           lets an index saved with saveindex() seek in it.
         """
         if len(mode) > 1 or mode not in "rw":
             raise ValueError("mode must be 'r' or 'w'")
@@ -1687,7 +1699,8 @@ class TarFile(object):
 
         try:
             t = cls.taropen(name, mode,
-                gzip.GzipFile(name, mode, compresslevel, fileobj),
+                gzip.GzipFile(name, mode, compresslevel, fileobj,
+                              blocksize=blocksize),
                 **kwargs)
         except IOError:
             raise ReadError("not a gzip file")
@@ -1755,11 +1768,84 @@ class TarFile(object):
            than once in the archive, its last occurrence is assumed to be the
            most up-to-date version.
         """
+        if not self._loaded and self._index is not None and \
+           name in self._index:
+            return self._memberat(self._index[name])
         tarinfo = self._getmember(name)
         if tarinfo is None:
             raise KeyError("filename %r not found" % name)
         return tarinfo
 
+    def saveindex(self, name):
+        """Save the offset of each member, by name, to the file `name'.
+           If the archive is read, all the members are loaded first. For
+           a gzip compressed archive, the start of each gzip member is
+           saved too (see TarFile.open()). The index can be saved after
+           the TarFile is closed.
+        """
+        if self.mode == "r":
+            if not self._loaded:
+                self._load()
+            if getattr(self.fileobj, "index", 0) is None:
+                self.fileobj.build_index()
+        checkpoints = getattr(self.fileobj, "index", None) or []
+        offsets = {}
+        for tarinfo in self.members:
+            offsets[tarinfo.name] = tarinfo.offset
+        with bltn_open(name, "wb") as f:
+            f.write(INDEX_MAGIC)
+            f.write(struct.pack("<QQ", len(checkpoints), len(offsets)))
+            for compressed, uncompressed in checkpoints:
+                f.write(struct.pack("<QQ", compressed, uncompressed))
+            for membername, offset in offsets.items():
+                membername = membername.encode("utf-8", "surrogateescape")
+                f.write(struct.pack("<QL", offset, len(membername)))
+                f.write(membername)
+
+    def loadindex(self, name):
+        """Load an index saved by saveindex() from the file `name', so
+           that getmember() and extractfile() can go straight to the
+           members it lists instead of scanning the archive.
+        """
+        self._check("r")
+        if isinstance(self.fileobj, _Stream):
+            raise StreamError("cannot seek in a stream of tar blocks")
+        with bltn_open(name, "rb") as f:
+            if f.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                raise ReadError("not a tar index")
+            try:
+                ncheckpoints, nmembers = struct.unpack("<QQ", f.read(16))
+                checkpoints = [struct.unpack("<QQ", f.read(16))
+                               for i in range(ncheckpoints)]
+                index = {}
+                for i in range(nmembers):
+                    offset, length = struct.unpack("<QL", f.read(12))
+                    membername = f.read(length)
+                    if len(membername) != length:
+                        raise ReadError("truncated tar index")
+                    index[membername.decode("utf-8", "surrogateescape")] = \
+                        offset
+            except struct.error:
+                raise ReadError("truncated tar index")
+        if checkpoints and hasattr(self.fileobj, "set_index"):
+            self.fileobj.set_index(checkpoints)
+        self._index = index
+
+    def _memberat(self, offset):
+        """Read the member whose header starts at offset, leaving the
+           position of next() alone.
+        """
+        self._check("r")
+        position = self.offset
+        try:
+            self.fileobj.seek(offset)
+            tarinfo = self.tarinfo.fromtarfile(self)
+        finally:
+            self.offset = position
+        if tarinfo is None:
+            raise ReadError("bad offset %d in tar index" % offset)
+        return tarinfo
+
     def getmembers(self):
         """Return the members of the archive as a list of TarInfo objects. The
            list has the same order as the members in the archive.
@@ -1971,6 +2057,7 @@ class TarFile(object):
         self._check("aw")
 
         tarinfo = copy.copy(tarinfo)
+        tarinfo.offset = self.offset
 
         buf = tarinfo.tobuf(self.format, self.encoding, self.errors)
         self.fileobj.write(buf)
@@ -1987,18 +2074,35 @@ class TarFile(object):
 
         self.members.append(tarinfo)
 
-    def extractall(self, path=".", members=None):
+    def extractall(self, path=".", members=None, workers=None):
         """Extract all members from the archive to the current working
            directory and set owner, modification time and permissions on
            directories afterwards. `path' specifies a different directory
            to extract to. `members' is optional and must be a subset of the
-           list returned by getmembers().
+           list returned by getmembers(). If `workers' is more than 1 and
+           the archive is an uncompressed file, regular files are extracted
+           on that many threads, each reading from its own file object.
         """
         directories = []
 
         if members is None:
             members = self
 
+        parallel = []
+        if workers and workers > 1 and threading is not None and \
+           self.name and isinstance(self.fileobj, io.BufferedReader):
+            # Regular files go to the workers, unless several members
+            # have their name.  Hard links are made once their targets
+            # are there.
+            members = list(members)
+            names = collections.Counter(tarinfo.name for tarinfo in members)
+            parallel = [tarinfo for tarinfo in members
+                        if tarinfo.isreg() and names[tarinfo.name] == 1]
+            links = [tarinfo for tarinfo in members if tarinfo.islnk()]
+            members = [tarinfo for tarinfo in members
+                       if not (tarinfo.isreg() and names[tarinfo.name] == 1
+                               or tarinfo.islnk())]
+
         for tarinfo in members:
             if tarinfo.isdir():
                 # Extract directories with a safe mode.
@@ -2007,6 +2111,11 @@ class TarFile(object):
                 tarinfo.mode = 0o700
             self.extract(tarinfo, path)
 
+        if parallel:
+            self._extract_parallel(parallel, path, workers)
+            for tarinfo in links:
+                self.extract(tarinfo, path)
+
         # Reverse sort directories.
         directories.sort(key=lambda a: a.name)
         directories.reverse()
@@ -2024,6 +2133,40 @@ class TarFile(object):
                 else:
                     self._dbg(1, "tarfile: %s" % e)
 
+    def _extract_parallel(self, members, path, workers):
+        """Extract members on `workers' threads, each using a copy of the
+           TarFile with its own file object.
+        """
+        members = iter(members)
+        lock = threading.Lock()
+        errors = []
+
+        def work():
+            tarfile = copy.copy(self)
+            tarfile.fileobj = bltn_open(self.name, "rb")
+            try:
+                while True:
+                    with lock:
+                        if errors:
+                            return
+                        tarinfo = next(members, None)
+                    if tarinfo is None:
+                        return
+                    tarfile.extract(tarinfo, path)
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+            finally:
+                tarfile.fileobj.close()
+
+        threads = [threading.Thread(target=work) for i in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if errors:
+            raise errors[0]
+
     def extract(self, member, path=""):
         """Extract a member from the archive to the current working directory,
            using its full name. Its file information is extracted as accurately
@@ -2111,8 +2254,13 @@ class TarFile(object):
         upperdirs = os.path.dirname(targetpath)
         if upperdirs and not os.path.exists(upperdirs):
             # Create directories that are not part of the archive with
-            # default permissions.
-            os.makedirs(upperdirs)
+            # default permissions.  Another thread of extractall() may be
+            # creating them at the same time.
+            try:
+                os.makedirs(upperdirs)
+            except EnvironmentError as e:
+                if e.errno != errno.EEXIST or not os.path.isdir(upperdirs):
+                    raise
 
         if tarinfo.islnk() or tarinfo.issym():
             self._dbg(1, "%s -> %s" % (tarinfo.name, tarinfo.linkname))
@@ -2315,8 +2463,11 @@ class TarFile(object):
 
         if tarinfo is None:
             end = len(members)
-        else:
+        elif tarinfo in members:
             end = members.index(tarinfo)
+        else:
+            # tarinfo was read through the index, see getmember()
+            end = len([m for m in members if m.offset < tarinfo.offset])
 
         for i in range(end - 1, -1, -1):
             if name == members[i].name:
@@ -1,4 +1,5 @@
 import io
+import array
 import unittest
 import pickle
 import pickletools
@@ -1293,6 +1294,147 @@ class AbstractPicklerUnpicklerObjectTests(unittest.TestCase):
         f.seek(0)
         self.assertEqual(unpickler.load(), data2)
 
+    def test_reusing_dumps_loads(self):
+        unpickler = self.unpickler_class(None)
+        for proto in protocols:
+            pickler = self.pickler_class(None, proto)
+            for data in [["abcdefg", "abcdefg", 44], {"a": (1, 2.5)},
+                         2**100, "\u20ac", b"xyz" * 100, []]:
+                pickled = pickler.dumps(data)
+                f = io.BytesIO()
+                self.pickler_class(f, proto).dump(data)
+                # the memo is cleared by each dumps()
+                self.assertEqual(pickled, f.getvalue())
+                self.assertEqual(unpickler.loads(pickled), data)
+                self.assertEqual(unpickler.loads(bytearray(pickled)), data)
+        self.assertEqual(unpickler.loads(pickled + b"trailing"), [])
+        self.assertRaises(EOFError, unpickler.loads, b"")
+        self.assertRaises(TypeError, unpickler.loads, "(lp0\n.")
+        # a failed dumps() leaves nothing behind for the next one
+        self.assertRaises(pickle.PicklingError, pickler.dumps,
+                          [1, lambda: None])
+        self.assertEqual(pickler.dumps(1), pickle.dumps(1, proto))
+
+    def test_no_file(self):
+        self.assertRaises(ValueError, self.pickler_class(None).dump, 1)
+        self.assertRaises(ValueError, self.unpickler_class(None).load)
+        # dumps() and loads() don't disturb the file
+        f = io.BytesIO()
+        pickler = self.pickler_class(f)
+        self.assertEqual(pickle.loads(pickler.dumps(1)), 1)
+        pickler.dump(2)
+        f.seek(0)
+        unpickler = self.unpickler_class(f)
+        self.assertEqual(unpickler.loads(pickler.dumps(3)), 3)
+        self.assertEqual(unpickler.load(), 2)
+
+    def test_fast_mode(self):
+        for proto in protocols:
+            pickler = self.pickler_class(None, proto)
+            pickler.fast = True
+            shared = [1, 2]
+            data = [shared, shared, {"a": shared}]
+            loaded = pickle.loads(pickler.dumps(data))
+            # nothing is memoized, so shared objects are copied
+            self.assertEqual(loaded, data)
+            self.assertIsNot(loaded[0], loaded[1])
+            self.assertEqual(pickler.memo, {})
+            nested = []
+            for i in range(200):
+                nested = [nested, {}]
+            self.assertEqual(pickle.loads(pickler.dumps(nested)), nested)
+            cyclic = [1]
+            cyclic.append(cyclic)
+            self.assertRaises(ValueError, pickler.dumps, cyclic)
+            d = {}
+            d[1] = [d]
+            self.assertRaises(ValueError, pickler.dumps, d)
+            # the pickler is still usable after that
+            self.assertEqual(pickle.loads(pickler.dumps(data)), data)
+
+
+class AbstractPickleBufferTests(unittest.TestCase):
+
+    pickler_class = None
+    unpickler_class = None
+
+    def dumps(self, obj, buffer_callback=None, proto=3):
+        f = io.BytesIO()
+        pickler = self.pickler_class(f, proto, buffer_callback=buffer_callback)
+        pickler.dump(obj)
+        return f.getvalue()
+
+    def loads(self, data, buffers=None):
+        return self.unpickler_class(io.BytesIO(data), buffers=buffers).load()
+
+    def test_out_of_band(self):
+        ba = bytearray(b"abc" * 100)
+        arr = array.array("d", range(100))
+        obj = [b"def" * 100, ba, arr, ba, memoryview(b"ghi"), b"xy", 42]
+        buffers = []
+        def callback(view):
+            self.assertEqual(type(view), memoryview)
+            if len(view) < 10:
+                return True
+            buffers.append(view)
+            return False
+        data = self.dumps(obj, callback)
+        self.assertTrue(opcode_in_pickle(pickle.NEXT_BUFFER, data))
+        self.assertEqual(len(buffers), 3)
+        self.assertLess(len(data), 200)
+        result = self.loads(data, buffers)
+        self.assertEqual(result, [b"def" * 100, ba, arr, ba, b"ghi", b"xy",
+                                  42])
+        self.assertIs(result[1], result[3])
+        self.assertEqual(type(result[2]), array.array)
+
+    def test_in_band(self):
+        obj = [b"abc", bytearray(b"def"), array.array("i", [1, 2])]
+        data = self.dumps(obj, lambda view: True)
+        self.assertEqual(data, self.dumps(obj))
+        self.assertEqual(self.loads(data), obj)
+
+    def test_buffers_not_copied(self):
+        obj = [b"abc", bytearray(b"def")]
+        data = self.dumps(obj, lambda view: False)
+        result = self.loads(data, obj)
+        self.assertIs(result[0], obj[0])
+        self.assertIs(result[1], obj[1])
+        # Out-of-band memoryviews come back as the buffers given
+        view = memoryview(b"abc")
+        data = self.dumps([view, view], lambda view: False)
+        buf = bytearray(b"xyz")
+        result = self.loads(data, [buf])
+        self.assertIs(result[0], buf)
+        self.assertIs(result[1], buf)
+
+    def test_memoryview_in_band(self):
+        in_band = lambda view: True
+        result = self.loads(self.dumps(memoryview(b"abc"), in_band))
+        self.assertEqual(result, b"abc")
+        self.assertEqual(type(result), bytes)
+        result = self.loads(self.dumps(memoryview(bytearray(b"abc")), in_band))
+        self.assertEqual(result, b"abc")
+        self.assertEqual(type(result), bytearray)
+
+    def test_memoryview_without_callback(self):
+        # Without a buffer callback, memoryview objects are still not
+        # supported
+        for proto in range(2):
+            self.assertRaises(TypeError, self.dumps, memoryview(b"abc"),
+                              proto=proto)
+
+    def test_errors(self):
+        for proto in range(3):
+            self.assertRaises(ValueError, self.dumps, b"abc", bool, proto)
+        data = self.dumps(b"abc", lambda view: False)
+        self.assertRaises(pickle.UnpicklingError, self.loads, data)
+        self.assertRaises(pickle.UnpicklingError, self.loads, data, [])
+        self.assertRaises(TypeError, self.loads, data, 42)
+        def callback(view):
+            raise ZeroDivisionError
+        self.assertRaises(ZeroDivisionError, self.dumps, b"abc", callback)
+
 
 if __name__ == "__main__":
     # Print some stuff that can be used to rewrite DATA{0,1,2}
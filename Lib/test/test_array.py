@@ -202,6 +202,11 @@ class BaseTest(unittest.TestCase):
         self.assertEqual(a, b)
         if a.itemsize>1:
             self.assertRaises(ValueError, b.fromstring, "x")
+        # writable buffers
+        for buf in (bytearray(a.tostring()), memoryview(a)):
+            b = array.array(self.typecode)
+            b.fromstring(buf)
+            self.assertEqual(a, b)
 
     def test_repr(self):
         a = array.array(self.typecode, 2*self.example)
@@ -220,6 +220,40 @@ class TestAsynchat(unittest.TestCase):
 class TestAsynchat_WithPoll(TestAsynchat):
     usepoll = True
 
+class TestAsynchat_WithEpoll(TestAsynchat):
+    usepoll = 'epoll'
+
+class gather_socket:
+    # records the buffers given to each sendmsg() and sends a few bytes
+    def __init__(self, limit):
+        self.limit = limit
+        self.calls = []
+    def fileno(self):
+        return 0
+    def setblocking(self, flag):
+        pass
+    def getpeername(self):
+        return None
+    def sendmsg(self, buffers):
+        self.calls.append(list(buffers))
+        return min(self.limit, sum(len(b) for b in buffers))
+
+class TestGatheredSend(unittest.TestCase):
+    def test_sendmsg(self):
+        sock = gather_socket(7)
+        c = asynchat.async_chat(sock, {})
+        c.connected = False
+        for data in (b"hello ", b"world", b"!", None):
+            c.producer_fifo.append(data)
+        c.connected = True
+        c.initiate_send()
+        self.assertEqual(sock.calls, [[b"hello ", b"world", b"!"]])
+        self.assertEqual(list(c.producer_fifo), [b"orld", b"!", None])
+        sock.limit = 100
+        c.initiate_send()
+        self.assertEqual(sock.calls[1], [b"orld", b"!"])
+        self.assertEqual(list(c.producer_fifo), [None])
+
 class TestHelperFunctions(unittest.TestCase):
     def test_find_prefix_at_end(self):
         self.assertEqual(asynchat.find_prefix_at_end("qwerty\r", "\r\n"), 1)
@@ -252,7 +286,8 @@ class TestFifo(unittest.TestCase):
 
 def test_main(verbose=None):
     support.run_unittest(TestAsynchat, TestAsynchat_WithPoll,
-                              TestHelperFunctions, TestFifo)
+                         TestAsynchat_WithEpoll, TestGatheredSend,
+                         TestHelperFunctions, TestFifo)
 
 if __name__ == "__main__":
     test_main(verbose=True)
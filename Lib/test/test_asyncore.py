@@ -359,6 +359,144 @@ class DispatcherWithSendTests(unittest.TestCase):
 class DispatcherWithSendTests_UsePoll(DispatcherWithSendTests):
     usepoll = True
 
+class counting_dispatcher(asyncore.dispatcher):
+    # readable() while nothing has been read; counts calls to the predicates
+    def __init__(self, sock, map):
+        asyncore.dispatcher.__init__(self, sock, map)
+        self.checks = 0
+        self.received = b''
+        self.want_write = False
+        self.writes = 0
+
+    def readable(self):
+        self.checks += 1
+        return True
+
+    def writable(self):
+        return self.want_write
+
+    def handle_read(self):
+        self.received += self.recv(100)
+
+    def handle_write(self):
+        self.writes += 1
+        self.want_write = False
+
+class proxy_sender(counting_dispatcher):
+    # writable() while data queued by another channel is left to send
+    def __init__(self, sock, map):
+        counting_dispatcher.__init__(self, sock, map)
+        self.buffer = b''
+
+    def writable(self):
+        return len(self.buffer) > 0
+
+    def handle_write(self):
+        sent = self.send(self.buffer)
+        self.buffer = self.buffer[sent:]
+
+class proxy_receiver(counting_dispatcher):
+    # queues what it reads on its peer, without telling the loop
+    def __init__(self, sock, map, peer):
+        counting_dispatcher.__init__(self, sock, map)
+        self.peer = peer
+
+    def handle_read(self):
+        self.peer.buffer += self.recv(100)
+
+
+if hasattr(select, 'epoll') and hasattr(socket, 'socketpair'):
+    class EpollPollerTests(unittest.TestCase):
+        def setUp(self):
+            self.map = {}
+            self.poller = asyncore.epoll_poller(self.map)
+            asyncore._pollers[id(self.map)] = self.poller
+            self.pairs = []
+            self.channels = []
+            for i in range(10):
+                a, b = socket.socketpair()
+                self.pairs.append((a, b))
+                self.channels.append(counting_dispatcher(a, self.map))
+
+        def tearDown(self):
+            del asyncore._pollers[id(self.map)]
+            self.poller.close()
+            asyncore.close_all(self.map)
+            for a, b in self.pairs:
+                b.close()
+
+        def test_only_ready_channels_checked(self):
+            self.poller(0)
+            self.assertEqual([c.checks for c in self.channels], [1] * 10)
+            for i in range(5):
+                self.poller(0)
+            # idle channels are not asked again
+            self.assertEqual([c.checks for c in self.channels], [1] * 10)
+            self.pairs[3][1].send(b'spam')
+            self.poller(0.5)
+            self.assertEqual(self.channels[3].received, b'spam')
+            self.poller(0)
+            # asked before handling the event and after it
+            self.assertEqual(self.channels[3].checks, 3)
+            self.assertEqual(sum(c.checks for c in self.channels), 12)
+
+        def test_writable_rechecked(self):
+            # writable() may become true without an event on the channel
+            chan = self.channels[0]
+            self.poller(0)
+            chan.want_write = True
+            self.poller(0)
+            self.assertEqual(chan.writes, 1)
+            # writable() is now false again
+            self.poller(0)
+            self.assertEqual(chan.writes, 1)
+            chan.want_write = True
+            chan.interest_changed()
+            self.poller(0)
+            self.assertEqual(chan.writes, 2)
+
+        def test_readable_turned_false(self):
+            chan = self.channels[0]
+            self.poller(0)
+            chan.readable = lambda: False
+            self.pairs[0][1].send(b'spam')
+            self.poller(0.1)
+            self.assertEqual(chan.received, b'')
+            del chan.readable
+            self.poller(0.5)
+            self.assertEqual(chan.received, b'spam')
+
+        def test_proxy(self):
+            # one channel's handler queues data on another channel, which
+            # doesn't call interest_changed()
+            a1, b1 = socket.socketpair()
+            a2, b2 = socket.socketpair()
+            self.pairs += [(a1, b1), (a2, b2)]
+            sender = proxy_sender(a2, self.map)
+            proxy_receiver(a1, self.map, sender)
+            asyncore.loop(0.1, 'epoll', self.map, 2)
+            b1.send(b'hello')
+            asyncore.loop(0.1, 'epoll', self.map, 3)
+            b2.settimeout(5)
+            self.assertEqual(b2.recv(100), b'hello')
+
+        def test_added_and_removed_channels(self):
+            self.poller(0)
+            self.channels[0].close()
+            a, b = socket.socketpair()
+            self.pairs.append((a, b))
+            chan = counting_dispatcher(a, self.map)
+            b.send(b'eggs')
+            self.poller(0.5)
+            self.assertEqual(chan.received, b'eggs')
+            self.assertNotIn(self.channels[0]._fileno, self.poller.registered)
+            self.assertEqual(len(self.poller.registered), 10)
+
+        def test_loop(self):
+            self.pairs[5][1].send(b'ham')
+            asyncore.loop(0.5, 'epoll', self.map, 1)
+            self.assertEqual(self.channels[5].received, b'ham')
+
 if hasattr(asyncore, 'file_wrapper'):
     class FileWrapperTest(unittest.TestCase):
         def setUp(self):
@@ -396,6 +534,8 @@ if hasattr(asyncore, 'file_wrapper'):
 def test_main():
     tests = [HelperFunctionTests, DispatcherTests, DispatcherWithSendTests,
              DispatcherWithSendTests_UsePoll]
+    if hasattr(select, 'epoll') and hasattr(socket, 'socketpair'):
+        tests.append(EpollPollerTests)
     if hasattr(asyncore, 'file_wrapper'):
         tests.append(FileWrapperTest)
 
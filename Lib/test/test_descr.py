@@ -4194,6 +4194,133 @@ order (MRO) for bases """
 
         self.assertRaises(AttributeError, getattr, EvilGetattribute(), "attr")
 
+    def test_attribute_caches(self):
+        # LOAD_ATTR remembers where it found an attribute, until the type
+        # changes
+        class A(object):
+            pass
+        class B(object):
+            __slots__ = ['x']
+        def get_x(obj):
+            return obj.x
+        a, b = A(), B()
+        a.x = 1
+        b.x = 2
+        for i in range(3):
+            self.assertEqual(get_x(a), 1)
+            self.assertEqual(get_x(b), 2)
+        a.x = 3
+        self.assertEqual(get_x(a), 3)
+        a2 = A()
+        a2.y = 0
+        a2.x = 4
+        self.assertEqual(get_x(a2), 4)
+        a2.__dict__ = {1: 2, 'x': 5}
+        self.assertEqual(get_x(a2), 5)
+        del a.x
+        self.assertRaises(AttributeError, get_x, a)
+        del b.x
+        self.assertRaises(AttributeError, get_x, b)
+        b.x = 6
+        self.assertEqual(get_x(b), 6)
+
+        # a descriptor or class attribute added to the type
+        a.x = 1
+        A.x = property(lambda self: 'property')
+        self.assertEqual(get_x(a), 'property')
+        del A.x
+        self.assertEqual(get_x(a), 1)
+        class Base(object):
+            pass
+        class Sub(Base):
+            pass
+        s = Sub()
+        s.x = 'instance'
+        self.assertEqual(get_x(s), 'instance')
+        Base.x = property(lambda self: 'base property')
+        self.assertEqual(get_x(s), 'base property')
+        del Base.x
+        self.assertEqual(get_x(s), 'instance')
+        B.x_slot = B.x
+        B.x = 'class'
+        self.assertEqual(get_x(b), 'class')
+
+        # __getattr__ and __getattribute__
+        A.__getattr__ = lambda self, name: 'getattr'
+        self.assertEqual(get_x(A()), 'getattr')
+        A.__getattribute__ = lambda self, name: 'getattribute'
+        self.assertEqual(get_x(a), 'getattribute')
+        del A.__getattribute__, A.__getattr__
+        self.assertEqual(get_x(a), 1)
+
+        # other objects
+        import math
+        for obj, value in [(math, math.pi), (a, 1)]:
+            obj.x = value
+            self.assertEqual(get_x(obj), value)
+        self.assertRaises(AttributeError, get_x, object())
+
+    def test_method_calls(self):
+        # obj.name(...) calls a function defined on the type without
+        # making a bound method, unless something else comes first
+        class A(object):
+            def f(self, *args, **kwargs):
+                return ('A.f', self, args, kwargs)
+            @staticmethod
+            def s(*args):
+                return ('static', args)
+            @classmethod
+            def c(cls, *args):
+                return ('class', cls, args)
+        class B(A):
+            def f(self, *args, **kwargs):
+                return ('B.f', super().f(*args, **kwargs))
+        def call_f(obj, *args):
+            return obj.f(*args, key=1)
+        a, b = A(), B()
+        for i in range(3):
+            self.assertEqual(call_f(a, 1), ('A.f', a, (1,), {'key': 1}))
+            self.assertEqual(call_f(b), ('B.f', ('A.f', b, (), {'key': 1})))
+        self.assertEqual(a.s(1, 2), ('static', (1, 2)))
+        self.assertEqual(a.c(1), ('class', A, (1,)))
+        self.assertEqual(B.c(), ('class', B, ()))
+        self.assertEqual(A.f(b, 2), ('A.f', b, (2,), {}))
+
+        # the instance dict comes before a function of the type
+        a.f = lambda *args, **kwargs: ('instance', args, kwargs)
+        self.assertEqual(call_f(a, 1), ('instance', (1,), {'key': 1}))
+        del a.f
+        self.assertEqual(call_f(a, 1), ('A.f', a, (1,), {'key': 1}))
+
+        # the method replaced on the type
+        A.f = lambda self, *args, **kwargs: 'new'
+        self.assertEqual(call_f(a), 'new')
+        A.f = property(lambda self: lambda *args, **kwargs: 'property')
+        self.assertEqual(call_f(a), 'property')
+        del A.f
+        self.assertRaises(AttributeError, call_f, a)
+
+        # methods of other objects
+        lst = []
+        def call_append(obj, x):
+            obj.append(x)
+        for i in range(3):
+            call_append(lst, i)
+        self.assertEqual(lst, [0, 1, 2])
+        self.assertEqual("a,b".split(","), ["a", "b"])
+        import math
+        self.assertEqual(math.floor(1.5), 1)
+        class WithGetattr(object):
+            def __getattr__(self, name):
+                return lambda: name
+        self.assertEqual(WithGetattr().anything(), 'anything')
+
+        # an error in the arguments leaves the stack clean
+        def bad_args(obj):
+            return obj.f(1 / 0)
+        self.assertRaises(ZeroDivisionError, bad_args, b)
+        self.assertRaises(AttributeError, bad_args, object())
+
 
 class DictProxyTests(unittest.TestCase):
     def setUp(self):
@@ -763,6 +763,135 @@ class DictTest(unittest.TestCase):
             pass
         self._tracked(MyDict())
 
+    def test_instance_dict_sharing(self):
+        # Instances of a class share the keys of their __dict__
+        class C(object):
+            pass
+        objs = [C() for i in range(10)]
+        for i, obj in enumerate(objs):
+            obj.a = i
+            obj.b = str(i)
+            obj.c = [i]
+        for i, obj in enumerate(objs):
+            self.assertEqual(obj.__dict__, {'a': i, 'b': str(i), 'c': [i]})
+            self.assertEqual(sorted(obj.__dict__), ['a', 'b', 'c'])
+            d = obj.__dict__
+            self.assertEqual(list(d.values()), [d[k] for k in d])
+            self.assertEqual(list(d.items()), list(zip(d, d.values())))
+        self.assertTrue(sys.getsizeof(objs[0].__dict__) <
+                        sys.getsizeof({'a': 0, 'b': '0', 'c': [0]}))
+
+        # attributes set in another order or only on some instances
+        x, y = objs[0], objs[1]
+        y.d = 4
+        x.e = 5
+        del y.a
+        self.assertEqual(x.__dict__, {'a': 0, 'b': '0', 'c': [0], 'e': 5})
+        self.assertEqual(y.__dict__, {'b': '1', 'c': [1], 'd': 4})
+        self.assertFalse(hasattr(y, 'a'))
+        self.assertFalse(hasattr(x, 'd'))
+        self.assertRaises(AttributeError, delattr, y, 'a')
+        y.a = 'again'
+        self.assertEqual(y.a, 'again')
+        self.assertEqual(sorted(y.__dict__.items()),
+                         [('a', 'again'), ('b', '1'), ('c', [1]), ('d', 4)])
+
+        # a key which isn't a str, and growing past the shared table size
+        z = objs[2]
+        z.__dict__[1] = 'one'
+        self.assertEqual(z.__dict__[1], 'one')
+        self.assertEqual(z.__dict__, {'a': 2, 'b': '2', 'c': [2], 1: 'one'})
+        w = objs[3]
+        for i in range(100):
+            setattr(w, 'attr%d' % i, i)
+        for i in range(100):
+            self.assertEqual(getattr(w, 'attr%d' % i), i)
+        self.assertEqual(len(w.__dict__), 103)
+        self.assertEqual(objs[4].__dict__, {'a': 4, 'b': '4', 'c': [4]})
+
+        # the dict methods
+        d = objs[5].__dict__
+        self.assertEqual(d.copy(), {'a': 5, 'b': '5', 'c': [5]})
+        self.assertEqual(dict(d), d.copy())
+        self.assertEqual(d.get('a'), 5)
+        self.assertEqual(d.setdefault('a', 0), 5)
+        self.assertEqual(d.setdefault('f', 6), 6)
+        self.assertEqual(d.pop('f'), 6)
+        self.assertTrue('a' in d and 'f' not in d)
+        item = d.popitem()
+        self.assertEqual(len(d), 2)
+        self.assertFalse(item[0] in d)
+        d.clear()
+        self.assertEqual(d, {})
+        objs[5].g = 7
+        self.assertEqual(objs[5].__dict__, {'g': 7})
+        d = objs[6].__dict__
+        d.update({'a': 'A', 'h': 8})
+        self.assertEqual(d, {'a': 'A', 'b': '6', 'c': [6], 'h': 8})
+        other = {}
+        other.update(objs[7].__dict__)
+        self.assertEqual(other, {'a': 7, 'b': '7', 'c': [7]})
+
+        # an instance dict used as the globals of some code
+        ns = objs[8].__dict__
+        exec("def f(): return a + len(b)\nr = f()", ns)
+        self.assertEqual(ns['r'], 9)
+
+        # the dicts are still collected
+        ref = weakref.ref(objs[9])
+        objs[9].cycle = objs[9]
+        del objs, obj, x, y, z, w
+        gc.collect()
+        self.assertTrue(ref() is None)
+
+    def test_instance_dict_update(self):
+        # An update which combines the split table still resizes it
+        class C(object):
+            def __init__(self, **kw):
+                self.__dict__.update(kw)
+        x = C()
+        x.__dict__.update({i: i for i in range(100)})
+        self.assertEqual(x.__dict__, {i: i for i in range(100)})
+        kw = {'attr%d' % i: i for i in range(200)}
+        y = C(**kw)
+        self.assertEqual(y.__dict__, kw)
+        self.assertEqual(y.attr199, 199)
+        self.assertFalse(hasattr(y, 'attr200'))
+
+    def test_instance_dict_outlier(self):
+        # One instance with many attributes doesn't make the dicts of the
+        # later instances larger than ordinary dicts
+        class C(object):
+            pass
+        big = C()
+        for i in range(25):
+            setattr(big, 'attr%d' % i, i)
+        small = [C() for i in range(3)]
+        for obj in small:
+            obj.x = 1
+            obj.y = 2
+        size = sys.getsizeof({'x': 1, 'y': 2})
+        for obj in small:
+            self.assertEqual(obj.__dict__, {'x': 1, 'y': 2})
+            self.assertTrue(sys.getsizeof(obj.__dict__) <= size)
+        self.assertEqual(big.attr24, 24)
+
+        # nor does one diverging from many instances sharing their keys
+        class D(object):
+            pass
+        objs = [D() for i in range(10)]
+        for obj in objs:
+            obj.x = 1
+            obj.y = 2
+        shared = sys.getsizeof(objs[1].__dict__)
+        objs[0].__dict__.update(('attr%d' % i, i) for i in range(25))
+        later = D()
+        later.x = 1
+        later.y = 2
+        self.assertEqual(sys.getsizeof(later.__dict__), shared)
+        self.assertEqual(sys.getsizeof(objs[1].__dict__), shared)
+        self.assertEqual(objs[0].attr24, 24)
+
 
 from test import mapping_tests
 
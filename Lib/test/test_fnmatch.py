@@ -3,6 +3,7 @@
 from test import support
 import unittest
 
+import fnmatch as fnmatch_module
 from fnmatch import fnmatch, fnmatchcase
 
 
@@ -47,6 +48,23 @@ class FnmatchTestCase(unittest.TestCase):
         self.check_match(b'test', b'te*')
         self.check_match(b'test\xff', b'te*\xff')
 
+    def test_cache_bounded(self):
+        cache = fnmatch_module._cache
+        fnmatch_module._purge()
+        for i in range(fnmatch_module._MAXCACHE + 20):
+            fnmatchcase('x', 'pat%d*' % i)
+        self.assertEqual(len(cache), fnmatch_module._MAXCACHE)
+        # the most recent patterns survive eviction
+        misses = cache.misses
+        fnmatchcase('x', 'pat%d*' % (fnmatch_module._MAXCACHE + 19))
+        self.assertEqual(cache.misses, misses)
+        # bytes patterns have a cache of their own
+        fnmatchcase(b'x', b'x')
+        self.assertEqual(len(fnmatch_module._cacheb), 1)
+        fnmatch_module._purge()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(len(fnmatch_module._cacheb), 0)
+
 def test_main():
     support.run_unittest(FnmatchTestCase)
 
@@ -264,6 +264,32 @@ class GCTests(unittest.TestCase):
         gc.collect(2)
         assertEqual(gc.get_count(), (0, 0, 0))
 
+    def test_freeze(self):
+        class A:
+            pass
+        a = A()
+        a.a = a
+        wr = weakref.ref(a)
+        b = []
+        gc.freeze()
+        try:
+            self.assertEqual(gc.get_count(), (0, 0, 0))
+            n = gc.get_freeze_count()
+            self.assertTrue(n > 0)
+            # frozen objects are still tracked, but never collected
+            self.assertTrue(gc.is_tracked(a))
+            self.assertTrue(id(a) in map(id, gc.get_objects()))
+            del a
+            gc.collect()
+            self.assertTrue(wr() is not None)
+            del b
+            self.assertEqual(gc.get_freeze_count(), n - 1)
+        finally:
+            gc.unfreeze()
+        self.assertEqual(gc.get_freeze_count(), 0)
+        gc.collect()
+        self.assertTrue(wr() is None)
+
     def test_trashcan(self):
         class Ouch:
             n = 0
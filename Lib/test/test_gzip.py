@@ -243,8 +243,106 @@ class TestGzip(unittest.TestCase):
         else:
             self.fail("1/0 didn't raise an exception")
 
+
+class TestBlocks(unittest.TestCase):
+    filename = support.TESTFN
+    data = " ".join(map(str, range(20000))).encode("ascii") + data1 * 100
+
+    def setUp(self):
+        support.unlink(self.filename)
+        support.unlink(self.filename + '.gzi')
+
+    def tearDown(self):
+        support.unlink(self.filename)
+        support.unlink(self.filename + '.gzi')
+
+    def write(self, blocksize=1000, threads=3, bgzf=False):
+        with gzip.GzipFile(self.filename, 'wb', blocksize=blocksize,
+                           threads=threads, bgzf=bgzf) as f:
+            # writes which don't line up with the blocks
+            for i in range(0, len(self.data), 777):
+                f.write(self.data[i:i + 777])
+        return f.index
+
+    def test_roundtrip(self):
+        for bgzf in (False, True):
+            for threads in (1, 4):
+                index = self.write(threads=threads, bgzf=bgzf)
+                self.assertEqual(len(index), -(-len(self.data) // 1000))
+                self.assertEqual([u for c, u in index],
+                                 list(range(0, len(self.data), 1000)))
+                with gzip.GzipFile(self.filename) as f:
+                    self.assertEqual(f.read(), self.data)
+
+    def test_bgzf_format(self):
+        self.write(bgzf=True)
+        with open(self.filename, 'rb') as f:
+            contents = f.read()
+        self.assertEqual(contents[:4], b'\037\213\010\004')
+        # the BC subfield holds the size of the member
+        self.assertEqual(contents[10:16], b'\006\000BC\002\000')
+        size = struct.unpack('<H', contents[16:18])[0] + 1
+        self.assertEqual(contents[size:size + 4], b'\037\213\010\004')
+        self.assertEqual(contents[-28:], gzip._BGZF_EOF)
+        self.assertRaises(ValueError, gzip.GzipFile, self.filename, 'wb',
+                          blocksize=gzip.BGZF_MAX_BLOCKSIZE + 1, bgzf=True)
+
+    def test_flush(self):
+        with gzip.GzipFile(self.filename, 'wb', blocksize=1000) as f:
+            f.write(data1)
+            f.flush()
+            f.write(data2)
+        self.assertEqual(f.index, [(0, 0), (f.index[1][0], len(data1))])
+        with gzip.GzipFile(self.filename) as f:
+            self.assertEqual(f.read(), data1 + data2)
+
+    def test_build_index(self):
+        for bgzf in (False, True):
+            index = self.write(bgzf=bgzf)
+            with gzip.GzipFile(self.filename) as f:
+                self.assertEqual(f.build_index(), index)
+        # a classic single-member file
+        with gzip.GzipFile(self.filename, 'wb') as f:
+            f.write(self.data)
+        with gzip.GzipFile(self.filename) as f:
+            self.assertEqual(f.build_index(), [(0, 0)])
+            f.seek(5000)
+            self.assertEqual(f.read(100), self.data[5000:5100])
+
+    def test_save_load_index(self):
+        index = self.write(bgzf=True)
+        with gzip.GzipFile(self.filename) as f:
+            f.build_index()
+            f.save_index(self.filename + '.gzi')
+        with open(self.filename + '.gzi', 'rb') as f:
+            self.assertEqual(struct.unpack('<Q', f.read(8))[0],
+                             len(index) - 1)
+        with gzip.GzipFile(self.filename) as f:
+            f.load_index(self.filename + '.gzi')
+            self.assertEqual(f.index, index)
+        with gzip.GzipFile(self.filename) as f:
+            f.set_index(index[1:])
+            self.assertEqual(f.index, index)
+            f.seek(54321)
+            self.assertEqual(f.read(10), self.data[54321:54331])
+
+    def test_seek(self):
+        self.write(bgzf=True)
+        with gzip.GzipFile(self.filename) as f:
+            f.build_index()
+            def rewind():
+                self.fail("seek() rewound the file")
+            f.rewind = rewind
+            for offset in (50000, 123, 99999, 1000, 999, 0, 77777,
+                           len(self.data) - 10):
+                f.seek(offset)
+                self.assertEqual(f.tell(), offset)
+                self.assertEqual(f.read(20), self.data[offset:offset + 20])
+            f.seek(len(self.data))
+            self.assertEqual(f.read(), b"")
+
 def test_main(verbose=None):
-    support.run_unittest(TestGzip)
+    support.run_unittest(TestGzip, TestBlocks)
 
 if __name__ == "__main__":
     test_main(verbose=True)
@@ -1,7 +1,11 @@
 import errno
 from http import client
+from http import server
 import io
 import socket
+import threading
+import time
+import urllib.request
 
 from unittest import TestCase
 
@@ -293,6 +297,150 @@ class TimeoutTest(TestCase):
         self.assertEqual(httpConn.sock.gettimeout(), 30)
         httpConn.close()
 
+class PoolTestHandler(server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        server.BaseHTTPRequestHandler.setup(self)
+        self.server.connections.append(self.connection)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        # /<size>[/close]
+        parts = self.path.split('/')
+        body = b'x' * int(parts[1])
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        if 'close' in parts:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class PoolTestServer(server.ThreadingHTTPServer):
+
+    def handle_error(self, request, client_address):
+        # closing a connection with unread data resets it
+        pass
+
+
+class ConnectionPoolTest(TestCase):
+
+    def setUp(self):
+        self.server = PoolTestServer((HOST, 0), PoolTestHandler)
+        self.server.connections = []
+        self.url = 'http://%s:%d/' % (HOST, self.server.server_port)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.pool = client.HTTPConnectionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+
+    def get(self, path):
+        return self.pool.request('GET', self.url + path)
+
+    def test_reuse(self):
+        for i in range(5):
+            response = self.get('10')
+            self.assertEqual(response.read(), b'x' * 10)
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertEqual(self.pool.requests, 5)
+        self.assertEqual(self.pool.reused, 4)
+        self.assertEqual(self.pool.reuse_ratio, 0.8)
+
+    def test_concurrent_responses(self):
+        self.pool.maxsize = 1
+        first = self.get('10')
+        second = self.get('10')
+        self.assertEqual(len(self.server.connections), 2)
+        first.read()
+        second.read()
+        # only one connection is kept
+        for i in range(3):
+            self.get('10').read()
+        self.assertEqual(len(self.server.connections), 2)
+        self.assertEqual(self.pool.reused, 3)
+
+    def test_close_early(self):
+        # a short unread body is read so that the connection can be reused
+        response = self.get('1000')
+        response.read(10)
+        response.close()
+        self.get('10').read()
+        self.assertEqual(self.pool.reused, 1)
+        # a long one isn't
+        response = self.get('%d' % (client._MAXDRAIN + 100))
+        response.read(10)
+        response.close()
+        self.get('10').read()
+        self.assertEqual(self.pool.reused, 2)
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_connection_close(self):
+        self.assertEqual(self.get('10/close').read(), b'x' * 10)
+        self.get('10').read()
+        self.assertEqual(self.pool.reused, 0)
+        self.assertEqual(len(self.server.connections), 2)
+
+    def test_stale_connection(self):
+        self.get('10').read()
+        self.server.connections[0].shutdown(socket.SHUT_RDWR)
+        time.sleep(0.1)
+        self.assertEqual(self.get('10').read(), b'x' * 10)
+        self.assertEqual(self.pool.reused, 0)
+        self.assertEqual(self.pool.discarded, 1)
+
+    def test_idle_timeout(self):
+        self.pool.idle_timeout = 0
+        self.get('10').read()
+        self.get('10').read()
+        self.assertEqual(self.pool.reused, 0)
+        self.assertEqual(self.pool.discarded, 1)
+
+    def test_timeout(self):
+        # a pooled connection gets the timeout of the new request, even
+        # the default one
+        conn, reused = self.pool.get_connection(HOST, self.server.server_port,
+                                                timeout=30)
+        conn.request('GET', '/10')
+        conn.getresponse().read()
+        self.assertEqual(conn.sock.gettimeout(), 30)
+        self.pool.put_connection(conn)
+        conn, reused = self.pool.get_connection(HOST, self.server.server_port)
+        self.assertTrue(reused)
+        self.assertEqual(conn.sock.gettimeout(), socket.getdefaulttimeout())
+        self.assertTrue(conn.timeout is socket._GLOBAL_DEFAULT_TIMEOUT)
+
+    def test_reuse_without_new_connection(self):
+        created = []
+        class Connection(client.HTTPConnection):
+            def __init__(self, *args, **kwds):
+                created.append(self)
+                client.HTTPConnection.__init__(self, *args, **kwds)
+        for i in range(3):
+            conn, reused = self.pool.get_connection(
+                '%s:%d' % (HOST, self.server.server_port),
+                connection_class=Connection)
+            conn.request('GET', '/10')
+            conn.getresponse().read()
+            self.pool.put_connection(conn)
+        self.assertEqual(len(created), 1)
+
+    def test_urllib_handler(self):
+        opener = urllib.request.build_opener(
+            urllib.request.HTTPHandler(pool=self.pool))
+        for i in range(3):
+            self.assertEqual(opener.open(self.url + '5').read(), b'xxxxx')
+        self.assertEqual(len(self.server.connections), 1)
+        self.assertEqual(self.pool.reused, 2)
+
+
 class HTTPSTimeoutTest(TestCase):
 # XXX Here should be tests for HTTPS, there isn't any right now!
 
@@ -375,7 +523,7 @@ class RequestBodyTest(TestCase):
 
 def test_main(verbose=None):
     support.run_unittest(HeaderTests, OfflineTest, BasicTest, TimeoutTest,
-                         HTTPSTimeoutTest, RequestBodyTest)
+                         ConnectionPoolTest, HTTPSTimeoutTest, RequestBodyTest)
 
 if __name__ == '__main__':
     test_main()
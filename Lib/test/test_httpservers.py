@@ -5,12 +5,15 @@ Josip Dzolonga, and Michael Otteneder for the 2007/08 GHOP contest.
 """
 
 from http.server import BaseHTTPRequestHandler, HTTPServer, \
-     SimpleHTTPRequestHandler, CGIHTTPRequestHandler
+     ThreadingHTTPServer, SimpleHTTPRequestHandler, CGIHTTPRequestHandler
 from http import server
 
 import os
 import sys
+import time
 import base64
+import socket
+import email.utils
 import shutil
 import urllib.parse
 import http.client
@@ -37,7 +40,8 @@ class TestServerThread(threading.Thread):
         self.test_object.lock.acquire()
 
     def run(self):
-        self.server = HTTPServer(('', 0), self.request_handler)
+        self.server = self.test_object.server_class(('', 0),
+                                                    self.request_handler)
         self.test_object.PORT = self.server.socket.getsockname()[1]
         self.test_object.lock.release()
         try:
@@ -50,6 +54,10 @@ class TestServerThread(threading.Thread):
 
 
 class BaseTestCase(unittest.TestCase):
+    # Connections may be kept open between requests, so each one
+    # needs a thread of its own.
+    server_class = ThreadingHTTPServer
+
     def setUp(self):
         self.lock = threading.Lock()
         self.thread = TestServerThread(self, self.request_handler)
@@ -92,6 +100,19 @@ class BaseHTTPServerTestCase(BaseTestCase):
             self.send_header('Connection', 'close')
             self.end_headers()
 
+        def do_CHUNKED(self):
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for data in (b'hello ', b'', b'chunked ', b'world'):
+                self.write_chunk(data)
+            self.end_chunks()
+
+        def do_NOLENGTH(self):
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b'no length')
+
     def setUp(self):
         BaseTestCase.setUp(self)
         self.con = http.client.HTTPConnection('localhost', self.PORT)
@@ -188,10 +209,26 @@ class BaseHTTPServerTestCase(BaseTestCase):
         res = self.con.getresponse()
         self.assertEquals(res.status, 999)
 
+    def test_chunked(self):
+        for i in range(2):
+            self.con.request('CHUNKED', '/')
+            res = self.con.getresponse()
+            self.assertEquals(res.getheader('Transfer-Encoding'), 'chunked')
+            self.assertEquals(res.read(), b'hello chunked world')
+            self.assertFalse(res.will_close)
+
+    def test_no_length_closes(self):
+        # Without a Content-Length the body can only end with the connection
+        self.con.request('NOLENGTH', '/')
+        res = self.con.getresponse()
+        self.assertEquals(res.getheader('Connection'), 'close')
+        self.assertEquals(res.read(), b'no length')
+        self.assertTrue(res.will_close)
+
 
 class SimpleHTTPServerTestCase(BaseTestCase):
     class request_handler(NoLogRequestHandler, SimpleHTTPRequestHandler):
-        pass
+        protocol_version = 'HTTP/1.1'
 
     def setUp(self):
         BaseTestCase.setUp(self)
@@ -263,6 +300,106 @@ class SimpleHTTPServerTestCase(BaseTestCase):
         response = self.request('/', method='GETs')
         self.check_status_and_reason(response, 501)
 
+    def test_keep_alive(self):
+        path = self.tempdir_name + '/test'
+        response = self.request(path)
+        self.check_status_and_reason(response, 200, data=self.data)
+        self.assertFalse(response.will_close)
+        sock = self.connection.sock
+        for i in range(3):
+            self.connection.request('GET', path)
+            response = self.connection.getresponse()
+            self.check_status_and_reason(response, 200, data=self.data)
+        # every request went over the first connection
+        self.assertTrue(self.connection.sock is sock)
+
+    def test_pipelining(self):
+        request = 'GET /%s/test HTTP/1.1\r\nHost: localhost\r\n' % (
+            self.tempdir_name)
+        requests = (request + '\r\n') * 2 + request + 'Connection: close\r\n\r\n'
+        sock = socket.create_connection(('localhost', self.PORT))
+        try:
+            sock.sendall(requests.encode('ascii'))
+            received = []
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                received.append(data)
+        finally:
+            sock.close()
+        responses = b''.join(received).split(b'HTTP/1.1 ')[1:]
+        self.assertEquals(len(responses), 3)
+        for response in responses:
+            self.assertTrue(response.startswith(b'200 '))
+            self.assertTrue(response.endswith(b'\r\n\r\n' + self.data))
+
+    def test_large_file(self):
+        # large enough to need several os.sendfile() calls
+        data = os.urandom(300 * 1024)
+        with open(os.path.join(self.tempdir, 'large'), 'wb') as f:
+            f.write(data)
+        response = self.request(self.tempdir_name + '/large')
+        self.check_status_and_reason(response, 200, data=data)
+
+    def test_not_modified(self):
+        path = self.tempdir_name + '/test'
+        response = self.request(path)
+        response.read()
+        etag = response.getheader('ETag')
+        last_modified = response.getheader('Last-Modified')
+        self.assertTrue(etag)
+
+        for headers in ({'If-None-Match': etag},
+                        {'If-None-Match': '"other", ' + etag},
+                        {'If-None-Match': '*'},
+                        {'If-Modified-Since': last_modified}):
+            response = self.request(path, headers=headers)
+            self.check_status_and_reason(response, 304)
+            self.assertEquals(response.getheader('ETag'), etag)
+            self.assertFalse(response.will_close)
+
+        earlier = email.utils.formatdate(time.time() - 3600, usegmt=True)
+        os.utime(os.path.join(self.tempdir, 'test'), None)
+        for headers in ({'If-None-Match': '"other"'},
+                        {'If-None-Match': '"other"',
+                         'If-Modified-Since': last_modified},
+                        {'If-Modified-Since': earlier},
+                        {'If-Modified-Since': 'not a date'}):
+            response = self.request(path, headers=headers)
+            self.check_status_and_reason(response, 200, data=self.data)
+
+    def test_redirect_keep_alive(self):
+        response = self.request(self.tempdir_name)
+        self.check_status_and_reason(response, 301)
+        self.assertEquals(response.getheader('Content-Length'), '0')
+        self.assertFalse(response.will_close)
+
+
+class SingleThreadedHTTPServerTestCase(BaseTestCase):
+    server_class = HTTPServer
+
+    class request_handler(NoLogRequestHandler, SimpleHTTPRequestHandler):
+        pass
+
+    def test_clients_not_starved(self):
+        # An HTTP/1.0 handler closes each connection after one response,
+        # so a client that stays connected doesn't hold up the others.
+        self.assertEquals(self.request_handler.protocol_version, 'HTTP/1.0')
+        first = self.request('/')
+        first.read()
+        self.assertTrue(first.will_close)
+        second = http.client.HTTPConnection('localhost', self.PORT,
+                                            timeout=10)
+        try:
+            second.request('GET', '/')
+            response = second.getresponse()
+            self.assertEquals(response.status, 200)
+            response.read()
+        finally:
+            second.close()
+            self.connection.close()
+
 
 cgi_file1 = """\
 #!%s
@@ -393,6 +530,7 @@ def test_main(verbose=None):
         cwd = os.getcwd()
         support.run_unittest(BaseHTTPServerTestCase,
                              SimpleHTTPServerTestCase,
+                             SingleThreadedHTTPServerTestCase,
                              CGIHTTPServerTestCase
                              )
     finally:
@@ -684,6 +684,36 @@ class BufferedReaderTest(unittest.TestCase, CommonBufferedTests):
         self.assertEquals(bufio.readinto(b), 0)
         self.assertEquals(b, b"gf")
 
+    def test_readinto_large(self):
+        data = b"abcdefghijklmnopqrstuvwxyz"
+        rawio = self.MockFileIO(data)
+        bufio = self.tp(rawio, buffer_size=4)
+        b = bytearray(2)
+        self.assertEquals(bufio.readinto(b), 2)
+        self.assertEquals(b, b"ab")
+        b = bytearray(13)
+        self.assertEquals(bufio.readinto(memoryview(b)), 13)
+        self.assertEquals(b, data[2:15])
+        # the raw stream read straight into b, bypassing the buffer
+        self.assertTrue(max(rawio.read_history) > 4)
+        self.assertEquals(bufio.tell(), 15)
+        self.assertEquals(bufio.read(3), data[15:18])
+        b = bytearray(20)
+        self.assertEquals(bufio.readinto(b), 8)
+        self.assertEquals(b[:8], data[18:])
+        self.assertEquals(bufio.readinto(b), 0)
+
+    def test_readinto_non_blocking(self):
+        rawio = self.MockRawIO((b"abc", None, b"defgh", None, None))
+        bufio = self.tp(rawio, buffer_size=4)
+        b = bytearray(6)
+        self.assertEquals(bufio.readinto(b), 3)
+        self.assertEquals(b[:3], b"abc")
+        self.assertEquals(bufio.readinto(b), 5)
+        self.assertEquals(b[:5], b"defgh")
+        self.assertTrue(bufio.readinto(b) is None)
+        self.assertEquals(bufio.readinto(b), 0)
+
     def test_buffering(self):
         data = b"abcdefghi"
         dlen = len(data)
@@ -29,6 +29,7 @@ import codecs
 import copy
 import pickle
 import io
+import queue
 import gc
 import os
 import re
@@ -264,6 +265,92 @@ class BuiltinLevelsTest(BaseTest):
         ])
 
 
+class CachedLevelTest(BaseTest):
+
+    """Test that the levels cached by loggers follow the hierarchy."""
+
+    def test_set_level_of_parent(self):
+        parent = logging.getLogger("CACHE")
+        child = logging.getLogger("CACHE.A.B")
+        self.assertTrue(child.isEnabledFor(logging.DEBUG))
+        parent.setLevel(logging.ERROR)
+        self.assertFalse(child.isEnabledFor(logging.WARNING))
+        self.assertTrue(child.isEnabledFor(logging.ERROR))
+        self.root_logger.setLevel(logging.CRITICAL)
+        self.assertFalse(child.isEnabledFor(logging.WARNING))
+        parent.setLevel(logging.NOTSET)
+        self.assertFalse(child.isEnabledFor(logging.ERROR))
+        self.root_logger.setLevel(logging.INFO)
+        self.assertTrue(child.isEnabledFor(logging.INFO))
+        self.assertFalse(child.isEnabledFor(logging.DEBUG))
+
+    def test_placeholder_replaced(self):
+        class WarningLogger(logging.Logger):
+            def __init__(self, name):
+                logging.Logger.__init__(self, name, logging.WARNING)
+        child = logging.getLogger("CACHE.PH.CHILD")
+        self.assertTrue(child.isEnabledFor(logging.DEBUG))
+        # the new logger comes between the child and the root logger
+        logging.setLoggerClass(WarningLogger)
+        try:
+            middle = logging.getLogger("CACHE.PH")
+        finally:
+            logging.setLoggerClass(logging.Logger)
+        self.assertTrue(child.parent is middle)
+        self.assertFalse(child.isEnabledFor(logging.INFO))
+        self.assertTrue(child.isEnabledFor(logging.WARNING))
+
+    def test_disable(self):
+        m = self.next_message
+        logger = logging.getLogger("CACHE.DISABLE")
+        self.assertTrue(logger.isEnabledFor(logging.INFO))
+        logging.disable(logging.INFO)
+        try:
+            logger.info(m())
+            logger.warning(m())
+            self.assertFalse(logger.isEnabledFor(logging.INFO))
+        finally:
+            logging.disable(0)
+        logger.info(m())
+        self.assert_log_lines([
+            ('CACHE.DISABLE', 'WARNING', '2'),
+            ('CACHE.DISABLE', 'INFO', '3'),
+        ])
+
+    def test_disabled_call_does_not_walk_hierarchy(self):
+        logger = logging.getLogger("CACHE.FAST")
+        logger.setLevel(logging.INFO)
+        logger.debug("primed")
+        # once the level is known, a disabled call doesn't look further
+        logger.getEffectiveLevel = None
+        logger.isEnabledFor = None
+        try:
+            logger.debug("not logged")
+        finally:
+            del logger.getEffectiveLevel, logger.isEnabledFor
+
+    def test_attributes_assigned(self):
+        # level, parent and manager.disable may be assigned directly
+        logger = logging.getLogger("CACHE.ATTR")
+        logger.setLevel(logging.INFO)
+        logger.debug("primed")
+        logger.level = logging.DEBUG
+        self.assertTrue(logger.isEnabledFor(logging.DEBUG))
+        logger.level = logging.NOTSET
+        other = logging.getLogger("CACHE.OTHER")
+        other.setLevel(logging.ERROR)
+        logger.warning("primed")
+        logger.parent = other
+        self.assertFalse(logger.isEnabledFor(logging.WARNING))
+        self.assertTrue(logger.isEnabledFor(logging.ERROR))
+        logger.manager.disable = logging.ERROR
+        try:
+            self.assertFalse(logger.isEnabledFor(logging.ERROR))
+        finally:
+            logger.manager.disable = 0
+        self.assertTrue(logger.isEnabledFor(logging.ERROR))
+
+
 class BasicFilterTest(BaseTest):
 
     """Test the bundled Filter class."""
@@ -483,6 +570,143 @@ class MemoryHandlerTest(BaseTest):
         self.assert_log_lines(lines)
 
 
+def log_from_process(q, name, count):
+    logger = logging.getLogger(name)
+    logger.propagate = 0
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.handlers.QueueHandler(q, block=True))
+    for i in range(count):
+        logger.info("%s %d", name, i)
+
+
+class QueueHandlerTest(BaseTest):
+
+    """Tests for QueueHandler and QueueListener."""
+
+    expected_log_pat = r"^[\w.]+ -> ([\w]+): ([\d]+)$"
+
+    def setUp(self):
+        BaseTest.setUp(self)
+        self.queue = queue.Queue()
+        self.que_hdlr = logging.handlers.QueueHandler(self.queue)
+        self.que_logger = logging.getLogger('que')
+        self.que_logger.propagate = 0
+        self.que_logger.addHandler(self.que_hdlr)
+
+    def tearDown(self):
+        self.que_hdlr.close()
+        BaseTest.tearDown(self)
+
+    def test_listener(self):
+        listener = logging.handlers.QueueListener(self.queue, self.root_hdlr)
+        listener.start()
+        try:
+            self.que_logger.info(self.next_message())
+            self.que_logger.error(self.next_message())
+        finally:
+            listener.stop()
+        self.assert_log_lines([('INFO', '1'), ('ERROR', '2')])
+        self.assertEqual(listener.handled, 2)
+        self.assertEqual(self.que_hdlr.enqueued, 2)
+
+    def test_handler_level(self):
+        self.root_hdlr.setLevel(logging.WARNING)
+        listener = logging.handlers.QueueListener(self.queue, self.root_hdlr)
+        listener.start()
+        self.que_logger.info(self.next_message())
+        self.que_logger.warning(self.next_message())
+        listener.stop()
+        self.assert_log_lines([('WARNING', '2')])
+
+    def test_batches(self):
+        for i in range(10):
+            self.que_logger.info(self.next_message())
+        listener = logging.handlers.QueueListener(self.queue, self.root_hdlr,
+                                                  batchSize=4)
+        # The sentinel is queued before the thread starts, so that the
+        # batches don't depend on when stop() is called.
+        listener.enqueueSentinel()
+        listener.start()
+        listener.stop()
+        self.assert_log_lines([('INFO', str(i)) for i in range(1, 11)])
+        # 4 + 4 + 2 records and the sentinel
+        self.assertEqual(listener.batches, 3)
+
+    def test_records_after_sentinel(self):
+        listener = logging.handlers.QueueListener(self.queue, self.root_hdlr)
+        listener.enqueueSentinel()
+        self.que_logger.info(self.next_message())
+        self.que_logger.info(self.next_message())
+        # The records are taken in the same batch as the sentinel and
+        # are handled before the thread stops.
+        listener.start()
+        listener.stop()
+        self.assert_log_lines([('INFO', '1'), ('INFO', '2')])
+        self.assertEqual(listener.handled, 2)
+        self.assertEqual(listener.batches, 1)
+
+    def test_prepare(self):
+        class Unpicklable:
+            def __reduce__(self):
+                raise TypeError("can't pickle")
+            def __str__(self):
+                return "unpicklable"
+        try:
+            1/0
+        except ZeroDivisionError:
+            self.que_logger.exception("%s %d", Unpicklable(), 5)
+        record = self.queue.get_nowait()
+        self.assertEqual(record.msg, "unpicklable 5")
+        self.assertEqual(record.args, None)
+        self.assertEqual(record.exc_info, None)
+        self.assertTrue("ZeroDivisionError" in record.exc_text)
+        record = pickle.loads(pickle.dumps(record))
+        self.assertEqual(record.getMessage(), "unpicklable 5")
+
+    def test_full_queue(self):
+        self.que_hdlr.queue = queue.Queue(2)
+        for i in range(3):
+            self.que_logger.info(self.next_message())
+        self.assertEqual(self.que_hdlr.enqueued, 2)
+        self.assertEqual(self.que_hdlr.dropped, 1)
+        # blocking for a while gives the listener the time to catch up
+        self.que_hdlr.block = True
+        self.que_hdlr.timeout = 0.01
+        self.que_logger.info(self.next_message())
+        self.assertEqual(self.que_hdlr.dropped, 2)
+        listener = logging.handlers.QueueListener(self.que_hdlr.queue,
+                                                  self.root_hdlr)
+        listener.start()
+        self.que_hdlr.timeout = None
+        for i in range(10):
+            self.que_logger.info(self.next_message())
+        listener.stop()
+        self.assertEqual(self.que_hdlr.dropped, 2)
+        self.assertEqual(listener.handled, 12)
+
+    def test_multiprocessing(self):
+        try:
+            import multiprocessing
+            mp_queue = multiprocessing.Queue()
+        except (ImportError, OSError):
+            self.skipTest("multiprocessing.Queue is not available")
+        listener = logging.handlers.QueueListener(mp_queue, self.root_hdlr)
+        listener.start()
+        processes = [multiprocessing.Process(target=log_from_process,
+                                             args=(mp_queue, 'proc%d' % i, 5))
+                     for i in range(3)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        listener.stop()
+        mp_queue.close()
+        self.stream.seek(0)
+        lines = sorted(self.stream.read().splitlines())
+        self.assertEqual(lines, sorted('proc%d -> INFO: proc%d %d' % (i, i, n)
+                                       for i in range(3) for n in range(5)))
+
+
 class ExceptionFormatter(logging.Formatter):
     """A special exception formatter."""
     def formatException(self, ei):
@@ -943,8 +1167,9 @@ class WarningsTest(BaseTest):
 # first and restore it at the end.
 @run_with_locale('LC_ALL', '')
 def test_main():
-    run_unittest(BuiltinLevelsTest, BasicFilterTest,
+    run_unittest(BuiltinLevelsTest, CachedLevelTest, BasicFilterTest,
                     CustomLevelsAndFiltersTest, MemoryHandlerTest,
+                    QueueHandlerTest,
                     ConfigFileTest, SocketHandlerTest, MemoryTest,
                     EncodingTest, WarningsTest)
 
@@ -15,6 +15,8 @@ import gc
 import signal
 import array
 import copy
+import itertools
+import pickle
 import socket
 import random
 import logging
@@ -1053,6 +1055,115 @@ class _TestPool(BaseTestCase):
         join = TimingWrapper(self.pool.join)
         join()
         self.assertTrue(join.elapsed < 0.2)
+
+def raise_large(x):
+    if x > 50:
+        raise ValueError(x)
+    return x
+
+class _TestBoundedPool(BaseTestCase):
+    # Generators cannot be sent to a manager's pool
+    ALLOWED_TYPES = ('processes', 'threads')
+
+    def counted(self, n, consumed):
+        for i in range(n):
+            consumed.append(i)
+            yield i
+
+    def test_imap_max_pending(self):
+        consumed = []
+        it = self.pool.imap(sqr, self.counted(1000, consumed), max_pending=4)
+        self.assertEqual(next(it), 0)
+        time.sleep(0.2)
+        # one result consumed, at most 4 tasks in flight
+        self.assertTrue(len(consumed) <= 5, len(consumed))
+        self.assertEqual(list(it), list(map(sqr, range(1, 1000))))
+
+    def test_imap_adaptive_chunksize(self):
+        it = self.pool.imap(sqr, self.counted(1000, []), chunksize=None,
+                            max_pending=8)
+        self.assertEqual(list(it), list(map(sqr, range(1000))))
+        it = self.pool.imap_unordered(sqr, self.counted(1000, []),
+                                      chunksize=None)
+        self.assertEqual(sorted(it), list(map(sqr, range(1000))))
+
+    def test_imap_unordered_max_pending(self):
+        it = self.pool.imap_unordered(sqr, self.counted(1000, []),
+                                      chunksize=7, max_pending=3)
+        self.assertEqual(sorted(it), list(map(sqr, range(1000))))
+
+    def test_map_async_lazy(self):
+        consumed = []
+        res = self.pool.map_async(sqr, self.counted(1000, consumed),
+                                  max_pending=4)
+        self.assertEqual(res.get(), list(map(sqr, range(1000))))
+        self.assertEqual(len(consumed), 1000)
+        res = self.pool.map_async(sqr, self.counted(100, []), chunksize=7,
+                                  max_pending=2)
+        self.assertEqual(res.get(), list(map(sqr, range(100))))
+        self.assertEqual(self.pool.map(sqr, self.counted(0, []),
+                                       max_pending=2), [])
+        self.assertEqual(self.pool.map(sqr, list(range(100)), chunksize=3,
+                                       max_pending=2),
+                         list(map(sqr, range(100))))
+
+    def test_map_async_lazy_error(self):
+        res = self.pool.map_async(raise_large, self.counted(200, []),
+                                  chunksize=5, max_pending=2)
+        self.assertRaises(ValueError, res.get, TIMEOUT2 * 10)
+
+    def test_unconsumed_imap_does_not_block_pool(self):
+        it = self.pool.imap(sqr, itertools.count(), max_pending=2)
+        self.assertEqual(self.pool.apply_async(sqr, (7,)).get(TIMEOUT2 * 10),
+                         49)
+        res = self.pool.map_async(sqr, self.counted(100, []), max_pending=2)
+        self.assertEqual(res.get(TIMEOUT2 * 10), list(map(sqr, range(100))))
+        self.assertEqual(next(it), 0)
+        self.assertEqual(next(it), 1)
+        del it
+
+    def test_close_with_abandoned_imap(self):
+        if self.TYPE == 'processes':
+            pool = multiprocessing.Pool(2)
+        else:
+            pool = multiprocessing.dummy.Pool(2)
+        it = pool.imap(sqr, iter(range(100)), max_pending=4)
+        self.assertEqual(next(it), 0)
+        self.assertEqual(next(it), 1)
+        it2 = pool.imap(sqr, iter(range(100)), chunksize=3, max_pending=2)
+        self.assertEqual(next(it2), 0)
+        del it
+        pool.close()
+        join = TimingWrapper(pool.join)
+        join()
+        self.assertTrue(join.elapsed < TIMEOUT2 * 10)
+        # the iterator which was kept gets the rest of its results
+        self.assertEqual(list(it2), list(map(sqr, range(1, 100))))
+
+    def test_bad_max_pending(self):
+        self.assertRaises(ValueError, self.pool.imap, sqr, [], max_pending=0)
+
+    def test_chunk_sizer(self):
+        sizer = multiprocessing.pool.ChunkSizer(target=0.1, maxsize=64)
+        self.assertEqual(sizer.size, 1)
+        for i in range(10):
+            sizer.record(sizer.size, sizer.size * 0.001)
+        self.assertEqual(sizer.size, 64)
+        for i in range(20):
+            sizer.record(sizer.size, sizer.size * 0.05)
+        self.assertEqual(sizer.size, 2)
+
+    def test_terminate_while_bounded(self):
+        if self.TYPE == 'processes':
+            pool = multiprocessing.Pool(2)
+        else:
+            pool = multiprocessing.dummy.Pool(2)
+        it = pool.imap(sqr, itertools.count(), max_pending=2)
+        self.assertEqual(next(it), 0)
+        pool.terminate()
+        join = TimingWrapper(pool.join)
+        join()
+        self.assertTrue(join.elapsed < 1.0)
 #
 # Test that manager has expected number of shared objects left
 #
@@ -1303,6 +1414,11 @@ class _TestConnection(BaseTestCase):
 
         self.assertEqual(conn.recv(), None)
 
+        # large buffers are sent as separate messages after the pickle
+        big = [bytearray(latin('X')) * (1024 * 64), arr * 10000, latin('Y')]
+        conn.send(big)
+        self.assertEqual(conn.recv(), big)
+
         really_big_msg = latin('X') * (1024 * 1024 * 16)   # 16Mb
         conn.send_bytes(really_big_msg)
         self.assertEqual(conn.recv_bytes(), really_big_msg)
@@ -1492,6 +1608,11 @@ class _TestPicklingConnections(BaseTestCase):
 #
 #
 
+try:
+    from multiprocessing.sharedctypes import SharedBuffer
+except ImportError:
+    SharedBuffer = None
+
 class _TestHeap(BaseTestCase):
 
     ALLOWED_TYPES = ('processes',)
@@ -1533,6 +1654,120 @@ class _TestHeap(BaseTestCase):
             self.assertTrue((arena != narena and nstart == 0) or
                             (stop == nstart))
 
+    def test_lent_block(self):
+        if SharedBuffer is None:
+            return
+        heap = multiprocessing.heap.SharedBufferWrapper._heap
+        a = array.array('i', range(1000))
+        shared = SharedBuffer(a)
+        view = pickle.loads(pickle.dumps(shared))
+        self.assertEqual(len(view), 1000)
+        self.assertEqual(view.tobytes(), a.tostring())
+        block, = heap._lent_blocks
+        # the block is kept while the receiving side uses it ...
+        del shared
+        multiprocessing.heap.SharedBufferWrapper(1)
+        self.assertTrue(block in heap._lent_blocks)
+        # ... and freed by the next allocation once it is done too
+        del view
+        multiprocessing.heap.SharedBufferWrapper(1)
+        self.assertFalse(block in heap._allocated_blocks)
+        self.assertEqual(heap._lent_blocks, {})
+
+    def test_arena_dir(self):
+        if sys.platform == 'win32':
+            return
+        arena_dir = multiprocessing.heap.get_arena_dir()
+        if os.path.isdir('/dev/shm'):
+            self.assertEqual(os.path.dirname(arena_dir), '/dev/shm')
+        arena = multiprocessing.heap.NamedArena(4096)
+        self.assertEqual(os.path.dirname(arena.name), arena_dir)
+
+#
+# Test passing buffers through shared memory to a pool
+#
+
+def buffer_info(obj):
+    return type(obj), len(obj), bytes(obj[:3])
+
+def make_bytes(n):
+    return b'x' * n
+
+def hold_buffer(obj):
+    time.sleep(1000)
+
+class _TestSharedBufferPool(BaseTestCase):
+
+    ALLOWED_TYPES = ('processes',)
+
+    def setUp(self):
+        self.shared_pool = multiprocessing.Pool(2, buffer_threshold=1000)
+
+    def tearDown(self):
+        self.shared_pool.terminate()
+        self.shared_pool.join()
+
+    def test_arguments(self):
+        if SharedBuffer is None:
+            return
+        a = array.array('B', range(200)) * 10
+        self.assertEqual(self.shared_pool.apply(buffer_info, (a,)),
+                         (memoryview, 2000, b'\x00\x01\x02'))
+        self.assertEqual(self.shared_pool.apply(buffer_info, (b'abc',)),
+                         (bytes, 3, b'abc'))
+        self.assertEqual(self.shared_pool.map(buffer_info,
+                                              [b'abc', bytearray(5000)]),
+                         [(bytes, 3, b'abc'), (memoryview, 5000, b'\0\0\0')])
+
+    def test_results(self):
+        if SharedBuffer is None:
+            return
+        result = self.shared_pool.apply(make_bytes, (10000,))
+        self.assertTrue(isinstance(result, memoryview))
+        self.assertEqual(result.tobytes(), b'x' * 10000)
+        result = self.shared_pool.map(make_bytes, [10, 5000], chunksize=2)
+        self.assertEqual(result[0], b'x' * 10)
+        self.assertEqual(result[1].tobytes(), b'x' * 5000)
+
+    def test_attached_arena_dropped(self):
+        if SharedBuffer is None:
+            return
+        named_arenas = multiprocessing.heap._named_arenas
+        names = set(named_arenas)
+        result = self.shared_pool.apply(make_bytes, (10000,))
+        # the arena of the worker is mapped until the result is dropped
+        attached = set(named_arenas) - names
+        self.assertEqual(len(attached), 1)
+        del result
+        # the result handler thread may still hold it for a moment
+        for i in range(100):
+            if not attached & set(named_arenas):
+                break
+            time.sleep(0.01)
+        self.assertFalse(attached & set(named_arenas))
+
+    def test_terminate_reaps_lent_blocks(self):
+        if SharedBuffer is None:
+            return
+        heap = multiprocessing.heap.SharedBufferWrapper._heap
+        lent = set(heap._lent_blocks)
+        self.shared_pool.apply_async(hold_buffer, (bytes(5000),))
+        # wait for a worker to take the block
+        for i in range(100):
+            time.sleep(0.05)
+            blocks = set(heap._lent_blocks) - lent
+            if blocks:
+                block, = blocks
+                (arena, start, stop) = block
+                if arena.buffer[start + 4:start + 8] != bytes(4):
+                    break
+        else:
+            self.fail("the block was not received")
+        self.shared_pool.terminate()
+        self.shared_pool.join()
+        self.assertFalse(block in heap._lent_blocks)
+        self.assertFalse(block in heap._allocated_blocks)
+
 #
 #
 #
@@ -72,6 +72,44 @@ class FileTests(unittest.TestCase):
             self.assertEqual(fobj.read().splitlines(),
                 [b"bacon", b"eggs", b"spam"])
 
+    @unittest.skipUnless(hasattr(os, "sendfile"), "requires os.sendfile()")
+    def test_sendfile(self):
+        import socket
+        with open(support.TESTFN, "wb") as fobj:
+            fobj.write(b"bacon eggs spam")
+        a, b = socket.socketpair()
+        fd = os.open(support.TESTFN, os.O_RDONLY)
+        try:
+            self.assertEqual(os.sendfile(a.fileno(), fd, 6, 4), 4)
+            self.assertEqual(b.recv(10), b"eggs")
+            # the file position is only used and updated without an offset
+            self.assertEqual(os.lseek(fd, 0, 1), 0)
+            self.assertEqual(os.sendfile(a.fileno(), fd, None, 5), 5)
+            self.assertEqual(os.lseek(fd, 0, 1), 5)
+            self.assertEqual(os.sendfile(a.fileno(), fd, None, 100), 10)
+            self.assertEqual(os.sendfile(a.fileno(), fd, None, 100), 0)
+            self.assertEqual(b.recv(100), b"bacon eggs spam")
+            self.assertRaises(ValueError, os.sendfile, a.fileno(), fd, 0, -1)
+        finally:
+            os.close(fd)
+            a.close()
+            b.close()
+
+    @unittest.skipUnless(hasattr(os, "writev"), "requires os.writev()")
+    def test_writev(self):
+        fd = os.open(support.TESTFN, os.O_CREAT | os.O_WRONLY)
+        try:
+            self.assertEqual(os.writev(fd, [b"bacon\n", bytearray(b"eggs\n"),
+                                            memoryview(b"spam\n"), b""]), 16)
+            self.assertEqual(os.writev(fd, ()), 0)
+            self.assertRaises(TypeError, os.writev, fd, [b"ham", "beans"])
+            self.assertRaises(TypeError, os.writev, fd, b"ham")
+        finally:
+            os.close(fd)
+        with open(support.TESTFN, "rb") as fobj:
+            self.assertEqual(fobj.read().splitlines(),
+                [b"bacon", b"eggs", b"spam"])
+
 
 class TemporaryFileTests(unittest.TestCase):
     def setUp(self):
@@ -7,6 +7,7 @@ from test.pickletester import AbstractPickleTests
 from test.pickletester import AbstractPickleModuleTests
 from test.pickletester import AbstractPersistentPicklerTests
 from test.pickletester import AbstractPicklerUnpicklerObjectTests
+from test.pickletester import AbstractPickleBufferTests
 
 try:
     import _pickle
@@ -67,6 +68,12 @@ class PyPicklerUnpicklerObjectTests(AbstractPicklerUnpicklerObjectTests):
     unpickler_class = pickle._Unpickler
 
 
+class PyPickleBufferTests(AbstractPickleBufferTests):
+
+    pickler_class = pickle._Pickler
+    unpickler_class = pickle._Unpickler
+
+
 if has_c_implementation:
     class CPicklerTests(PyPicklerTests):
         pickler = _pickle.Pickler
@@ -88,14 +95,29 @@ if has_c_implementation:
         pickler_class = _pickle.Pickler
         unpickler_class = _pickle.Unpickler
 
+    class CPickleBufferTests(AbstractPickleBufferTests):
+        pickler_class = _pickle.Pickler
+        unpickler_class = _pickle.Unpickler
+
+    class CDumpPickle_LoadPickleBufferTests(AbstractPickleBufferTests):
+        pickler_class = _pickle.Pickler
+        unpickler_class = pickle._Unpickler
+
+    class DumpPickle_CLoadPickleBufferTests(AbstractPickleBufferTests):
+        pickler_class = pickle._Pickler
+        unpickler_class = _pickle.Unpickler
+
 
 def test_main():
-    tests = [PickleTests, PyPicklerTests, PyPersPicklerTests]
+    tests = [PickleTests, PyPicklerTests, PyPersPicklerTests,
+             PyPickleBufferTests]
     if has_c_implementation:
         tests.extend([CPicklerTests, CPersPicklerTests,
                       CDumpPickle_LoadPickle, DumpPickle_CLoadPickle,
                       PyPicklerUnpicklerObjectTests,
-                      CPicklerUnpicklerObjectTests])
+                      CPicklerUnpicklerObjectTests,
+                      CPickleBufferTests, CDumpPickle_LoadPickleBufferTests,
+                      DumpPickle_CLoadPickleBufferTests])
     support.run_unittest(*tests)
     support.run_doctest(pickle)
 
@@ -696,6 +696,55 @@ class ReTests(unittest.TestCase):
         self.assertRaises(ValueError, re.compile, '(?a)\w', re.UNICODE)
         self.assertRaises(ValueError, re.compile, '(?au)\w')
 
+    def test_cache_lru_eviction(self):
+        old_size = re.cache_info()[3]
+        self.addCleanup(re.set_cache_size, old_size)
+        re.purge()
+        re.set_cache_size(3)
+        for i in range(3):
+            re.compile('cache%d' % i)
+        # touch the oldest entry so that 'cache1' becomes the LRU one
+        re.compile('cache0')
+        hits, misses, evictions = re.cache_info()[:3]
+        re.compile('cache3')
+        self.assertEqual(re.cache_info()[2], evictions + 1)
+        self.assertEqual(re.cache_info()[4], 3)
+        re.compile('cache0')
+        self.assertEqual(re.cache_info()[0], hits + 1)
+        re.compile('cache1')
+        self.assertEqual(re.cache_info()[1], misses + 2)
+
+    def test_cache_shrink(self):
+        old_size = re.cache_info()[3]
+        self.addCleanup(re.set_cache_size, old_size)
+        re.purge()
+        for i in range(10):
+            re.compile('shrink%d' % i)
+        re.set_cache_size(4)
+        self.assertEqual(re.cache_info()[3:], (4, 4))
+        re.set_cache_size(0)
+        re.compile('shrink')
+        self.assertEqual(re.cache_info()[4], 0)
+        self.assertRaises(ValueError, re.set_cache_size, -1)
+
+    def test_cache_pin(self):
+        old_size = re.cache_info()[3]
+        self.addCleanup(re.set_cache_size, old_size)
+        re.purge()
+        re.set_cache_size(2)
+        p = re.pin('pinned', re.I)
+        self.addCleanup(re.unpin, 'pinned', re.I)
+        for i in range(5):
+            re.compile('other%d' % i)
+        re.purge()
+        hits = re.cache_info()[0]
+        self.assertTrue(re.compile('pinned', re.I) is p)
+        self.assertEqual(re.cache_info()[0], hits + 1)
+        re.unpin('pinned', re.I)
+        for i in range(5):
+            re.compile('other%d' % i)
+        self.assertEqual(re.cache_info()[4], 2)
+
 
 def run_re_tests():
     from test.re_tests import benchmarks, tests, SUCCEED, FAIL, SYNTAX_ERROR
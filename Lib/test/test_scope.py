@@ -693,6 +693,85 @@ result2 = h()
         h = g()
         self.assertEqual(h(), 3)
 
+    def testGlobalCache(self):
+        # LOAD_GLOBAL caches what it finds until the globals or the
+        # builtins change
+        import builtins
+        code = compile("def f():\n    return len\n", "<test>", "exec")
+        ns = {}
+        exec(code, ns)
+        f = ns["f"]
+        self.assertTrue(f() is builtins.len)
+        self.assertTrue(f() is builtins.len)
+        ns["len"] = 42
+        self.assertEqual(f(), 42)
+        ns["len"] = 43
+        self.assertEqual(f(), 43)
+        del ns["len"]
+        self.assertTrue(f() is builtins.len)
+        ns.update(len=44)
+        self.assertEqual(f(), 44)
+        self.assertEqual(ns.pop("len"), 44)
+        self.assertTrue(f() is builtins.len)
+        ns["len"] = 45
+        self.assertEqual(f(), 45)
+        ns.clear()
+        ns["__builtins__"] = {"len": 46}
+        self.assertEqual(f(), 46)
+        ns["__builtins__"]["len"] = 47
+        self.assertEqual(f(), 47)
+
+        # changes to the builtins
+        ns = {"__builtins__": builtins}
+        exec(code, ns)
+        f = ns["f"]
+        self.assertTrue(f() is builtins.len)
+        orig = builtins.len
+        try:
+            builtins.len = 48
+            self.assertEqual(f(), 48)
+            del builtins.len
+            self.assertRaises(NameError, f)
+        finally:
+            builtins.len = orig
+        self.assertTrue(f() is orig)
+
+        # one code object run with different globals
+        code = compile("def g():\n    return x\n", "<test>", "exec")
+        ns1, ns2 = {"x": 1}, {"x": 2}
+        exec(code, ns1)
+        exec(code, ns2)
+        g1, g2 = ns1["g"], ns2["g"]
+        self.assertTrue(g1.__code__ is g2.__code__)
+        for i in range(3):
+            self.assertEqual(g1(), 1)
+            self.assertEqual(g2(), 2)
+        ns2["x"] = 3
+        self.assertEqual(g1(), 1)
+        self.assertEqual(g2(), 3)
+
+        # a value replaced while another global's value is being freed
+        class Rebind:
+            def __del__(self):
+                ns1["x"] = "rebound"
+        ns1["y"] = Rebind()
+        self.assertEqual(g1(), 1)
+        del ns1["y"]
+        self.assertEqual(g1(), "rebound")
+
+        # an instance __dict__ as the globals
+        class C:
+            pass
+        obj = C()
+        obj.x = 5
+        exec(code, obj.__dict__)
+        g = obj.g
+        self.assertEqual(g(), 5)
+        obj.x = 6
+        self.assertEqual(g(), 6)
+        del obj.x
+        self.assertRaises(NameError, g)
+
 
 def test_main():
     run_unittest(ScopeTests)
@@ -7,6 +7,7 @@ import sys
 import stat
 import os
 import os.path
+import io
 from test import support
 from test.support import TESTFN
 TESTFN2 = TESTFN + "2"
@@ -273,6 +274,35 @@ class TestShutil(unittest.TestCase):
                 shutil.rmtree(TESTFN, ignore_errors=True)
                 shutil.rmtree(TESTFN2, ignore_errors=True)
 
+    def test_copyfileobj(self):
+        data = bytes(range(256)) * 100
+        for length in (1000, 256, len(data), len(data) + 1, -1):
+            src = io.BytesIO(data)
+            dst = io.BytesIO()
+            shutil.copyfileobj(src, dst, length)
+            self.assertEqual(dst.getvalue(), data)
+        # text files and other file-like objects are copied with read()
+        dst = io.StringIO()
+        shutil.copyfileobj(io.StringIO("abc" * 10000), dst)
+        self.assertEqual(dst.getvalue(), "abc" * 10000)
+
+    def test_copyfile(self):
+        data = bytes(range(256)) * 1000
+        with open(TESTFN, "wb") as f:
+            f.write(data)
+        try:
+            shutil.copyfile(TESTFN, TESTFN2)
+            with open(TESTFN2, "rb") as f:
+                self.assertEqual(f.read(), data)
+            # an empty file, and one overwriting a longer one
+            with open(TESTFN, "wb") as f:
+                pass
+            shutil.copyfile(TESTFN, TESTFN2)
+            self.assertEqual(os.path.getsize(TESTFN2), 0)
+        finally:
+            support.unlink(TESTFN)
+            support.unlink(TESTFN2)
+
 
 class TestMove(unittest.TestCase):
 
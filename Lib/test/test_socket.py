@@ -13,6 +13,7 @@ import traceback
 import queue
 import sys
 import os
+import io
 import array
 from weakref import proxy
 import signal
@@ -644,6 +645,62 @@ class BasicTCPTest(SocketConnectedTest):
         self.serv_conn.send(MSG)
         self.serv_conn.shutdown(2)
 
+    FILEDATA = bytes(range(256)) * 1024
+
+    def testSendFile(self):
+        # Testing sendfile()
+        expected = self.FILEDATA[10:] + self.FILEDATA[:100] + b'xyz'
+        msg = b''
+        while len(msg) < len(expected):
+            read = self.cli_conn.recv(65536)
+            if not read:
+                break
+            msg += read
+        self.assertEqual(msg, expected)
+
+    def _testSendFile(self):
+        with open(support.TESTFN, 'wb') as f:
+            f.write(self.FILEDATA)
+        try:
+            with open(support.TESTFN, 'rb') as f:
+                f.read(10)
+                # from the current position
+                self.assertEqual(self.serv_conn.sendfile(f),
+                                 len(self.FILEDATA) - 10)
+                self.assertEqual(f.tell(), len(self.FILEDATA))
+                self.assertEqual(self.serv_conn.sendfile(f, 0, 100), 100)
+                self.assertEqual(f.tell(), 100)
+                self.assertEqual(f.read(1), self.FILEDATA[100:101])
+        finally:
+            support.unlink(support.TESTFN)
+        # not a regular file: read into a buffer and sent
+        self.assertEqual(self.serv_conn.sendfile(io.BytesIO(b'axyzb'), 1, 3),
+                         3)
+
+    @unittest.skipUnless(hasattr(socket.socket, "sendmsg"),
+                         "requires sendmsg()")
+    def testSendmsg(self):
+        expected = MSG + b'x' * 100000 + MSG
+        msg = b''
+        while len(msg) < len(expected):
+            read = self.cli_conn.recv(65536)
+            if not read:
+                break
+            msg += read
+        self.assertEqual(msg, expected)
+
+    def _testSendmsg(self):
+        if not hasattr(socket.socket, "sendmsg"):
+            return
+        self.assertEqual(self.serv_conn.sendmsg([]), 0)
+        self.assertEqual(self.serv_conn.sendmsg([MSG]), len(MSG))
+        self.assertRaises(TypeError, self.serv_conn.sendmsg, MSG)
+        self.assertRaises(TypeError, self.serv_conn.sendmsg, ['x'])
+        f = self.serv_conn.makefile('wb', 0)
+        f.writelines([bytearray(b'x' * 50000), b'', memoryview(b'x' * 50000),
+                      MSG])
+        f.close()
+
 class BasicUDPTest(ThreadedUDPSocketTest):
 
     def __init__(self, methodName='runTest'):
@@ -710,6 +767,23 @@ class BasicSocketPairTest(SocketPairTest):
         msg = self.cli.recv(1024)
         self.assertEqual(msg, MSG)
 
+    @unittest.skipUnless(hasattr(socket.socket, "sendmsg"),
+                         "requires sendmsg()")
+    def testSendmsgRights(self):
+        msg = b''
+        while len(msg) < len(MSG):
+            msg += self.serv.recv(1024)
+        self.assertEqual(msg, MSG)
+
+    def _testSendmsgRights(self):
+        if not hasattr(socket.socket, "sendmsg"):
+            return
+        fds = array.array('i', [0, 1])
+        self.assertEqual(self.cli.sendmsg([MSG[:4], MSG[4:]],
+                         [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)]),
+                         len(MSG))
+        self.assertRaises(TypeError, self.cli.sendmsg, [MSG], [b'x'])
+
 class NonBlockingTCPTests(ThreadedTCPSocketTest):
 
     def __init__(self, methodName='runTest'):
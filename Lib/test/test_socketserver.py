@@ -9,6 +9,7 @@ import os
 import select
 import signal
 import socket
+import sys
 import tempfile
 import threading
 import time
@@ -223,6 +224,107 @@ class SocketServerTest(unittest.TestCase):
                                 socketserver.DatagramRequestHandler,
                                 self.dgram_examine)
 
+    def test_ThreadPoolTCPServer(self):
+        self.run_server(socketserver.ThreadPoolTCPServer,
+                        socketserver.StreamRequestHandler,
+                        self.stream_examine)
+
+    def test_ThreadPoolUDPServer(self):
+        self.run_server(socketserver.ThreadPoolUDPServer,
+                        socketserver.DatagramRequestHandler,
+                        self.dgram_examine)
+
+    def test_ThreadPoolResize(self):
+        server = self.make_server((HOST, 0), socketserver.ThreadPoolTCPServer,
+                                  socketserver.StreamRequestHandler)
+        server.pool_size = 2
+        t = threading.Thread(target=server.serve_forever,
+                             kwargs={'poll_interval':0.01})
+        t.daemon = True
+        t.start()
+        try:
+            self.stream_examine(socket.AF_INET, server.server_address)
+            self.assertEquals(len(server._workers), 2)
+            server.resize_pool(5)
+            self.assertEquals(len(server._workers), 5)
+            server.resize_pool(1)
+            for i in range(3):
+                self.stream_examine(socket.AF_INET, server.server_address)
+            workers = server._workers
+            for w in workers:
+                if w.is_alive():
+                    w.join(0.1)
+            alive = [w for w in workers if w.is_alive()]
+            self.assertEquals(len(alive), 1)
+        finally:
+            server.shutdown()
+            t.join()
+            server.server_close()
+        self.assertFalse([w for w in workers if w.is_alive()])
+
+    if HAVE_FORKING:
+        def test_PreForkTCPServer(self):
+            self.run_server(socketserver.PreForkTCPServer,
+                            socketserver.StreamRequestHandler,
+                            self.stream_examine)
+
+        def test_PreForkUDPServer(self):
+            self.run_server(socketserver.PreForkUDPServer,
+                            socketserver.DatagramRequestHandler,
+                            self.dgram_examine)
+
+        def test_PreForkResize(self):
+            server = self.make_server((HOST, 0),
+                                      socketserver.PreForkTCPServer,
+                                      socketserver.StreamRequestHandler)
+            server.pool_size = 2
+            t = threading.Thread(target=server.serve_forever,
+                                 kwargs={'poll_interval':0.01})
+            t.daemon = True
+            t.start()
+            try:
+                self.stream_examine(socket.AF_INET, server.server_address)
+                children = list(server.active_children)
+                self.assertEquals(len(children), 2)
+                server.resize_pool(3)
+                time.sleep(0.1)
+                self.assertEquals(len(server.active_children), 3)
+                # A worker which dies is replaced
+                os.kill(children[0], signal.SIGKILL)
+                time.sleep(0.1)
+                self.assertEquals(len(server.active_children), 3)
+                self.assertNotIn(children[0], server.active_children)
+                server.resize_pool(1)
+                time.sleep(0.1)
+                self.assertEquals(len(server.active_children), 1)
+                self.stream_examine(socket.AF_INET, server.server_address)
+            finally:
+                server.shutdown()
+                t.join()
+                server.server_close()
+            self.assertEquals(server.active_children, [])
+
+        def test_PreForkWorkerError(self):
+            class MyServer(socketserver.PreForkTCPServer):
+                def serve_requests(self, poll_interval):
+                    raise ZeroDivisionError
+            server = MyServer((HOST, 0), socketserver.StreamRequestHandler)
+            server.active_children = []
+            r, w = os.pipe()
+            stderr = sys.stderr
+            sys.stderr = open(w, "w")
+            try:
+                server.start_worker(0.01)
+            finally:
+                sys.stderr.close()
+                sys.stderr = stderr
+                server.server_close()
+            pid, = server.active_children
+            self.assertEquals(os.waitpid(pid, 0)[1], 1 << 8)
+            with open(r) as f:
+                # The worker reports the exception before exiting
+                self.assertIn("ZeroDivisionError", f.read())
+
     # Alas, on Linux (at least) recvfrom() doesn't return a meaningful
     # client address so this cannot work:
 
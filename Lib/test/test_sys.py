@@ -412,6 +412,36 @@ class SysModuleTest(unittest.TestCase):
     def test_clear_type_cache(self):
         sys._clear_type_cache()
 
+    def test_getallocatorstats(self):
+        if not hasattr(sys, "getallocatorstats"):
+            return
+        stats = sys.getallocatorstats()
+        self.assertEqual(stats['arenas'], sum(stats['arena_usage']))
+        self.assertEqual(stats['arenas_reclaimed'],
+                         stats['arenas_allocated_total'] - stats['arenas'])
+        self.assertTrue(stats['arenas'] <= stats['arenas_highwater'])
+        pools_per_arena = stats['arena_size'] // stats['pool_size']
+        self.assertEqual(len(stats['arena_usage']), pools_per_arena + 1)
+        self.assertEqual(stats['pools_used'],
+                         sum(n * used for n, used in
+                             enumerate(stats['arena_usage'])))
+        self.assertEqual(stats['pools_used'],
+                         sum(c[1] for c in stats['size_classes']))
+        self.assertEqual(stats['bytes_allocated'],
+                         sum(c[0] * c[2] for c in stats['size_classes']))
+        sizes = [c[0] for c in stats['size_classes']]
+        self.assertEqual(sizes, sorted(sizes))
+
+        # Arenas emptied by freeing objects are given back
+        objs = [str(i) for i in range(200000)]
+        grown = sys.getallocatorstats()
+        del objs
+        shrunk = sys.getallocatorstats()
+        self.assertTrue(grown['arenas'] >= stats['arenas'] + 10)
+        self.assertTrue(shrunk['arenas'] <= grown['arenas'] - 10)
+        self.assertTrue(shrunk['arenas_reclaimed'] >=
+                        grown['arenas_reclaimed'] + 10)
+
     def test_ioencoding(self):
         import subprocess,os
         env = dict(os.environ)
@@ -523,7 +553,7 @@ class SizeofTest(unittest.TestCase):
             return inner
         check(get_cell().__closure__[0], size(h + 'P'))
         # code
-        check(get_cell().__code__, size(h + '5i8Pi2P'))
+        check(get_cell().__code__, size(h + '5i8Pi5P'))
         # complex
         check(complex(0,1), size(h + '2d'))
         # method_descriptor (descriptor object)
@@ -541,9 +571,14 @@ class SizeofTest(unittest.TestCase):
         # method-wrapper (descriptor object)
         check({}.__iter__, size(h + '2P'))
         # dict
-        check({}, size(h + '3P2P' + 8*'P2P'))
+        check({}, size(h + '3P2PQPi' + 8*'P2P'))
         longdict = {1:1, 2:2, 3:3, 4:4, 5:5, 6:6, 7:7, 8:8}
-        check(longdict, size(h + '3P2P' + 8*'P2P') + 16*size('P2P'))
+        check(longdict, size(h + '3P2PQPi' + 8*'P2P') + 16*size('P2P'))
+        # instance dict (split table: no small table, 8 values)
+        class C(object): pass
+        x = C()
+        x.a = 1
+        check(x.__dict__, size(h + '3P2PQPi0P') + 8*self.P)
         # dictionary-keyiterator
         check({}.keys(), size(h + 'P'))
         # dictionary-valueiterator
@@ -685,7 +720,7 @@ class SizeofTest(unittest.TestCase):
         # type
         # (PyTypeObject + PyNumberMethods + PyMappingMethods +
         #  PySequenceMethods + PyBufferProcs)
-        s = size(vh + 'P2P15Pl4PP9PP11PI') + size('16Pi17P 3P 10P 2P 2P')
+        s = size(vh + 'P2P15Pl4PP9PP11PI') + size('16Pi17P 3P 10P 2P 3P')
         check(int, s)
         # class
         class newstyleclass(object): pass
@@ -266,6 +266,40 @@ class MiscReadTest(ReadTest):
             self.assertEqual(tarinfo.mtime, os.path.getmtime(path))
         tar.close()
 
+    def test_extractall_workers(self):
+        # Extracting regular files on several threads gives the same result.
+        def contents(top):
+            result = {}
+            for dirpath, dirnames, filenames in os.walk(top):
+                for name in dirnames + filenames:
+                    path = os.path.join(dirpath, name)
+                    st = os.lstat(path)
+                    mtime = data = None
+                    if os.path.isfile(path) and not os.path.islink(path):
+                        mtime = st.st_mtime
+                        with open(path, "rb") as f:
+                            data = f.read()
+                    result[os.path.relpath(path, top)] = (st.st_mode,
+                                                          mtime, data)
+            return result
+        def extractall(path, workers):
+            tar = tarfile.open(self.tarname, mode=self.mode,
+                               encoding="iso8859-1")
+            # Leave out the names which can't be encoded on every filesystem.
+            members = [tarinfo for tarinfo in tar
+                       if all(ord(c) < 128 for c in tarinfo.name)]
+            tar.extractall(path, members, workers=workers)
+            tar.close()
+        serial = os.path.join(TEMPDIR, "serial")
+        parallel = os.path.join(TEMPDIR, "parallel")
+        try:
+            extractall(serial, None)
+            extractall(parallel, 4)
+            self.assertEqual(contents(parallel), contents(serial))
+        finally:
+            shutil.rmtree(serial)
+            shutil.rmtree(parallel)
+
 
 class StreamReadTest(ReadTest):
 
@@ -1092,6 +1126,115 @@ class MiscTest(unittest.TestCase):
         self.assertEqual(tarfile.itn(0xffffffff), b"\x80\x00\x00\x00\xff\xff\xff\xff")
 
 
+class IndexTest(unittest.TestCase):
+
+    mode = ""
+    kwargs = {}
+    indexname = tmpname + ".idx"
+
+    def setUp(self):
+        self.tarname = tmpname + (self.mode and "." + self.mode)
+        tar = tarfile.open(self.tarname, "w:" + self.mode, **self.kwargs)
+        for i in range(300):
+            data = str(i).encode("ascii") * (i * 10)
+            tarinfo = tarfile.TarInfo("dir%d/member%d" % (i % 3, i))
+            tarinfo.size = len(data)
+            tar.addfile(tarinfo, io.BytesIO(data))
+        # a long name, written as an extra header
+        tarinfo = tarfile.TarInfo("x" * 200)
+        tar.addfile(tarinfo)
+        tar.close()
+        tar.saveindex(self.indexname)
+
+    def tearDown(self):
+        support.unlink(self.tarname)
+        support.unlink(self.indexname)
+
+    def test_same_members(self):
+        tar = tarfile.open(self.tarname, "r:" + self.mode)
+        try:
+            expected = dict((t.name, t) for t in tar.getmembers())
+        finally:
+            tar.close()
+        tar = tarfile.open(self.tarname, "r:" + self.mode)
+        try:
+            tar.loadindex(self.indexname)
+            for name in ("dir2/member299", "dir0/member0", "x" * 200,
+                         "dir1/member100"):
+                tarinfo = tar.getmember(name)
+                for attr in ("name", "size", "offset", "offset_data",
+                             "type"):
+                    self.assertEqual(getattr(tarinfo, attr),
+                                     getattr(expected[name], attr))
+            data = tar.extractfile("dir1/member151").read()
+            self.assertEqual(data, b"151" * 1510)
+            # only the first member was read
+            self.assertEqual(len(tar.members), 1)
+            self.assertFalse(tar._loaded)
+            self.assertRaises(KeyError, tar.getmember, "missing")
+            self.assertEqual(len(tar.getmembers()), 301)
+        finally:
+            tar.close()
+
+    def test_saveindex_reading(self):
+        # An index can be built when reading an archive.
+        indexname = self.indexname + "2"
+        tar = tarfile.open(self.tarname, "r:" + self.mode)
+        try:
+            tar.saveindex(indexname)
+        finally:
+            tar.close()
+        try:
+            indexes = []
+            for name in (self.indexname, indexname):
+                tar = tarfile.open(self.tarname, "r:" + self.mode)
+                try:
+                    tar.loadindex(name)
+                    indexes.append((tar._index,
+                                    getattr(tar.fileobj, "index", None)))
+                finally:
+                    tar.close()
+            self.assertEqual(len(indexes[0][0]), 301)
+            self.assertTrue(indexes[0] == indexes[1])
+        finally:
+            support.unlink(indexname)
+
+    def test_bad_index(self):
+        with open(self.indexname, "r+b") as f:
+            f.truncate(100)
+        tar = tarfile.open(self.tarname, "r:" + self.mode)
+        try:
+            self.assertRaises(tarfile.ReadError, tar.loadindex, self.indexname)
+            self.assertRaises(tarfile.ReadError, tar.loadindex, self.tarname)
+        finally:
+            tar.close()
+        tar = tarfile.open(self.tarname, "r|" + self.mode)
+        try:
+            self.assertRaises(tarfile.StreamError, tar.loadindex,
+                              self.indexname)
+        finally:
+            tar.close()
+
+
+class GzipIndexTest(IndexTest):
+
+    mode = "gz"
+    kwargs = {"blocksize": 4096}
+
+    def test_checkpoints(self):
+        tar = tarfile.open(self.tarname, "r:gz")
+        try:
+            tar.loadindex(self.indexname)
+            self.assertTrue(len(tar.fileobj.index) > 10)
+            tar.fileobj.rewind = None   # seeking must not rewind
+            self.assertEqual(tar.extractfile("dir2/member200").read(),
+                             b"200" * 2000)
+            self.assertEqual(tar.extractfile("dir0/member3").read(),
+                             b"3" * 30)
+        finally:
+            tar.close()
+
+
 class GzipMiscReadTest(MiscReadTest):
     tarname = gzipname
     mode = "r:gz"
@@ -1167,6 +1310,7 @@ def test_main():
         AppendTest,
         LimitsTest,
         MiscTest,
+        IndexTest,
     ]
 
     if hasattr(os, "link"):
@@ -1188,6 +1332,7 @@ def test_main():
             GzipStreamReadTest,
             GzipWriteTest,
             GzipStreamWriteTest,
+            GzipIndexTest,
         ]
 
     if bz2:
@@ -1147,11 +1147,160 @@ class UniversalNewlineTests(unittest.TestCase):
         support.unlink(TESTFN2)
 
 
+class LazyDirectoryTests(unittest.TestCase):
+    def setUp(self):
+        zipfp = zipfile.ZipFile(TESTFN, "w")
+        for i in range(200):
+            zipfp.writestr("dir%d/file%d" % (i % 7, i), str(i) * 10)
+        # the last of two entries with the same name wins
+        zipfp.writestr("dir0/file0", b"replaced")
+        zipfp.writestr("\u20ac.txt", b"euro")
+        zipfp.close()
+
+    def tearDown(self):
+        support.unlink(TESTFN)
+
+    def test_same_contents(self):
+        zipfp = zipfile.ZipFile(TESTFN, "r")
+        lazyfp = zipfile.ZipFile(TESTFN, "r", lazy=True)
+        try:
+            self.assertEqual(lazyfp.namelist(), zipfp.namelist())
+            self.assertEqual(list(lazyfp.iternames()), zipfp.namelist())
+            for name in ("dir3/file10", "dir0/file0", "\u20ac.txt"):
+                self.assertEqual(lazyfp.read(name), zipfp.read(name))
+                info, lazyinfo = zipfp.getinfo(name), lazyfp.getinfo(name)
+                for attr in zipfile.ZipInfo.__slots__:
+                    self.assertEqual(getattr(lazyinfo, attr),
+                                     getattr(info, attr))
+            self.assertRaises(KeyError, lazyfp.getinfo, "missing")
+            self.assertEqual(len(lazyfp.infolist()), len(zipfp.infolist()))
+            self.assertEqual([i.header_offset for i in lazyfp.infolist()],
+                             [i.header_offset for i in zipfp.infolist()])
+            self.assertTrue(lazyfp.testzip() is None)
+        finally:
+            zipfp.close()
+            lazyfp.close()
+
+    def test_on_demand(self):
+        zipfp = zipfile.ZipFile(TESTFN, "r", lazy=True)
+        try:
+            if zipfile.mmap is not None:
+                self.assertTrue(isinstance(zipfp._cdir, zipfile.mmap.mmap))
+            names = zipfp.namelist()
+            self.assertEqual(len(names), 202)
+            self.assertEqual(zipfp.NameToInfo, {})
+            info = zipfp.getinfo("dir5/file5")
+            self.assertEqual(list(zipfp.NameToInfo), ["dir5/file5"])
+            self.assertEqual(zipfp.read(info), b"5" * 10)
+            # the instances made so far are kept when all are loaded
+            infos = zipfp.infolist()
+            self.assertTrue(infos[5] is info)
+            self.assertTrue(zipfp._cdir is None)
+            self.assertEqual(zipfp.read("dir0/file0"), b"replaced")
+            self.assertEqual(zipfp.namelist(), names)
+        finally:
+            zipfp.close()
+        self.assertEqual(zipfp.namelist(), names)
+        zipfp = zipfile.ZipFile(TESTFN, "r", lazy=True)
+        zipfp.close()
+        self.assertRaises(RuntimeError, zipfp.namelist)
+        self.assertRaises(RuntimeError, zipfp.getinfo, "dir1/file1")
+
+    def test_file_object(self):
+        with open(TESTFN, "rb") as f:
+            data = io.BytesIO(f.read())
+        zipfp = zipfile.ZipFile(data, "r", lazy=True)
+        self.assertEqual(zipfp.read("dir2/file2"), b"2" * 10)
+        self.assertEqual(len(zipfp.namelist()), 202)
+        zipfp.close()
+
+    def test_modes(self):
+        self.assertRaises(RuntimeError, zipfile.ZipFile, TESTFN, "a",
+                          lazy=True)
+        self.assertRaises(RuntimeError, zipfile.ZipFile, TESTFN2, "w",
+                          lazy=True)
+
+
+class WorkersTests(unittest.TestCase):
+    def setUp(self):
+        os.mkdir(TESTFNDIR)
+        os.mkdir(os.path.join(TESTFNDIR, "sub"))
+        self.files = [TESTFNDIR, os.path.join(TESTFNDIR, "sub")]
+        for i in range(50):
+            name = os.path.join(TESTFNDIR, "sub" if i % 2 else "",
+                                "file%d" % i)
+            with open(name, "wb") as fp:
+                fp.write(bytes(str(i), "ascii") * (i * 1000))
+            self.files.append(name)
+
+    def tearDown(self):
+        shutil.rmtree(TESTFNDIR)
+        shutil.rmtree(TESTFN2, True)
+        support.unlink(TESTFN)
+
+    def readContents(self, zipfp):
+        return [(info.filename, info.CRC, info.file_size, info.compress_size,
+                 zipfp.read(info)) for info in zipfp.infolist()]
+
+    def test_writeall(self):
+        for compression in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            if compression == zipfile.ZIP_DEFLATED and not zlib:
+                continue
+            contents = []
+            for workers in (None, 4):
+                zipfp = zipfile.ZipFile(TESTFN, "w", compression)
+                zipfp.writeall(self.files, workers=workers)
+                zipfp.writeall([(self.files[2], "renamed")], workers=workers)
+                zipfp.close()
+                zipfp = zipfile.ZipFile(TESTFN, "r")
+                self.assertTrue(zipfp.testzip() is None)
+                contents.append(self.readContents(zipfp))
+                zipfp.close()
+            self.assertEqual(contents[0], contents[1])
+            self.assertEqual(len(contents[1]), len(self.files) + 1)
+            self.assertEqual(contents[1][-1][0], "renamed")
+
+    def test_writeall_error(self):
+        zipfp = zipfile.ZipFile(TESTFN, "w")
+        self.assertRaises(OSError, zipfp.writeall,
+                          self.files + [TESTFN2] + self.files, workers=4)
+        zipfp.close()
+        zipfp = zipfile.ZipFile(TESTFN, "r")
+        self.assertEqual(zipfp.namelist(),
+                         [name.replace(os.sep, "/") for name in
+                          [TESTFNDIR + "/", os.path.join(TESTFNDIR, "sub/")]
+                          + self.files[2:]])
+        zipfp.close()
+
+    def test_extractall(self):
+        zipfp = zipfile.ZipFile(TESTFN, "w")
+        zipfp.writeall(self.files)
+        # a member replaced by a later one with the same name
+        zipfp.writestr(self.files[5].replace(os.sep, "/"), b"replaced")
+        zipfp.close()
+        zipfp = zipfile.ZipFile(TESTFN, "r")
+        zipfp.extractall(TESTFN2, workers=4)
+        zipfp.close()
+        for name in self.files:
+            target = os.path.join(TESTFN2, name)
+            if os.path.isdir(name):
+                self.assertTrue(os.path.isdir(target))
+                continue
+            with open(target, "rb") as fp:
+                data = fp.read()
+            if name == self.files[5]:
+                self.assertEqual(data, b"replaced")
+            else:
+                with open(name, "rb") as fp:
+                    self.assertEqual(data, fp.read())
+
+
 def test_main():
     run_unittest(TestsWithSourceFile, TestZip64InSmallFiles, OtherTests,
                  PyZipFileTests, DecryptionTests, TestsWithMultipleOpens,
                  TestWithDirectory,
-                 UniversalNewlineTests, TestsWithRandomBinaryFiles)
+                 UniversalNewlineTests, TestsWithRandomBinaryFiles,
+                 LazyDirectoryTests, WorkersTests)
 
 if __name__ == "__main__":
     test_main()
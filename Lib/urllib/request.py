@@ -988,8 +988,9 @@ class ProxyDigestAuthHandler(BaseHandler, AbstractDigestAuthHandler):
 
 class AbstractHTTPHandler(BaseHandler):
 
-    def __init__(self, debuglevel=0):
+    def __init__(self, debuglevel=0, pool=None):
         self._debuglevel = debuglevel
+        self._pool = pool
 
     def set_http_debuglevel(self, level):
         self._debuglevel = level
@@ -1031,19 +1032,32 @@ class AbstractHTTPHandler(BaseHandler):
         if not host:
             raise URLError('no host given')
 
-        h = http_class(host, timeout=req.timeout) # will parse host:port
         headers = dict(req.headers)
         headers.update(req.unredirected_hdrs)
 
-        # TODO(jhylton): Should this be redesigned to handle
-        # persistent connections?
+        if self._pool is not None:
+            # The connection goes back to the pool once the response
+            # has been read or closed.
+            headers = dict((name.title(), val)
+                           for name, val in headers.items())
+            try:
+                r = self._pool.request(req.get_method(), req.selector,
+                                       req.data, headers, host=host,
+                                       connection_class=http_class,
+                                       timeout=req.timeout,
+                                       tunnel_host=req._tunnel_host)
+            except socket.error as err:
+                raise URLError(err)
+            r.url = req.full_url
+            r.msg = r.reason
+            return r
+
+        h = http_class(host, timeout=req.timeout) # will parse host:port
 
-        # We want to make an HTTP/1.1 request, but the addinfourl
-        # class isn't prepared to deal with a persistent connection.
-        # It will try to read all remaining data from the socket,
-        # which will block while the server waits for the next request.
-        # So make sure the connection gets closed after the (only)
-        # request.
+        # We want to make an HTTP/1.1 request, but without a connection
+        # pool nothing would read the rest of the response before the
+        # connection is reused.  So make sure the connection gets closed
+        # after the (only) request.
         headers["Connection"] = "close"
         headers = dict((name.title(), val) for name, val in headers.items())
 
@@ -4,7 +4,7 @@ Read and write ZIP files.
 XXX references to utf-8 need further investigation.
 """
 import struct, os, time, sys, shutil
-import binascii, io, stat
+import binascii, io, stat, errno, collections, queue, tempfile
 
 try:
     import zlib # We may need its compression method
@@ -13,6 +13,16 @@ except ImportError:
     zlib = None
     crc32 = binascii.crc32
 
+try:
+    import mmap # Used to read the central directory of large archives
+except ImportError:
+    mmap = None
+
+try:
+    import threading # Used to extract and compress members in parallel
+except ImportError:
+    threading = None
+
 __all__ = ["BadZipfile", "error", "ZIP_STORED", "ZIP_DEFLATED", "is_zipfile",
            "ZipInfo", "ZipFile", "PyZipFile", "LargeZipFile" ]
 
@@ -154,6 +164,52 @@ def is_zipfile(filename):
         pass
     return result
 
+def _imap_threads(func, iterable, workers):
+    """Like map(func, iterable), with the calls made on `workers' threads.
+    The results are returned in order, and at most 2 * workers calls are
+    in progress or waiting to be collected at any time."""
+    jobs = queue.Queue()
+    def work():
+        while True:
+            job = jobs.get()
+            if job is None:
+                return
+            try:
+                job[2] = func(job[0])
+            except Exception as e:
+                job[3] = e
+            job[1].set()
+    def result(job):
+        job[1].wait()
+        if job[3] is not None:
+            raise job[3]
+        return job[2]
+    threads = [threading.Thread(target=work) for i in range(workers)]
+    for t in threads:
+        t.daemon = True
+        t.start()
+    pending = collections.deque()
+    try:
+        for arg in iterable:
+            job = [arg, threading.Event(), None, None]
+            pending.append(job)
+            jobs.put(job)
+            if len(pending) >= 2 * workers:
+                yield result(pending.popleft())
+        while pending:
+            yield result(pending.popleft())
+    finally:
+        # drop the calls not started yet, if we stopped early
+        try:
+            while True:
+                jobs.get_nowait()
+        except queue.Empty:
+            pass
+        for t in threads:
+            jobs.put(None)
+        for t in threads:
+            t.join()
+
 def _EndRecData64(fpin, offset, endrec):
     """
     Read the ZIP64 end-of-archive records and use that to update endrec
@@ -642,7 +698,8 @@ class ZipExtFile:
 class ZipFile:
     """ Class with methods to open, read, write, close, list zip files.
 
-    z = ZipFile(file, mode="r", compression=ZIP_STORED, allowZip64=False)
+    z = ZipFile(file, mode="r", compression=ZIP_STORED, allowZip64=False,
+                lazy=False)
 
     file: Either the path to the file, or a file-like object.
           If it is a path, the file will be opened and closed by ZipFile.
@@ -651,15 +708,22 @@ class ZipFile:
     allowZip64: if True ZipFile will create files with ZIP64 extensions when
                 needed, otherwise it will raise an exception when this would
                 be necessary.
+    lazy: if True (mode "r" only), the central directory is memory mapped
+          and only indexed by name; ZipInfo instances are created when
+          they are asked for.
 
     """
 
     fp = None                   # Set here since __del__ checks it
+    _cdir = None                # Central directory, when loaded lazily
 
-    def __init__(self, file, mode="r", compression=ZIP_STORED, allowZip64=False):
+    def __init__(self, file, mode="r", compression=ZIP_STORED, allowZip64=False,
+                 lazy=False):
         """Open the ZIP file with mode read "r", write "w" or append "a"."""
         if mode not in ("r", "w", "a"):
             raise RuntimeError('ZipFile() requires mode "r", "w", or "a"')
+        if lazy and mode != "r":
+            raise RuntimeError('lazy loading of the directory requires mode "r"')
 
         if compression == ZIP_STORED:
             pass
@@ -679,6 +743,8 @@ class ZipFile:
         self.mode = key = mode.replace('b', '')[0]
         self.pwd = None
         self.comment = b''
+        self._lazy = lazy
+        self._cdir_index = None # Offset of directory entries, by name
 
         # Check if we were passed a file-like object
         if isinstance(file, str):
@@ -750,70 +816,158 @@ class ZipFile:
             print("given, inferred, offset", offset_cd, inferred, concat)
         # self.start_dir:  Position of start of central directory
         self.start_dir = offset_cd + concat
+        self._concat = concat
+        if self._lazy:
+            self._cdir, self._cdir_start = self._mapDirectory(self.start_dir,
+                                                              size_cd)
+            self._cdir_end = self._cdir_start + size_cd
+            index = self._cdir_index = {}
+            for pos, filename in self._iterDirectory():
+                index[filename] = pos
+            return
         fp.seek(self.start_dir, 0)
         data = fp.read(size_cd)
-        fp = io.BytesIO(data)
         total = 0
         while total < size_cd:
-            centdir = fp.read(sizeCentralDir)
-            if centdir[0:4] != stringCentralDir:
-                raise BadZipfile("Bad magic number for central directory")
-            centdir = struct.unpack(structCentralDir, centdir)
-            if self.debug > 2:
-                print(centdir)
-            filename = fp.read(centdir[_CD_FILENAME_LENGTH])
-            flags = centdir[5]
-            if flags & 0x800:
-                # UTF-8 file names extension
-                filename = filename.decode('utf-8')
-            else:
-                # Historical ZIP filename encoding
-                filename = filename.decode('cp437')
-            # Create ZipInfo instance to store file information
-            x = ZipInfo(filename)
-            x.extra = fp.read(centdir[_CD_EXTRA_FIELD_LENGTH])
-            x.comment = fp.read(centdir[_CD_COMMENT_LENGTH])
-            x.header_offset = centdir[_CD_LOCAL_HEADER_OFFSET]
-            (x.create_version, x.create_system, x.extract_version, x.reserved,
-                x.flag_bits, x.compress_type, t, d,
-                x.CRC, x.compress_size, x.file_size) = centdir[1:12]
-            x.volume, x.internal_attr, x.external_attr = centdir[15:18]
-            # Convert date/time code to (year, month, day, hour, min, sec)
-            x._raw_time = t
-            x.date_time = ( (d>>9)+1980, (d>>5)&0xF, d&0x1F,
-                                     t>>11, (t>>5)&0x3F, (t&0x1F) * 2 )
-
-            x._decodeExtra()
-            x.header_offset = x.header_offset + concat
+            x, total = self._readCentralDir(data, total)
             self.filelist.append(x)
             self.NameToInfo[x.filename] = x
 
-            # update total bytes read from central directory
-            total = (total + sizeCentralDir + centdir[_CD_FILENAME_LENGTH]
-                     + centdir[_CD_EXTRA_FIELD_LENGTH]
-                     + centdir[_CD_COMMENT_LENGTH])
-
             if self.debug > 2:
                 print("total", total)
 
+    def _mapDirectory(self, offset, size):
+        """Return a buffer holding the central directory, and the position
+        of the directory in it.  The file is memory mapped if possible."""
+        if mmap is not None and size > 0:
+            try:
+                fileno = self.fp.fileno()
+                # the mapping must start on an allocation boundary
+                start = offset - offset % mmap.ALLOCATIONGRANULARITY
+                return (mmap.mmap(fileno, offset + size - start,
+                                  access=mmap.ACCESS_READ, offset=start),
+                        offset - start)
+            except (AttributeError, EnvironmentError, ValueError):
+                # not a real file (io.UnsupportedOperation is a ValueError)
+                pass
+        self.fp.seek(offset, 0)
+        return self.fp.read(size), 0
+
+    def _iterDirectory(self):
+        """Yield the position and the file name of each entry of a lazily
+        loaded central directory, without creating ZipInfo instances."""
+        buf = self._cdir
+        if buf is None:
+            raise RuntimeError(
+                  "Attempt to read ZIP archive that was already closed")
+        pos = self._cdir_start
+        end = self._cdir_end
+        while pos < end:
+            centdir = buf[pos:pos + sizeCentralDir]
+            if centdir[0:4] != stringCentralDir:
+                raise BadZipfile("Bad magic number for central directory")
+            centdir = struct.unpack(structCentralDir, centdir)
+            start = pos + sizeCentralDir
+            filename = buf[start:start + centdir[_CD_FILENAME_LENGTH]]
+            filename = filename.decode('utf-8' if centdir[_CD_FLAG_BITS] & 0x800
+                                       else 'cp437')
+            # Normalize the name as ZipInfo does
+            filename = filename.split(chr(0), 1)[0]
+            if os.sep != "/" and os.sep in filename:
+                filename = filename.replace(os.sep, "/")
+            yield pos, filename
+            pos = (start + centdir[_CD_FILENAME_LENGTH]
+                   + centdir[_CD_EXTRA_FIELD_LENGTH]
+                   + centdir[_CD_COMMENT_LENGTH])
+
+    def _readCentralDir(self, data, pos):
+        """Create a ZipInfo instance from the central directory entry at
+        position pos in data.  Return it with the position of the next
+        entry."""
+        centdir = data[pos:pos + sizeCentralDir]
+        if centdir[0:4] != stringCentralDir:
+            raise BadZipfile("Bad magic number for central directory")
+        centdir = struct.unpack(structCentralDir, centdir)
+        if self.debug > 2:
+            print(centdir)
+        pos += sizeCentralDir
+        filename = data[pos:pos + centdir[_CD_FILENAME_LENGTH]]
+        pos += centdir[_CD_FILENAME_LENGTH]
+        flags = centdir[5]
+        if flags & 0x800:
+            # UTF-8 file names extension
+            filename = filename.decode('utf-8')
+        else:
+            # Historical ZIP filename encoding
+            filename = filename.decode('cp437')
+        # Create ZipInfo instance to store file information
+        x = ZipInfo(filename)
+        x.extra = data[pos:pos + centdir[_CD_EXTRA_FIELD_LENGTH]]
+        pos += centdir[_CD_EXTRA_FIELD_LENGTH]
+        x.comment = data[pos:pos + centdir[_CD_COMMENT_LENGTH]]
+        pos += centdir[_CD_COMMENT_LENGTH]
+        x.header_offset = centdir[_CD_LOCAL_HEADER_OFFSET]
+        (x.create_version, x.create_system, x.extract_version, x.reserved,
+            x.flag_bits, x.compress_type, t, d,
+            x.CRC, x.compress_size, x.file_size) = centdir[1:12]
+        x.volume, x.internal_attr, x.external_attr = centdir[15:18]
+        # Convert date/time code to (year, month, day, hour, min, sec)
+        x._raw_time = t
+        x.date_time = ( (d>>9)+1980, (d>>5)&0xF, d&0x1F,
+                                 t>>11, (t>>5)&0x3F, (t&0x1F) * 2 )
+
+        x._decodeExtra()
+        x.header_offset = x.header_offset + self._concat
+        return x, pos
+
+    def _loadDirectory(self):
+        """Create the ZipInfo instances of all the entries of a lazily
+        loaded central directory, and release the directory."""
+        index = self._cdir_index
+        # instances already handed out by getinfo()
+        made = self.NameToInfo.copy()
+        for pos, filename in self._iterDirectory():
+            x = None
+            if index[filename] == pos:
+                x = made.get(filename)
+            if x is None:
+                x = self._readCentralDir(self._cdir, pos)[0]
+            self.filelist.append(x)
+            self.NameToInfo[x.filename] = x
+        self._cdir_index = None
+        self._closeDirectory()
+
+    def _closeDirectory(self):
+        if self._cdir is not None and not isinstance(self._cdir, bytes):
+            self._cdir.close()
+        self._cdir = None
+
+    def iternames(self):
+        """Iterate over the file names in the archive.  A lazily loaded
+        directory is read without creating ZipInfo instances."""
+        if self._cdir_index is not None:
+            for pos, filename in self._iterDirectory():
+                yield filename
+        else:
+            for data in self.filelist:
+                yield data.filename
 
     def namelist(self):
         """Return a list of file names in the archive."""
-        l = []
-        for data in self.filelist:
-            l.append(data.filename)
-        return l
+        return list(self.iternames())
 
     def infolist(self):
         """Return a list of class ZipInfo instances for files in the
         archive."""
+        if self._cdir_index is not None:
+            self._loadDirectory()
         return self.filelist
 
     def printdir(self, file=None):
         """Print a table of contents for the zip file."""
         print("%-46s %19s %12s" % ("File Name", "Modified    ", "Size"),
               file=file)
-        for zinfo in self.filelist:
+        for zinfo in self.infolist():
             date = "%d-%02d-%02d %02d:%02d:%02d" % zinfo.date_time[:6]
             print("%-46s %s %12d" % (zinfo.filename, date, zinfo.file_size),
                   file=file)
@@ -821,7 +975,7 @@ class ZipFile:
     def testzip(self):
         """Read all the files and check the CRC."""
         chunk_size = 2 ** 20
-        for zinfo in self.filelist:
+        for zinfo in self.infolist():
             try:
                 # Read by chunks, to avoid an OverflowError or a
                 # MemoryError with very large embedded files.
@@ -834,6 +988,14 @@ class ZipFile:
     def getinfo(self, name):
         """Return the instance of ZipInfo given 'name'."""
         info = self.NameToInfo.get(name)
+        if info is None and self._cdir_index is not None:
+            pos = self._cdir_index.get(name)
+            if pos is not None:
+                if self._cdir is None:
+                    raise RuntimeError(
+                          "Attempt to read ZIP archive that was already closed")
+                info = self._readCentralDir(self._cdir, pos)[0]
+                self.NameToInfo[name] = info
         if info is None:
             raise KeyError(
                 'There is no item named %r in the archive' % name)
@@ -941,17 +1103,37 @@ class ZipFile:
 
         return self._extract_member(member, path, pwd)
 
-    def extractall(self, path=None, members=None, pwd=None):
+    def extractall(self, path=None, members=None, pwd=None, workers=None):
         """Extract all members from the archive to the current working
            directory. `path' specifies a different directory to extract to.
            `members' is optional and must be a subset of the list returned
-           by namelist().
+           by namelist(). If `workers' is more than 1, the members are
+           extracted on that many threads, each reading from its own file
+           object (unless the archive was given as a file object).
         """
         if members is None:
             members = self.namelist()
 
-        for zipinfo in members:
-            self.extract(zipinfo, path, pwd)
+        if not workers or workers <= 1 or threading is None or \
+           self._filePassed:
+            for zipinfo in members:
+                self.extract(zipinfo, path, pwd)
+            return
+
+        if path is None:
+            path = os.getcwd()
+        # Only the last of several members with the same name is kept,
+        # as it would overwrite the others.
+        infos = collections.OrderedDict()
+        for member in members:
+            if not isinstance(member, ZipInfo):
+                member = self.getinfo(member)
+            infos.pop(member.filename, None)
+            infos[member.filename] = member
+        for targetpath in _imap_threads(
+                lambda member: self._extract_member(member, path, pwd),
+                infos.values(), workers):
+            pass
 
     def _extract_member(self, member, targetpath, pwd):
         """Extract the ZipInfo object 'member' to a physical
@@ -972,14 +1154,23 @@ class ZipFile:
 
         targetpath = os.path.normpath(targetpath)
 
-        # Create all upper directories if necessary.
+        # Create all upper directories if necessary.  Another thread of
+        # extractall() may be creating them at the same time.
         upperdirs = os.path.dirname(targetpath)
         if upperdirs and not os.path.exists(upperdirs):
-            os.makedirs(upperdirs)
+            try:
+                os.makedirs(upperdirs)
+            except OSError as e:
+                if e.errno != errno.EEXIST or not os.path.isdir(upperdirs):
+                    raise
 
         if member.filename[-1] == '/':
             if not os.path.isdir(targetpath):
-                os.mkdir(targetpath)
+                try:
+                    os.mkdir(targetpath)
+                except OSError as e:
+                    if e.errno != errno.EEXIST:
+                        raise
             return targetpath
 
         source = self.open(member, pwd=pwd)
@@ -1013,13 +1204,9 @@ class ZipFile:
                 raise LargeZipFile(
                       "Zipfile size would require ZIP64 extensions")
 
-    def write(self, filename, arcname=None, compress_type=None):
-        """Put the bytes from filename into the archive under the name
-        arcname."""
-        if not self.fp:
-            raise RuntimeError(
-                  "Attempt to write to ZIP archive that was already closed")
-
+    def _fileInfo(self, filename, arcname, compress_type):
+        """Return a ZipInfo instance for the file filename, and whether it
+        is a directory."""
         st = os.stat(filename)
         isdir = stat.S_ISDIR(st.st_mode)
         mtime = time.localtime(st.st_mtime)
@@ -1041,6 +1228,16 @@ class ZipFile:
 
         zinfo.file_size = st.st_size
         zinfo.flag_bits = 0x00
+        return zinfo, isdir
+
+    def write(self, filename, arcname=None, compress_type=None):
+        """Put the bytes from filename into the archive under the name
+        arcname."""
+        if not self.fp:
+            raise RuntimeError(
+                  "Attempt to write to ZIP archive that was already closed")
+
+        zinfo, isdir = self._fileInfo(filename, arcname, compress_type)
         zinfo.header_offset = self.fp.tell()    # Start of header bytes
 
         self._writecheck(zinfo)
@@ -1094,6 +1291,76 @@ class ZipFile:
         self.filelist.append(zinfo)
         self.NameToInfo[zinfo.filename] = zinfo
 
+    def writeall(self, files, compress_type=None, workers=None):
+        """Put the bytes of several files into the archive.  `files' is an
+        iterable of file names or of (filename, arcname) pairs.  If `workers'
+        is more than 1, the files are read and compressed on that many
+        threads, into temporary files, and then appended to the archive in
+        order."""
+        if not workers or workers <= 1 or threading is None:
+            for filename in files:
+                if isinstance(filename, str):
+                    self.write(filename, compress_type=compress_type)
+                else:
+                    self.write(filename[0], filename[1], compress_type)
+            return
+        if not self.fp:
+            raise RuntimeError(
+                  "Attempt to write to ZIP archive that was already closed")
+        if compress_type == ZIP_DEFLATED and not zlib:
+            raise RuntimeError(
+                  "Compression requires the (missing) zlib module")
+
+        def compress(filename):
+            if isinstance(filename, str):
+                zinfo, isdir = self._fileInfo(filename, None, compress_type)
+            else:
+                zinfo, isdir = self._fileInfo(filename[0], filename[1],
+                                              compress_type)
+                filename = filename[0]
+            zinfo.CRC = zinfo.compress_size = zinfo.file_size = 0
+            if isdir:
+                return zinfo, None
+            if zinfo.compress_type == ZIP_DEFLATED:
+                cmpr = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION,
+                     zlib.DEFLATED, -15)
+            else:
+                cmpr = None
+            data = tempfile.SpooledTemporaryFile(max_size=2 ** 20)
+            try:
+                with open(filename, "rb") as fp:
+                    while 1:
+                        buf = fp.read(1024 * 64)
+                        if not buf:
+                            break
+                        zinfo.file_size += len(buf)
+                        zinfo.CRC = crc32(buf, zinfo.CRC) & 0xffffffff
+                        if cmpr:
+                            buf = cmpr.compress(buf)
+                        data.write(buf)
+                if cmpr:
+                    data.write(cmpr.flush())
+                zinfo.compress_size = data.tell()
+                data.seek(0)
+            except:
+                data.close()
+                raise
+            return zinfo, data
+
+        for zinfo, data in _imap_threads(compress, files, workers):
+            try:
+                zinfo.header_offset = self.fp.tell()    # Start of header bytes
+                self._writecheck(zinfo)
+                self._didModify = True
+                self.fp.write(zinfo.FileHeader())
+                if data is not None:
+                    shutil.copyfileobj(data, self.fp)
+            finally:
+                if data is not None:
+                    data.close()
+            self.filelist.append(zinfo)
+            self.NameToInfo[zinfo.filename] = zinfo
+
     def writestr(self, zinfo_or_arcname, data):
         """Write a file into the archive.  The contents is 'data', which
         may be either a 'str' or a 'bytes' instance; if it is a 'str',
@@ -1144,6 +1411,7 @@ class ZipFile:
     def close(self):
         """Close the file, and for mode "w" and "a" write the ending
         records."""
+        self._closeDirectory()
         if self.fp is None:
             return
 
@@ -542,6 +542,8 @@ static PyObject *
 _bufferedreader_read_fast(buffered *self, Py_ssize_t);
 static PyObject *
 _bufferedreader_read_generic(buffered *self, Py_ssize_t);
+static Py_ssize_t
+_bufferedreader_readinto_generic(buffered *self, char *out, Py_ssize_t n);
 
 
 /*
@@ -815,22 +817,36 @@ end:
 static PyObject *
 buffered_readinto(buffered *self, PyObject *args)
 {
+    Py_buffer buf;
+    Py_ssize_t n;
     PyObject *res = NULL;
 
     CHECK_INITIALIZED(self)
-    
-    /* TODO: use raw.readinto() instead! */
+    CHECK_CLOSED(self, "readinto of closed file")
+    if (!PyArg_ParseTuple(args, "w*:readinto", &buf)) {
+        return NULL;
+    }
+
+    /* The data is copied straight from the buffer, or read with
+       raw.readinto() into the caller's buffer: no bytes object is made. */
+    ENTER_BUFFERED(self)
     if (self->writable) {
-        ENTER_BUFFERED(self)
         res = _bufferedwriter_flush_unlocked(self, 0);
-        LEAVE_BUFFERED(self)
         if (res == NULL)
             goto end;
-        Py_DECREF(res);
+        Py_CLEAR(res);
+    }
+    n = _bufferedreader_readinto_generic(self, buf.buf, buf.len);
+    if (n == -2) {
+        Py_INCREF(Py_None);
+        res = Py_None;
     }
-    res = bufferediobase_readinto((PyObject *)self, args);
+    else if (n >= 0)
+        res = PyLong_FromSsize_t(n);
 
 end:
+    LEAVE_BUFFERED(self)
+    PyBuffer_Release(&buf);
     return res;
 }
 
@@ -1330,24 +1346,23 @@ _bufferedreader_read_fast(buffered *self, Py_ssize_t n)
     Py_RETURN_NONE;
 }
 
-/* Generic read function: read from the stream until enough bytes are read,
- * or until an EOF occurs or until read() would block.
+/* Generic read function: read from the stream into out until n bytes are
+ * read, or until an EOF occurs or until read() would block.  Whole blocks
+ * are read directly into out, bypassing the buffer.  Return the number of
+ * bytes read, -2 if read() would block before anything was read, or -1 on
+ * error.
  */
-static PyObject *
-_bufferedreader_read_generic(buffered *self, Py_ssize_t n)
+static Py_ssize_t
+_bufferedreader_readinto_generic(buffered *self, char *out, Py_ssize_t n)
 {
-    PyObject *res = NULL;
     Py_ssize_t current_size, remaining, written;
-    char *out;
 
     current_size = Py_SAFE_DOWNCAST(READAHEAD(self), Py_off_t, Py_ssize_t);
-    if (n <= current_size)
-        return _bufferedreader_read_fast(self, n);
-
-    res = PyBytes_FromStringAndSize(NULL, n);
-    if (res == NULL)
-        goto error;
-    out = PyBytes_AS_STRING(res);
+    if (n <= current_size) {
+        memcpy(out, self->buffer + self->pos, n);
+        self->pos += n;
+        return n;
+    }
     remaining = n;
     written = 0;
     if (current_size > 0) {
@@ -1364,17 +1379,12 @@ _bufferedreader_read_generic(buffered *self, Py_ssize_t n)
             break;
         r = _bufferedreader_raw_read(self, out + written, r);
         if (r == -1)
-            goto error;
+            return -1;
         if (r == 0 || r == -2) {
             /* EOF occurred or read() would block. */
-            if (r == 0 || written > 0) {
-                if (_PyBytes_Resize(&res, written))
-                    goto error;
-                return res;
-            }
-            Py_DECREF(res);
-            Py_INCREF(Py_None);
-            return Py_None;
+            if (r == 0 || written > 0)
+                return written;
+            return -2;
         }
         remaining -= r;
         written += r;
@@ -1386,17 +1396,12 @@ _bufferedreader_read_generic(buffered *self, Py_ssize_t n)
     while (self->read_end < self->buffer_size) {
         Py_ssize_t r = _bufferedreader_fill_buffer(self);
         if (r == -1)
-            goto error;
+            return -1;
         if (r == 0 || r == -2) {
             /* EOF occurred or read() would block. */
-            if (r == 0 || written > 0) {
-                if (_PyBytes_Resize(&res, written))
-                    goto error;
-                return res;
-            }
-            Py_DECREF(res);
-            Py_INCREF(Py_None);
-            return Py_None;
+            if (r == 0 || written > 0)
+                return written;
+            return -2;
         }
         if (remaining > r) {
             memcpy(out + written, self->buffer + self->pos, r);
@@ -1414,11 +1419,33 @@ _bufferedreader_read_generic(buffered *self, Py_ssize_t n)
             break;
     }
 
-    return res;
+    return written;
+}
 
-error:
-    Py_XDECREF(res);
-    return NULL;
+static PyObject *
+_bufferedreader_read_generic(buffered *self, Py_ssize_t n)
+{
+    PyObject *res;
+    Py_ssize_t written;
+
+    if (n <= Py_SAFE_DOWNCAST(READAHEAD(self), Py_off_t, Py_ssize_t))
+        return _bufferedreader_read_fast(self, n);
+
+    res = PyBytes_FromStringAndSize(NULL, n);
+    if (res == NULL)
+        return NULL;
+    written = _bufferedreader_readinto_generic(self, PyBytes_AS_STRING(res), n);
+    if (written == -1) {
+        Py_DECREF(res);
+        return NULL;
+    }
+    if (written == -2) {
+        Py_DECREF(res);
+        Py_RETURN_NONE;
+    }
+    if (written < n && _PyBytes_Resize(&res, written))
+        return NULL;
+    return res;
 }
 
 static PyObject *
@@ -1462,6 +1489,7 @@ static PyMethodDef bufferedreader_methods[] = {
     {"read", (PyCFunction)buffered_read, METH_VARARGS},
     {"peek", (PyCFunction)buffered_peek, METH_VARARGS},
     {"read1", (PyCFunction)buffered_read1, METH_VARARGS},
+    {"readinto", (PyCFunction)buffered_readinto, METH_VARARGS},
     {"readline", (PyCFunction)buffered_readline, METH_VARARGS},
     {"seek", (PyCFunction)buffered_seek, METH_VARARGS},
     {"tell", (PyCFunction)buffered_tell, METH_NOARGS},
@@ -60,6 +60,12 @@ typedef struct _PyEncoderObject {
     PyObject *skipkeys;
     int fast_encode;
     int allow_nan;
+    Py_ssize_t indent_width;
+    /* Only set while encoding to a stream: the write callable, the size of
+       the blocks passed to it and the size of the chunks in rval */
+    PyObject *write;
+    Py_ssize_t buffer_size;
+    Py_ssize_t pending;
 } PyEncoderObject;
 
 static PyMemberDef encoder_members[] = {
@@ -1112,6 +1118,7 @@ encoder_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
         s->item_separator = NULL;
         s->sort_keys = NULL;
         s->skipkeys = NULL;
+        s->write = NULL;
     }
     return (PyObject *)s;
 }
@@ -1142,6 +1149,36 @@ encoder_init(PyObject *self, PyObject *args, PyObject *kwds)
     Py_INCREF(s->skipkeys);
     s->fast_encode = (PyCFunction_Check(s->encoder) && PyCFunction_GetFunction(s->encoder) == (PyCFunction)py_encode_basestring_ascii);
     s->allow_nan = PyObject_IsTrue(allow_nan);
+    s->indent_width = 0;
+    if (s->indent != Py_None) {
+        s->indent_width = PyNumber_AsSsize_t(s->indent, PyExc_OverflowError);
+        if (s->indent_width == -1 && PyErr_Occurred())
+            return -1;
+    }
+    return 0;
+}
+
+static int
+encoder_flush(PyEncoderObject *s, PyObject *rval)
+{
+    /* Pass the chunks in rval to s->write as one string and clear rval */
+    PyObject *joined;
+    PyObject *res;
+    if (PyList_GET_SIZE(rval) == 0)
+        return 0;
+    joined = join_list_unicode(rval);
+    if (joined == NULL)
+        return -1;
+    if (PyList_SetSlice(rval, 0, PyList_GET_SIZE(rval), NULL)) {
+        Py_DECREF(joined);
+        return -1;
+    }
+    s->pending = 0;
+    res = PyObject_CallFunctionObjArgs(s->write, joined, NULL);
+    Py_DECREF(joined);
+    if (res == NULL)
+        return -1;
+    Py_DECREF(res);
     return 0;
 }
 
@@ -1149,24 +1186,54 @@ static PyObject *
 encoder_call(PyObject *self, PyObject *args, PyObject *kwds)
 {
     /* Python callable interface to encode_listencode_obj */
-    static char *kwlist[] = {"obj", "_current_indent_level", NULL};
+    static char *kwlist[] = {"obj", "_current_indent_level", "write", "buffer_size", NULL};
     PyObject *obj;
     PyObject *rval;
+    PyObject *write = Py_None;
+    PyObject *old_write;
+    Py_ssize_t old_buffer_size, old_pending;
     Py_ssize_t indent_level;
+    Py_ssize_t buffer_size = 65536;
     PyEncoderObject *s;
+    int rv;
     assert(PyEncoder_Check(self));
     s = (PyEncoderObject *)self;
-    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO&:_iterencode", kwlist,
-        &obj, _convertPyInt_AsSsize_t, &indent_level))
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "OO&|OO&:_iterencode", kwlist,
+        &obj, _convertPyInt_AsSsize_t, &indent_level,
+        &write, _convertPyInt_AsSsize_t, &buffer_size))
         return NULL;
     rval = PyList_New(0);
     if (rval == NULL)
         return NULL;
-    if (encoder_listencode_obj(s, rval, obj, indent_level)) {
-        Py_DECREF(rval);
+    if (write == Py_None) {
+        if (encoder_listencode_obj(s, rval, obj, indent_level)) {
+            Py_DECREF(rval);
+            return NULL;
+        }
+        return rval;
+    }
+
+    /* Write the output in blocks of at least buffer_size characters,
+       keeping only the current block in memory.  The state of any
+       encoding in progress (from a default function) is restored after. */
+    old_write = s->write;
+    old_buffer_size = s->buffer_size;
+    old_pending = s->pending;
+    Py_INCREF(write);
+    s->write = write;
+    s->buffer_size = buffer_size;
+    s->pending = 0;
+    rv = encoder_listencode_obj(s, rval, obj, indent_level);
+    if (rv == 0)
+        rv = encoder_flush(s, rval);
+    s->write = old_write;
+    s->buffer_size = old_buffer_size;
+    s->pending = old_pending;
+    Py_DECREF(write);
+    Py_DECREF(rval);
+    if (rv)
         return NULL;
-    }
-    return rval;
+    Py_RETURN_NONE;
 }
 
 static PyObject *
@@ -1238,11 +1305,46 @@ encoder_encode_string(PyEncoderObject *s, PyObject *obj)
 }
 
 static int
-_steal_list_append(PyObject *lst, PyObject *stolen)
+encoder_append(PyEncoderObject *s, PyObject *rval, PyObject *chunk)
+{
+    /* Append chunk to rval, writing out rval if it has grown large enough */
+    if (PyList_Append(rval, chunk))
+        return -1;
+    if (s->write != NULL) {
+        if (PyUnicode_Check(chunk))
+            s->pending += PyUnicode_GET_SIZE(chunk);
+        if (s->pending >= s->buffer_size)
+            return encoder_flush(s, rval);
+    }
+    return 0;
+}
+
+static int
+encoder_steal_append(PyEncoderObject *s, PyObject *rval, PyObject *stolen)
 {
     /* Append stolen and then decrement its reference count */
-    int rval = PyList_Append(lst, stolen);
+    int rv = encoder_append(s, rval, stolen);
     Py_DECREF(stolen);
+    return rv;
+}
+
+static PyObject *
+encoder_newline_indent(PyEncoderObject *s, Py_ssize_t indent_level)
+{
+    /* Return '\n' + (' ' * (indent * indent_level)) */
+    PyObject *rval;
+    Py_UNICODE *p;
+    Py_ssize_t i, n;
+    n = s->indent_width * indent_level;
+    if (n < 0)
+        n = 0;
+    rval = PyUnicode_FromUnicode(NULL, n + 1);
+    if (rval == NULL)
+        return NULL;
+    p = PyUnicode_AS_UNICODE(rval);
+    p[0] = '\n';
+    for (i = 1; i <= n; i++)
+        p[i] = ' ';
     return rval;
 }
 
@@ -1257,26 +1359,26 @@ encoder_listencode_obj(PyEncoderObject *s, PyObject *rval, PyObject *obj, Py_ssi
         PyObject *cstr = _encoded_const(obj);
         if (cstr == NULL)
             return -1;
-        return _steal_list_append(rval, cstr);
+        return encoder_steal_append(s, rval, cstr);
     }
     else if (PyUnicode_Check(obj))
     {
         PyObject *encoded = encoder_encode_string(s, obj);
         if (encoded == NULL)
             return -1;
-        return _steal_list_append(rval, encoded);
+        return encoder_steal_append(s, rval, encoded);
     }
     else if (PyLong_Check(obj)) {
         PyObject *encoded = PyObject_Str(obj);
         if (encoded == NULL)
             return -1;
-        return _steal_list_append(rval, encoded);
+        return encoder_steal_append(s, rval, encoded);
     }
     else if (PyFloat_Check(obj)) {
         PyObject *encoded = encoder_encode_float(s, obj);
         if (encoded == NULL)
             return -1;
-        return _steal_list_append(rval, encoded);
+        return encoder_steal_append(s, rval, encoded);
     }
     else if (PyList_Check(obj) || PyTuple_Check(obj)) {
         return encoder_listencode_list(s, rval, obj, indent_level);
@@ -1337,6 +1439,8 @@ encoder_listencode_dict(PyEncoderObject *s, PyObject *rval, PyObject *dct, Py_ss
     PyObject *it = NULL;
     PyObject *items;
     PyObject *item = NULL;
+    PyObject *newline_indent = NULL;
+    PyObject *separator = NULL;
     int skipkeys;
     Py_ssize_t idx;
     PyObject *mapping;
@@ -1350,7 +1454,7 @@ encoder_listencode_dict(PyEncoderObject *s, PyObject *rval, PyObject *dct, Py_ss
             return -1;
     }
     if (Py_SIZE(dct) == 0)
-        return PyList_Append(rval, empty_dict);
+        return encoder_append(s, rval, empty_dict);
 
     if (s->markers != Py_None) {
         int has_key;
@@ -1368,17 +1472,23 @@ encoder_listencode_dict(PyEncoderObject *s, PyObject *rval, PyObject *dct, Py_ss
         }
     }
 
-    if (PyList_Append(rval, open_dict))
+    if (encoder_append(s, rval, open_dict))
         goto bail;
 
     if (s->indent != Py_None) {
-        /* TODO: DOES NOT RUN */
         indent_level += 1;
-        /*
-            newline_indent = '\n' + (' ' * (_indent * _current_indent_level))
-            separator = _item_separator + newline_indent
-            buf += newline_indent
-        */
+        newline_indent = encoder_newline_indent(s, indent_level);
+        if (newline_indent == NULL)
+            goto bail;
+        separator = PyUnicode_Concat(s->item_separator, newline_indent);
+        if (separator == NULL)
+            goto bail;
+        if (encoder_append(s, rval, newline_indent))
+            goto bail;
+    }
+    else {
+        Py_INCREF(s->item_separator);
+        separator = s->item_separator;
     }
 
     if (PyObject_IsTrue(s->sort_keys)) {
@@ -1442,13 +1552,12 @@ encoder_listencode_dict(PyEncoderObject *s, PyObject *rval, PyObject *dct, Py_ss
             continue;
         }
         else {
-            /* TODO: include repr of key */
-            PyErr_SetString(PyExc_ValueError, "keys must be a string");
+            PyErr_Format(PyExc_TypeError, "key %R is not a string", key);
             goto bail;
         }
 
         if (idx) {
-            if (PyList_Append(rval, s->item_separator))
+            if (encoder_append(s, rval, separator))
                 goto bail;
         }
 
@@ -1456,12 +1565,12 @@ encoder_listencode_dict(PyEncoderObject *s, PyObject *rval, PyObject *dct, Py_ss
         Py_CLEAR(kstr);
         if (encoded == NULL)
             goto bail;
-        if (PyList_Append(rval, encoded)) {
+        if (encoder_append(s, rval, encoded)) {
             Py_DECREF(encoded);
             goto bail;
         }
         Py_DECREF(encoded);
-        if (PyList_Append(rval, s->key_separator))
+        if (encoder_append(s, rval, s->key_separator))
             goto bail;
 
         value = PyTuple_GET_ITEM(item, 1);
@@ -1480,13 +1589,17 @@ encoder_listencode_dict(PyEncoderObject *s, PyObject *rval, PyObject *dct, Py_ss
         Py_CLEAR(ident);
     }
     if (s->indent != Py_None) {
-        /* TODO: DOES NOT RUN */
         indent_level -= 1;
-        /*
-            yield '\n' + (' ' * (_indent * _current_indent_level))
-        */
+        Py_CLEAR(newline_indent);
+        newline_indent = encoder_newline_indent(s, indent_level);
+        if (newline_indent == NULL)
+            goto bail;
+        if (encoder_append(s, rval, newline_indent))
+            goto bail;
+        Py_CLEAR(newline_indent);
     }
-    if (PyList_Append(rval, close_dict))
+    Py_CLEAR(separator);
+    if (encoder_append(s, rval, close_dict))
         goto bail;
     return 0;
 
@@ -1495,6 +1608,8 @@ bail:
     Py_XDECREF(item);
     Py_XDECREF(kstr);
     Py_XDECREF(ident);
+    Py_XDECREF(newline_indent);
+    Py_XDECREF(separator);
     return -1;
 }
 
@@ -1510,6 +1625,8 @@ encoder_listencode_list(PyEncoderObject *s, PyObject *rval, PyObject *seq, Py_ss
     PyObject *s_fast = NULL;
     Py_ssize_t num_items;
     PyObject **seq_items;
+    PyObject *newline_indent = NULL;
+    PyObject *separator = NULL;
     Py_ssize_t i;
 
     if (open_array == NULL || close_array == NULL || empty_array == NULL) {
@@ -1526,7 +1643,7 @@ encoder_listencode_list(PyEncoderObject *s, PyObject *rval, PyObject *seq, Py_ss
     num_items = PySequence_Fast_GET_SIZE(s_fast);
     if (num_items == 0) {
         Py_DECREF(s_fast);
-        return PyList_Append(rval, empty_array);
+        return encoder_append(s, rval, empty_array);
     }
 
     if (s->markers != Py_None) {
@@ -1546,21 +1663,27 @@ encoder_listencode_list(PyEncoderObject *s, PyObject *rval, PyObject *seq, Py_ss
     }
 
     seq_items = PySequence_Fast_ITEMS(s_fast);
-    if (PyList_Append(rval, open_array))
+    if (encoder_append(s, rval, open_array))
         goto bail;
     if (s->indent != Py_None) {
-        /* TODO: DOES NOT RUN */
         indent_level += 1;
-        /*
-            newline_indent = '\n' + (' ' * (_indent * _current_indent_level))
-            separator = _item_separator + newline_indent
-            buf += newline_indent
-        */
+        newline_indent = encoder_newline_indent(s, indent_level);
+        if (newline_indent == NULL)
+            goto bail;
+        separator = PyUnicode_Concat(s->item_separator, newline_indent);
+        if (separator == NULL)
+            goto bail;
+        if (encoder_append(s, rval, newline_indent))
+            goto bail;
+    }
+    else {
+        Py_INCREF(s->item_separator);
+        separator = s->item_separator;
     }
     for (i = 0; i < num_items; i++) {
         PyObject *obj = seq_items[i];
         if (i) {
-            if (PyList_Append(rval, s->item_separator))
+            if (encoder_append(s, rval, separator))
                 goto bail;
         }
         if (encoder_listencode_obj(s, rval, obj, indent_level))
@@ -1572,19 +1695,25 @@ encoder_listencode_list(PyEncoderObject *s, PyObject *rval, PyObject *seq, Py_ss
         Py_CLEAR(ident);
     }
     if (s->indent != Py_None) {
-        /* TODO: DOES NOT RUN */
         indent_level -= 1;
-        /*
-            yield '\n' + (' ' * (_indent * _current_indent_level))
-        */
+        Py_CLEAR(newline_indent);
+        newline_indent = encoder_newline_indent(s, indent_level);
+        if (newline_indent == NULL)
+            goto bail;
+        if (encoder_append(s, rval, newline_indent))
+            goto bail;
+        Py_CLEAR(newline_indent);
     }
-    if (PyList_Append(rval, close_array))
+    Py_CLEAR(separator);
+    if (encoder_append(s, rval, close_array))
         goto bail;
     Py_DECREF(s_fast);
     return 0;
 
 bail:
     Py_XDECREF(ident);
+    Py_XDECREF(newline_indent);
+    Py_XDECREF(separator);
     Py_DECREF(s_fast);
     return -1;
 }
@@ -1632,7 +1761,10 @@ encoder_clear(PyObject *self)
     return 0;
 }
 
-PyDoc_STRVAR(encoder_doc, "_iterencode(obj, _current_indent_level) -> iterable");
+PyDoc_STRVAR(encoder_doc, "_iterencode(obj, _current_indent_level[, write, buffer_size]) -> iterable\n\
+\n\
+If write is given, it is called with the encoded text in blocks of about\n\
+buffer_size characters, and None is returned.");
 
 static
 PyTypeObject PyEncoderType = {
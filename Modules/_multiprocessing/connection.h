@@ -264,21 +264,81 @@ _error:
  * Functions for transferring objects
  */
 
+/*
+ * Large buffers found while pickling an object are sent after the pickle,
+ * one message each, without copying them.  Their number is appended to
+ * the pickle as a 4 byte little-endian integer followed by a NUL byte;
+ * since a pickle always ends with the STOP opcode '.', the receiver can
+ * tell whether such a trailer is present.  The unpickler ignores any data
+ * after STOP.
+ */
+
+#define OOB_TRAILER_SIZE 5
+
+static PyObject *
+connection_buffer_callback(PyObject *buffers, PyObject *view)
+{
+	if (PyMemoryView_Check(view) &&
+	    PyMemoryView_GET_BUFFER(view)->len >= CONNECTION_OOB_MIN_SIZE) {
+		if (PyList_Append(buffers, view) < 0)
+			return NULL;
+		Py_RETURN_FALSE;
+	}
+	Py_RETURN_TRUE;
+}
+
+static PyMethodDef connection_buffer_callback_def = {
+	"buffer_callback", (PyCFunction)connection_buffer_callback, METH_O
+};
+
 static PyObject *
 connection_send_obj(ConnectionObject *self, PyObject *obj)
 {
 	char *buffer;
 	int res;
-	Py_ssize_t length;
-	PyObject *pickled_string = NULL;
+	Py_ssize_t length, i, nbuffers;
+	PyObject *pickled_string = NULL, *buffers = NULL;
+	PyObject *callback = NULL, *args = NULL, *kwds = NULL;
 
 	CHECK_WRITABLE(self);
 
-	pickled_string = PyObject_CallFunctionObjArgs(pickle_dumps, obj, 
-						      pickle_protocol, NULL);
+	buffers = PyList_New(0);
+	if (!buffers)
+		goto failure;
+	callback = PyCFunction_New(&connection_buffer_callback_def, buffers);
+	if (!callback)
+		goto failure;
+	args = PyTuple_Pack(2, obj, pickle_protocol);
+	kwds = Py_BuildValue("{sO}", "buffer_callback", callback);
+	if (!args || !kwds)
+		goto failure;
+
+	pickled_string = PyObject_Call(pickle_dumps, args, kwds);
 	if (!pickled_string)
 		goto failure;
 
+	nbuffers = PyList_GET_SIZE(buffers);
+	if (nbuffers > 0) {
+		PyObject *message;
+		unsigned char *trailer;
+
+		length = PyBytes_GET_SIZE(pickled_string);
+		message = PyBytes_FromStringAndSize(NULL,
+						    length + OOB_TRAILER_SIZE);
+		if (!message)
+			goto failure;
+		memcpy(PyBytes_AS_STRING(message),
+		       PyBytes_AS_STRING(pickled_string), length);
+		trailer = (unsigned char *)PyBytes_AS_STRING(message) + length;
+		trailer[0] = (unsigned char)(nbuffers & 0xff);
+		trailer[1] = (unsigned char)((nbuffers >> 8) & 0xff);
+		trailer[2] = (unsigned char)((nbuffers >> 16) & 0xff);
+		trailer[3] = (unsigned char)((nbuffers >> 24) & 0xff);
+		trailer[4] = '\0';
+		Py_DECREF(pickled_string);
+		pickled_string = message;
+	}
+
 	if (PyBytes_AsStringAndSize(pickled_string, &buffer, &length) < 0)
 		goto failure;
 
@@ -289,11 +349,33 @@ connection_send_obj(ConnectionObject *self, PyObject *obj)
 		goto failure;
 	}
 
+	for (i = 0; i < nbuffers; i++) {
+		Py_buffer view;
+
+		if (PyObject_GetBuffer(PyList_GET_ITEM(buffers, i), &view,
+				       PyBUF_SIMPLE) < 0)
+			goto failure;
+		res = conn_send_string(self, view.buf, view.len);
+		PyBuffer_Release(&view);
+		if (res < 0) {
+			mp_SetError(PyExc_IOError, res);
+			goto failure;
+		}
+	}
+
 	Py_XDECREF(pickled_string);
+	Py_XDECREF(buffers);
+	Py_XDECREF(callback);
+	Py_XDECREF(args);
+	Py_XDECREF(kwds);
 	Py_RETURN_NONE;
 
   failure:
 	Py_XDECREF(pickled_string);
+	Py_XDECREF(buffers);
+	Py_XDECREF(callback);
+	Py_XDECREF(args);
+	Py_XDECREF(kwds);
 	return NULL;
 }
 
@@ -330,7 +412,44 @@ connection_recv_obj(ConnectionObject *self)
 		}
 	}
 
-	if (temp)
+	if (temp && PyBytes_GET_SIZE(temp) > OOB_TRAILER_SIZE &&
+	    PyBytes_AS_STRING(temp)[PyBytes_GET_SIZE(temp) - 1] != '.') {
+		/* Receive all the out-of-band buffers before unpickling,
+		   so that the connection stays usable if that fails */
+		PyObject *buffers = NULL, *args = NULL, *kwds = NULL;
+		unsigned char *trailer;
+		Py_ssize_t i, nbuffers;
+
+		trailer = (unsigned char *)PyBytes_AS_STRING(temp) +
+			PyBytes_GET_SIZE(temp) - OOB_TRAILER_SIZE;
+		nbuffers = trailer[0] | (trailer[1] << 8) |
+			(trailer[2] << 16) | ((Py_ssize_t)trailer[3] << 24);
+		buffers = PyList_New(nbuffers);
+		args = PyTuple_New(0);
+		if (buffers && args) {
+			for (i = 0; i < nbuffers; i++) {
+				PyObject *item;
+
+				item = connection_recvbytes(self, args);
+				if (!item)
+					break;
+				PyList_SET_ITEM(buffers, i, item);
+			}
+			if (i == nbuffers) {
+				kwds = Py_BuildValue("{sO}", "buffers",
+						     buffers);
+				Py_DECREF(args);
+				args = PyTuple_Pack(1, temp);
+				if (kwds && args)
+					result = PyObject_Call(pickle_loads,
+							       args, kwds);
+			}
+		}
+		Py_XDECREF(buffers);
+		Py_XDECREF(args);
+		Py_XDECREF(kwds);
+	}
+	else if (temp)
 		result = PyObject_CallFunctionObjArgs(pickle_loads, 
 						      temp, NULL);
 	Py_XDECREF(temp);
@@ -161,6 +161,10 @@ extern HANDLE sigint_event;
 
 #define CONNECTION_BUFFER_SIZE 1024
 
+/* Data of at least this size is sent by Connection.send() as separate
+   out-of-band messages rather than being copied into the pickle */
+#define CONNECTION_OOB_MIN_SIZE (16*1024)
+
 typedef struct {
 	PyObject_HEAD
 	HANDLE handle;
@@ -16,8 +16,13 @@
 #  define WRITE(h, buffer, length) write(h, buffer, length)
 #  define READ(h, buffer, length) read(h, buffer, length)
 #  define CLOSE(h) close(h)
+#  if defined(HAVE_WRITEV) && defined(HAVE_SYS_UIO_H)
+#    include <sys/uio.h>
+#    define HAVE_CONN_WRITEV
+#  endif
 #endif
 
+#ifndef HAVE_CONN_WRITEV
 /*
  * Send string to file descriptor
  */
@@ -39,6 +44,42 @@ _conn_sendall(HANDLE h, char *string, size_t length)
 	return MP_SUCCESS;
 }
 
+#else
+/*
+ * Send a header and a string with writev(), without joining them
+ */
+
+static Py_ssize_t
+_conn_sendall_with_header(HANDLE h, char *header, size_t header_length,
+			  char *string, size_t length)
+{
+	struct iovec iov[2];
+	Py_ssize_t res;
+
+	iov[0].iov_base = header;
+	iov[0].iov_len = header_length;
+	iov[1].iov_base = string;
+	iov[1].iov_len = length;
+	while (iov[0].iov_len + iov[1].iov_len > 0) {
+		res = writev(h, iov, 2);
+		if (res < 0)
+			return MP_SOCKET_ERROR;
+		if ((size_t)res < iov[0].iov_len) {
+			iov[0].iov_base = (char *)iov[0].iov_base + res;
+			iov[0].iov_len -= res;
+		}
+		else {
+			res -= iov[0].iov_len;
+			iov[0].iov_len = 0;
+			iov[1].iov_base = (char *)iov[1].iov_base + res;
+			iov[1].iov_len -= res;
+		}
+	}
+
+	return MP_SUCCESS;
+}
+#endif
+
 /*
  * Receive string of exact length from file descriptor 
  */
@@ -74,6 +115,21 @@ static Py_ssize_t
 conn_send_string(ConnectionObject *conn, char *string, size_t length)
 {
 	Py_ssize_t res;
+#ifdef HAVE_CONN_WRITEV
+	/* The "header" of the message is a 32 bit unsigned number (in
+	   network order) which specifies the length of the "body".  Both
+	   go to the kernel in one call, however large the body is. */
+	UINT32 lenbuff;
+
+	if (length > MAX_MESSAGE_LENGTH)
+		return MP_BAD_MESSAGE_LENGTH;
+
+	lenbuff = htonl((UINT32)length);
+	Py_BEGIN_ALLOW_THREADS
+	res = _conn_sendall_with_header(conn->handle, (char*)&lenbuff, 4,
+					string, length);
+	Py_END_ALLOW_THREADS
+#else
 	/* The "header" of the message is a 32 bit unsigned number (in
 	   network order) which specifies the length of the "body".  If
 	   the message is shorter than about 16kb then it is quicker to
@@ -104,6 +160,7 @@ conn_send_string(ConnectionObject *conn, char *string, size_t length)
 			_conn_sendall(conn->handle, string, length);
 		Py_END_ALLOW_THREADS
 	}
+#endif
 	return res;
 }
 
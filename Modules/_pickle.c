@@ -73,6 +73,10 @@ enum opcode {
     /* Protocol 3 (Python 3.x) */
     BINBYTES       = 'B',
     SHORT_BINBYTES = 'C',
+
+    /* Out-of-band data (protocol 3, only written when a buffer_callback is
+       given) */
+    NEXT_BUFFER    = '\x97',
 };
 
 /* These aren't opcodes -- they're ways to pickle bools before protocol 2
@@ -99,6 +103,10 @@ enum {
     /* Size of the write buffer of Pickler. Higher values will reduce the
        number of calls to the write() method of the output stream. */
     WRITE_BUF_SIZE = 256,
+
+    /* Pickler.dumps() builds the whole pickle in the write buffer and keeps
+       the buffer for the next call, unless it grew larger than this. */
+    MAX_KEPT_BUF_SIZE = 1 << 20,
 };
 
 /* Exception classes for pickle. These should override the ones defined in
@@ -109,6 +117,8 @@ static PyObject *UnpicklingError = NULL;
 
 /* copyreg.dispatch_table, {type_object: pickling_function} */
 static PyObject *dispatch_table = NULL;
+/* copyreg._buffer_registry, {type_object: reduction_function} */
+static PyObject *buffer_registry = NULL;
 /* For EXT[124] opcodes. */
 /* copyreg._extension_registry, {(module_name, function_name): code} */
 static PyObject *extension_registry = NULL;
@@ -312,10 +322,13 @@ typedef struct PicklerObject {
     PyObject *arg;
     int proto;                  /* Pickle protocol number, >= 0 */
     int bin;                    /* Boolean, true if proto > 0 */
-    int buf_size;               /* Size of the current buffered pickle data */
+    Py_ssize_t buf_size;        /* Size of the current buffered pickle data */
     char *write_buf;            /* Write buffer, this is to avoid calling the
                                    write() method of the output stream too
                                    often. */
+    Py_ssize_t write_buf_size;  /* Allocated size of write_buf */
+    int to_bytes;               /* Set by dumps(): keep all the pickle data
+                                   in write_buf, growing it as needed. */
     int fast;                   /* Enable fast mode if set to a true value.
                                    The fast mode disable the usage of memo,
                                    therefore speeding the pickling process by
@@ -326,6 +339,8 @@ typedef struct PicklerObject {
     int fix_imports;            /* Indicate whether Pickler should fix
                                    the name of globals for Python 2.x. */
     PyObject *fast_memo;
+    PyObject *buffer_callback;  /* Callable deciding whether buffers are
+                                   sent out-of-band, can be NULL. */
 } PicklerObject;
 
 typedef struct UnpicklerObject {
@@ -353,6 +368,13 @@ typedef struct UnpicklerObject {
     int proto;                  /* Protocol of the pickle loaded. */
     int fix_imports;            /* Indicate whether Unpickler should fix
                                    the name of globals pickled by Python 2.x. */
+    PyObject *buffers;          /* Iterator over the out-of-band buffers,
+                                   can be NULL. */
+    Py_buffer input;            /* Data given to loads(), read directly
+                                   instead of through read() and
+                                   readline(); input.buf is NULL
+                                   otherwise. */
+    Py_ssize_t input_pos;       /* Reading position in input. */
 } UnpicklerObject;
 
 /* Forward declarations */
@@ -439,6 +461,33 @@ pickler_write(PicklerObject *self, const char *s, Py_ssize_t n)
         return -1;
     }
 
+    if (self->to_bytes) {
+        if (s == NULL)
+            return 0;
+        if (n > self->write_buf_size - self->buf_size) {
+            Py_ssize_t size = self->write_buf_size;
+            char *buf;
+
+            while (n > size - self->buf_size) {
+                if (size > PY_SSIZE_T_MAX / 2) {
+                    PyErr_NoMemory();
+                    return -1;
+                }
+                size *= 2;
+            }
+            buf = (char *)PyMem_Realloc(self->write_buf, size);
+            if (buf == NULL) {
+                PyErr_NoMemory();
+                return -1;
+            }
+            self->write_buf = buf;
+            self->write_buf_size = size;
+        }
+        memcpy(self->write_buf + self->buf_size, s, n);
+        self->buf_size += n;
+        return n;
+    }
+
     if (s == NULL) {
         if (!(self->buf_size))
             return 0;
@@ -486,6 +535,16 @@ unpickler_read(UnpicklerObject *self, char **s, Py_ssize_t n)
     PyObject *len;
     PyObject *data;
 
+    if (self->input.buf != NULL) {
+        if (n > self->input.len - self->input_pos) {
+            PyErr_SetNone(PyExc_EOFError);
+            return -1;
+        }
+        *s = (char *)self->input.buf + self->input_pos;
+        self->input_pos += n;
+        return n;
+    }
+
     len = PyLong_FromSsize_t(n);
     if (len == NULL)
         return -1;
@@ -523,6 +582,24 @@ unpickler_readline(UnpicklerObject *self, char **s)
 {
     PyObject *data;
 
+    if (self->input.buf != NULL) {
+        /* The lines are copied to a bytes object all the same, since the
+           callers rely on them being NUL-terminated and modify them. */
+        char *start = (char *)self->input.buf + self->input_pos;
+        char *end = (char *)self->input.buf + self->input.len;
+        char *nl = memchr(start, '\n', end - start);
+        Py_ssize_t n = (nl == NULL ? end : nl + 1) - start;
+
+        data = PyBytes_FromStringAndSize(start, n);
+        if (data == NULL)
+            return -1;
+        self->input_pos += n;
+        Py_XDECREF(self->last_string);
+        self->last_string = data;
+        *s = PyBytes_AS_STRING(data);
+        return n;
+    }
+
     data = PyObject_CallObject(self->readline, empty_tuple);
     if (data == NULL)
         return -1;
@@ -1126,6 +1203,114 @@ save_bytes(PicklerObject *self, PyObject *obj)
     }
 }
 
+/* Only used with a buffer callback: without one, memoryview objects are
+   left to the generic reduce machinery, which can't pickle them. */
+static int
+save_memoryview(PicklerObject *self, PyObject *obj)
+{
+    PyObject *data;
+    PyObject *reduce_value;
+    int status;
+
+    if (self->buffer_callback != NULL) {
+        PyObject *result;
+        int in_band;
+
+        Py_INCREF(obj);
+        result = pickler_call(self, self->buffer_callback, obj);
+        if (result == NULL)
+            return -1;
+        in_band = PyObject_IsTrue(result);
+        Py_DECREF(result);
+        if (in_band < 0)
+            return -1;
+        if (!in_band) {
+            const char next_buffer_op = NEXT_BUFFER;
+
+            if (pickler_write(self, &next_buffer_op, 1) < 0)
+                return -1;
+            return memo_put(self, obj);
+        }
+    }
+
+    /* In-band: a copy of the data, read-only views as bytes */
+    data = PyObject_CallMethod(obj, "tobytes", NULL);
+    if (data == NULL)
+        return -1;
+    if (PyMemoryView_GET_BUFFER(obj)->readonly) {
+        status = save_bytes(self, data);
+        Py_DECREF(data);
+        return status;
+    }
+    reduce_value = Py_BuildValue("(O(O))", (PyObject *)&PyByteArray_Type,
+                                 data);
+    Py_DECREF(data);
+    if (reduce_value == NULL)
+        return -1;
+    status = save_reduce(self, reduce_value, obj);
+    Py_DECREF(reduce_value);
+    return status;
+}
+
+/* Send the data of obj out-of-band if the buffer callback agrees, using
+   the reduction function registered in copyreg._buffer_registry.
+   Returns:
+    -1   to signal an error;
+     0   if obj is to be pickled in-band as usual;
+     1   if obj was saved. */
+static int
+save_buffer(PicklerObject *self, PyObject *obj, PyObject *reduce_func)
+{
+    const char mark_op = MARK;
+    const char ops[3] = {NEXT_BUFFER, TUPLE, REDUCE};
+    PyObject *view, *result;
+    PyObject *reduce_value, *func, *args;
+    Py_ssize_t i;
+    int in_band;
+    int status = -1;
+
+    view = PyMemoryView_FromObject(obj);
+    if (view == NULL)
+        return -1;
+    result = pickler_call(self, self->buffer_callback, view);
+    if (result == NULL)
+        return -1;
+    in_band = PyObject_IsTrue(result);
+    Py_DECREF(result);
+    if (in_band)
+        return in_band < 0 ? -1 : 0;
+
+    Py_INCREF(obj);
+    reduce_value = pickler_call(self, reduce_func, obj);
+    if (reduce_value == NULL)
+        return -1;
+    if (!PyTuple_Check(reduce_value) ||
+        !PyArg_UnpackTuple(reduce_value, "buffer reduction", 2, 2,
+                           &func, &args) ||
+        !PyTuple_Check(args)) {
+        PyErr_Clear();
+        PyErr_SetString(PicklingError, "buffer reduction function must "
+                        "return a (callable, tuple) pair");
+        goto done;
+    }
+
+    if (save(self, func, 0) < 0 ||
+        pickler_write(self, &mark_op, 1) < 0)
+        goto done;
+    for (i = 0; i < PyTuple_GET_SIZE(args); i++) {
+        if (save(self, PyTuple_GET_ITEM(args, i), 0) < 0)
+            goto done;
+    }
+    if (pickler_write(self, ops, 3) < 0 ||
+        memo_put(self, obj) < 0)
+        goto done;
+    status = 1;
+
+  done:
+    Py_DECREF(reduce_value);
+    return status;
+}
+
 /* A copy of PyUnicode_EncodeRawUnicodeEscape() that also translates
    backslash and newline characters to \uXXXX escapes. */
 static PyObject *
@@ -1338,18 +1523,20 @@ save_tuple(PicklerObject *self, PyObject *obj)
     /* id(tuple) isn't in the memo now.  If it shows up there after
      * saving the tuple elements, the tuple must be recursive, in
      * which case we'll pop everything we put on the stack, and fetch
-     * its value from the memo.
+     * its value from the memo.  Nothing is memoized in fast mode.
      */
-    memo_key = PyLong_FromVoidPtr(obj);
-    if (memo_key == NULL)
-        return -1;
+    if (!self->fast) {
+        memo_key = PyLong_FromVoidPtr(obj);
+        if (memo_key == NULL)
+            return -1;
+    }
 
     if (len <= 3 && self->proto >= 2) {
         /* Use TUPLE{1,2,3} opcodes. */
         if (store_tuple_elements(self, obj, len) < 0)
             goto error;
 
-        if (PyDict_GetItem(self->memo, memo_key)) {
+        if (memo_key != NULL && PyDict_GetItem(self->memo, memo_key)) {
             /* pop the len elements */
             for (i = 0; i < len; i++)
                 if (pickler_write(self, &pop_op, 1) < 0)
@@ -1358,7 +1545,7 @@ save_tuple(PicklerObject *self, PyObject *obj)
             if (memo_get(self, memo_key) < 0)
                 goto error;
 
-            Py_DECREF(memo_key);
+            Py_XDECREF(memo_key);
             return 0;
         }
         else { /* Not recursive. */
@@ -1377,7 +1564,7 @@ save_tuple(PicklerObject *self, PyObject *obj)
     if (store_tuple_elements(self, obj, len) < 0)
         goto error;
 
-    if (PyDict_GetItem(self->memo, memo_key)) {
+    if (memo_key != NULL && PyDict_GetItem(self->memo, memo_key)) {
         /* pop the stack stuff we pushed */
         if (self->bin) {
             if (pickler_write(self, &pop_mark_op, 1) < 0)
@@ -1395,7 +1582,7 @@ save_tuple(PicklerObject *self, PyObject *obj)
         if (memo_get(self, memo_key) < 0)
             goto error;
 
-        Py_DECREF(memo_key);
+        Py_XDECREF(memo_key);
         return 0;
     }
     else { /* Not recursive. */
@@ -1412,7 +1599,7 @@ save_tuple(PicklerObject *self, PyObject *obj)
         status = -1;
     }
 
-    Py_DECREF(memo_key);
+    Py_XDECREF(memo_key);
     return status;
 }
 
@@ -2395,14 +2582,25 @@ save(PicklerObject *self, PyObject *obj, int pers_save)
 
     /* Check the memo to see if it has the object. If so, generate
        a GET (or BINGET) opcode, instead of pickling the object
-       once again. */
-    memo_key = PyLong_FromVoidPtr(obj);
-    if (memo_key == NULL)
-        goto error;
-    if (PyDict_GetItem(self->memo, memo_key)) {
-        if (memo_get(self, memo_key) < 0)
+       once again.  Nothing is memoized in fast mode. */
+    if (!self->fast) {
+        memo_key = PyLong_FromVoidPtr(obj);
+        if (memo_key == NULL)
             goto error;
-        goto done;
+        if (PyDict_GetItem(self->memo, memo_key)) {
+            if (memo_get(self, memo_key) < 0)
+                goto error;
+            goto done;
+        }
+    }
+
+    /* Offer the data of bytes-like objects to the buffer callback. */
+    if (self->buffer_callback != NULL) {
+        PyObject *buffer_reduce = PyDict_GetItem(buffer_registry,
+                                                 (PyObject *)type);
+        if (buffer_reduce != NULL &&
+            (status = save_buffer(self, obj, buffer_reduce)) != 0)
+            goto done;
     }
 
     if (type == &PyBytes_Type) {
@@ -2425,6 +2623,10 @@ save(PicklerObject *self, PyObject *obj, int pers_save)
         status = save_tuple(self, obj);
         goto done;
     }
+    else if (type == &PyMemoryView_Type && self->buffer_callback != NULL) {
+        status = save_memoryview(self, obj);
+        goto done;
+    }
     else if (type == &PyType_Type) {
         status = save_global(self, obj, NULL);
         goto done;
@@ -2548,6 +2750,11 @@ dump(PicklerObject *self, PyObject *obj)
 {
     const char stop_op = STOP;
 
+    /* Forget the state left by a previous call that failed. */
+    self->fast_nesting = 0;
+    if (self->fast_memo != NULL)
+        PyDict_Clear(self->fast_memo);
+
     if (self->proto >= 2) {
         char header[2];
 
@@ -2600,6 +2807,11 @@ Pickler_dump(PicklerObject *self, PyObject *args)
                      Py_TYPE(self)->tp_name);
         return NULL;
     }
+    if (self->write == Py_None) {
+        PyErr_SetString(PyExc_ValueError,
+                        "Pickler has no file, use dumps() instead");
+        return NULL;
+    }
 
     if (!PyArg_ParseTuple(args, "O:dump", &obj))
         return NULL;
@@ -2610,9 +2822,57 @@ Pickler_dump(PicklerObject *self, PyObject *args)
     Py_RETURN_NONE;
 }
 
+PyDoc_STRVAR(Pickler_dumps_doc,
+"dumps(obj) -> bytes. Return a pickled representation of obj.\n"
+"\n"
+"The memo is cleared first, so that the pickle can be loaded on its own.\n"
+"The buffer the pickle is built in is kept for the next call, which makes\n"
+"this faster than pickle.dumps() for pickling many small objects.");
+
+static PyObject *
+Pickler_dumps(PicklerObject *self, PyObject *args)
+{
+    PyObject *obj;
+    PyObject *result = NULL;
+
+    if (self->write == NULL) {
+        PyErr_Format(PicklingError, 
+                     "Pickler.__init__() was not called by %s.__init__()",
+                     Py_TYPE(self)->tp_name);
+        return NULL;
+    }
+
+    if (!PyArg_ParseTuple(args, "O:dumps", &obj))
+        return NULL;
+
+    /* Drop what a failed dump() may have left in the buffer. */
+    self->buf_size = 0;
+
+    if (!self->fast && PyDict_Size(self->memo) > 0)
+        PyDict_Clear(self->memo);
+
+    self->to_bytes = 1;
+    if (dump(self, obj) == 0)
+        result = PyBytes_FromStringAndSize(self->write_buf, self->buf_size);
+    self->to_bytes = 0;
+    self->buf_size = 0;
+
+    if (self->write_buf_size > MAX_KEPT_BUF_SIZE) {
+        char *buf = (char *)PyMem_Realloc(self->write_buf, WRITE_BUF_SIZE);
+        if (buf != NULL) {
+            self->write_buf = buf;
+            self->write_buf_size = WRITE_BUF_SIZE;
+        }
+    }
+
+    return result;
+}
+
 static struct PyMethodDef Pickler_methods[] = {
     {"dump", (PyCFunction)Pickler_dump, METH_VARARGS,
      Pickler_dump_doc},
+    {"dumps", (PyCFunction)Pickler_dumps, METH_VARARGS,
+     Pickler_dumps_doc},
     {"clear_memo", (PyCFunction)Pickler_clear_memo, METH_NOARGS,
      Pickler_clear_memo_doc},
     {NULL, NULL}                /* sentinel */
@@ -2628,6 +2888,7 @@ Pickler_dealloc(PicklerObject *self)
     Py_XDECREF(self->pers_func);
     Py_XDECREF(self->arg);
     Py_XDECREF(self->fast_memo);
+    Py_XDECREF(self->buffer_callback);
 
     PyMem_Free(self->write_buf);
 
@@ -2642,6 +2903,7 @@ Pickler_traverse(PicklerObject *self, visitproc visit, void *arg)
     Py_VISIT(self->pers_func);
     Py_VISIT(self->arg);
     Py_VISIT(self->fast_memo);
+    Py_VISIT(self->buffer_callback);
     return 0;
 }
 
@@ -2653,6 +2915,7 @@ Pickler_clear(PicklerObject *self)
     Py_CLEAR(self->pers_func);
     Py_CLEAR(self->arg);
     Py_CLEAR(self->fast_memo);
+    Py_CLEAR(self->buffer_callback);
 
     PyMem_Free(self->write_buf);
     self->write_buf = NULL;
@@ -2661,7 +2924,7 @@ Pickler_clear(PicklerObject *self)
 }
 
 PyDoc_STRVAR(Pickler_doc,
-"Pickler(file, protocol=None)"
+"Pickler(file, protocol=None, *, fix_imports=True, buffer_callback=None)"
 "\n"
 "This takes a binary file for writing a pickle data stream.\n"
 "\n"
@@ -2678,23 +2941,35 @@ PyDoc_STRVAR(Pickler_doc,
 "The file argument must have a write() method that accepts a single\n"
 "bytes argument. It can thus be a file object opened for binary\n"
 "writing, a io.BytesIO instance, or any other custom object that\n"
-"meets this interface.\n"
+"meets this interface.  If file is None, only dumps() can be used.\n"
 "\n"
 "If fix_imports is True and protocol is less than 3, pickle will try to\n"
 "map the new Python 3.x names to the old module names used in Python\n"
-"2.x, so that the pickle data stream is readable with Python 2.x.\n");
+"2.x, so that the pickle data stream is readable with Python 2.x.\n"
+"\n"
+"If buffer_callback is not None, the data of bytes, bytearray and\n"
+"array.array objects, and of memoryview objects, may be sent\n"
+"out-of-band instead of being copied into the pickle data stream.\n"
+"buffer_callback is called with a memoryview of the data; if it\n"
+"returns a false value, only a reference to the next out-of-band\n"
+"buffer is written, and the caller is responsible for handing the\n"
+"buffers, in order, to the unpickler.  buffer_callback requires a\n"
+"protocol of 3 or higher.\n");
 
 static int
 Pickler_init(PicklerObject *self, PyObject *args, PyObject *kwds)
 {
-    static char *kwlist[] = {"file", "protocol", "fix_imports", 0};
+    static char *kwlist[] = {"file", "protocol", "fix_imports",
+                             "buffer_callback", 0};
     PyObject *file;
     PyObject *proto_obj = NULL;
+    PyObject *buffer_callback = NULL;
     long proto = 0;
     int fix_imports = 1;
 
-    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|Oi:Pickler",
-                                     kwlist, &file, &proto_obj, &fix_imports))
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|OiO:Pickler",
+                                     kwlist, &file, &proto_obj, &fix_imports,
+                                     &buffer_callback))
         return -1;
 
     /* In case of multiple __init__() calls, clear previous content. */
@@ -2716,6 +2991,13 @@ Pickler_init(PicklerObject *self, PyObject *args, PyObject *kwds)
                      HIGHEST_PROTOCOL);
         return -1;
     }
+    if (buffer_callback == Py_None)
+        buffer_callback = NULL;
+    if (buffer_callback != NULL && proto < 3) {
+        PyErr_SetString(PyExc_ValueError,
+                        "buffer_callback needs protocol >= 3");
+        return -1;
+    }
 
     self->proto = proto;
     self->bin = proto > 0;
@@ -2724,21 +3006,31 @@ Pickler_init(PicklerObject *self, PyObject *args, PyObject *kwds)
     self->fast_nesting = 0;
     self->fast_memo = NULL;
     self->fix_imports = fix_imports && proto < 3;
+    Py_XINCREF(buffer_callback);
+    self->buffer_callback = buffer_callback;
 
-    if (!PyObject_HasAttrString(file, "write")) {
-        PyErr_SetString(PyExc_TypeError,
-                        "file must have a 'write' attribute");
-        return -1;
+    if (file == Py_None) {
+        Py_INCREF(Py_None);
+        self->write = Py_None;
     }
-    self->write = PyObject_GetAttrString(file, "write");
-    if (self->write == NULL)
-        return -1;
-	self->buf_size = 0;
+    else {
+        if (!PyObject_HasAttrString(file, "write")) {
+            PyErr_SetString(PyExc_TypeError,
+                            "file must have a 'write' attribute");
+            return -1;
+        }
+        self->write = PyObject_GetAttrString(file, "write");
+        if (self->write == NULL)
+            return -1;
+    }
+    self->buf_size = 0;
+    self->to_bytes = 0;
     self->write_buf = (char *)PyMem_Malloc(WRITE_BUF_SIZE);
     if (self->write_buf == NULL) {
         PyErr_NoMemory();
         return -1;
     }
+    self->write_buf_size = WRITE_BUF_SIZE;
     self->pers_func = NULL;
     if (PyObject_HasAttrString((PyObject *)self, "persistent_id")) {
         self->pers_func = PyObject_GetAttrString((PyObject *)self,
@@ -3259,6 +3551,29 @@ load_short_binbytes(UnpicklerObject *self)
     return 0;
 }
 
+static int
+load_next_buffer(UnpicklerObject *self)
+{
+    PyObject *buffer;
+
+    if (self->buffers == NULL) {
+        PyErr_SetString(UnpicklingError,
+                        "pickle stream refers to out-of-band data "
+                        "but no buffers argument was given");
+        return -1;
+    }
+    buffer = PyIter_Next(self->buffers);
+    if (buffer == NULL) {
+        if (!PyErr_Occurred())
+            PyErr_SetString(UnpicklingError,
+                            "not enough out-of-band buffers");
+        return -1;
+    }
+
+    PDATA_PUSH(self->stack, buffer, -1);
+    return 0;
+}
+
 static int
 load_binstring(UnpicklerObject *self)
 {
@@ -4343,6 +4658,7 @@ load(UnpicklerObject *self)
         OP(BINFLOAT, load_binfloat)
         OP(BINBYTES, load_binbytes)
         OP(SHORT_BINBYTES, load_short_binbytes)
+        OP(NEXT_BUFFER, load_next_buffer)
         OP(BINSTRING, load_binstring)
         OP(SHORT_BINSTRING, load_short_binstring)
         OP(STRING, load_string)
@@ -4434,10 +4750,64 @@ Unpickler_load(UnpicklerObject *self)
                      Py_TYPE(self)->tp_name);
         return NULL;
     }
+    if (self->read == Py_None) {
+        PyErr_SetString(PyExc_ValueError,
+                        "Unpickler has no file, use loads() instead");
+        return NULL;
+    }
 
     return load(self);
 }
 
+PyDoc_STRVAR(Unpickler_loads_doc,
+"loads(data) -> object. Load a pickle from a bytes-like object."
+"\n"
+"The memo is cleared first.  The data is read in place rather than\n"
+"through a file, and the unpickler's stack is reused, which makes this\n"
+"faster than pickle.loads() for loading many small pickles.  Bytes past\n"
+"the pickled object's representation are ignored.\n");
+
+static PyObject *
+Unpickler_loads(UnpicklerObject *self, PyObject *args)
+{
+    PyObject *data;
+    PyObject *result;
+
+    if (self->read == NULL) {
+        PyErr_Format(UnpicklingError, 
+                     "Unpickler.__init__() was not called by %s.__init__()",
+                     Py_TYPE(self)->tp_name);
+        return NULL;
+    }
+    if (self->input.buf != NULL) {
+        PyErr_SetString(PyExc_RuntimeError,
+                        "Unpickler.loads() called recursively");
+        return NULL;
+    }
+
+    if (!PyArg_ParseTuple(args, "O:loads", &data))
+        return NULL;
+    if (PyUnicode_Check(data)) {
+        PyErr_SetString(PyExc_TypeError,
+                        "Can't load pickle from unicode string");
+        return NULL;
+    }
+    if (PyObject_GetBuffer(data, &self->input, PyBUF_SIMPLE) < 0) {
+        self->input.buf = NULL;
+        return NULL;
+    }
+    self->input_pos = 0;
+
+    if (PyDict_Size(self->memo) > 0)
+        PyDict_Clear(self->memo);
+
+    result = load(self);
+
+    PyBuffer_Release(&self->input);
+    self->input.buf = NULL;
+    return result;
+}
+
 /* The name of find_class() is misleading. In newer pickle protocols, this
    function is used for loading any global (i.e., functions), not just
    classes. The name is kept only for backward compatibility. */
@@ -4540,6 +4910,8 @@ Unpickler_find_class(UnpicklerObject *self, PyObject *args)
 static struct PyMethodDef Unpickler_methods[] = {
     {"load", (PyCFunction)Unpickler_load, METH_NOARGS,
      Unpickler_load_doc},
+    {"loads", (PyCFunction)Unpickler_loads, METH_VARARGS,
+     Unpickler_loads_doc},
     {"find_class", (PyCFunction)Unpickler_find_class, METH_VARARGS,
      Unpickler_find_class_doc},
     {NULL, NULL}                /* sentinel */
@@ -4556,6 +4928,7 @@ Unpickler_dealloc(UnpicklerObject *self)
     Py_XDECREF(self->pers_func);
     Py_XDECREF(self->arg);
     Py_XDECREF(self->last_string);
+    Py_XDECREF(self->buffers);
 
     PyMem_Free(self->marks);
     free(self->encoding);
@@ -4574,6 +4947,7 @@ Unpickler_traverse(UnpicklerObject *self, visitproc visit, void *arg)
     Py_VISIT(self->pers_func);
     Py_VISIT(self->arg);
     Py_VISIT(self->last_string);
+    Py_VISIT(self->buffers);
     return 0;
 }
 
@@ -4587,6 +4961,7 @@ Unpickler_clear(UnpicklerObject *self)
     Py_CLEAR(self->pers_func);
     Py_CLEAR(self->arg);
     Py_CLEAR(self->last_string);
+    Py_CLEAR(self->buffers);
 
     PyMem_Free(self->marks);
     self->marks = NULL;
@@ -4599,7 +4974,7 @@ Unpickler_clear(UnpicklerObject *self)
 }
 
 PyDoc_STRVAR(Unpickler_doc,
-"Unpickler(file, *, encoding='ASCII', errors='strict')"
+"Unpickler(file, *, encoding='ASCII', errors='strict', buffers=None)"
 "\n"
 "This takes a binary file for reading a pickle data stream.\n"
 "\n"
@@ -4611,7 +4986,7 @@ PyDoc_STRVAR(Unpickler_doc,
 "requires no arguments.  Both methods should return bytes.\n"
 "Thus file-like object can be a binary file object opened for\n"
 "reading, a BytesIO object, or any other custom object that\n"
-"meets this interface.\n"
+"meets this interface.  If file is None, only loads() can be used.\n"
 "\n"
 "Optional keyword arguments are *fix_imports*, *encoding* and *errors*,\n"
 "which are used to control compatiblity support for pickle stream\n"
@@ -4619,13 +4994,21 @@ PyDoc_STRVAR(Unpickler_doc,
 "map the old Python 2.x names to the new names used in Python 3.x.  The\n"
 "*encoding* and *errors* tell pickle how to decode 8-bit string\n"
 "instances pickled by Python 2.x; these default to 'ASCII' and\n"
-"'strict', respectively.\n");
+"'strict', respectively.\n"
+"\n"
+"If buffers is not None, it is an iterable of the out-of-band\n"
+"buffers written by a pickler with a buffer_callback, in the order\n"
+"they were handed to that callback.  The buffers, which can be any\n"
+"objects supporting the buffer protocol, are used without copying\n"
+"them.\n");
 
 static int
 Unpickler_init(UnpicklerObject *self, PyObject *args, PyObject *kwds)
 {
-    static char *kwlist[] = {"file", "fix_imports", "encoding", "errors", 0};
+    static char *kwlist[] = {"file", "fix_imports", "encoding", "errors",
+                             "buffers", 0};
     PyObject *file;
+    PyObject *buffers = NULL;
     int fix_imports = 1;
     char *encoding = NULL;
     char *errors = NULL;
@@ -4645,18 +5028,27 @@ Unpickler_init(UnpicklerObject *self, PyObject *args, PyObject *kwds)
        extra careful in the other Unpickler methods, since a subclass could
        forget to call Unpickler.__init__() thus breaking our internal
        invariants. */
-    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|iss:Unpickler", kwlist,
-                                     &file, &fix_imports, &encoding, &errors))
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "O|issO:Unpickler", kwlist,
+                                     &file, &fix_imports, &encoding, &errors,
+                                     &buffers))
         return -1;
 
     /* In case of multiple __init__() calls, clear previous content. */
     if (self->read != NULL)
         (void)Unpickler_clear(self);
 
-    self->read = PyObject_GetAttrString(file, "read");
-    self->readline = PyObject_GetAttrString(file, "readline");
-    if (self->readline == NULL || self->read == NULL)
-        return -1;
+    if (file == Py_None) {
+        Py_INCREF(Py_None);
+        self->read = Py_None;
+        Py_INCREF(Py_None);
+        self->readline = Py_None;
+    }
+    else {
+        self->read = PyObject_GetAttrString(file, "read");
+        self->readline = PyObject_GetAttrString(file, "readline");
+        if (self->readline == NULL || self->read == NULL)
+            return -1;
+    }
 
     if (encoding == NULL)
         encoding = "ASCII";
@@ -4693,6 +5085,13 @@ Unpickler_init(UnpicklerObject *self, PyObject *args, PyObject *kwds)
     self->proto = 0;
     self->fix_imports = fix_imports;
 
+    self->buffers = NULL;
+    if (buffers != NULL && buffers != Py_None) {
+        self->buffers = PyObject_GetIter(buffers);
+        if (self->buffers == NULL)
+            return -1;
+    }
+
     return 0;
 }
 
@@ -4830,6 +5229,9 @@ initmodule(void)
     dispatch_table = PyObject_GetAttrString(copyreg, "dispatch_table");
     if (!dispatch_table)
         goto error;
+    buffer_registry = PyObject_GetAttrString(copyreg, "_buffer_registry");
+    if (!buffer_registry)
+        goto error;
     extension_registry = \
         PyObject_GetAttrString(copyreg, "_extension_registry");
     if (!extension_registry)
@@ -4905,6 +5307,7 @@ initmodule(void)
   error:
     Py_CLEAR(copyreg);
     Py_CLEAR(dispatch_table);
+    Py_CLEAR(buffer_registry);
     Py_CLEAR(extension_registry);
     Py_CLEAR(inverted_registry);
     Py_CLEAR(extension_cache);
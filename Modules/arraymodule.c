@@ -1363,12 +1363,14 @@ Convert array to an ordinary list with the same items.");
 static PyObject *
 array_fromstring(arrayobject *self, PyObject *args)
 {
-	char *str;
+	Py_buffer buffer;
 	Py_ssize_t n;
 	int itemsize = self->ob_descr->itemsize;
-        if (!PyArg_ParseTuple(args, "s#:fromstring", &str, &n))
+        if (!PyArg_ParseTuple(args, "s*:fromstring", &buffer))
 		return NULL;
+	n = buffer.len;
 	if (n % itemsize != 0) {
+		PyBuffer_Release(&buffer);
 		PyErr_SetString(PyExc_ValueError,
 			   "string length not a multiple of item size");
 		return NULL;
@@ -1378,13 +1380,17 @@ array_fromstring(arrayobject *self, PyObject *args)
         Py_ssize_t old_size = Py_SIZE(self);
 		if ((n > PY_SSIZE_T_MAX - old_size) ||
 			((old_size + n) > PY_SSIZE_T_MAX / itemsize)) {
+				PyBuffer_Release(&buffer);
 				return PyErr_NoMemory();
 		}
-		if (array_resize(self, old_size + n) == -1)
+		if (array_resize(self, old_size + n) == -1) {
+			PyBuffer_Release(&buffer);
 			return NULL;
+		}
 		memcpy(self->ob_item + old_size * itemsize,
-			str, n * itemsize);
+			buffer.buf, n * itemsize);
 	}
+	PyBuffer_Release(&buffer);
 	Py_INCREF(Py_None);
 	return Py_None;
 }
@@ -1392,8 +1398,9 @@ array_fromstring(arrayobject *self, PyObject *args)
 PyDoc_STRVAR(fromstring_doc,
 "fromstring(string)\n\
 \n\
-Appends items from the string, interpreting it as an array of machine\n\
-values, as if it had been read from a file using the fromfile() method).");
+Appends items from the string, or any other object supporting the buffer\n\
+interface, interpreting it as an array of machine values, as if it had\n\
+been read from a file using the fromfile() method).");
 
 
 static PyObject *
@@ -54,6 +54,13 @@ static struct gc_generation generations[NUM_GENERATIONS] = {
 
 PyGC_Head *_PyGC_generation0 = GEN_HEAD(0);
 
+/* Objects moved here by gc.freeze() are still tracked, but no collection
+ * looks at them, so their pages aren't written to after a fork().
+ */
+static struct gc_generation permanent_generation = {
+	{{&permanent_generation.head, &permanent_generation.head, 0}}, 0, 0
+};
+
 static int enabled = 1; /* automatic collection enabled? */
 
 /* true if we are currently running the collector */
@@ -1125,6 +1132,53 @@ gc_get_count(PyObject *self, PyObject *noargs)
 			     generations[2].count);
 }
 
+PyDoc_STRVAR(gc_freeze__doc__,
+"freeze() -> None\n"
+"\n"
+"Move all the objects tracked by the collector to a permanent generation\n"
+"and ignore them in all future collections.  Calling this before fork()\n"
+"keeps the collections in the child from writing to the pages it shares\n"
+"with the parent.\n");
+
+static PyObject *
+gc_freeze(PyObject *self, PyObject *noargs)
+{
+	int i;
+
+	for (i = 0; i < NUM_GENERATIONS; i++) {
+		gc_list_merge(GEN_HEAD(i), &permanent_generation.head);
+		generations[i].count = 0;
+	}
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+PyDoc_STRVAR(gc_unfreeze__doc__,
+"unfreeze() -> None\n"
+"\n"
+"Move the objects of the permanent generation back to the oldest\n"
+"generation, so that collections look at them again.\n");
+
+static PyObject *
+gc_unfreeze(PyObject *self, PyObject *noargs)
+{
+	gc_list_merge(&permanent_generation.head,
+		      GEN_HEAD(NUM_GENERATIONS-1));
+	Py_INCREF(Py_None);
+	return Py_None;
+}
+
+PyDoc_STRVAR(gc_get_freeze_count__doc__,
+"get_freeze_count() -> int\n"
+"\n"
+"Return the number of objects in the permanent generation.\n");
+
+static PyObject *
+gc_get_freeze_count(PyObject *self, PyObject *noargs)
+{
+	return PyLong_FromSsize_t(gc_list_size(&permanent_generation.head));
+}
+
 static int
 referrersvisit(PyObject* obj, PyObject *objs)
 {
@@ -1171,6 +1225,10 @@ gc_get_referrers(PyObject *self, PyObject *args)
 			return NULL;
 		}
 	}
+	if (!(gc_referrers_for(args, &permanent_generation.head, result))) {
+		Py_DECREF(result);
+		return NULL;
+	}
 	return result;
 }
 
@@ -1232,6 +1290,10 @@ gc_get_objects(PyObject *self, PyObject *noargs)
 			return NULL;
 		}
 	}
+	if (append_objects(result, &permanent_generation.head)) {
+		Py_DECREF(result);
+		return NULL;
+	}
 	return result;
 }
 
@@ -1271,7 +1333,11 @@ PyDoc_STRVAR(gc__doc__,
 "get_objects() -- Return a list of all objects tracked by the collector.\n"
 "is_tracked() -- Returns true if a given object is tracked.\n"
 "get_referrers() -- Return the list of objects that refer to an object.\n"
-"get_referents() -- Return the list of objects that an object refers to.\n");
+"get_referents() -- Return the list of objects that an object refers to.\n"
+"freeze() -- Move all tracked objects to a permanent generation.\n"
+"unfreeze() -- Move the permanent generation back to the oldest one.\n"
+"get_freeze_count() -- Return the number of objects in the permanent\n"
+"                      generation.\n");
 
 static PyMethodDef GcMethods[] = {
 	{"enable",	   gc_enable,	  METH_NOARGS,  gc_enable__doc__},
@@ -1290,6 +1356,10 @@ static PyMethodDef GcMethods[] = {
 		gc_get_referrers__doc__},
 	{"get_referents",  gc_get_referents, METH_VARARGS,
 		gc_get_referents__doc__},
+	{"freeze",	   gc_freeze,	  METH_NOARGS,  gc_freeze__doc__},
+	{"unfreeze",	   gc_unfreeze,	  METH_NOARGS,  gc_unfreeze__doc__},
+	{"get_freeze_count", gc_get_freeze_count, METH_NOARGS,
+		gc_get_freeze_count__doc__},
 	{NULL,	NULL}		/* Sentinel */
 };
 
@@ -96,6 +96,14 @@ corresponding Unix manual entries for more information on calls.");
 #include <langinfo.h>
 #endif
 
+#ifdef HAVE_SYS_SENDFILE_H
+#include <sys/sendfile.h>
+#endif
+
+#ifdef HAVE_SYS_UIO_H
+#include <sys/uio.h>
+#endif
+
 /* Various compilers have only certain posix functions */
 /* XXX Gosh I wish these were all moved into pyconfig.h */
 #if defined(PYCC_VACPP) && defined(PYOS_OS2)
@@ -5157,6 +5165,118 @@ posix_write(PyObject *self, PyObject *args)
 }
 
 
+#if defined(HAVE_WRITEV) && defined(HAVE_SYS_UIO_H)
+#ifndef IOV_MAX
+#define IOV_MAX 16
+#endif
+
+PyDoc_STRVAR(posix_writev__doc__,
+"writev(fd, buffers) -> byteswritten\n\n\
+Write the contents of buffers, a sequence of objects supporting the\n\
+buffer protocol, to a file descriptor with a single system call.  Like\n\
+write(), fewer bytes than the total may be written.");
+
+static PyObject *
+posix_writev(PyObject *self, PyObject *args)
+{
+	int fd;
+	PyObject *seq, *fast;
+	Py_ssize_t cnt, i, size;
+	struct iovec *iov = NULL;
+	Py_buffer *bufs = NULL;
+	PyObject *result = NULL;
+
+	if (!PyArg_ParseTuple(args, "iO:writev", &fd, &seq))
+		return NULL;
+	fast = PySequence_Fast(seq, "writev() arg 2 must be a sequence");
+	if (fast == NULL)
+		return NULL;
+	cnt = PySequence_Fast_GET_SIZE(fast);
+	/* The rest is left for the next call, as for a partial write. */
+	if (cnt > IOV_MAX)
+		cnt = IOV_MAX;
+	iov = PyMem_New(struct iovec, cnt + 1);
+	bufs = PyMem_New(Py_buffer, cnt + 1);
+	if (iov == NULL || bufs == NULL) {
+		PyErr_NoMemory();
+		goto done;
+	}
+	for (i = 0; i < cnt; i++) {
+		if (PyObject_GetBuffer(PySequence_Fast_GET_ITEM(fast, i),
+				       &bufs[i], PyBUF_SIMPLE) < 0) {
+			cnt = i;
+			goto done;
+		}
+		iov[i].iov_base = bufs[i].buf;
+		iov[i].iov_len = bufs[i].len;
+	}
+	if (!_PyVerify_fd(fd)) {
+		posix_error();
+		goto done;
+	}
+	Py_BEGIN_ALLOW_THREADS
+	size = writev(fd, iov, (int)cnt);
+	Py_END_ALLOW_THREADS
+	if (size < 0)
+		posix_error();
+	else
+		result = PyLong_FromSsize_t(size);
+done:
+	if (bufs != NULL)
+		for (i = 0; i < cnt; i++)
+			PyBuffer_Release(&bufs[i]);
+	PyMem_Free(bufs);
+	PyMem_Free(iov);
+	Py_DECREF(fast);
+	return result;
+}
+#endif /* HAVE_WRITEV && HAVE_SYS_UIO_H */
+
+
+#if defined(HAVE_SENDFILE) && defined(HAVE_SYS_SENDFILE_H)
+PyDoc_STRVAR(posix_sendfile__doc__,
+"sendfile(out, in, offset, count) -> byteswritten\n\n\
+Copy count bytes from file descriptor in, starting at offset, to file\n\
+descriptor out, without copying them to user space.  If offset is None,\n\
+read from the current position of in and update it.");
+
+static PyObject *
+posix_sendfile(PyObject *self, PyObject *args)
+{
+	int out, in;
+	Py_ssize_t count, size;
+	PyObject *offobj;
+	off_t offset;
+	off_t *offp = NULL;
+
+	if (!PyArg_ParseTuple(args, "iiOn:sendfile", &out, &in, &offobj, &count))
+		return NULL;
+	if (offobj != Py_None) {
+#if !defined(HAVE_LARGEFILE_SUPPORT)
+		offset = PyLong_AsLong(offobj);
+#else
+		offset = PyLong_AsLongLong(offobj);
+#endif
+		if (PyErr_Occurred())
+			return NULL;
+		offp = &offset;
+	}
+	if (count < 0) {
+		PyErr_SetString(PyExc_ValueError, "negative count");
+		return NULL;
+	}
+	if (!_PyVerify_fd(out) || !_PyVerify_fd(in))
+		return posix_error();
+	Py_BEGIN_ALLOW_THREADS
+	size = sendfile(out, in, offp, (size_t)count);
+	Py_END_ALLOW_THREADS
+	if (size < 0)
+		return posix_error();
+	return PyLong_FromSsize_t(size);
+}
+#endif /* HAVE_SENDFILE && HAVE_SYS_SENDFILE_H */
+
+
 PyDoc_STRVAR(posix_fstat__doc__,
 "fstat(fd) -> stat result\n\n\
 Like stat(), but for an open file descriptor.");
@@ -7237,6 +7357,12 @@ static PyMethodDef posix_methods[] = {
 	{"lseek",	posix_lseek, METH_VARARGS, posix_lseek__doc__},
 	{"read",	posix_read, METH_VARARGS, posix_read__doc__},
 	{"write",	posix_write, METH_VARARGS, posix_write__doc__},
+#if defined(HAVE_SENDFILE) && defined(HAVE_SYS_SENDFILE_H)
+	{"sendfile",	posix_sendfile, METH_VARARGS, posix_sendfile__doc__},
+#endif
+#if defined(HAVE_WRITEV) && defined(HAVE_SYS_UIO_H)
+	{"writev",	posix_writev, METH_VARARGS, posix_writev__doc__},
+#endif
 	{"fstat",	posix_fstat, METH_VARARGS, posix_fstat__doc__},
 	{"isatty",	posix_isatty, METH_VARARGS, posix_isatty__doc__},
 #ifdef HAVE_PIPE
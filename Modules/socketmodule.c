@@ -2600,6 +2600,155 @@ until all data is sent.  If an error occurs, it's impossible\n\
 to tell how much data has been sent.");
 
 
+#ifdef HAVE_SENDMSG
+#ifndef IOV_MAX
+#define IOV_MAX 16
+#endif
+
+/* s.sendmsg(buffers[, ancdata[, flags[, address]]]) method */
+
+static PyObject *
+sock_sendmsg(PySocketSockObject *s, PyObject *args)
+{
+	PyObject *data, *ancdata = Py_None, *addro = Py_None;
+	PyObject *fast = NULL, *ancfast = NULL, *result = NULL;
+	Py_ssize_t cnt, ncmsgs = 0, nbufs = 0, ncmsgbufs = 0, i, n = -1;
+	int flags = 0, timeout = 0, addrlen;
+	sock_addr_t addrbuf;
+	struct msghdr msg;
+	struct cmsghdr *cmsg;
+	struct iovec *iov = NULL;
+	Py_buffer *bufs = NULL, *cmsgbufs = NULL;
+	int *cmsgtypes = NULL;
+	size_t controllen = 0;
+
+	if (!PyArg_ParseTuple(args, "O|OiO:sendmsg",
+			      &data, &ancdata, &flags, &addro))
+		return NULL;
+	if (!IS_SELECTABLE(s))
+		return select_error();
+
+	memset(&msg, 0, sizeof(msg));
+	if (addro != Py_None) {
+		if (!getsockaddrarg(s, addro, SAS2SA(&addrbuf), &addrlen))
+			return NULL;
+		msg.msg_name = SAS2SA(&addrbuf);
+		msg.msg_namelen = addrlen;
+	}
+
+	fast = PySequence_Fast(data, "sendmsg() argument 1 must be "
+				     "a sequence of buffers");
+	if (fast == NULL)
+		return NULL;
+	cnt = PySequence_Fast_GET_SIZE(fast);
+	/* The rest is left for the next call, as for a partial send. */
+	if (cnt > IOV_MAX)
+		cnt = IOV_MAX;
+	iov = PyMem_New(struct iovec, cnt + 1);
+	bufs = PyMem_New(Py_buffer, cnt + 1);
+	if (iov == NULL || bufs == NULL) {
+		PyErr_NoMemory();
+		goto finally;
+	}
+	for (; nbufs < cnt; nbufs++) {
+		if (PyObject_GetBuffer(PySequence_Fast_GET_ITEM(fast, nbufs),
+				       &bufs[nbufs], PyBUF_SIMPLE) < 0)
+			goto finally;
+		iov[nbufs].iov_base = bufs[nbufs].buf;
+		iov[nbufs].iov_len = bufs[nbufs].len;
+	}
+	msg.msg_iov = iov;
+	msg.msg_iovlen = cnt;
+
+	/* Ancillary data is a sequence of (level, type, data) tuples */
+	if (ancdata != Py_None) {
+		ancfast = PySequence_Fast(ancdata, "sendmsg() argument 2 must "
+					  "be a sequence of (level, type, data)");
+		if (ancfast == NULL)
+			goto finally;
+		ncmsgs = PySequence_Fast_GET_SIZE(ancfast);
+	}
+	if (ncmsgs > 0) {
+		cmsgbufs = PyMem_New(Py_buffer, ncmsgs);
+		cmsgtypes = PyMem_New(int, 2 * ncmsgs);
+		if (cmsgbufs == NULL || cmsgtypes == NULL) {
+			PyErr_NoMemory();
+			goto finally;
+		}
+		for (; ncmsgbufs < ncmsgs; ncmsgbufs++) {
+			PyObject *item = PySequence_Fast_GET_ITEM(ancfast,
+								  ncmsgbufs);
+			if (!PyTuple_Check(item)) {
+				PyErr_SetString(PyExc_TypeError,
+						"sendmsg() ancillary data items "
+						"must be (level, type, data)");
+				goto finally;
+			}
+			if (!PyArg_ParseTuple(item, "iiy*:sendmsg",
+					      &cmsgtypes[2 * ncmsgbufs],
+					      &cmsgtypes[2 * ncmsgbufs + 1],
+					      &cmsgbufs[ncmsgbufs]))
+				goto finally;
+			controllen += CMSG_SPACE(cmsgbufs[ncmsgbufs].len);
+		}
+		msg.msg_control = PyMem_Malloc(controllen);
+		if (msg.msg_control == NULL) {
+			PyErr_NoMemory();
+			goto finally;
+		}
+		memset(msg.msg_control, 0, controllen);
+		msg.msg_controllen = controllen;
+		cmsg = CMSG_FIRSTHDR(&msg);
+		for (i = 0; i < ncmsgs; i++) {
+			cmsg->cmsg_level = cmsgtypes[2 * i];
+			cmsg->cmsg_type = cmsgtypes[2 * i + 1];
+			cmsg->cmsg_len = CMSG_LEN(cmsgbufs[i].len);
+			memcpy(CMSG_DATA(cmsg), cmsgbufs[i].buf,
+			       cmsgbufs[i].len);
+			cmsg = CMSG_NXTHDR(&msg, cmsg);
+		}
+	}
+
+	Py_BEGIN_ALLOW_THREADS
+	timeout = internal_select(s, 1);
+	if (!timeout)
+		n = sendmsg(s->sock_fd, &msg, flags);
+	Py_END_ALLOW_THREADS
+
+	if (timeout == 1)
+		PyErr_SetString(socket_timeout, "timed out");
+	else if (n < 0)
+		s->errorhandler();
+	else
+		result = PyLong_FromSsize_t(n);
+
+finally:
+	for (i = 0; i < nbufs; i++)
+		PyBuffer_Release(&bufs[i]);
+	for (i = 0; i < ncmsgbufs; i++)
+		PyBuffer_Release(&cmsgbufs[i]);
+	PyMem_Free(msg.msg_control);
+	PyMem_Free(cmsgtypes);
+	PyMem_Free(cmsgbufs);
+	PyMem_Free(bufs);
+	PyMem_Free(iov);
+	Py_XDECREF(ancfast);
+	Py_DECREF(fast);
+	return result;
+}
+
+PyDoc_STRVAR(sendmsg_doc,
+"sendmsg(buffers[, ancdata[, flags[, address]]]) -> count\n\
+\n\
+Send the contents of buffers, a sequence of objects supporting the\n\
+buffer protocol, with a single system call, without joining them.\n\
+ancdata is a sequence of (level, type, data) tuples of ancillary data,\n\
+such as (SOL_SOCKET, SCM_RIGHTS, array('i', fds)); flags are as for\n\
+send(), and address is as for sendto().  Return the number of bytes\n\
+sent; this may be less than the total if the network is busy.");
+#endif /* HAVE_SENDMSG */
+
+
 /* s.sendto(data, [flags,] sockaddr) method */
 
 static PyObject *
@@ -2748,6 +2897,10 @@ static PyMethodDef sock_methods[] = {
 			  send_doc},
 	{"sendall",	  (PyCFunction)sock_sendall, METH_VARARGS,
 			  sendall_doc},
+#ifdef HAVE_SENDMSG
+	{"sendmsg",	  (PyCFunction)sock_sendmsg, METH_VARARGS,
+			  sendmsg_doc},
+#endif
 	{"sendto",	  (PyCFunction)sock_sendto, METH_VARARGS,
 			  sendto_doc},
 	{"setblocking",	  (PyCFunction)sock_setblocking, METH_O,
@@ -4520,6 +4673,10 @@ PyInit__socket(void)
 	PyModule_AddIntConstant(m, "SOMAXCONN", 5); /* Common value */
 #endif
 
+#ifdef	SCM_RIGHTS
+	PyModule_AddIntConstant(m, "SCM_RIGHTS", SCM_RIGHTS);
+#endif
+
 	/* Flags for send, recv */
 #ifdef	MSG_OOB
 	PyModule_AddIntConstant(m, "MSG_OOB", MSG_OOB);
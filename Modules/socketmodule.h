@@ -38,6 +38,10 @@ typedef int socklen_t;
 # undef AF_UNIX
 #endif
 
+#ifdef HAVE_SYS_UIO_H
+# include <sys/uio.h>
+#endif
+
 #ifdef HAVE_LINUX_NETLINK_H
 # ifdef HAVE_ASM_TYPES_H
 #  include <asm/types.h>
@@ -108,6 +108,9 @@ PyCode_New(int argcount, int kwonlyargcount,
 		Py_INCREF(lnotab);
 		co->co_lnotab = lnotab;
                 co->co_zombieframe = NULL;
+		co->co_globalcache = NULL;
+		co->co_attrcache = NULL;
+		co->co_attrcache_map = NULL;
 	}
 	return co;
 }
@@ -284,6 +287,10 @@ code_dealloc(PyCodeObject *co)
 	Py_XDECREF(co->co_lnotab);
         if (co->co_zombieframe != NULL)
                 PyObject_GC_Del(co->co_zombieframe);
+	if (co->co_globalcache != NULL)
+		PyMem_FREE(co->co_globalcache);
+	if (co->co_attrcache != NULL)
+		PyMem_FREE(co->co_attrcache);	/* and co_attrcache_map */
 	PyObject_DEL(co);
 }
 
@@ -8,6 +8,7 @@
 */
 
 #include "Python.h"
+#include "structmember.h" /* for offsetof */
 #include "stringlib/eq.h"
 
 
@@ -138,6 +139,13 @@ which point everyone will have terabytes of RAM on 64-bit boxes).
 /* Object used as dummy key to fill deleted entries */
 static PyObject *dummy = NULL; /* Initialized by first call to newPyDictObject() */
 
+/* The source of dict versions.  Every dict gets a new version when it is
+   created and whenever one of its items is added, replaced or removed, so
+   that no two states of any dicts share a version; 0 is never used. */
+static PY_DICT_VERSION_T pydict_global_version = 0;
+
+#define DICT_NEXT_VERSION() (++pydict_global_version)
+
 #ifdef Py_REF_DEBUG
 PyObject *
 _PyDict_Dummy(void)
@@ -149,6 +157,60 @@ _PyDict_Dummy(void)
 /* forward declarations */
 static PyDictEntry *
 lookdict_unicode(PyDictObject *mp, PyObject *key, long hash);
+static int dictresize(PyDictObject *mp, Py_ssize_t minused);
+
+/*
+Split tables.  The __dict__ of instances of a heap type is created by
+_PyObjectDict_New() as a split table: its keys and hashes live in a key
+table shared by the instances and held by the type (ht_cached_keys), and the
+dict itself only holds an array of values, indexed like the shared table.
+An instance which lacks one of the shared keys has a NULL value for it.
+
+Shared tables hold only exact unicode keys and never hold dummies: keys are
+only ever added to them, by the instance dicts using them.  When a shared
+table gets full, the instance adding a key makes a table twice as large,
+records it as the successor (sk_next) of the full one and moves its values to
+it; other instances move when they add a key themselves.  New instances
+start with the table held by the type, which only moves on to the latest
+table once most of the instances started with it have outgrown it, so that
+one instance with many attributes doesn't make all the later ones pay for a
+large values array.  An instance which needs a key missing from its table
+while using few of the keys already there doesn't follow the others; it
+gets an ordinary dict, and so do the later instances of the type.  A split
+table is turned into an ordinary one
+("combined") when it gets a key of another type, when the shared table would
+grow past SHARED_KEYS_MAX_SIZE slots, and by the few operations which don't
+support split tables.
+
+Split tables are allocated without ma_smalltable, so that an instance costs
+the dict header plus the values array only.
+*/
+struct _dictsharedkeys {
+	Py_ssize_t sk_refcnt;	/* dicts using the table, the type, sk_next */
+	Py_ssize_t sk_fill;	/* # keys */
+	Py_ssize_t sk_mask;
+	struct _dictsharedkeys *sk_next;	/* larger table replacing it */
+	Py_ssize_t sk_ninstances;	/* instances started with the table */
+	Py_ssize_t sk_noutgrown;	/* moves from it to a successor */
+	int sk_unshared;		/* new instances get ordinary dicts */
+	PyDictEntry sk_table[1];
+};
+typedef struct _dictsharedkeys sharedkeys;
+
+#define SHARED_KEYS_MAX_SIZE 64
+
+#define SHARED_KEYS_OF_TABLE(table) \
+	((sharedkeys *)((char *)(table) - offsetof(sharedkeys, sk_table)))
+#define SHARED_KEYS(mp) SHARED_KEYS_OF_TABLE((mp)->ma_table)
+
+/* The value of the i-th entry of mp, for split and combined tables */
+#define DICT_VALUE_AT(mp, i) \
+	((mp)->ma_values != NULL ? (mp)->ma_values[i] : (mp)->ma_table[i].me_value)
+#define DICT_VALUE(mp, ep) DICT_VALUE_AT(mp, (ep) - (mp)->ma_table)
+
+#define HAS_SMALLTABLE(mp) (!(mp)->ma_nosmalltable)
+#define TABLE_IS_MALLOCED(mp) ((mp)->ma_values == NULL && \
+	(!HAS_SMALLTABLE(mp) || (mp)->ma_table != (mp)->ma_smalltable))
 
 #ifdef SHOW_CONVERSION_COUNTS
 static long created = 0L;
@@ -284,6 +346,9 @@ PyDict_New(void)
 #endif
 	}
 	mp->ma_lookup = lookdict_unicode;
+	mp->ma_version = DICT_NEXT_VERSION();
+	mp->ma_values = NULL;
+	mp->ma_nosmalltable = 0;
 #ifdef SHOW_TRACK_COUNT
 	count_untracked++;
 #endif
@@ -293,6 +358,207 @@ PyDict_New(void)
 	return (PyObject *)mp;
 }
 
+static sharedkeys *
+new_shared_keys(Py_ssize_t size)
+{
+	sharedkeys *sk;
+
+	sk = PyMem_MALLOC(offsetof(sharedkeys, sk_table) +
+			  size * sizeof(PyDictEntry));
+	if (sk == NULL) {
+		PyErr_NoMemory();
+		return NULL;
+	}
+	sk->sk_refcnt = 1;
+	sk->sk_fill = 0;
+	sk->sk_mask = size - 1;
+	sk->sk_next = NULL;
+	sk->sk_ninstances = 0;
+	sk->sk_noutgrown = 0;
+	sk->sk_unshared = 0;
+	memset(sk->sk_table, 0, size * sizeof(PyDictEntry));
+	return sk;
+}
+
+static void
+shared_keys_decref(sharedkeys *sk)
+{
+	sharedkeys *next;
+	Py_ssize_t i;
+
+	while (sk != NULL && --sk->sk_refcnt == 0) {
+		next = sk->sk_next;
+		for (i = 0; i <= sk->sk_mask; i++)
+			Py_XDECREF(sk->sk_table[i].me_key);
+		PyMem_FREE(sk);
+		sk = next;
+	}
+}
+
+void
+_PyDict_DecRefSharedKeys(sharedkeys *sk)
+{
+	shared_keys_decref(sk);
+}
+
+/* Return the entry of sk holding key itself, or else the free entry where
+   it belongs.  This follows the probe sequence of lookdict(); shared tables
+   have no dummies, and the keys of a table are the very objects found in
+   its successors. */
+static PyDictEntry *
+shared_keys_find(sharedkeys *sk, PyObject *key, long hash)
+{
+	register size_t i;
+	register size_t perturb;
+	register size_t mask = (size_t)sk->sk_mask;
+	register PyDictEntry *ep;
+
+	i = hash & mask;
+	ep = &sk->sk_table[i];
+	for (perturb = hash; ep->me_key != NULL && ep->me_key != key;
+	     perturb >>= PERTURB_SHIFT) {
+		i = (i << 2) + i + perturb + 1;
+		ep = &sk->sk_table[i & mask];
+	}
+	return ep;
+}
+
+/* Make a table twice the size of sk, holding the same keys, as the
+   successor of sk. */
+static sharedkeys *
+grow_shared_keys(sharedkeys *sk)
+{
+	sharedkeys *newsk;
+	PyDictEntry *ep, *newep;
+	Py_ssize_t i;
+
+	assert(sk->sk_next == NULL);
+	newsk = new_shared_keys((sk->sk_mask + 1) * 2);
+	if (newsk == NULL)
+		return NULL;
+	for (i = 0; i <= sk->sk_mask; i++) {
+		ep = &sk->sk_table[i];
+		if (ep->me_key != NULL) {
+			newep = shared_keys_find(newsk, ep->me_key,
+						 (long)ep->me_hash);
+			Py_INCREF(ep->me_key);
+			newep->me_key = ep->me_key;
+			newep->me_hash = ep->me_hash;
+			newsk->sk_fill++;
+		}
+	}
+	sk->sk_next = newsk;	/* steals the reference */
+	return newsk;
+}
+
+/* Move the values of the split table mp to newsk, a successor of its
+   shared table. */
+static int
+split_migrate(PyDictObject *mp, sharedkeys *newsk)
+{
+	sharedkeys *sk = SHARED_KEYS(mp);
+	PyObject **values, **oldvalues = mp->ma_values;
+	PyDictEntry *ep;
+	Py_ssize_t i, size = newsk->sk_mask + 1;
+
+	values = PyObject_MALLOC(size * sizeof(PyObject *));
+	if (values == NULL) {
+		PyErr_NoMemory();
+		return -1;
+	}
+	memset(values, 0, size * sizeof(PyObject *));
+	for (i = 0; i <= sk->sk_mask; i++) {
+		if (oldvalues[i] != NULL) {
+			ep = &sk->sk_table[i];
+			ep = shared_keys_find(newsk, ep->me_key,
+					      (long)ep->me_hash);
+			assert(ep->me_key != NULL);
+			values[ep - newsk->sk_table] = oldvalues[i];
+		}
+	}
+	newsk->sk_refcnt++;
+	mp->ma_table = newsk->sk_table;
+	mp->ma_mask = newsk->sk_mask;
+	mp->ma_values = values;
+	PyObject_FREE(oldvalues);
+	sk->sk_noutgrown++;
+	shared_keys_decref(sk);
+	return 0;
+}
+
+static PyObject *
+new_split_dict(sharedkeys *sk)
+{
+	PyDictObject *mp;
+	PyObject **values;
+	Py_ssize_t size = sk->sk_mask + 1;
+
+	/* The values arrays are small: pymalloc saves the malloc overhead */
+	values = PyObject_MALLOC(size * sizeof(PyObject *));
+	if (values == NULL)
+		return PyErr_NoMemory();
+	memset(values, 0, size * sizeof(PyObject *));
+	mp = (PyDictObject *)_PyObject_GC_Malloc(
+		offsetof(PyDictObject, ma_smalltable));
+	if (mp == NULL) {
+		PyObject_FREE(values);
+		return NULL;
+	}
+	PyObject_INIT(mp, &PyDict_Type);
+	sk->sk_refcnt++;
+	sk->sk_ninstances++;
+	mp->ma_fill = mp->ma_used = 0;
+	mp->ma_mask = sk->sk_mask;
+	mp->ma_table = sk->sk_table;
+	mp->ma_lookup = lookdict_unicode;
+	mp->ma_version = DICT_NEXT_VERSION();
+	mp->ma_values = values;
+	mp->ma_nosmalltable = 1;
+#ifdef SHOW_TRACK_COUNT
+	count_untracked++;
+#endif
+	return (PyObject *)mp;
+}
+
+/* Create the __dict__ of an instance of tp: a split table sharing its keys
+   with the other instances if tp is a heap type, else an ordinary dict. */
+PyObject *
+_PyObjectDict_New(PyTypeObject *tp)
+{
+	PyHeapTypeObject *et = (PyHeapTypeObject *)tp;
+	sharedkeys *sk;
+
+	if (!(tp->tp_flags & Py_TPFLAGS_HEAPTYPE) || dummy == NULL)
+		return PyDict_New();
+	sk = et->ht_cached_keys;
+	if (sk != NULL && sk->sk_unshared)
+		return PyDict_New();
+	if (sk == NULL) {
+		sk = new_shared_keys(PyDict_MINSIZE);
+		if (sk == NULL)
+			return NULL;
+		et->ht_cached_keys = sk;
+	}
+	else if (sk->sk_next != NULL && sk->sk_noutgrown >= 2 &&
+		 sk->sk_noutgrown * 2 > sk->sk_ninstances) {
+		/* Most instances outgrow it: start with the latest table */
+		while (sk->sk_next != NULL)
+			sk = sk->sk_next;
+		sk->sk_refcnt++;
+		shared_keys_decref(et->ht_cached_keys);
+		et->ht_cached_keys = sk;
+	}
+	return new_split_dict(sk);
+}
+
+/* Turn the split table mp into an ordinary one. */
+static int
+dict_combine(PyDictObject *mp)
+{
+	assert(mp->ma_values != NULL);
+	return dictresize(mp, mp->ma_used * 2);
+}
+
 /*
 The basic lookup function used by all operations.
 This is based on Algorithm D from Knuth Vol. 3, Sec. 6.4.
@@ -315,7 +581,8 @@ never raise an exception; that function can never return NULL.  For both, when
 the key isn't found a PyDictEntry* is returned for which the me_value field is
 NULL; this is the slot in the dict at which the key would have been found, and
 the caller can (if it wishes) add the <key, value> pair to the returned
-PyDictEntry*.
+PyDictEntry*.  For a split table, the value is found with DICT_VALUE(): the
+key may be in the shared table while the dict has no value for it.
 */
 static PyDictEntry *
 lookdict(PyDictObject *mp, PyObject *key, register long hash)
@@ -494,7 +761,7 @@ _PyDict_MaybeUntrack(PyObject *op)
 	ep = mp->ma_table;
 	mask = mp->ma_mask;
 	for (i = 0; i <= mask; i++) {
-		if ((value = ep[i].me_value) == NULL)
+		if ((value = DICT_VALUE_AT(mp, i)) == NULL)
 			continue;
 		if (_PyObject_GC_MAY_BE_TRACKED(value) ||
 			_PyObject_GC_MAY_BE_TRACKED(ep[i].me_key))
@@ -511,6 +778,9 @@ Used both by the internal resize routine and by the public insert routine.
 Eats a reference to key and one to value.
 Returns -1 if an error occurred, or 0 on success.
 */
+static int insertdict_split(PyDictObject *mp, PyObject *key, long hash,
+			    PyObject *value);
+
 static int
 insertdict(register PyDictObject *mp, PyObject *key, long hash, PyObject *value)
 {
@@ -518,6 +788,8 @@ insertdict(register PyDictObject *mp, PyObject *key, long hash, PyObject *value)
 	register PyDictEntry *ep;
 	typedef PyDictEntry *(*lookupfunc)(PyDictObject *, PyObject *, long);
 
+	if (mp->ma_values != NULL)
+		return insertdict_split(mp, key, hash, value);
 	assert(mp->ma_lookup != NULL);
 	ep = mp->ma_lookup(mp, key, hash);
 	if (ep == NULL) {
@@ -526,6 +798,7 @@ insertdict(register PyDictObject *mp, PyObject *key, long hash, PyObject *value)
 		return -1;
 	}
 	MAINTAIN_TRACKING(mp, key, value);
+	mp->ma_version = DICT_NEXT_VERSION();
 	if (ep->me_value != NULL) {
 		old_value = ep->me_value;
 		ep->me_value = value;
@@ -547,6 +820,78 @@ insertdict(register PyDictObject *mp, PyObject *key, long hash, PyObject *value)
 	return 0;
 }
 
+/*
+insertdict() for a split table.  A new key goes to the shared table, which
+is first replaced by its latest successor, or by a new, larger one if it is
+full.  The table is combined for a key which isn't an exact unicode, or
+when the shared table can't grow any more.
+*/
+static int
+insertdict_split(PyDictObject *mp, PyObject *key, long hash, PyObject *value)
+{
+	PyObject *old_value, **slot;
+	PyDictEntry *ep;
+	sharedkeys *sk, *newsk;
+
+	if (!PyUnicode_CheckExact(key))
+		goto combine;
+	ep = lookdict_unicode(mp, key, hash);
+	if (ep->me_key == NULL && SHARED_KEYS(mp)->sk_next != NULL) {
+		sk = SHARED_KEYS(mp);
+		if (mp->ma_used * 2 < sk->sk_fill) {
+			/* Rather than give an instance which doesn't follow
+			   the others the larger latest table, stop sharing */
+			sk->sk_unshared = 1;
+			goto combine;
+		}
+		newsk = sk->sk_next;
+		while (newsk->sk_next != NULL)
+			newsk = newsk->sk_next;
+		if (split_migrate(mp, newsk) < 0)
+			goto fail;
+		ep = lookdict_unicode(mp, key, hash);
+	}
+	if (ep->me_key == NULL) {
+		sk = SHARED_KEYS(mp);
+		if ((sk->sk_fill + 1) * 3 >= (sk->sk_mask + 1) * 2) {
+			if ((sk->sk_mask + 1) * 2 > SHARED_KEYS_MAX_SIZE)
+				goto combine;
+			newsk = grow_shared_keys(sk);
+			if (newsk == NULL || split_migrate(mp, newsk) < 0)
+				goto fail;
+			ep = lookdict_unicode(mp, key, hash);
+		}
+	}
+	MAINTAIN_TRACKING(mp, key, value);
+	slot = &mp->ma_values[ep - mp->ma_table];
+	if (ep->me_key == NULL) {
+		sk = SHARED_KEYS(mp);
+		ep->me_key = key;
+		ep->me_hash = (Py_ssize_t)hash;
+		sk->sk_fill++;
+	}
+	else
+		Py_DECREF(key);
+	old_value = *slot;
+	*slot = value;
+	mp->ma_version = DICT_NEXT_VERSION();
+	if (old_value != NULL)
+		Py_DECREF(old_value); /* which **CAN** re-enter */
+	else {
+		mp->ma_fill++;
+		mp->ma_used++;
+	}
+	return 0;
+
+  combine:
+	if (dict_combine(mp) == 0)
+		return insertdict(mp, key, hash, value);
+  fail:
+	Py_DECREF(key);
+	Py_DECREF(value);
+	return -1;
+}
+
 /*
 Internal routine used by dictresize() to insert an item which is
 known to be absent from the dict.  This routine also assumes that
@@ -583,16 +928,18 @@ insertdict_clean(register PyDictObject *mp, PyObject *key, long hash,
 /*
 Restructure the table by allocating a new table and reinserting all
 items again.  When entries have been deleted, the new table may
-actually be smaller than the old one.
+actually be smaller than the old one.  A split table becomes a combined
+one.
 */
 static int
 dictresize(PyDictObject *mp, Py_ssize_t minused)
 {
 	Py_ssize_t newsize;
 	PyDictEntry *oldtable, *newtable, *ep;
-	Py_ssize_t i;
+	Py_ssize_t i, oldmask;
 	int is_oldtable_malloced;
 	PyDictEntry small_copy[PyDict_MINSIZE];
+	PyObject **oldvalues;
 
 	assert(minused >= 0);
 
@@ -608,10 +955,12 @@ dictresize(PyDictObject *mp, Py_ssize_t minused)
 
 	/* Get space for a new table. */
 	oldtable = mp->ma_table;
+	oldmask = mp->ma_mask;
+	oldvalues = mp->ma_values;
 	assert(oldtable != NULL);
-	is_oldtable_malloced = oldtable != mp->ma_smalltable;
+	is_oldtable_malloced = TABLE_IS_MALLOCED(mp);
 
-	if (newsize == PyDict_MINSIZE) {
+	if (newsize == PyDict_MINSIZE && HAS_SMALLTABLE(mp)) {
 		/* A large table is shrinking, or we can't get any smaller. */
 		newtable = mp->ma_smalltable;
 		if (newtable == oldtable) {
@@ -647,6 +996,23 @@ dictresize(PyDictObject *mp, Py_ssize_t minused)
 	i = mp->ma_fill;
 	mp->ma_fill = 0;
 
+	if (oldvalues != NULL) {
+		/* The keys stay in the shared table too */
+		mp->ma_values = NULL;
+		for (i = 0; i <= oldmask; i++) {
+			if (oldvalues[i] != NULL) {
+				ep = &oldtable[i];
+				Py_INCREF(ep->me_key);
+				insertdict_clean(mp, ep->me_key,
+						 (long)ep->me_hash,
+						 oldvalues[i]);
+			}
+		}
+		PyObject_FREE(oldvalues);
+		shared_keys_decref(SHARED_KEYS_OF_TABLE(oldtable));
+		return 0;
+	}
+
 	/* Copy the data over; this is refcount-neutral for active entries;
 	   dummy entries aren't copied over, of course */
 	for (ep = oldtable; i > 0; ep++) {
@@ -737,7 +1103,7 @@ PyDict_GetItem(PyObject *op, PyObject *key)
 			return NULL;
 		}
 	}
-	return ep->me_value;
+	return DICT_VALUE(mp, ep);
 }
 
 /* Variant of PyDict_GetItem() that doesn't suppress exceptions.
@@ -767,7 +1133,7 @@ PyDict_GetItemWithError(PyObject *op, PyObject *key)
 	ep = (mp->ma_lookup)(mp, key, hash);
 	if (ep == NULL)
 		return NULL;
-	return ep->me_value;
+	return DICT_VALUE(mp, ep);
 }
 
 /* CAUTION: PyDict_SetItem() must guarantee that it won't resize the
@@ -845,21 +1211,70 @@ PyDict_DelItem(PyObject *op, PyObject *key)
 	ep = (mp->ma_lookup)(mp, key, hash);
 	if (ep == NULL)
 		return -1;
-	if (ep->me_value == NULL) {
+	if (DICT_VALUE(mp, ep) == NULL) {
 		set_key_error(key);
 		return -1;
 	}
+	if (mp->ma_values != NULL) {
+		/* The key stays in the shared table */
+		old_value = mp->ma_values[ep - mp->ma_table];
+		mp->ma_values[ep - mp->ma_table] = NULL;
+		mp->ma_fill--;
+		mp->ma_used--;
+		mp->ma_version = DICT_NEXT_VERSION();
+		Py_DECREF(old_value);
+		return 0;
+	}
 	old_key = ep->me_key;
 	Py_INCREF(dummy);
 	ep->me_key = dummy;
 	old_value = ep->me_value;
 	ep->me_value = NULL;
 	mp->ma_used--;
+	mp->ma_version = DICT_NEXT_VERSION();
 	Py_DECREF(old_value);
 	Py_DECREF(old_key);
 	return 0;
 }
 
+/* Empty a dict without ma_smalltable, which has no table to fall back on
+   without an allocation, by deleting its items one at a time.  The dict
+   stays consistent whatever the decrefs do to it. */
+static void
+dict_clear_in_place(PyDictObject *mp)
+{
+	Py_ssize_t i;
+	PyDictEntry *ep;
+	PyObject *key, *value;
+
+	for (i = 0; i <= mp->ma_mask; i++) {
+		if (mp->ma_values != NULL) {
+			value = mp->ma_values[i];
+			if (value == NULL)
+				continue;
+			mp->ma_values[i] = NULL;
+			mp->ma_fill--;
+			mp->ma_used--;
+			mp->ma_version = DICT_NEXT_VERSION();
+			Py_DECREF(value);
+		}
+		else {
+			ep = &mp->ma_table[i];
+			value = ep->me_value;
+			if (value == NULL)
+				continue;
+			key = ep->me_key;
+			Py_INCREF(dummy);
+			ep->me_key = dummy;
+			ep->me_value = NULL;
+			mp->ma_used--;
+			mp->ma_version = DICT_NEXT_VERSION();
+			Py_DECREF(value);
+			Py_DECREF(key);
+		}
+	}
+}
+
 void
 PyDict_Clear(PyObject *op)
 {
@@ -875,6 +1290,10 @@ PyDict_Clear(PyObject *op)
 	if (!PyDict_Check(op))
 		return;
 	mp = (PyDictObject *)op;
+	if (!HAS_SMALLTABLE(mp)) {
+		dict_clear_in_place(mp);
+		return;
+	}
 #ifdef Py_DEBUG
 	n = mp->ma_mask + 1;
 	i = 0;
@@ -891,6 +1310,8 @@ PyDict_Clear(PyObject *op)
 	 * clearing.
 	 */
 	fill = mp->ma_fill;
+	if (fill > 0)
+		mp->ma_version = DICT_NEXT_VERSION();
 	if (table_is_malloced)
 		EMPTY_TO_MINSIZE(mp);
 
@@ -950,15 +1371,17 @@ PyDict_Next(PyObject *op, Py_ssize_t *ppos, PyObject **pkey, PyObject **pvalue)
 	register Py_ssize_t i;
 	register Py_ssize_t mask;
 	register PyDictEntry *ep;
+	PyDictObject *mp;
 
 	if (!PyDict_Check(op))
 		return 0;
 	i = *ppos;
 	if (i < 0)
 		return 0;
-	ep = ((PyDictObject *)op)->ma_table;
-	mask = ((PyDictObject *)op)->ma_mask;
-	while (i <= mask && ep[i].me_value == NULL)
+	mp = (PyDictObject *)op;
+	ep = mp->ma_table;
+	mask = mp->ma_mask;
+	while (i <= mask && DICT_VALUE_AT(mp, i) == NULL)
 		i++;
 	*ppos = i+1;
 	if (i > mask)
@@ -966,7 +1389,7 @@ PyDict_Next(PyObject *op, Py_ssize_t *ppos, PyObject **pkey, PyObject **pvalue)
 	if (pkey)
 		*pkey = ep[i].me_key;
 	if (pvalue)
-		*pvalue = ep[i].me_value;
+		*pvalue = DICT_VALUE_AT(mp, i);
 	return 1;
 }
 
@@ -977,15 +1400,17 @@ _PyDict_Next(PyObject *op, Py_ssize_t *ppos, PyObject **pkey, PyObject **pvalue,
 	register Py_ssize_t i;
 	register Py_ssize_t mask;
 	register PyDictEntry *ep;
+	PyDictObject *mp;
 
 	if (!PyDict_Check(op))
 		return 0;
 	i = *ppos;
 	if (i < 0)
 		return 0;
-	ep = ((PyDictObject *)op)->ma_table;
-	mask = ((PyDictObject *)op)->ma_mask;
-	while (i <= mask && ep[i].me_value == NULL)
+	mp = (PyDictObject *)op;
+	ep = mp->ma_table;
+	mask = mp->ma_mask;
+	while (i <= mask && DICT_VALUE_AT(mp, i) == NULL)
 		i++;
 	*ppos = i+1;
 	if (i > mask)
@@ -994,7 +1419,7 @@ _PyDict_Next(PyObject *op, Py_ssize_t *ppos, PyObject **pkey, PyObject **pvalue,
 	if (pkey)
 		*pkey = ep[i].me_key;
 	if (pvalue)
-		*pvalue = ep[i].me_value;
+		*pvalue = DICT_VALUE_AT(mp, i);
 	return 1;
 }
 
@@ -1005,18 +1430,28 @@ dict_dealloc(register PyDictObject *mp)
 {
 	register PyDictEntry *ep;
 	Py_ssize_t fill = mp->ma_fill;
+	Py_ssize_t i;
  	PyObject_GC_UnTrack(mp);
 	Py_TRASHCAN_SAFE_BEGIN(mp)
-	for (ep = mp->ma_table; fill > 0; ep++) {
-		if (ep->me_key) {
-			--fill;
-			Py_DECREF(ep->me_key);
-			Py_XDECREF(ep->me_value);
+	if (mp->ma_values != NULL) {
+		for (i = 0; i <= mp->ma_mask; i++)
+			Py_XDECREF(mp->ma_values[i]);
+		PyObject_FREE(mp->ma_values);
+		shared_keys_decref(SHARED_KEYS(mp));
+	}
+	else {
+		for (ep = mp->ma_table; fill > 0; ep++) {
+			if (ep->me_key) {
+				--fill;
+				Py_DECREF(ep->me_key);
+				Py_XDECREF(ep->me_value);
+			}
 		}
+		if (TABLE_IS_MALLOCED(mp))
+			PyMem_DEL(mp->ma_table);
 	}
-	if (mp->ma_table != mp->ma_smalltable)
-		PyMem_DEL(mp->ma_table);
-	if (numfree < PyDict_MAXFREELIST && Py_TYPE(mp) == &PyDict_Type)
+	if (numfree < PyDict_MAXFREELIST && Py_TYPE(mp) == &PyDict_Type &&
+	    HAS_SMALLTABLE(mp))
 		free_list[numfree++] = mp;
 	else
 		Py_TYPE(mp)->tp_free((PyObject *)mp);
@@ -1124,7 +1559,7 @@ dict_subscript(PyDictObject *mp, register PyObject *key)
 	ep = (mp->ma_lookup)(mp, key, hash);
 	if (ep == NULL)
 		return NULL;
-	v = ep->me_value;
+	v = DICT_VALUE(mp, ep);
 	if (v == NULL) {
 		if (!PyDict_CheckExact(mp)) {
 			/* Look up __missing__ method if we're a subclass. */
@@ -1188,7 +1623,7 @@ dict_keys(register PyDictObject *mp)
 	ep = mp->ma_table;
 	mask = mp->ma_mask;
 	for (i = 0, j = 0; i <= mask; i++) {
-		if (ep[i].me_value != NULL) {
+		if (DICT_VALUE_AT(mp, i) != NULL) {
 			PyObject *key = ep[i].me_key;
 			Py_INCREF(key);
 			PyList_SET_ITEM(v, j, key);
@@ -1204,7 +1639,6 @@ dict_values(register PyDictObject *mp)
 {
 	register PyObject *v;
 	register Py_ssize_t i, j;
-	PyDictEntry *ep;
 	Py_ssize_t mask, n;
 
   again:
@@ -1219,11 +1653,10 @@ dict_values(register PyDictObject *mp)
 		Py_DECREF(v);
 		goto again;
 	}
-	ep = mp->ma_table;
 	mask = mp->ma_mask;
 	for (i = 0, j = 0; i <= mask; i++) {
-		if (ep[i].me_value != NULL) {
-			PyObject *value = ep[i].me_value;
+		PyObject *value = DICT_VALUE_AT(mp, i);
+		if (value != NULL) {
 			Py_INCREF(value);
 			PyList_SET_ITEM(v, j, value);
 			j++;
@@ -1270,7 +1703,7 @@ dict_items(register PyDictObject *mp)
 	ep = mp->ma_table;
 	mask = mp->ma_mask;
 	for (i = 0, j = 0; i <= mask; i++) {
-		if ((value=ep[i].me_value) != NULL) {
+		if ((value=DICT_VALUE_AT(mp, i)) != NULL) {
 			key = ep[i].me_key;
 			item = PyList_GET_ITEM(v, j);
 			Py_INCREF(key);
@@ -1517,20 +1950,28 @@ PyDict_Merge(PyObject *a, PyObject *b, int override)
 		 * incrementally resizing as we insert new items.  Expect
 		 * that there will be no (or few) overlapping keys.
 		 */
-		if ((mp->ma_fill + other->ma_used)*3 >= (mp->ma_mask+1)*2) {
+		if (mp->ma_values == NULL &&
+		    (mp->ma_fill + other->ma_used)*3 >= (mp->ma_mask+1)*2) {
 		   if (dictresize(mp, (mp->ma_used + other->ma_used)*2) != 0)
 			   return -1;
 		}
 		for (i = 0; i <= other->ma_mask; i++) {
+			PyObject *value = DICT_VALUE_AT(other, i);
 			entry = &other->ma_table[i];
-			if (entry->me_value != NULL &&
+			if (value != NULL &&
 			    (override ||
 			     PyDict_GetItem(a, entry->me_key) == NULL)) {
 				Py_INCREF(entry->me_key);
-				Py_INCREF(entry->me_value);
+				Py_INCREF(value);
 				if (insertdict(mp, entry->me_key,
 					       (long)entry->me_hash,
-					       entry->me_value) != 0)
+					       value) != 0)
+					return -1;
+				/* A split table combined by insertdict()
+				 * missed the resize above */
+				if (mp->ma_fill*3 >= (mp->ma_mask+1)*2 &&
+				    dictresize(mp, (mp->ma_used +
+						    other->ma_used)*2) != 0)
 					return -1;
 			}
 		}
@@ -1661,7 +2102,7 @@ dict_equal(PyDictObject *a, PyDictObject *b)
 
 	/* Same # of entries -- check all of 'em.  Exit early on any diff. */
 	for (i = 0; i <= a->ma_mask; i++) {
-		PyObject *aval = a->ma_table[i].me_value;
+		PyObject *aval = DICT_VALUE_AT(a, i);
 		if (aval != NULL) {
 			int cmp;
 			PyObject *bval;
@@ -1724,7 +2165,7 @@ dict_contains(register PyDictObject *mp, PyObject *key)
 	ep = (mp->ma_lookup)(mp, key, hash);
 	if (ep == NULL)
 		return NULL;
-	return PyBool_FromLong(ep->me_value != NULL);
+	return PyBool_FromLong(DICT_VALUE(mp, ep) != NULL);
 }
 
 static PyObject *
@@ -1748,7 +2189,7 @@ dict_get(register PyDictObject *mp, PyObject *args)
 	ep = (mp->ma_lookup)(mp, key, hash);
 	if (ep == NULL)
 		return NULL;
-	val = ep->me_value;
+	val = DICT_VALUE(mp, ep);
 	if (val == NULL)
 		val = failobj;
 	Py_INCREF(val);
@@ -1777,7 +2218,7 @@ dict_setdefault(register PyDictObject *mp, PyObject *args)
 	ep = (mp->ma_lookup)(mp, key, hash);
 	if (ep == NULL)
 		return NULL;
-	val = ep->me_value;
+	val = DICT_VALUE(mp, ep);
 	if (val == NULL) {
 		val = failobj;
 		if (PyDict_SetItem((PyObject*)mp, key, failobj))
@@ -1823,7 +2264,7 @@ dict_pop(PyDictObject *mp, PyObject *args)
 	ep = (mp->ma_lookup)(mp, key, hash);
 	if (ep == NULL)
 		return NULL;
-	if (ep->me_value == NULL) {
+	if (DICT_VALUE(mp, ep) == NULL) {
 		if (deflt) {
 			Py_INCREF(deflt);
 			return deflt;
@@ -1831,12 +2272,21 @@ dict_pop(PyDictObject *mp, PyObject *args)
 		set_key_error(key);
 		return NULL;
 	}
+	if (mp->ma_values != NULL) {
+		old_value = mp->ma_values[ep - mp->ma_table];
+		mp->ma_values[ep - mp->ma_table] = NULL;
+		mp->ma_fill--;
+		mp->ma_used--;
+		mp->ma_version = DICT_NEXT_VERSION();
+		return old_value;
+	}
 	old_key = ep->me_key;
 	Py_INCREF(dummy);
 	ep->me_key = dummy;
 	old_value = ep->me_value;
 	ep->me_value = NULL;
 	mp->ma_used--;
+	mp->ma_version = DICT_NEXT_VERSION();
 	Py_DECREF(old_key);
 	return old_value;
 }
@@ -1866,6 +2316,10 @@ dict_popitem(PyDictObject *mp)
 				"popitem(): dictionary is empty");
 		return NULL;
 	}
+	if (mp->ma_values != NULL && dict_combine(mp) < 0) {
+		Py_DECREF(res);
+		return NULL;
+	}
 	/* Set ep to "the first" dict entry with a value.  We abuse the hash
 	 * field of slot 0 to hold a search finger:
 	 * If slot 0 has a value, use slot 0.
@@ -1894,6 +2348,7 @@ dict_popitem(PyDictObject *mp)
 	ep->me_key = dummy;
 	ep->me_value = NULL;
 	mp->ma_used--;
+	mp->ma_version = DICT_NEXT_VERSION();
 	assert(mp->ma_table[0].me_value == NULL);
 	mp->ma_table[0].me_hash = i + 1;  /* next place to start */
 	return res;
@@ -1927,8 +2382,14 @@ dict_sizeof(PyDictObject *mp)
 {
 	Py_ssize_t res;
 
-	res = sizeof(PyDictObject);
-	if (mp->ma_table != mp->ma_smalltable)
+	if (HAS_SMALLTABLE(mp))
+		res = sizeof(PyDictObject);
+	else
+		res = offsetof(PyDictObject, ma_smalltable);
+	/* The shared table of a split table isn't counted */
+	if (mp->ma_values != NULL)
+		res = res + (mp->ma_mask + 1) * sizeof(PyObject *);
+	else if (TABLE_IS_MALLOCED(mp))
 		res = res + (mp->ma_mask + 1) * sizeof(PyDictEntry);
 	return PyLong_FromSsize_t(res);
 }
@@ -2030,7 +2491,7 @@ PyDict_Contains(PyObject *op, PyObject *key)
 			return -1;
 	}
 	ep = (mp->ma_lookup)(mp, key, hash);
-	return ep == NULL ? -1 : (ep->me_value != NULL);
+	return ep == NULL ? -1 : (DICT_VALUE(mp, ep) != NULL);
 }
 
 /* Internal version of PyDict_Contains used when the hash value is already known */
@@ -2041,7 +2502,46 @@ _PyDict_Contains(PyObject *op, PyObject *key, long hash)
 	PyDictEntry *ep;
 
 	ep = (mp->ma_lookup)(mp, key, hash);
-	return ep == NULL ? -1 : (ep->me_value != NULL);
+	return ep == NULL ? -1 : (DICT_VALUE(mp, ep) != NULL);
+}
+
+/* Variant of PyDict_GetItem() for a str key, which first tries the slot
+   *hint, where the key was found in this dict or a dict like it before:
+   this avoids the lookup if the slot still holds the very same key.
+   *hint is updated when the key is found elsewhere.  Like
+   PyDict_GetItem(), this ignores errors; it must be called without an
+   exception set. */
+PyObject *
+_PyDict_GetItemHint(PyObject *op, PyObject *key, Py_ssize_t *hint)
+{
+	PyDictObject *mp = (PyDictObject *)op;
+	PyDictEntry *ep;
+	PyObject *value;
+	Py_ssize_t i = *hint;
+	long hash;
+
+	assert(PyDict_Check(op) && PyUnicode_CheckExact(key));
+	if (i >= 0 && i <= mp->ma_mask && mp->ma_table[i].me_key == key) {
+		value = DICT_VALUE_AT(mp, i);
+		if (value != NULL)
+			return value;
+	}
+	if ((hash = ((PyUnicodeObject *) key)->hash) == -1) {
+		hash = PyObject_Hash(key);
+		if (hash == -1) {
+			PyErr_Clear();
+			return NULL;
+		}
+	}
+	ep = (mp->ma_lookup)(mp, key, hash);
+	if (ep == NULL) {
+		PyErr_Clear();
+		return NULL;
+	}
+	value = DICT_VALUE(mp, ep);
+	if (value != NULL)
+		*hint = ep - mp->ma_table;
+	return value;
 }
 
 /* Hack to implement "key in dict" */
@@ -2071,6 +2571,7 @@ dict_new(PyTypeObject *type, PyObject *args, PyObject *kwds)
 		assert(d->ma_table == NULL && d->ma_fill == 0 && d->ma_used == 0);
 		INIT_NONZERO_DICT_SLOTS(d);
 		d->ma_lookup = lookdict_unicode;
+		d->ma_version = DICT_NEXT_VERSION();
 		/* The object has been implicitely tracked by tp_alloc */
 		if (type == &PyDict_Type)
 			_PyObject_GC_UNTRACK(d);
@@ -2287,7 +2788,7 @@ static PyObject *dictiter_iternextkey(dictiterobject *di)
 		goto fail;
 	ep = d->ma_table;
 	mask = d->ma_mask;
-	while (i <= mask && ep[i].me_value == NULL)
+	while (i <= mask && DICT_VALUE_AT(d, i) == NULL)
 		i++;
 	di->di_pos = i+1;
 	if (i > mask)
@@ -2340,7 +2841,6 @@ static PyObject *dictiter_iternextvalue(dictiterobject *di)
 {
 	PyObject *value;
 	register Py_ssize_t i, mask;
-	register PyDictEntry *ep;
 	PyDictObject *d = di->di_dict;
 
 	if (d == NULL)
@@ -2358,8 +2858,7 @@ static PyObject *dictiter_iternextvalue(dictiterobject *di)
 	mask = d->ma_mask;
 	if (i < 0 || i > mask)
 		goto fail;
-	ep = d->ma_table;
-	while ((value=ep[i].me_value) == NULL) {
+	while ((value=DICT_VALUE_AT(d, i)) == NULL) {
 		i++;
 		if (i > mask)
 			goto fail;
@@ -2431,7 +2930,7 @@ static PyObject *dictiter_iternextitem(dictiterobject *di)
 		goto fail;
 	ep = d->ma_table;
 	mask = d->ma_mask;
-	while (i <= mask && ep[i].me_value == NULL)
+	while (i <= mask && DICT_VALUE_AT(d, i) == NULL)
 		i++;
 	di->di_pos = i+1;
 	if (i > mask)
@@ -2448,7 +2947,7 @@ static PyObject *dictiter_iternextitem(dictiterobject *di)
 	}
 	di->len--;
 	key = ep[i].me_key;
-	value = ep[i].me_value;
+	value = DICT_VALUE_AT(d, i);
 	Py_INCREF(key);
 	Py_INCREF(value);
 	PyTuple_SET_ITEM(result, 0, key);
@@ -1061,7 +1061,7 @@ PyObject_GenericSetAttr(PyObject *obj, PyObject *name, PyObject *value)
 	if (dictptr != NULL) {
 		PyObject *dict = *dictptr;
 		if (dict == NULL && value != NULL) {
-			dict = PyDict_New();
+			dict = _PyObjectDict_New(tp);
 			if (dict == NULL)
 				goto done;
 			*dictptr = dict;
@@ -168,9 +168,26 @@
  * Therefore, allocating arenas with malloc is not optimal, because there is
  * some address space wastage, but this is the most portable way to request
  * memory from the system across various platforms.
+ *
+ * Where anonymous mmap() is available, arenas are mapped and unmapped
+ * directly instead.  A free()'d arena may otherwise stay in the process:
+ * malloc implementations usually serve requests this size from the heap
+ * once the first mapped blocks have been released, and the heap can only
+ * shrink from its top.  Mapped arenas are also page aligned, so no pool is
+ * lost to alignment.
  */
 #define ARENA_SIZE		(256 << 10)	/* 256KB */
 
+#if defined(_POSIX_MAPPED_FILES) && _POSIX_MAPPED_FILES > 0
+#include <sys/mman.h>
+#if !defined(MAP_ANONYMOUS) && defined(MAP_ANON)
+#define MAP_ANONYMOUS		MAP_ANON
+#endif
+#ifdef MAP_ANONYMOUS
+#define ARENAS_USE_MMAP
+#endif
+#endif
+
 #ifdef WITH_MEMORY_LIMITS
 #define MAX_ARENAS		(SMALL_MEMORY_LIMIT / ARENA_SIZE)
 #endif
@@ -493,12 +510,33 @@ static struct arena_object* usable_arenas = NULL;
 /* Number of arenas allocated that haven't been free()'d. */
 static size_t narenas_currently_allocated = 0;
 
-#ifdef PYMALLOC_DEBUG
-/* Total number of times malloc() called to allocate an arena. */
+/* Total number of arenas ever allocated. */
 static size_t ntimes_arena_allocated = 0;
 /* High water mark (max value ever seen) for narenas_currently_allocated. */
 static size_t narenas_highwater = 0;
+
+/* Get and release the memory of one arena. */
+static void *
+arena_alloc(void)
+{
+#ifdef ARENAS_USE_MMAP
+	void *address = mmap(NULL, ARENA_SIZE, PROT_READ | PROT_WRITE,
+			     MAP_PRIVATE | MAP_ANONYMOUS, -1, 0);
+	return address == MAP_FAILED ? NULL : address;
+#else
+	return malloc(ARENA_SIZE);
+#endif
+}
+
+static void
+arena_free(void *address)
+{
+#ifdef ARENAS_USE_MMAP
+	munmap(address, ARENA_SIZE);
+#else
+	free(address);
 #endif
+}
 
 /* Allocate a new arena.  If we run out of memory, return NULL.  Else
  * allocate a new arena, and return the address of an arena_object
@@ -562,7 +600,7 @@ new_arena(void)
 	arenaobj = unused_arena_objects;
 	unused_arena_objects = arenaobj->nextarena;
 	assert(arenaobj->address == 0);
-	arenaobj->address = (uptr)malloc(ARENA_SIZE);
+	arenaobj->address = (uptr)arena_alloc();
 	if (arenaobj->address == 0) {
 		/* The allocation failed: return NULL after putting the
 		 * arenaobj back.
@@ -573,11 +611,9 @@ new_arena(void)
 	}
 
 	++narenas_currently_allocated;
-#ifdef PYMALLOC_DEBUG
 	++ntimes_arena_allocated;
 	if (narenas_currently_allocated > narenas_highwater)
 		narenas_highwater = narenas_currently_allocated;
-#endif
 	arenaobj->freepools = NULL;
 	/* pool_address <- first pool-aligned address in the arena
 	   nfreepools <- number of whole pools that fit after alignment */
@@ -973,7 +1009,7 @@ PyObject_Free(void *p)
 			/* All the rest is arena management.  We just freed
 			 * a pool, and there are 4 cases for arena mgmt:
 			 * 1. If all the pools are free, return the arena to
-			 *    the system free().
+			 *    the system.
 			 * 2. If this is the only free pool in the arena,
 			 *    add the arena back to the `usable_arenas` list.
 			 * 3. If the "next" arena has a smaller count of free
@@ -1016,7 +1052,7 @@ PyObject_Free(void *p)
 				unused_arena_objects = ao;
 
 				/* Free the entire arena. */
-				free((void *)ao->address);
+				arena_free((void *)ao->address);
 				ao->address = 0;	/* mark unassociated */
 				--narenas_currently_allocated;
 
@@ -1199,6 +1235,71 @@ PyObject_Realloc(void *p, size_t nbytes)
    	return bp ? bp : p;
 }
 
+#if (SMALL_REQUEST_THRESHOLD >> ALIGNMENT_SHIFT) > _PYMALLOC_MAX_CLASSES || \
+    ARENA_SIZE / POOL_SIZE > _PYMALLOC_MAX_ARENA_POOLS
+#error "_PyMallocStats is too small for this configuration"
+#endif
+
+/* Fill in *stats with the usage of the arenas, pools and size classes, for
+ * sys.getallocatorstats().  Unlike _PyObject_DebugMallocStats() this is
+ * available in every build with pymalloc.
+ */
+void
+_PyObject_GetMallocStats(_PyMallocStats *stats)
+{
+	uint i;
+	const uint numclasses = SMALL_REQUEST_THRESHOLD >> ALIGNMENT_SHIFT;
+
+	memset(stats, 0, sizeof(*stats));
+	stats->arena_size = ARENA_SIZE;
+	stats->pool_size = POOL_SIZE;
+	stats->arena_pools = ARENA_SIZE / POOL_SIZE;
+	stats->nclasses = numclasses;
+	for (i = 0; i < numclasses; ++i)
+		stats->class_size[i] = INDEX2SIZE(i);
+
+	for (i = 0; i < maxarenas; ++i) {
+		uptr base = arenas[i].address;
+
+		/* Skip arenas which are not allocated. */
+		if (base == (uptr)NULL)
+			continue;
+		stats->narenas += 1;
+		stats->npools_free += arenas[i].nfreepools;
+		stats->arena_usage[arenas[i].ntotalpools -
+				   arenas[i].nfreepools] += 1;
+
+		/* visit every pool carved out of the arena */
+		if (base & (uptr)POOL_SIZE_MASK) {
+			base &= ~(uptr)POOL_SIZE_MASK;
+			base += POOL_SIZE;
+		}
+		for (; base < (uptr) arenas[i].pool_address;
+		     base += POOL_SIZE) {
+			poolp p = (poolp)base;
+			const uint sz = p->szidx;
+
+			if (p->ref.count == 0)
+				continue;	/* currently unused */
+			stats->class_pools[sz] += 1;
+			stats->class_blocks[sz] += p->ref.count;
+			stats->class_freeblocks[sz] +=
+				NUMBLOCKS(sz) - p->ref.count;
+		}
+	}
+	assert(stats->narenas == narenas_currently_allocated);
+	stats->narenas_total = ntimes_arena_allocated;
+	stats->narenas_highwater = narenas_highwater;
+
+	for (i = 0; i < numclasses; ++i) {
+		stats->npools_used += stats->class_pools[i];
+		stats->allocated_bytes += stats->class_blocks[i] *
+					  stats->class_size[i];
+		stats->available_bytes += stats->class_freeblocks[i] *
+					  stats->class_size[i];
+	}
+}
+
 #else	/* ! WITH_PYMALLOC */
 
 /*==========================================================================*/
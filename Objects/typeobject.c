@@ -1738,7 +1738,7 @@ subtype_dict(PyObject *obj, void *context)
 	}
 	dict = *dictptr;
 	if (dict == NULL)
-		*dictptr = dict = PyDict_New();
+		*dictptr = dict = _PyObjectDict_New(Py_TYPE(obj));
 	Py_XINCREF(dict);
 	return dict;
 }
@@ -2451,6 +2451,8 @@ type_dealloc(PyTypeObject *type)
 	PyObject_Free((char *)type->tp_doc);
 	Py_XDECREF(et->ht_name);
 	Py_XDECREF(et->ht_slots);
+	if (et->ht_cached_keys != NULL)
+		_PyDict_DecRefSharedKeys(et->ht_cached_keys);
 	Py_TYPE(type)->tp_free((PyObject *)type);
 }
 
@@ -116,6 +116,11 @@ static int maybe_call_line_trace(Py_tracefunc, PyObject *,
 static PyObject * cmp_outcome(int, PyObject *, PyObject *);
 static PyObject * import_from(PyObject *, PyObject *);
 static int import_all_from(PyObject *, PyObject *);
+static PyGlobalCacheEntry * new_global_cache(PyCodeObject *);
+static PyAttrCacheEntry * attr_cache_entry(PyCodeObject *, int);
+static PyObject * load_attr(PyObject *, PyObject *, PyAttrCacheEntry *);
+static PyObject * load_method(PyObject *, PyObject *, PyAttrCacheEntry *,
+			      int *);
 static void format_exc_check_arg(PyObject *, const char *, PyObject *);
 static PyObject * unicode_concatenate(PyObject *, PyObject *,
                                       PyFrameObject *, unsigned char *);
@@ -700,6 +705,8 @@ PyEval_EvalFrameEx(PyFrameObject *f, int throwflag)
 	unsigned char *first_instr;
 	PyObject *names;
 	PyObject *consts;
+	PyGlobalCacheEntry *gce;	/* LOAD_GLOBAL cache entry */
+	PY_DICT_VERSION_T globals_version, builtins_version;
 #if defined(Py_DEBUG) || defined(LLTRACE)
 	/* Make it easier to find out where we are with a debugger */
 	char *filename;
@@ -2010,10 +2017,35 @@ PyEval_EvalFrameEx(PyFrameObject *f, int throwflag)
 
 		TARGET(LOAD_GLOBAL)
 			w = GETITEM(names, oparg);
-			if (PyUnicode_CheckExact(w)) {
+			/* The cache entry of the name holds the object found
+			   the last time, with the versions the globals and the
+			   builtins had before looking it up.  As long as both
+			   keep these versions, the lookups would find it
+			   again. */
+			if (co->co_globalcache != NULL) {
+				gce = &co->co_globalcache[oparg];
+				if (gce->gc_globals_version ==
+				    ((PyDictObject *)f->f_globals)->ma_version &&
+				    gce->gc_builtins_version ==
+				    ((PyDictObject *)f->f_builtins)->ma_version) {
+					x = gce->gc_value;
+					Py_INCREF(x);
+					PUSH(x);
+					DISPATCH();
+				}
+			}
+			globals_version =
+				((PyDictObject *)f->f_globals)->ma_version;
+			builtins_version =
+				((PyDictObject *)f->f_builtins)->ma_version;
+			if (PyUnicode_CheckExact(w) &&
+			    ((PyDictObject *)f->f_globals)->ma_values == NULL &&
+			    ((PyDictObject *)f->f_builtins)->ma_values == NULL) {
 				/* Inline the PyDict_GetItem() calls.
 				   WARNING: this is an extreme speed hack.
-				   Do not try this at home. */
+				   Do not try this at home.  Split tables
+				   (instance dicts used as globals) are left
+				   to PyDict_GetItem(). */
 				long hash = ((PyUnicodeObject *)w)->hash;
 				if (hash != -1) {
 					PyDictObject *d;
@@ -2025,11 +2057,8 @@ PyEval_EvalFrameEx(PyFrameObject *f, int throwflag)
 						break;
 					}
 					x = e->me_value;
-					if (x != NULL) {
-						Py_INCREF(x);
-						PUSH(x);
-						DISPATCH();
-					}
+					if (x != NULL)
+						goto load_global_found;
 					d = (PyDictObject *)(f->f_builtins);
 					e = d->ma_lookup(d, w, hash);
 					if (e == NULL) {
@@ -2037,11 +2066,8 @@ PyEval_EvalFrameEx(PyFrameObject *f, int throwflag)
 						break;
 					}
 					x = e->me_value;
-					if (x != NULL) {
-						Py_INCREF(x);
-						PUSH(x);
-						DISPATCH();
-					}
+					if (x != NULL)
+						goto load_global_found;
 					goto load_global_error;
 				}
 			}
@@ -2057,6 +2083,17 @@ PyEval_EvalFrameEx(PyFrameObject *f, int throwflag)
 					break;
 				}
 			}
+		  load_global_found:
+			if (co->co_globalcache == NULL)
+				co->co_globalcache = new_global_cache(co);
+			if (co->co_globalcache != NULL) {
+				/* If a lookup changed the dicts, the versions
+				   recorded are already stale */
+				gce = &co->co_globalcache[oparg];
+				gce->gc_globals_version = globals_version;
+				gce->gc_builtins_version = builtins_version;
+				gce->gc_value = x;
+			}
 			Py_INCREF(x);
 			PUSH(x);
 			DISPATCH();
@@ -2192,12 +2229,41 @@ PyEval_EvalFrameEx(PyFrameObject *f, int throwflag)
 		TARGET(LOAD_ATTR)
 			w = GETITEM(names, oparg);
 			v = TOP();
-			x = PyObject_GetAttr(v, w);
+			x = load_attr(v, w,
+				attr_cache_entry(co, INSTR_OFFSET() - 3));
 			Py_DECREF(v);
 			SET_TOP(x);
 			if (x != NULL) DISPATCH();
 			break;
 
+		TARGET(LOAD_METHOD)
+		{
+			int unbound;
+			w = GETITEM(names, oparg);
+			v = TOP();
+			x = load_method(v, w,
+				attr_cache_entry(co, INSTR_OFFSET() - 3),
+				&unbound);
+			if (x == NULL) {
+				Py_DECREF(v);
+				SET_TOP(NULL);
+				break;
+			}
+			if (unbound) {
+				/* CALL_METHOD calls the function with v
+				   as the first argument */
+				SET_TOP(x);
+				PUSH(v);
+			}
+			else {
+				/* CALL_METHOD calls the attribute itself */
+				SET_TOP(NULL);
+				Py_DECREF(v);
+				PUSH(x);
+			}
+			DISPATCH();
+		}
+
 		TARGET(COMPARE_OP)
 			w = POP();
 			v = TOP();
@@ -2536,6 +2602,40 @@ PyEval_EvalFrameEx(PyFrameObject *f, int throwflag)
 			break;
 		}
 
+		TARGET(CALL_METHOD)
+		{
+			/* Below the arguments is either a function and
+			   its first argument, or NULL and the callable
+			   (see LOAD_METHOD) */
+			PyObject **sp;
+			int n = (oparg & 0xff) + 2 * ((oparg >> 8) & 0xff);
+			PCALL(PCALL_ALL);
+			sp = stack_pointer;
+			if (stack_pointer[-n - 2] != NULL) {
+				PCALL(PCALL_METHOD);
+#ifdef WITH_TSC
+				x = call_function(&sp, oparg + 1,
+						  &intr0, &intr1);
+#else
+				x = call_function(&sp, oparg + 1);
+#endif
+				stack_pointer = sp;
+			}
+			else {
+#ifdef WITH_TSC
+				x = call_function(&sp, oparg, &intr0, &intr1);
+#else
+				x = call_function(&sp, oparg);
+#endif
+				stack_pointer = sp;
+				STACKADJ(-1);
+			}
+			PUSH(x);
+			if (x != NULL)
+				DISPATCH();
+			break;
+		}
+
 		TARGET_WITH_IMPL(CALL_FUNCTION_VAR, _call_function_var_kw)
 		TARGET_WITH_IMPL(CALL_FUNCTION_KW, _call_function_var_kw)
 		TARGET(CALL_FUNCTION_VAR_KW)
@@ -4150,6 +4250,218 @@ cmp_outcome(int op, register PyObject *v, register PyObject *w)
 	return v;
 }
 
+/* Allocate the LOAD_GLOBAL cache of co, with an empty entry for each name:
+   versions start at 1.  Failing to allocate it isn't an error, the lookups
+   are then just done every time. */
+static PyGlobalCacheEntry *
+new_global_cache(PyCodeObject *co)
+{
+	PyGlobalCacheEntry *cache;
+	Py_ssize_t n = PyTuple_GET_SIZE(co->co_names);
+
+	if (n == 0)
+		return NULL;
+	cache = PyMem_New(PyGlobalCacheEntry, n);
+	if (cache != NULL)
+		memset(cache, 0, n * sizeof(PyGlobalCacheEntry));
+	return cache;
+}
+
+/* The attribute caches of LOAD_ATTR and LOAD_METHOD.  The cache entry of
+   an instruction records where it found the attribute on an instance of
+   some type whose tp_getattro is PyObject_GenericGetAttr.  It is only
+   valid while the type keeps the version tag it had then: any change to
+   the type or to one of its bases invalidates the tag. */
+
+/* Kinds of entries (ac_kind) */
+#define ATTRCACHE_DICT		1	/* In the instance dict, probably at
+					   index ac_index; not on the type */
+#define ATTRCACHE_SLOT		2	/* In the __slots__ slot at offset
+					   ac_index */
+#define ATTRCACHE_METHOD	3	/* The function ac_descr of the type,
+					   unless the instance dict has it */
+
+#define ATTRCACHE_VALID(ace, tp) \
+	((ace)->ac_type == (tp) && \
+	 PyType_HasFeature((tp), Py_TPFLAGS_VALID_VERSION_TAG) && \
+	 (ace)->ac_version == (tp)->tp_version_tag)
+
+#define ATTRCACHE_FILL(ace, tp, kind, index, descr) do { \
+	(ace)->ac_type = (tp); \
+	(ace)->ac_version = (tp)->tp_version_tag; \
+	(ace)->ac_kind = (kind); \
+	(ace)->ac_index = (index); \
+	(ace)->ac_descr = (descr); \
+    } while (0)
+
+/* Allocate the attribute cache of co, with an entry for each of its first
+   255 LOAD_ATTR and LOAD_METHOD instructions, and the map from the offsets
+   of the instructions to the entries.  Return 0 if this failed; the
+   instructions then go without a cache. */
+static int
+new_attr_cache(PyCodeObject *co)
+{
+	unsigned char *code = (unsigned char *)PyBytes_AS_STRING(co->co_code);
+	Py_ssize_t i, len = PyBytes_GET_SIZE(co->co_code);
+	PyAttrCacheEntry *cache;
+	unsigned char *map;
+	int op, n = 0;
+	size_t size;
+
+	for (i = 0; i < len; i += HAS_ARG(op) ? 3 : 1) {
+		op = code[i];
+		if ((op == LOAD_ATTR || op == LOAD_METHOD) && n < 255)
+			n++;
+	}
+	if (n == 0)
+		return 0;
+	size = n * sizeof(PyAttrCacheEntry) + len;
+	cache = PyMem_MALLOC(size);
+	if (cache == NULL)
+		return 0;
+	memset(cache, 0, size);
+	map = (unsigned char *)(cache + n);
+	n = 0;
+	for (i = 0; i < len; i += HAS_ARG(op) ? 3 : 1) {
+		op = code[i];
+		if ((op == LOAD_ATTR || op == LOAD_METHOD) && n < 255)
+			map[i] = ++n;
+	}
+	co->co_attrcache = cache;
+	co->co_attrcache_map = map;
+	return 1;
+}
+
+/* The cache entry of the instruction at offset in co, or NULL */
+static PyAttrCacheEntry *
+attr_cache_entry(PyCodeObject *co, int offset)
+{
+	int i;
+
+	if (co->co_attrcache == NULL && !new_attr_cache(co))
+		return NULL;
+	i = co->co_attrcache_map[offset];
+	return i ? &co->co_attrcache[i - 1] : NULL;
+}
+
+/* PyObject_GetAttr(obj, name), using and filling the cache entry ace */
+static PyObject *
+load_attr(PyObject *obj, PyObject *name, PyAttrCacheEntry *ace)
+{
+	PyTypeObject *tp = Py_TYPE(obj);
+	PyObject *descr, *dict, *res;
+	PyMemberDef *mp;
+	Py_ssize_t hint;
+
+	if (ace == NULL)
+		return PyObject_GetAttr(obj, name);
+	if (ATTRCACHE_VALID(ace, tp)) {
+		if (ace->ac_kind == ATTRCACHE_DICT) {
+			dict = *(PyObject **)((char *)obj + tp->tp_dictoffset);
+			if (dict != NULL) {
+				res = _PyDict_GetItemHint(dict, name,
+							  &ace->ac_index);
+				if (res != NULL) {
+					Py_INCREF(res);
+					return res;
+				}
+			}
+		}
+		else if (ace->ac_kind == ATTRCACHE_SLOT) {
+			res = *(PyObject **)((char *)obj + ace->ac_index);
+			if (res != NULL) {
+				Py_INCREF(res);
+				return res;
+			}
+		}
+		/* Let the slow path find the attribute or raise */
+		return PyObject_GetAttr(obj, name);
+	}
+
+	if (tp->tp_getattro != PyObject_GenericGetAttr ||
+	    !PyUnicode_CheckExact(name))
+		return PyObject_GetAttr(obj, name);
+	descr = _PyType_Lookup(tp, name);
+	if (!PyType_HasFeature(tp, Py_TPFLAGS_VALID_VERSION_TAG))
+		return PyObject_GetAttr(obj, name);
+	if (descr == NULL) {
+		if (tp->tp_dictoffset > 0) {
+			dict = *(PyObject **)((char *)obj + tp->tp_dictoffset);
+			hint = -1;
+			if (dict != NULL &&
+			    (res = _PyDict_GetItemHint(dict, name,
+						       &hint)) != NULL) {
+				ATTRCACHE_FILL(ace, tp, ATTRCACHE_DICT, hint,
+					       NULL);
+				Py_INCREF(res);
+				return res;
+			}
+		}
+	}
+	else if (Py_TYPE(descr) == &PyMemberDescr_Type &&
+		 PyObject_TypeCheck(obj,
+				    ((PyMemberDescrObject *)descr)->d_type)) {
+		/* A slot, which comes before the instance dict */
+		mp = ((PyMemberDescrObject *)descr)->d_member;
+		if (mp->type == T_OBJECT_EX && !(mp->flags & READ_RESTRICTED)) {
+			res = *(PyObject **)((char *)obj + mp->offset);
+			if (res != NULL) {
+				ATTRCACHE_FILL(ace, tp, ATTRCACHE_SLOT,
+					       mp->offset, NULL);
+				Py_INCREF(res);
+				return res;
+			}
+		}
+	}
+	return PyObject_GetAttr(obj, name);
+}
+
+/* Look up the method name of obj for CALL_METHOD.  If it is a function
+   defined on the type of obj, return it and set *unbound to 1: it is to
+   be called with obj as its first argument, without making a bound
+   method.  Else return PyObject_GetAttr(obj, name) and set *unbound to
+   0. */
+static PyObject *
+load_method(PyObject *obj, PyObject *name, PyAttrCacheEntry *ace,
+	    int *unbound)
+{
+	PyTypeObject *tp = Py_TYPE(obj);
+	PyObject *descr, **dictptr, *attr;
+
+	*unbound = 0;
+	if (ace != NULL && ATTRCACHE_VALID(ace, tp)) {
+		if (ace->ac_kind != ATTRCACHE_METHOD)
+			return load_attr(obj, name, ace);
+		descr = ace->ac_descr;
+	}
+	else if (tp->tp_getattro == PyObject_GenericGetAttr &&
+		 PyUnicode_CheckExact(name)) {
+		descr = _PyType_Lookup(tp, name);
+		if (descr == NULL || !PyFunction_Check(descr))
+			return load_attr(obj, name, ace);
+		if (ace != NULL &&
+		    PyType_HasFeature(tp, Py_TPFLAGS_VALID_VERSION_TAG))
+			ATTRCACHE_FILL(ace, tp, ATTRCACHE_METHOD, 0, descr);
+	}
+	else
+		return PyObject_GetAttr(obj, name);
+
+	/* A function is a non-data descriptor: the instance dict comes
+	   first.  The lookup could run code changing the type. */
+	Py_INCREF(descr);
+	dictptr = _PyObject_GetDictPtr(obj);
+	if (dictptr != NULL && *dictptr != NULL) {
+		attr = PyDict_GetItem(*dictptr, name);
+		if (attr != NULL) {
+			Py_INCREF(attr);
+			Py_DECREF(descr);
+			return attr;
+		}
+	}
+	*unbound = 1;
+	return descr;
+}
+
 static PyObject *
 import_from(PyObject *v, PyObject *name)
 {
@@ -810,6 +810,8 @@ opcode_stack_effect(int opcode, int oparg)
 			return 1;
 		case LOAD_ATTR:
 			return 0;
+		case LOAD_METHOD:
+			return 1;
 		case COMPARE_OP:
 			return -1;
 		case IMPORT_NAME:
@@ -856,6 +858,8 @@ opcode_stack_effect(int opcode, int oparg)
 			return -NARGS(oparg)-1;
 		case CALL_FUNCTION_VAR_KW:
 			return -NARGS(oparg)-2;
+		case CALL_METHOD:
+			return -NARGS(oparg)-1;
 		case MAKE_FUNCTION:
 			return -NARGS(oparg) - ((oparg >> 16) & 0xffff);
 		case MAKE_CLOSURE:
@@ -2737,7 +2741,28 @@ compiler_compare(struct compiler *c, expr_ty e)
 static int
 compiler_call(struct compiler *c, expr_ty e)
 {
-	VISIT(c, expr, e->v.Call.func);
+	expr_ty func = e->v.Call.func;
+
+	/* obj.name(args) is compiled to LOAD_METHOD and CALL_METHOD, which
+	   don't need a bound method object when name is a function defined
+	   on the type of obj.  CALL_METHOD passes one more positional
+	   argument than it got, so there must be fewer than 255. */
+	if (func->kind == Attribute_kind &&
+	    func->v.Attribute.ctx == Load &&
+	    e->v.Call.starargs == NULL && e->v.Call.kwargs == NULL &&
+	    asdl_seq_LEN(e->v.Call.args) < 255) {
+		int n = asdl_seq_LEN(e->v.Call.args);
+		VISIT(c, expr, func->v.Attribute.value);
+		ADDOP_NAME(c, LOAD_METHOD, func->v.Attribute.attr, names);
+		VISIT_SEQ(c, expr, e->v.Call.args);
+		if (e->v.Call.keywords) {
+			VISIT_SEQ(c, keyword, e->v.Call.keywords);
+			n |= asdl_seq_LEN(e->v.Call.keywords) << 8;
+		}
+		ADDOP_I(c, CALL_METHOD, n);
+		return 1;
+	}
+	VISIT(c, expr, func);
 	return compiler_call_helper(c, 0,
 				    e->v.Call.args,
 				    e->v.Call.keywords,
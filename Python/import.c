@@ -89,8 +89,9 @@ typedef unsigned short mode_t;
 			   change LIST_APPEND and SET_ADD, add MAP_ADD)
        Python 3.1a0: 3150 (optimize conditional branches:
 			   introduce POP_JUMP_IF_FALSE and POP_JUMP_IF_TRUE)
+       Python 3.1.2: 3160 (add LOAD_METHOD and CALL_METHOD)
 */
-#define MAGIC (3150 | ((long)'\r'<<16) | ((long)'\n'<<24))
+#define MAGIC (3160 | ((long)'\r'<<16) | ((long)'\n'<<24))
 
 /* Magic word as global; note that _PyImport_Init() can change the
    value of this global to accommodate for alterations of how the
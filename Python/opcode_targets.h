@@ -159,8 +159,8 @@ static void *opcode_targets[256] = {
 	&&_unknown_opcode,
 	&&_unknown_opcode,
 	&&_unknown_opcode,
-	&&_unknown_opcode,
-	&&_unknown_opcode,
+	&&TARGET_LOAD_METHOD,
+	&&TARGET_CALL_METHOD,
 	&&_unknown_opcode,
 	&&_unknown_opcode,
 	&&_unknown_opcode,
@@ -704,6 +704,92 @@ sys_gettotalrefcount(PyObject *self)
 }
 #endif /* Py_REF_DEBUG */
 
+#ifdef WITH_PYMALLOC
+static int
+set_stat(PyObject *dict, const char *name, PyObject *value)
+{
+	int err;
+
+	if (value == NULL)
+		return -1;
+	err = PyDict_SetItemString(dict, name, value);
+	Py_DECREF(value);
+	return err;
+}
+
+static PyObject *
+sys_getallocatorstats(PyObject *self)
+{
+	_PyMallocStats st;
+	PyObject *dict, *classes, *usage;
+	unsigned int i;
+
+	/* Take the counts first: creating the result changes them. */
+	_PyObject_GetMallocStats(&st);
+
+	classes = PyList_New(st.nclasses);
+	if (classes == NULL)
+		return NULL;
+	for (i = 0; i < st.nclasses; i++) {
+		PyObject *item = Py_BuildValue("(nnnn)",
+					       (Py_ssize_t)st.class_size[i],
+					       (Py_ssize_t)st.class_pools[i],
+					       (Py_ssize_t)st.class_blocks[i],
+					       (Py_ssize_t)st.class_freeblocks[i]);
+		if (item == NULL) {
+			Py_DECREF(classes);
+			return NULL;
+		}
+		PyList_SET_ITEM(classes, i, item);
+	}
+	usage = PyList_New(st.arena_pools + 1);
+	if (usage == NULL) {
+		Py_DECREF(classes);
+		return NULL;
+	}
+	for (i = 0; i <= st.arena_pools; i++) {
+		PyObject *item = PyLong_FromSize_t(st.arena_usage[i]);
+		if (item == NULL) {
+			Py_DECREF(classes);
+			Py_DECREF(usage);
+			return NULL;
+		}
+		PyList_SET_ITEM(usage, i, item);
+	}
+
+	dict = PyDict_New();
+	if (dict != NULL && (
+	    PyDict_SetItemString(dict, "size_classes", classes) ||
+	    PyDict_SetItemString(dict, "arena_usage", usage) ||
+	    set_stat(dict, "arena_size", PyLong_FromSize_t(st.arena_size)) ||
+	    set_stat(dict, "pool_size", PyLong_FromSize_t(st.pool_size)) ||
+	    set_stat(dict, "arenas", PyLong_FromSize_t(st.narenas)) ||
+	    set_stat(dict, "arenas_allocated_total",
+		     PyLong_FromSize_t(st.narenas_total)) ||
+	    set_stat(dict, "arenas_reclaimed",
+		     PyLong_FromSize_t(st.narenas_total - st.narenas)) ||
+	    set_stat(dict, "arenas_highwater",
+		     PyLong_FromSize_t(st.narenas_highwater)) ||
+	    set_stat(dict, "pools_used", PyLong_FromSize_t(st.npools_used)) ||
+	    set_stat(dict, "pools_free", PyLong_FromSize_t(st.npools_free)) ||
+	    set_stat(dict, "bytes_allocated",
+		     PyLong_FromSize_t(st.allocated_bytes)) ||
+	    set_stat(dict, "bytes_available",
+		     PyLong_FromSize_t(st.available_bytes))))
+		Py_CLEAR(dict);
+	Py_DECREF(classes);
+	Py_DECREF(usage);
+	return dict;
+}
+
+PyDoc_STRVAR(getallocatorstats_doc,
+"getallocatorstats() -> dict\n\
+\n\
+Return a dict describing the arenas, pools and size classes of the small\n\
+object allocator.  This is an implementation detail of CPython."
+);
+#endif /* WITH_PYMALLOC */
+
 PyDoc_STRVAR(getrefcount_doc,
 "getrefcount(object) -> integer\n\
 \n\
@@ -864,6 +950,10 @@ static PyMethodDef sys_methods[] = {
 #endif
 #ifdef DYNAMIC_EXECUTION_PROFILE
 	{"getdxp",	_Py_GetDXProfile, METH_VARARGS},
+#endif
+#ifdef WITH_PYMALLOC
+	{"getallocatorstats", (PyCFunction)sys_getallocatorstats, METH_NOARGS,
+	 getallocatorstats_doc},
 #endif
 	{"getfilesystemencoding", (PyCFunction)sys_getfilesystemencoding,
 	 METH_NOARGS, getfilesystemencoding_doc},
@@ -1049,6 +1139,7 @@ displayhook() -- print an object to the screen, and save it in builtins._\n\
 excepthook() -- print an exception and its traceback to sys.stderr\n\
 exc_info() -- return thread-safe information about the current exception\n\
 exit() -- exit the interpreter by raising SystemExit\n\
+getallocatorstats() -- return the usage of the small object allocator\n\
 getdlopenflags() -- returns flags to be used for dlopen() calls\n\
 getprofile() -- get the global profiling function\n\
 getrefcount() -- return the reference count for an object (plus one :-)\n\
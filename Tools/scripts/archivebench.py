@@ -0,0 +1,148 @@
+#! /usr/bin/env python
+
+"""Time writing and extracting archives with one and several threads.
+
+usage: archivebench.py [-w workers] [-n small_files] [-s huge_size_mb]
+
+Two sets of files are made in a temporary directory: many small files
+(default 20000 files of 1-4 KB) and a few huge ones (default 4 files of
+64 MB).  For each set, the time taken by ZipFile.writeall() with
+ZIP_DEFLATED and by ZipFile.extractall() and TarFile.extractall() is
+printed, first on one thread and then on `workers' threads (default: the
+number of CPUs).
+"""
+
+import getopt
+import os
+import random
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+
+def cpu_count():
+    try:
+        return max(os.sysconf('SC_NPROCESSORS_ONLN'), 1)
+    except (AttributeError, ValueError, OSError):
+        return 1
+
+
+def make_data(size, rng):
+    # compressible, but not trivially so
+    words = [bytes(''.join(rng.choice('abcdefghij') for i in range(8)),
+                   'ascii') for j in range(256)]
+    chunk = b' '.join(rng.choice(words) for i in range(8192))
+    return (chunk * (size // len(chunk) + 1))[:size]
+
+
+def make_small_files(top, count):
+    rng = random.Random(1)
+    files = []
+    for i in range(count):
+        dirname = os.path.join(top, 'd%d' % (i % 100))
+        if not os.path.isdir(dirname):
+            os.mkdir(dirname)
+        name = os.path.join(dirname, 'f%d' % i)
+        with open(name, 'wb') as f:
+            f.write(make_data(rng.randint(1024, 4096), rng))
+        files.append(name)
+    return files
+
+
+def make_huge_files(top, count, size):
+    rng = random.Random(2)
+    data = make_data(size, rng)
+    files = []
+    for i in range(count):
+        name = os.path.join(top, 'huge%d' % i)
+        with open(name, 'wb') as f:
+            f.write(data)
+        files.append(name)
+    return files
+
+
+def timed(name, func, *args):
+    start = time.time()
+    func(*args)
+    print("  %-36s %8.3f s" % (name, time.time() - start))
+
+
+def write_zip(path, files, workers):
+    archive = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+    archive.writeall(files, workers=workers)
+    archive.close()
+
+
+def extract_zip(path, target, workers):
+    archive = zipfile.ZipFile(path)
+    archive.extractall(target, workers=workers)
+    archive.close()
+
+
+def extract_tar(path, target, workers):
+    archive = tarfile.open(path)
+    archive.extractall(target, workers=workers)
+    archive.close()
+
+
+def run(title, tmpdir, files, workers):
+    print("%s: %d files, %.1f MB" % (title, len(files),
+          sum(os.path.getsize(name) for name in files) / 2**20))
+    zipname = os.path.join(tmpdir, 'bench.zip')
+    tarname = os.path.join(tmpdir, 'bench.tar')
+    archive = tarfile.open(tarname, 'w')
+    for name in files:
+        archive.add(name)
+    archive.close()
+    for n in (1, workers):
+        target = os.path.join(tmpdir, 'out')
+        timed("ZipFile.writeall(workers=%d)" % n, write_zip, zipname,
+              files, n)
+        timed("ZipFile.extractall(workers=%d)" % n, extract_zip, zipname,
+              target, n)
+        shutil.rmtree(target)
+        timed("TarFile.extractall(workers=%d)" % n, extract_tar, tarname,
+              target, n)
+        shutil.rmtree(target)
+    os.remove(zipname)
+    os.remove(tarname)
+
+
+def main():
+    workers = cpu_count()
+    small = 20000
+    huge_size = 64
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'w:n:s:')
+    except getopt.error as msg:
+        print(msg, file=sys.stderr)
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    for o, a in opts:
+        if o == '-w':
+            workers = int(a)
+        elif o == '-n':
+            small = int(a)
+        elif o == '-s':
+            huge_size = int(a)
+    tmpdir = tempfile.mkdtemp()
+    cwd = os.getcwd()
+    try:
+        # relative names, so that the archives don't hold tmpdir
+        os.chdir(tmpdir)
+        os.mkdir('small')
+        os.mkdir('huge')
+        run("Many small files", tmpdir, make_small_files('small', small),
+            workers)
+        run("Few huge files", tmpdir,
+            make_huge_files('huge', 4, huge_size * 2**20), workers)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
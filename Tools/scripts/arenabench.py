@@ -0,0 +1,71 @@
+#! /usr/bin/env python
+
+"""Show how much memory is given back after a peak of small objects.
+
+usage: arenabench.py [-n objects] [-k keep]
+
+Many small objects (default 2000000 short strings and tuples) are made and
+then freed, like a worker handling one large request before going idle.
+The resident set size is printed at the start, at the peak, after freeing
+all but one object in `keep' (default 100, spread over the whole heap) and
+after freeing them all.  Where sys.getallocatorstats() exists, the number
+of arenas held by the small object allocator and the share of pools in
+use in them are printed as well.
+"""
+
+import getopt
+import os
+import sys
+
+
+def rss():
+    # current resident set size in bytes
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def report(stage):
+    line = "%-24s RSS %8.1f MB" % (stage, rss() / 2**20)
+    if hasattr(sys, 'getallocatorstats'):
+        stats = sys.getallocatorstats()
+        pools = stats['arenas'] * stats['arena_size'] // stats['pool_size']
+        line += "  %6d arenas, %5.1f%% of pools used" % (
+            stats['arenas'], 100.0 * stats['pools_used'] / max(pools, 1))
+    print(line)
+    sys.stdout.flush()
+
+
+def main():
+    nobjects = 2000000
+    keep = 100
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:k:')
+    except getopt.error as msg:
+        print(msg, file=sys.stderr)
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    for o, a in opts:
+        if o == '-n':
+            nobjects = int(a)
+        elif o == '-k':
+            keep = int(a)
+    print("%d objects, keeping 1 in %d" % (nobjects, keep))
+    report("start")
+    objs = [None] * nobjects
+    for i in range(nobjects):
+        objs[i] = 'object %d' % i if i % 2 else (i, i)
+    report("peak")
+    for i in range(nobjects):
+        if i % keep:
+            objs[i] = None
+    report("after freeing most")
+    del objs
+    report("after freeing all")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#! /usr/bin/env python
+
+"""Measure the memory a forked child keeps sharing with its parent.
+
+usage: forkbench.py [-n objects] [-w workers] [-m mode]
+
+The parent makes many small container objects (default 1000000 lists,
+dicts and instances) with the collector disabled, then forks `workers'
+children (default 4).  Each child enables the collector, runs a full
+collection and reports how much of its memory is still shared with the
+parent and how much it had to copy, as read from /proc/self/smaps.
+
+This is done once with the objects left in the collector's generations,
+and once after gc.freeze() has moved them to the permanent generation.
+Each mode runs in a fresh interpreter; -m plain or -m freeze measures one
+mode in this process.
+"""
+
+import gc
+import getopt
+import os
+import subprocess
+import sys
+import time
+
+
+class Item:
+    def __init__(self, i):
+        self.key = i
+        self.value = [i]
+
+
+def make_objects(n):
+    objs = []
+    for i in range(n // 3):
+        objs.append([i, str(i)])
+        objs.append({'id': i})
+        objs.append(Item(i))
+    return objs
+
+
+def smaps():
+    # (shared, private) bytes of all the mappings of this process
+    shared = private = 0
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            if line.startswith(('Shared_Clean:', 'Shared_Dirty:')):
+                shared += int(line.split()[1]) * 1024
+            elif line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                private += int(line.split()[1]) * 1024
+    return shared, private
+
+
+def child(wfd):
+    gc.enable()
+    start = time.time()
+    gc.collect()
+    elapsed = time.time() - start
+    shared, private = smaps()
+    os.write(wfd, ("%d %d %f\n" % (shared, private, elapsed)).encode())
+    os._exit(0)
+
+
+def measure(mode, nobjects, nworkers):
+    gc.disable()
+    objs = make_objects(nobjects)
+    if mode == 'freeze':
+        gc.freeze()
+    rfd, wfd = os.pipe()
+    pids = []
+    for i in range(nworkers):
+        pid = os.fork()
+        if pid == 0:
+            os.close(rfd)
+            child(wfd)
+        pids.append(pid)
+    os.close(wfd)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    with os.fdopen(rfd) as f:
+        results = [[float(x) for x in line.split()] for line in f]
+    shared = sum(r[0] for r in results) / len(results)
+    private = sum(r[1] for r in results) / len(results)
+    elapsed = sum(r[2] for r in results) / len(results)
+    print("%-7s shared %7.1f MB  private %7.1f MB  collect %6.1f ms"
+          % (mode, shared / 2**20, private / 2**20, elapsed * 1e3))
+    sys.stdout.flush()
+
+
+def main():
+    nobjects = 1000000
+    nworkers = 4
+    modes = ['plain', 'freeze']
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:w:m:')
+    except getopt.error as msg:
+        print(msg, file=sys.stderr)
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    for o, a in opts:
+        if o == '-n':
+            nobjects = int(a)
+        elif o == '-w':
+            nworkers = int(a)
+        elif o == '-m':
+            if a not in modes:
+                print("unknown mode: %s" % a, file=sys.stderr)
+                sys.exit(2)
+            modes = [a]
+    if not os.path.exists('/proc/self/smaps'):
+        print("/proc/self/smaps is needed to tell shared pages from "
+              "private ones", file=sys.stderr)
+        sys.exit(1)
+    if len(modes) == 1:
+        measure(modes[0], nobjects, nworkers)
+        return
+    print("%d objects, %d workers, averages per worker" % (nobjects,
+                                                           nworkers))
+    sys.stdout.flush()
+    for mode in modes:
+        subprocess.call([sys.executable, __file__, '-n', str(nobjects),
+                         '-w', str(nworkers), '-m', mode])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#! /usr/bin/env python
+
+"""Measure the memory and attribute access time of instance dicts.
+
+usage: instancebench.py [-n instances] [-a attributes] [-x extra] [-l layout]
+
+Many instances of one class (default 1000000) are made, each with the same
+attributes (default 5) set in __init__.  This is done once with the
+__dict__ of the instances sharing their keys, and once with each instance
+holding a dict of its own (a copy of the shared dict, like the dicts of
+earlier versions).  For each layout the growth of the resident set size,
+the size reported by sys.getsizeof() for one __dict__ and the best time
+taken to read every attribute of every instance are printed.  With -x,
+one instance made first gets `extra' more attributes, like an outlier
+among many similar instances.
+
+Each layout is measured in a fresh interpreter; -l shared or -l combined
+measures one layout in this process.
+"""
+
+import getopt
+import os
+import subprocess
+import sys
+import time
+
+
+def rss():
+    # current resident set size in bytes
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def make_class(nattrs):
+    names = ['attr%d' % i for i in range(nattrs)]
+    body = ['def __init__(self, i):']
+    body.extend('    self.%s = i' % name for name in names)
+    ns = {}
+    exec('\n'.join(body), ns)
+    return type('C', (object,), {'__init__': ns['__init__']}), names
+
+
+def make_reader(names):
+    body = ['def read(objs):', '    for obj in objs:']
+    body.extend('        obj.%s' % name for name in names)
+    ns = {}
+    exec('\n'.join(body), ns)
+    return ns['read']
+
+
+def measure(layout, ninstances, nattrs, extra):
+    cls, names = make_class(nattrs)
+    read = make_reader(names)
+    outlier = cls(0)
+    for i in range(extra):
+        setattr(outlier, 'extra%d' % i, i)
+    objs = [None] * ninstances
+    before = rss()
+    for i in range(ninstances):
+        obj = cls(i)
+        if layout == 'combined':
+            obj.__dict__ = dict(obj.__dict__)
+        objs[i] = obj
+    grown = rss() - before
+    times = []
+    for i in range(5):
+        start = time.time()
+        read(objs)
+        times.append(time.time() - start)
+    elapsed = min(times)
+    print("%-10s RSS %+8.1f MB  __dict__ %4d bytes  %6.1f ns/attribute" % (
+        layout, grown / 2**20, sys.getsizeof(objs[0].__dict__),
+        elapsed * 1e9 / (ninstances * nattrs)))
+    sys.stdout.flush()
+
+
+def main():
+    ninstances = 1000000
+    nattrs = 5
+    extra = 0
+    layouts = ['shared', 'combined']
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:a:x:l:')
+    except getopt.error as msg:
+        print(msg, file=sys.stderr)
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    for o, a in opts:
+        if o == '-n':
+            ninstances = int(a)
+        elif o == '-a':
+            nattrs = int(a)
+        elif o == '-x':
+            extra = int(a)
+        elif o == '-l':
+            if a not in layouts:
+                print("unknown layout: %s" % a, file=sys.stderr)
+                sys.exit(2)
+            layouts = [a]
+    if len(layouts) == 1:
+        measure(layouts[0], ninstances, nattrs, extra)
+        return
+    print("%d instances, %d attributes, outlier with %d more" % (
+        ninstances, nattrs, extra))
+    sys.stdout.flush()
+    for layout in layouts:
+        subprocess.call([sys.executable, __file__, '-n', str(ninstances),
+                         '-a', str(nattrs), '-x', str(extra), '-l', layout])
+
+
+if __name__ == '__main__':
+    main()
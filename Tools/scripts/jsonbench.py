@@ -0,0 +1,90 @@
+#! /usr/bin/env python
+
+"""Compare the ways of writing a large object to a file as JSON.
+
+usage: jsonbench.py [-n records] [-s buffer_size] [file]
+
+The object is a list of records which is written to file (default: a
+temporary file) with
+  - the old json.dump(), one write() per encoded fragment,
+  - f.write(json.dumps(obj)), building the whole text first,
+  - json.dump(), writing blocks of buffer_size characters.
+The time taken and the largest text held in memory are printed.
+"""
+
+import getopt
+import json
+import os
+import sys
+import tempfile
+import time
+
+
+def make_records(n):
+    return [{"id": i, "name": "record %d" % i, "score": i / 7,
+             "tags": ["alpha", "beta", "gamma"], "active": i % 3 == 0,
+             "parent": None}
+            for i in range(n)]
+
+
+def old_dump(obj, f):
+    for chunk in json.JSONEncoder().iterencode(obj):
+        f.write(chunk)
+    return 0
+
+
+def dumps_write(obj, f):
+    s = json.dumps(obj)
+    f.write(s)
+    return len(s)
+
+
+def streaming_dump(obj, f, buffer_size):
+    json.dump(obj, f, buffer_size=buffer_size)
+    return buffer_size
+
+
+def run(name, func, path, obj, *args):
+    with open(path, 'w', encoding='utf-8') as f:
+        start = time.time()
+        held = func(obj, f, *args)
+        elapsed = time.time() - start
+    size = os.path.getsize(path)
+    print("%-28s %8.3f s  %8.1f MB/s  text held: %s" % (
+        name, elapsed, size / elapsed / 2**20,
+        "%d chars" % held if held else "per fragment"))
+
+
+def main():
+    nrecords = 200000
+    buffer_size = json.encoder.BUFFER_SIZE
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:s:')
+    except getopt.error as msg:
+        print(msg, file=sys.stderr)
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    for o, a in opts:
+        if o == '-n':
+            nrecords = int(a)
+        elif o == '-s':
+            buffer_size = int(a)
+    if args:
+        path = args[0]
+    else:
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+    try:
+        obj = make_records(nrecords)
+        print("%d records" % nrecords)
+        run("iterencode + write", old_dump, path, obj)
+        run("write(dumps())", dumps_write, path, obj)
+        run("dump(buffer_size=%d)" % buffer_size, streaming_dump, path, obj,
+            buffer_size)
+    finally:
+        if not args:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
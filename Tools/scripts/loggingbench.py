@@ -0,0 +1,58 @@
+#! /usr/bin/env python
+
+"""Time logger calls that are discarded and calls that are logged.
+
+usage: loggingbench.py [-n calls] [-d max_depth]
+
+For loggers nested 1 to max_depth levels below a logger whose level is
+INFO, the time per logger.debug() call (discarded) and per logger.info()
+call (handled by a handler that does nothing) is printed.
+"""
+
+import getopt
+import logging
+import sys
+import time
+
+
+class NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+
+
+def timeit(func, ncalls):
+    start = time.time()
+    for i in range(ncalls):
+        func("message %d", i)
+    return (time.time() - start) / ncalls * 1e9
+
+
+def main():
+    ncalls = 1000000
+    maxdepth = 6
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:d:')
+    except getopt.error as msg:
+        print(msg, file=sys.stderr)
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    for o, a in opts:
+        if o == '-n':
+            ncalls = int(a)
+        elif o == '-d':
+            maxdepth = int(a)
+    top = logging.getLogger("bench")
+    top.setLevel(logging.INFO)
+    top.addHandler(NullHandler())
+    top.propagate = 0
+    print("depth  disabled debug()  enabled info()")
+    for depth in range(1, maxdepth + 1):
+        name = ".".join(["bench"] + ["l%d" % i for i in range(depth)])
+        logger = logging.getLogger(name)
+        disabled = timeit(logger.debug, ncalls)
+        enabled = timeit(logger.info, ncalls // 10)
+        print("%5d  %11.0f ns  %11.0f ns" % (depth, disabled, enabled))
+
+
+if __name__ == '__main__':
+    main()
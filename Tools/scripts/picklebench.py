@@ -0,0 +1,90 @@
+#! /usr/bin/env python
+
+"""Time the pickling round trip of many small messages.
+
+usage: picklebench.py [-n messages] [-p protocol] [-P]
+
+Each message is a small dict, like a request sent between processes.  The
+messages are pickled and unpickled one at a time (default 100000 of them)
+with
+  - pickle.dumps() and pickle.loads(),
+  - a Pickler and an Unpickler reused through their dumps() and loads()
+    methods,
+  - the same in fast mode, which keeps no memo.
+The time taken per message is printed for pickling, unpickling and the
+round trip.  -P uses the pure Python implementation instead of _pickle.
+"""
+
+import getopt
+import pickle
+import sys
+import time
+
+
+def make_messages(n):
+    return [{"id": i, "method": "get", "args": ("key%d" % i, i * 3),
+             "reply": True}
+            for i in range(n)]
+
+
+def module_functions(proto, pickler_class, unpickler_class):
+    if pickler_class is pickle.Pickler:
+        return (lambda obj: pickle.dumps(obj, proto)), pickle.loads
+    def dumps(obj):
+        return pickler_class(None, proto).dumps(obj)
+    def loads(data):
+        return unpickler_class(None).loads(data)
+    return dumps, loads
+
+
+def reused(proto, pickler_class, unpickler_class, fast=False):
+    pickler = pickler_class(None, proto)
+    pickler.fast = fast
+    return pickler.dumps, unpickler_class(None).loads
+
+
+def run(name, funcs, messages):
+    dumps, loads = funcs
+    start = time.time()
+    pickled = [dumps(msg) for msg in messages]
+    middle = time.time()
+    for data in pickled:
+        loads(data)
+    end = time.time()
+    scale = 1e6 / len(messages)
+    print("%-24s dumps %6.2f us  loads %6.2f us  round trip %6.2f us" % (
+        name, (middle - start) * scale, (end - middle) * scale,
+        (end - start) * scale))
+
+
+def main():
+    nmessages = 100000
+    proto = pickle.HIGHEST_PROTOCOL
+    pickler_class, unpickler_class = pickle.Pickler, pickle.Unpickler
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], 'n:p:P')
+    except getopt.error as msg:
+        print(msg, file=sys.stderr)
+        print(__doc__, file=sys.stderr)
+        sys.exit(2)
+    for o, a in opts:
+        if o == '-n':
+            nmessages = int(a)
+        elif o == '-p':
+            proto = int(a)
+        elif o == '-P':
+            pickler_class = pickle._Pickler
+            unpickler_class = pickle._Unpickler
+    messages = make_messages(nmessages)
+    print("%d messages, protocol %d, %s" % (
+        nmessages, proto, pickler_class.__module__))
+    run("pickle.dumps/loads", module_functions(proto, pickler_class,
+                                               unpickler_class), messages)
+    run("reused, memo", reused(proto, pickler_class, unpickler_class),
+        messages)
+    run("reused, fast", reused(proto, pickler_class, unpickler_class, True),
+        messages)
+
+
+if __name__ == '__main__':
+    main()